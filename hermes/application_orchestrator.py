@@ -1,7 +1,10 @@
+import logging
 from argparse import Namespace
 
 from hermes.chat.conversation_orchestrator import ConversationOrchestrator
 from hermes.chat.history import History
+from hermes.chat.history_compaction import HistoryCompactionSettings, HistoryCompactor, HistorySummarizer
+from hermes.chat.history_journal import HistoryJournal, HistoryJournalSettings
 from hermes.chat.interface.control_panel.commands_lister import CommandsLister
 from hermes.chat.participants.debug_participant import DebugParticipant
 from hermes.chat.participants.llm_participant import LLMParticipant
@@ -10,8 +13,12 @@ from hermes.components_container import CoreComponents
 from hermes.config_manager import ConfigManager
 from hermes.core_components_builder import CoreComponentsBuilder
 from hermes.participants_factory import ParticipantsFactory
+from hermes.utils.config_utils import get_cache_dir_path
+from hermes.utils.http_transport import HttpTransportSettings, get_shared_http_transport
 from hermes.utils_command_executor import UtilsCommandExecutor
 
+logger = logging.getLogger(__name__)
+
 
 class ApplicationOrchestrator:
     def __init__(self):
@@ -20,6 +27,7 @@ class ApplicationOrchestrator:
         self.participants_factory = ParticipantsFactory(self.config_manager)
 
     def run(self):
+        get_shared_http_transport().configure(HttpTransportSettings.from_config(self.config_manager.get_http_settings()))
         components = self.core_components_builder.build()
         provider_model_pairs = components.model_factory.get_provider_model_pairs()
         cli_parser = CLIParser(provider_model_pairs)
@@ -67,7 +75,7 @@ class ApplicationOrchestrator:
         )
         self.participants_factory.print_welcome_message(model_info_string)
 
-        history = History()
+        history = History(journal=self._create_history_journal())
         conversation_orchestrator = ConversationOrchestrator(
             user_participant=participants.user,
             assistant_participant=participants.assistant,
@@ -100,7 +108,8 @@ class ApplicationOrchestrator:
         )
         self.participants_factory.print_welcome_message(model_info_string)
 
-        history = History()
+        journal = self._create_history_journal()
+        history = History(journal=journal, compactor=self._create_history_compactor(components, journal))
         conversation_orchestrator = ConversationOrchestrator(
             user_participant=participants.user,
             assistant_participant=participants.assistant,
@@ -109,6 +118,31 @@ class ApplicationOrchestrator:
         )
         self._run_conversation(conversation_orchestrator, participants.assistant)
 
+    def _create_history_journal(self) -> HistoryJournal | None:
+        settings = HistoryJournalSettings.from_config(self.config_manager.get_history_settings())
+        if not settings.autosave:
+            return None
+        try:
+            journal = HistoryJournal.create_session(settings)
+        except OSError as e:
+            logger.warning(f"Can't create the autosave directory of the session, the history won't be autosaved: {e}")
+            return None
+        self.participants_factory.notifications_printer.print_notification(
+            f"Autosaving the session, resume it with /load_history {journal.session_directory}"
+        )
+        return journal
+
+    def _create_history_compactor(self, components: CoreComponents, journal: HistoryJournal | None) -> HistoryCompactor | None:
+        settings = HistoryCompactionSettings.from_config(self.config_manager.get_compaction_settings())
+        if not settings.model:
+            return None
+        model = components.model_factory.get_model_from_info_string(settings.model, self.config_manager.get_config())
+        # The originals of the compacted messages are kept with the autosaved session
+        archive_directory = journal.session_directory / "compacted" if journal else get_cache_dir_path() / "compacted"
+        summarizer = HistorySummarizer(model, settings.max_message_characters)
+        notifications_printer = self.participants_factory.notifications_printer
+        return HistoryCompactor(settings, summarizer.summarize, archive_directory, notifications_printer)
+
     def _get_model_info_string(self, cli_model: str | None) -> str | None:
         return cli_model or self.config_manager.get_default_model_info_string()
 
@@ -121,6 +155,7 @@ class ApplicationOrchestrator:
             print("Error occurred:")
             raise e
         finally:
+            conversation_orchestrator.history.close()
             self._cleanup_if_needed(assistant)
 
     def _cleanup_if_needed(self, assistant_participant: LLMParticipant | DebugParticipant):
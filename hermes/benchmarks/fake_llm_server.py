@@ -0,0 +1,326 @@
+"""Local HTTP server speaking the streaming protocols of the OpenAI chat completions and Anthropic messages APIs,
+with a configurable time to first token and token rate, to measure Hermes' own overhead without provider variance.
+
+Run it standalone with `python -m hermes.benchmarks.fake_llm_server --port 8765`, then point a model at it,
+e.g. `"openai": {"api_key": "fake", "base_url": "http://127.0.0.1:8765/v1"}`.
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+CHARACTERS_PER_TOKEN = 4
+RESPONSE_SEPARATOR = "$%%"
+
+DEFAULT_RESPONSE = """## Findings
+
+The **first** point is covered in the [documentation](https://example.com/docs), with a few caveats:
+
+- the cache is warmed on startup
+- the requests are retried with backoff
+- the history is compacted in the background
+
+```python
+def process(items):
+    return [item.strip() for item in items if item]
+```
+
+"""
+
+
+@dataclass
+class FakeLLMServerSettings:
+    time_to_first_token_seconds: float = 0.3
+    tokens_per_second: float = 80.0
+    tokens_per_chunk: int = 3
+    # Responses are repeated up to this many tokens, 0 sends each response once
+    response_tokens: int = 400
+
+
+class ResponseScript:
+    """The responses of the server, given out in order and starting over once all were used"""
+
+    def __init__(self, responses: list[str]):
+        if not responses:
+            raise ValueError("The response script needs at least one response")
+        self._responses = itertools.cycle(responses)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: Path) -> "ResponseScript":
+        """Responses separated by $%%, the format of the mocked deep research responses"""
+        content = path.read_text()
+        return cls([response.strip() for response in content.split(RESPONSE_SEPARATOR) if response.strip()])
+
+    def next_response(self) -> str:
+        with self._lock:
+            return next(self._responses)
+
+
+class FakeLLMServer:
+    """Threaded server, each request streams on its own thread like concurrent provider calls"""
+
+    def __init__(self, settings: FakeLLMServerSettings | None = None, script: ResponseScript | None = None, port: int = 0):
+        self.settings = settings or FakeLLMServerSettings()
+        self.script = script or ResponseScript([DEFAULT_RESPONSE])
+        self.request_count = 0
+        self.received_bytes = 0
+        self._counter_lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _create_handler_class(self))
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-llm-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        # shutdown() waits for serve_forever, which never runs if the server wasn't started
+        if self._thread is not None:
+            self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def record_request(self, size: int):
+        with self._counter_lock:
+            self.request_count += 1
+            self.received_bytes += size
+
+    def get_response_chunks(self) -> list[str]:
+        response = self.script.next_response()
+        if self.settings.response_tokens:
+            target_characters = self.settings.response_tokens * CHARACTERS_PER_TOKEN
+            response = (response * (target_characters // len(response) + 1))[:target_characters]
+        chunk_characters = self.settings.tokens_per_chunk * CHARACTERS_PER_TOKEN
+        return [response[index : index + chunk_characters] for index in range(0, len(response), chunk_characters)]
+
+    def get_chunk_interval_seconds(self) -> float:
+        if self.settings.tokens_per_second <= 0:
+            return 0.0
+        return self.settings.tokens_per_chunk / self.settings.tokens_per_second
+
+
+def _create_handler_class(server: FakeLLMServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(_FakeLLMRequestHandler):
+        fake_server = server
+
+    return Handler
+
+
+class _FakeLLMRequestHandler(BaseHTTPRequestHandler):
+    fake_server: FakeLLMServer
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):  # noqa: N802
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.fake_server.record_request(len(body))
+        request = json.loads(body or b"{}")
+        if self.path.endswith("/chat/completions"):
+            self._respond(request, _OpenAIStreamFormat(request))
+        elif self.path.endswith("/messages"):
+            self._respond(request, _AnthropicStreamFormat(request))
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+
+    def do_HEAD(self):  # noqa: N802
+        # Connection warm-ups
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _respond(self, request: dict, stream_format: "_StreamFormat"):
+        chunks = self.fake_server.get_response_chunks()
+        time.sleep(self.fake_server.settings.time_to_first_token_seconds)
+        if not request.get("stream"):
+            self._send_json(200, stream_format.complete_response("".join(chunks)))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        interval = self.fake_server.get_chunk_interval_seconds()
+        self._send_events(stream_format.start_events())
+        for index, chunk in enumerate(chunks):
+            if index:
+                time.sleep(interval)
+            self._send_events(stream_format.delta_events(chunk))
+        self._send_events(stream_format.end_events(sum(len(chunk) for chunk in chunks) // CHARACTERS_PER_TOKEN))
+        self._write_chunk(b"")
+
+    def _send_events(self, events: list[tuple[str | None, Any]]):
+        if not events:
+            # An empty chunk would end the response
+            return
+        lines = []
+        for event_name, data in events:
+            if event_name:
+                lines.append(f"event: {event_name}\n")
+            lines.append(f"data: {data if isinstance(data, str) else json.dumps(data)}\n\n")
+        self._write_chunk("".join(lines).encode())
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+
+class _StreamFormat(ABC):
+    """The server-sent events (name and data) and the non-streamed response of a provider's protocol"""
+
+    def __init__(self, request: dict):
+        self.request = request
+        self.model = request.get("model", "fake-model")
+        self.input_tokens = len(json.dumps(request)) // CHARACTERS_PER_TOKEN
+
+    def start_events(self) -> list[tuple[str | None, Any]]:
+        return []
+
+    @abstractmethod
+    def delta_events(self, text: str) -> list[tuple[str | None, Any]]:
+        pass
+
+    @abstractmethod
+    def end_events(self, output_tokens: int) -> list[tuple[str | None, Any]]:
+        pass
+
+    @abstractmethod
+    def complete_response(self, text: str) -> dict:
+        pass
+
+
+class _OpenAIStreamFormat(_StreamFormat):
+    def delta_events(self, text: str) -> list[tuple[str | None, Any]]:
+        return [(None, self._chunk({"role": "assistant", "content": text}, None))]
+
+    def end_events(self, output_tokens: int) -> list[tuple[str | None, Any]]:
+        events = [(None, self._chunk({}, "stop"))]
+        if (self.request.get("stream_options") or {}).get("include_usage"):
+            events.append((None, {**self._chunk({}, None), "choices": [], "usage": self._usage(output_tokens)}))
+        return [*events, (None, "[DONE]")]
+
+    def complete_response(self, text: str) -> dict:
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": self.model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": self._usage(len(text) // CHARACTERS_PER_TOKEN),
+        }
+
+    def _chunk(self, delta: dict, finish_reason: str | None) -> dict:
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": self.model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    def _usage(self, output_tokens: int) -> dict:
+        return {"prompt_tokens": self.input_tokens, "completion_tokens": output_tokens, "total_tokens": self.input_tokens + output_tokens}
+
+
+class _AnthropicStreamFormat(_StreamFormat):
+    def start_events(self) -> list[tuple[str | None, Any]]:
+        message = {**self._message([]), "usage": self._usage(1)}
+        return [
+            ("message_start", {"type": "message_start", "message": message}),
+            ("content_block_start", {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}),
+        ]
+
+    def delta_events(self, text: str) -> list[tuple[str | None, Any]]:
+        return [("content_block_delta", {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": text}})]
+
+    def end_events(self, output_tokens: int) -> list[tuple[str | None, Any]]:
+        return [
+            ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+            (
+                "message_delta",
+                {
+                    "type": "message_delta",
+                    "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                    "usage": {"output_tokens": output_tokens},
+                },
+            ),
+            ("message_stop", {"type": "message_stop"}),
+        ]
+
+    def complete_response(self, text: str) -> dict:
+        return {
+            **self._message([{"type": "text", "text": text}]),
+            "stop_reason": "end_turn",
+            "usage": self._usage(len(text) // CHARACTERS_PER_TOKEN),
+        }
+
+    def _message(self, content: list) -> dict:
+        return {
+            "id": "msg_fake",
+            "type": "message",
+            "role": "assistant",
+            "model": self.model,
+            "content": content,
+            "stop_reason": None,
+            "stop_sequence": None,
+        }
+
+    def _usage(self, output_tokens: int) -> dict:
+        return {
+            "input_tokens": self.input_tokens,
+            "output_tokens": output_tokens,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake streaming LLM server (OpenAI chat completions and Anthropic messages)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttft", type=float, default=FakeLLMServerSettings.time_to_first_token_seconds, help="Time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=FakeLLMServerSettings.tokens_per_second)
+    parser.add_argument("--response-tokens", type=int, default=FakeLLMServerSettings.response_tokens)
+    parser.add_argument("--script", type=Path, help="File with the responses, separated by $%%")
+    args = parser.parse_args()
+
+    settings = FakeLLMServerSettings(
+        time_to_first_token_seconds=args.ttft, tokens_per_second=args.tokens_per_second, response_tokens=args.response_tokens
+    )
+    server = FakeLLMServer(settings, ResponseScript.from_file(args.script) if args.script else None, port=args.port)
+    print(f"Fake LLM server listening on {server.url} (OpenAI: {server.url}/v1, Anthropic: {server.url})")
+    server.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""End-to-end latency benchmark of Hermes against the local fake LLM server.
+
+Drives the real ConversationOrchestrator (chat) and ResearchEngine (deep research) with scripted user turns over a large history,
+and reports the client-side CPU time, peak memory, rendering cost and per-phase latency. The fake server runs in its own
+process, so its work doesn't count against the client.
+
+Run it through `uv run invoke benchmark-latency`, or `python -m hermes.benchmarks.latency_benchmark --help`.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Generator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, cast
+
+from hermes.chat.conversation_orchestrator import ConversationOrchestrator
+from hermes.chat.events.engine_commands.once import OnceEvent
+from hermes.chat.events.message_event import MessageEvent
+from hermes.chat.history import History
+from hermes.chat.interface import Orchestrator
+from hermes.chat.interface.assistant.chat.assistant_orchestrator import ChatAssistantOrchestrator
+from hermes.chat.interface.assistant.chat.control_panel import ChatAssistantControlPanel
+from hermes.chat.interface.assistant.deep_research.assistant_orchestrator import DeepResearchAssistantOrchestrator
+from hermes.chat.interface.assistant.models.chat_models.stream_metrics import StreamMetrics, get_shared_stream_metrics
+from hermes.chat.interface.assistant.models.model_factory import ModelFactory
+from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
+from hermes.chat.interface.user.control_panel.exa_client import ExaClient
+from hermes.chat.interface.user.interface.event_renderer import EventRenderer
+from hermes.chat.interface.user.interface.markdown_highlighter import MarkdownHighlighter
+from hermes.chat.messages import TextMessage
+from hermes.chat.participants import LLMParticipant, Participant
+
+if TYPE_CHECKING:
+    from hermes.chat.events.base import Event
+    from hermes.mcp.mcp_manager import McpManager
+
+RESEARCH_RESPONSES_PATH = Path(__file__).parent.parent / "examples" / "mock_responses.txt"
+SERVER_STARTUP_TIMEOUT_SECONDS = 10.0
+MODEL_TAGS = {"OPENAI": "gpt-4o", "ANTHROPIC": "claude-3-5-sonnet-20241022"}
+
+
+@dataclass
+class BenchmarkSettings:
+    provider: str = "OPENAI"
+    turns: int = 5
+    history_messages: int = 200
+    history_message_characters: int = 2000
+    time_to_first_token_seconds: float = 0.2
+    tokens_per_second: float = 200.0
+    response_tokens: int = 400
+    markdown: bool = True
+
+
+@dataclass
+class BenchmarkResult:
+    scenario: str
+    wall_seconds: float
+    cpu_seconds: float
+    peak_rss_bytes: int | None
+    turn_seconds: list[float]
+    stream_metrics: list[StreamMetrics] = field(default_factory=list)
+
+    @property
+    def provider_seconds(self) -> float:
+        return sum(metrics.waiting_seconds for metrics in self.stream_metrics)
+
+    @property
+    def client_overhead_seconds(self) -> float:
+        """Everything but waiting for the fake provider: request building, rendering, command handling, bookkeeping"""
+        return self.wall_seconds - self.provider_seconds
+
+    def describe(self) -> str:
+        lines = [
+            f"{self.scenario}: {len(self.turn_seconds)} turns, {len(self.stream_metrics)} LLM requests",
+            f"  wall {self.wall_seconds:.2f}s, provider {self.provider_seconds:.2f}s, client overhead {self.client_overhead_seconds:.2f}s",
+            f"  client CPU {self.cpu_seconds:.2f}s" + (f", peak RSS {self.peak_rss_bytes / 2**20:.0f}MiB" if self.peak_rss_bytes else ""),
+        ]
+        phases = {
+            "turn": self.turn_seconds,
+            "request build": [m.request_build_seconds for m in self.stream_metrics if m.request_build_seconds is not None],
+            "first chunk": [m.time_to_first_chunk_seconds for m in self.stream_metrics if m.time_to_first_chunk_seconds is not None],
+            "rendering": [m.consumer_seconds for m in self.stream_metrics],
+        }
+        lines.extend(f"  {name}: {_describe_distribution(values)}" for name, values in phases.items() if values)
+        return "\n".join(lines)
+
+    def to_json(self) -> dict:
+        return {
+            **{key: value for key, value in asdict(self).items() if key != "stream_metrics"},
+            "provider_seconds": self.provider_seconds,
+            "client_overhead_seconds": self.client_overhead_seconds,
+            "stream_metrics": [metrics.to_json() for metrics in self.stream_metrics],
+        }
+
+
+def _describe_distribution(values: list[float]) -> str:
+    if len(values) == 1:
+        return f"{values[0] * 1000:.1f}ms"
+    percentiles = statistics.quantiles(values, n=20, method="inclusive")
+    return f"p50 {percentiles[9] * 1000:.1f}ms, p95 {percentiles[18] * 1000:.1f}ms, max {max(values) * 1000:.1f}ms"
+
+
+class ScriptedUserInterface(Orchestrator):
+    """Sends the given messages one per cycle, asks the conversation to stop after the last one,
+    and renders the assistant's responses like the real user interface (into a buffer).
+    """
+
+    def __init__(self, messages: list[str], event_renderer: EventRenderer):
+        self.messages = list(messages)
+        # Public like in UserOrchestrator, /stream_metrics toggles it
+        self.event_renderer = event_renderer
+        self.turn_seconds: list[float] = []
+        self._turn_started: float | None = None
+
+    def render(self, events: Generator["Event", None, None]):
+        self.event_renderer.render_events(events)
+        if self._turn_started is not None:
+            self.turn_seconds.append(time.perf_counter() - self._turn_started)
+            self._turn_started = None
+
+    def get_input(self) -> Generator["Event", None, None]:
+        text = self.messages.pop(0)
+        if not self.messages:
+            yield OnceEvent(enabled=True)
+        self._turn_started = time.perf_counter()
+        yield MessageEvent(TextMessage(author="user", text=text, is_directly_entered=True))
+
+    def clear(self):
+        pass
+
+    def prepare(self):
+        pass
+
+
+class ScriptedUserParticipant(Participant):
+    """The user side of a benchmark, driven by a ScriptedUserInterface"""
+
+    def __init__(self, interface: ScriptedUserInterface):
+        self.interface = interface
+
+    def get_input_and_run_commands(self) -> Generator["Event", None, None]:
+        return self.interface.get_input()
+
+    def consume_events_and_render(self, events: Generator["Event", None, None]):
+        self.interface.render(events)
+
+    def get_interface(self) -> Orchestrator:
+        return self.interface
+
+    def get_author_key(self) -> str:
+        return "user"
+
+    def clear(self):
+        self.interface.clear()
+
+    def initialize_from_history(self, history: History):
+        self.interface.initialize_from_history(history)
+
+    def get_name(self) -> str:
+        return "user"
+
+
+@contextlib.contextmanager
+def start_fake_server(settings: BenchmarkSettings, script_path: Path | None = None, response_tokens: int | None = None):
+    """The fake LLM server in a subprocess, yields its URL"""
+    port = _find_free_port()
+    arguments = [
+        sys.executable,
+        "-m",
+        "hermes.benchmarks.fake_llm_server",
+        f"--port={port}",
+        f"--ttft={settings.time_to_first_token_seconds}",
+        f"--tokens-per-second={settings.tokens_per_second}",
+        f"--response-tokens={settings.response_tokens if response_tokens is None else response_tokens}",
+    ]
+    if script_path:
+        arguments.append(f"--script={script_path}")
+    process = subprocess.Popen(arguments, stdout=subprocess.DEVNULL)
+    try:
+        _wait_for_port(port)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def _find_free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _wait_for_port(port: int):
+    deadline = time.monotonic() + SERVER_STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        with contextlib.suppress(OSError), socket.create_connection(("127.0.0.1", port), timeout=0.5):
+            return
+        time.sleep(0.05)
+    raise RuntimeError(f"The fake LLM server didn't start on port {port}")
+
+
+def run_chat_benchmark(settings: BenchmarkSettings) -> BenchmarkResult:
+    with start_fake_server(settings) as server_url:
+        mcp_manager = _create_mcp_manager()
+        control_panel = ChatAssistantControlPanel(CLINotificationsPrinter(), [], ExaClient(None), {}, mcp_manager)
+        assistant = LLMParticipant(ChatAssistantOrchestrator(_create_model(settings, server_url), control_panel))
+        messages = [f"Question {turn}: what changed in the last answer and why?" for turn in range(settings.turns)]
+        return _run_conversation("chat", settings, assistant, messages, mcp_manager)
+
+
+def run_research_benchmark(settings: BenchmarkSettings) -> BenchmarkResult:
+    # The scripted research commands must be sent as they are
+    with (
+        start_fake_server(settings, RESEARCH_RESPONSES_PATH, response_tokens=0) as server_url,
+        tempfile.TemporaryDirectory() as research_dir,
+    ):
+        mcp_manager = _create_mcp_manager()
+        orchestrator = DeepResearchAssistantOrchestrator(_create_model(settings, server_url), Path(research_dir), None, mcp_manager)
+        messages = ["Research how the caching layers interact."]
+        return _run_conversation("research", settings, LLMParticipant(orchestrator), messages, mcp_manager)
+
+
+def _run_conversation(
+    scenario: str, settings: BenchmarkSettings, assistant: LLMParticipant, messages: list[str], mcp_manager: "McpManager"
+) -> BenchmarkResult:
+    event_renderer = EventRenderer(MarkdownHighlighter() if settings.markdown else None, CLINotificationsPrinter())
+    user_interface = ScriptedUserInterface(messages, event_renderer)
+    user = ScriptedUserParticipant(user_interface)
+    conversation = ConversationOrchestrator(user, assistant, _create_history(settings), mcp_manager)
+    stream_metrics = get_shared_stream_metrics()
+    stream_metrics.take_unreported()
+
+    wall_started, cpu_started = time.perf_counter(), time.process_time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        conversation.start_conversation()
+    wall_seconds, cpu_seconds = time.perf_counter() - wall_started, time.process_time() - cpu_started
+
+    return BenchmarkResult(
+        scenario=f"{scenario} ({settings.provider.lower()}, {settings.history_messages} history messages)",
+        wall_seconds=wall_seconds,
+        cpu_seconds=cpu_seconds,
+        peak_rss_bytes=_get_peak_rss_bytes(),
+        turn_seconds=user_interface.turn_seconds,
+        stream_metrics=stream_metrics.take_unreported(),
+    )
+
+
+def _create_model(settings: BenchmarkSettings, server_url: str):
+    provider = settings.provider.upper()
+    base_url = f"{server_url}/v1" if provider == "OPENAI" else server_url
+    config = {provider.lower(): {"api_key": "fake", "base_url": base_url}}
+    return ModelFactory(CLINotificationsPrinter()).get_model(provider, MODEL_TAGS[provider], config)
+
+
+class _NoMcpServers:
+    """Stands in for the McpManager, the benchmark runs without MCP servers and without the user's config file"""
+
+    initial_load_complete = True
+
+    def wait_for_initial_load(self, timeout: float = 30.0):
+        pass
+
+    def get_status_report(self) -> str | None:
+        return None
+
+    def has_errors(self) -> bool:
+        return False
+
+    def create_commands_for_mode(self, mode: str) -> list:
+        return []
+
+
+def _create_mcp_manager() -> "McpManager":
+    return cast("McpManager", _NoMcpServers())
+
+
+def _create_history(settings: BenchmarkSettings) -> History:
+    history = History()
+    filler = "The quick brown fox jumps over the lazy dog, again and again. "
+    text = (filler * (settings.history_message_characters // len(filler) + 1))[: settings.history_message_characters]
+    for index in range(settings.history_messages):
+        history.add_message(TextMessage(author="user" if index % 2 == 0 else "assistant", text=f"Message {index}. {text}"))
+    history.commit()
+    return history
+
+
+def _get_peak_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+SCENARIOS = {"chat": run_chat_benchmark, "research": run_research_benchmark}
+
+
+def main():
+    defaults = BenchmarkSettings()
+    parser = argparse.ArgumentParser(description="Hermes end-to-end latency benchmark against a local fake LLM server")
+    parser.add_argument("--scenario", choices=[*SCENARIOS, "all"], default="all")
+    parser.add_argument("--provider", choices=[provider.lower() for provider in MODEL_TAGS], default=defaults.provider.lower())
+    parser.add_argument("--turns", type=int, default=defaults.turns)
+    parser.add_argument("--history-messages", type=int, default=defaults.history_messages)
+    parser.add_argument("--history-message-characters", type=int, default=defaults.history_message_characters)
+    parser.add_argument("--ttft", type=float, default=defaults.time_to_first_token_seconds, help="Time to first token of the fake server")
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--response-tokens", type=int, default=defaults.response_tokens)
+    parser.add_argument("--no-markdown", action="store_true", help="Render the responses without markdown highlighting")
+    parser.add_argument("--output", type=Path, help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    settings = BenchmarkSettings(
+        provider=args.provider.upper(),
+        turns=args.turns,
+        history_messages=args.history_messages,
+        history_message_characters=args.history_message_characters,
+        time_to_first_token_seconds=args.ttft,
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        markdown=not args.no_markdown,
+    )
+    scenarios = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    results = [SCENARIOS[scenario](settings) for scenario in scenarios]
+    for result in results:
+        print(result.describe())
+    if args.output:
+        output: list[dict[str, Any]] = [result.to_json() for result in results]
+        args.output.write_text(json.dumps(output, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -97,7 +97,7 @@ class ConversationOrchestrator:
         all_events = list(self._swallow_engine_commands_from_stream(events))
         # Ensure MCPs are fully loaded before sending messages to the assistant
         self._wait_for_mcps_and_update_commands()
-        history_recovery_event = HistoryRecoveryEvent(self.history.get_history_for(self.assistant_participant.get_name()))
+        history_recovery_event = self._sync_history_for(self.assistant_participant)
         all_events = list(self._track_events_in_history(all_events))
         all_events.insert(0, history_recovery_event)
         self.assistant_participant.consume_events_and_render(event for event in all_events)
@@ -112,7 +112,7 @@ class ConversationOrchestrator:
         yield from self.assistant_participant.get_input_and_run_commands()
         while not self._received_assistant_done_event:
             continuation_event = self._get_agent_continuation_event_from_user()
-            history_snapshot = HistoryRecoveryEvent(self.history.get_history_for(self.assistant_participant.get_name()))
+            history_snapshot = self._sync_history_for(self.assistant_participant)
             self._track_events_in_history([continuation_event])
             self.assistant_participant.consume_events_and_render(event for event in [history_snapshot, continuation_event])
             yield from self.assistant_participant.get_input_and_run_commands()
@@ -137,10 +137,15 @@ I'll wait for your next steps or completion message.""",
 
     def _consume_events_from_assistant_and_render_user(self, events: Generator[Event, None, None]):
         events = self._swallow_engine_commands_from_stream(events)
-        history_snapshot = HistoryRecoveryEvent(self.history.get_history_for(self.user_participant.get_name()))
+        history_snapshot = self._sync_history_for(self.user_participant)
         events = self._track_events_in_history(events)
         self.user_participant.consume_events_and_render(event for event in chain([history_snapshot], events))
 
+    def _sync_history_for(self, participant: Participant) -> HistoryRecoveryEvent:
+        """Only the messages added since the participant's previous sync, so the cost of a cycle doesn't grow with the session"""
+        history_sync = self.history.sync_history_for(participant.get_name())
+        return HistoryRecoveryEvent(history_sync.messages, is_incremental=history_sync.is_incremental)
+
     def _commit_history(self):
         self.history.commit()
 
@@ -3,6 +3,8 @@
 from hermes.chat.events.engine_commands.agent_mode import AgentModeEvent
 from hermes.chat.events.engine_commands.assistant_done import AssistantDoneEvent
 from hermes.chat.events.engine_commands.base import EngineCommandEvent
+from hermes.chat.events.engine_commands.branch import BranchEvent
+from hermes.chat.events.engine_commands.checkpoint import CheckpointEvent
 from hermes.chat.events.engine_commands.clear_history import ClearHistoryEvent
 from hermes.chat.events.engine_commands.deep_research_budget import DeepResearchBudgetEvent
 from hermes.chat.events.engine_commands.exit import ExitEvent
@@ -12,7 +14,9 @@ from hermes.chat.events.engine_commands.list_research import ListResearchEvent
 from hermes.chat.events.engine_commands.llm_commands_execution import LLMCommandsExecutionEvent
 from hermes.chat.events.engine_commands.load_history import LoadHistoryEvent
 from hermes.chat.events.engine_commands.once import OnceEvent
+from hermes.chat.events.engine_commands.save_branches import SaveBranchesEvent
 from hermes.chat.events.engine_commands.save_history import SaveHistoryEvent
+from hermes.chat.events.engine_commands.stream_metrics import StreamMetricsEvent
 from hermes.chat.events.engine_commands.switch_research import SwitchResearchEvent
 from hermes.chat.events.engine_commands.thinking_level import ThinkingLevelEvent
 
@@ -32,4 +36,8 @@ __all__ = [
     "SwitchResearchEvent",
     "ListResearchEvent",
     "FocusSubproblemEvent",
+    "StreamMetricsEvent",
+    "CheckpointEvent",
+    "BranchEvent",
+    "SaveBranchesEvent",
 ]
@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from hermes.chat.events.engine_commands.base import EngineCommandEvent
+from hermes.chat.interface.helpers.terminal_coloring import CLIColors
+
+if TYPE_CHECKING:
+    from hermes.chat.conversation_orchestrator import ConversationOrchestrator
+
+
+@dataclass
+class BranchEvent(EngineCommandEvent):
+    """Event to switch to a history branch, creating it from the checkpoint or the current history if it doesn't exist.
+    Lists the branches and checkpoints without a name.
+    """
+
+    name: str | None = None
+    checkpoint: str | None = None
+
+    def execute(self, orchestrator: "ConversationOrchestrator") -> None:
+        if self.name is None:
+            self._print_branches(orchestrator)
+            return
+        try:
+            self._switch(orchestrator, self.name)
+        except ValueError as e:
+            orchestrator.notifications_printer.print_notification(str(e), CLIColors.RED)
+
+    def _switch(self, orchestrator: "ConversationOrchestrator", name: str):
+        history = orchestrator.history
+        if name in history.branches.get_branches() and self.checkpoint is None:
+            history.switch_branch(name)
+            orchestrator.notifications_printer.print_notification(f"Switched to branch {name}")
+        else:
+            history.create_branch(name, self.checkpoint)
+            orchestrator.notifications_printer.print_notification(f"Created branch {name} from {self.checkpoint or 'the current history'}")
+        for participant in orchestrator.participants:
+            participant.initialize_from_history(history)
+
+    def _print_branches(self, orchestrator: "ConversationOrchestrator"):
+        branches = orchestrator.history.branches
+        lines = [
+            f"{'*' if name == branches.current_branch else ' '} {name} ({length} history items)"
+            for name, length in branches.get_branches().items()
+        ]
+        lines += [f"  checkpoint {name} ({length} history items)" for name, length in branches.get_checkpoints().items()]
+        orchestrator.notifications_printer.print_notification("History branches:\n" + "\n".join(lines))
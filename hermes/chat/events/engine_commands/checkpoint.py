@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from hermes.chat.events.engine_commands.base import EngineCommandEvent
+
+if TYPE_CHECKING:
+    from hermes.chat.conversation_orchestrator import ConversationOrchestrator
+
+
+@dataclass
+class CheckpointEvent(EngineCommandEvent):
+    """Event to mark the committed history, so a branch can start from it later"""
+
+    name: str
+
+    def execute(self, orchestrator: "ConversationOrchestrator") -> None:
+        length = orchestrator.history.create_checkpoint(self.name)
+        orchestrator.notifications_printer.print_notification(f"Created checkpoint {self.name} at {length} history items")
@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from hermes.chat.events.engine_commands.base import EngineCommandEvent
+
+if TYPE_CHECKING:
+    from hermes.chat.conversation_orchestrator import ConversationOrchestrator
+
+
+@dataclass
+class SaveBranchesEvent(EngineCommandEvent):
+    """Event to save all the history branches and checkpoints to a directory"""
+
+    directory: str
+
+    def execute(self, orchestrator: "ConversationOrchestrator") -> None:
+        orchestrator.notifications_printer.print_notification(f"Saving the history branches to {self.directory}")
+        orchestrator.history.save_branches(self.directory)
@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from hermes.chat.events.engine_commands.base import EngineCommandEvent
+from hermes.chat.interface.assistant.models.chat_models.stream_metrics import get_shared_stream_metrics
+
+if TYPE_CHECKING:
+    from hermes.chat.conversation_orchestrator import ConversationOrchestrator
+
+
+@dataclass
+class StreamMetricsEvent(EngineCommandEvent):
+    show: bool | None
+
+    def execute(self, orchestrator: "ConversationOrchestrator") -> None:
+        if self.show is None:
+            self._print_summary(orchestrator)
+            return
+
+        event_renderer = getattr(orchestrator.user_participant.get_interface(), "event_renderer", None)
+        if event_renderer is None:
+            orchestrator.notifications_printer.print_notification("Stream metrics can't be shown in this interface")
+            return
+        # Start with the next response, not with the backlog of the hidden ones
+        get_shared_stream_metrics().take_unreported()
+        event_renderer.show_stream_metrics = self.show
+        orchestrator.notifications_printer.print_notification(f"Stream metrics {'shown' if self.show else 'hidden'} after each response")
+
+    def _print_summary(self, orchestrator: "ConversationOrchestrator"):
+        summary_lines = get_shared_stream_metrics().describe_summary()
+        if not summary_lines:
+            orchestrator.notifications_printer.print_notification("No responses streamed yet")
+            return
+        orchestrator.notifications_printer.print_notification("\n".join(summary_lines))
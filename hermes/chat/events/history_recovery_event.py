@@ -6,10 +6,16 @@ from hermes.chat.messages import Message
 
 @dataclass(init=False)
 class HistoryRecoveryEvent(Event):
+    """The history of the participant. Incremental events only carry the messages added since the previous one,
+    the others replace everything the participant has.
+    """
+
     messages: list[Message]
+    is_incremental: bool
 
-    def __init__(self, messages: list[Message]):
+    def __init__(self, messages: list[Message], is_incremental: bool = False):
         self.messages = messages
+        self.is_incremental = is_incremental
 
     def get_messages(self) -> list[Message]:
         return self.messages
@@ -1,16 +1,27 @@
 """History keeps track of the messages in the conversation."""
 
 import json
+import logging
+from collections.abc import Callable
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
 from hermes.chat.events.base import Event
 from hermes.chat.events.message_event import MessageEvent
+from hermes.chat.history_branches import HistoryBranches, is_branches_directory
+from hermes.chat.history_journal import HistoryJournal, is_session_directory, read_session
+from hermes.chat.indexed_history import INDEXED_HISTORY_EXTENSION, IndexedHistoryReader, is_indexed_history, write_indexed_history
 from hermes.chat.messages import (
-    DESERIALIZATION_KEYMAP,
     Message,
+    deserialize_message,
 )
 from hermes.chat.messages.text import TextMessage
 
+if TYPE_CHECKING:
+    from hermes.chat.history_compaction import HistoryCompactor
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class HistoryItem:
@@ -23,6 +34,33 @@ class HistoryItem:
             "message": self.message.to_json() if self.message else None,
         }
 
+    def to_index_entry(self) -> tuple[bytes, dict]:
+        """The serialized message and its metadata, as stored in an indexed history"""
+        return json.dumps(self.to_json()["message"], ensure_ascii=False).encode("utf-8"), self.get_metadata()
+
+    def get_metadata(self) -> dict:
+        if not self.message:
+            return {}
+        return {
+            "author": self.message.author,
+            "timestamp": self.message.timestamp.isoformat(),
+            "is_directly_entered": isinstance(self.message, TextMessage) and self.message.is_directly_entered,
+        }
+
+    def is_visible_to(self, author: str) -> bool:
+        """Determine if the message should be in the history of the author"""
+        metadata = self.get_metadata()
+        # Ignore items without messages
+        if not metadata:
+            return False
+
+        # For other authors, always include
+        if metadata["author"] != author:
+            return True
+
+        # For messages from the target author, exclude directly entered ones
+        return not metadata["is_directly_entered"]
+
     @staticmethod
     def from_json(history_item: dict):
         if "message" not in history_item:
@@ -32,35 +70,148 @@ class HistoryItem:
             )
             return None
 
-        message_data = history_item["message"]
-        message_type = message_data["type"]
-        if message_type not in DESERIALIZATION_KEYMAP:
-            raise ValueError(f"Unknown message type: {message_type}")
+        return HistoryItem(message=deserialize_message(history_item["message"]))
+
+
+class LazyHistoryItem(HistoryItem):
+    """An item of a loaded indexed history, its message is deserialized on first access.
+
+    Deciding who sees the message only needs the metadata from the index, and saving the item again copies the
+    serialized message as is.
+    """
 
-        message = DESERIALIZATION_KEYMAP[message_type](message_data)
-        return HistoryItem(message=message)
+    def __init__(self, reader: IndexedHistoryReader, index: int):
+        self._reader = reader
+        self._index = index
+        self._message: Message | None = None
+        self._is_loaded = False
+
+    @property
+    def message(self) -> Message | None:
+        if not self._is_loaded:
+            message_data = json.loads(self._reader.read_body(self._index))
+            self._message = deserialize_message(message_data) if message_data else None
+            self._is_loaded = True
+        return self._message
+
+    @message.setter
+    def message(self, message: Message | None):  # type: ignore[override]
+        self._message = message
+        self._is_loaded = True
+
+    def to_index_entry(self) -> tuple[bytes, dict]:
+        if self._is_loaded:
+            return super().to_index_entry()
+        return self._reader.read_body(self._index), self._reader.get_metadata(self._index)
+
+    def get_metadata(self) -> dict:
+        if self._is_loaded:
+            return super().get_metadata()
+        return self._reader.get_metadata(self._index)
+
+    def __repr__(self) -> str:
+        return f"LazyHistoryItem({self._reader.path}, {self._index}, is_loaded={self._is_loaded})"
+
+
+@dataclass
+class HistorySync:
+    """The messages a participant sees, only the ones added since its previous sync when is_incremental"""
+
+    messages: list[Message]
+    is_incremental: bool
+
+
+class HistoryView:
+    """The messages an author sees, kept up to date as messages are added, so syncing doesn't scan the whole history.
+
+    The cursor counts the messages already given to the author. Rolling back uncommitted messages, clearing or
+    loading the history can remove messages the author already has, the next sync then returns the full view.
+    """
+
+    def __init__(self, author: str):
+        self.author = author
+        self.messages: list[Message] = []
+        self._committed_count = 0
+        self._cursor = 0
+        self._needs_full_sync = True
+
+    def add(self, item: HistoryItem):
+        if item.is_visible_to(self.author) and item.message is not None:
+            self.messages.append(item.message)
+
+    def commit(self):
+        self._committed_count = len(self.messages)
+
+    def reset_uncommitted(self):
+        del self.messages[self._committed_count :]
+        # The interrupted cycle may not have applied its sync either
+        self._needs_full_sync = True
+
+    def rebuild(self, items: list[HistoryItem]):
+        self.messages = [item.message for item in items if item.is_visible_to(self.author) and item.message is not None]
+        self._committed_count = len(self.messages)
+        self._needs_full_sync = True
+
+    def sync(self) -> HistorySync:
+        if self._needs_full_sync:
+            history_sync = HistorySync(list(self.messages), is_incremental=False)
+        else:
+            history_sync = HistorySync(self.messages[self._cursor :], is_incremental=True)
+        self._cursor = len(self.messages)
+        self._needs_full_sync = False
+        return history_sync
 
 
 class History:
     _committed_items: list[HistoryItem]
     _uncommitted_items: list[HistoryItem]
 
-    def __init__(self):
+    def __init__(self, journal: HistoryJournal | None = None, compactor: "HistoryCompactor | None" = None):
         self._committed_items = []
         self._uncommitted_items = []
+        # Per author views, created on their first sync
+        self._views: dict[str, HistoryView] = {}
+        # Autosaves the committed items, see HistoryJournal
+        self._journal = journal
+        # Summarizes the start of a long history in the background, see HistoryCompactor
+        self._compactor = compactor
+        # The committed items of the other branches and the checkpoints, sharing the items in common
+        self.branches = HistoryBranches()
 
     def add_message(self, message: Message):
-        self._uncommitted_items.append(HistoryItem(message=message))
+        item = HistoryItem(message=message)
+        self._uncommitted_items.append(item)
+        for view in self._views.values():
+            view.add(item)
 
     def commit(self):
         """Move uncommitted items to committed"""
-        self._committed_items.extend(self._uncommitted_items)
+        new_items = self._uncommitted_items
+        self._committed_items.extend(new_items)
+        self.branches.append(new_items)
         self._uncommitted_items = []
+        for view in self._views.values():
+            view.commit()
+        if new_items:
+            self._autosave(lambda journal: journal.append(new_items, self._committed_items))
+        if self._compactor:
+            self._compact(self._compactor)
+
+    def _compact(self, compactor: "HistoryCompactor"):
+        compacted_items = compactor.compact(self._committed_items)
+        if compacted_items is None:
+            return
+        self._committed_items = compacted_items
+        self.branches.reset(compacted_items)
+        self._rebuild_views()
+        self._autosave(lambda journal: journal.write_snapshot(self._committed_items))
 
     def reset_uncommitted(self):
         """Clear uncommitted items without committing"""
         had_changes = bool(self._uncommitted_items)
         self._uncommitted_items = []
+        for view in self._views.values():
+            view.reset_uncommitted()
         return had_changes
 
     def get_messages(self) -> list[Message]:
@@ -73,62 +224,167 @@ class History:
 
     def get_history_for(self, author: str) -> list[Message]:
         """Get history messages filtered for a specific author"""
-        results = []
-        all_items = self._get_all_history_items()
+        return list(self._get_view(author).messages)
 
-        for item in all_items:
-            if self._should_include_in_history(item, author):
-                results.append(item.message)
+    def sync_history_for(self, author: str) -> HistorySync:
+        """The history messages of the author added since its previous sync, see HistoryView"""
+        return self._get_view(author).sync()
 
-        return results
+    def _get_view(self, author: str) -> HistoryView:
+        if author not in self._views:
+            view = HistoryView(author)
+            view.rebuild(self._committed_items)
+            for item in self._uncommitted_items:
+                view.add(item)
+            self._views[author] = view
+        return self._views[author]
 
-    def _get_all_history_items(self) -> list[HistoryItem]:
-        """Get all history items, both committed and uncommitted"""
-        return self._committed_items + self._uncommitted_items
+    def _rebuild_views(self):
+        for view in self._views.values():
+            view.rebuild(self._committed_items)
 
-    def _should_include_in_history(self, item: HistoryItem, author: str) -> bool:
-        """Determine if history item should be included for the author"""
-        # Ignore items without messages
-        if not item.message:
-            return False
+    def clear(self):
+        self._committed_items = []
+        self._uncommitted_items = []
+        self.branches.reset([])
+        self._rebuild_views()
+        self._autosave(lambda journal: journal.write_snapshot([]))
 
-        # For other authors, always include
-        if item.message.author != author:
-            return True
+    def create_checkpoint(self, name: str) -> int:
+        """Marks the committed items to branch from later, returns their count"""
+        return self.branches.create_checkpoint(name)
 
-        # For messages from the target author, exclude directly entered ones
-        return not (isinstance(item.message, TextMessage) and item.message.is_directly_entered)
+    def create_branch(self, name: str, checkpoint: str | None = None):
+        """Creates a branch from the checkpoint, or from the committed items, and switches to it
 
-    def clear(self):
-        self._committed_items = []
+        Raises:
+            ValueError: If the branch already exists or the checkpoint doesn't
+        """
+        self.branches.create_branch(name, checkpoint)
+        if checkpoint is None:
+            # Same items, the views stay as they are
+            self.branches.switch(name)
+        else:
+            self.switch_branch(name)
+
+    def switch_branch(self, name: str):
+        """Replaces the committed items with the items of the branch, the uncommitted ones are dropped
+
+        Raises:
+            ValueError: If the branch doesn't exist
+        """
+        self.branches.switch(name)
+        previous_items = self._committed_items
+        self._committed_items = self.branches.get_items()
         self._uncommitted_items = []
+        self._rebuild_views()
+        # Only the items after the start the branches share are journaled
+        kept_count = _count_shared_items(previous_items, self._committed_items)
+        self._autosave(lambda journal: journal.rewind(kept_count, self._committed_items[kept_count:], self._committed_items))
+
+    def save_branches(self, directory: str):
+        """Saves all the branches and checkpoints to the directory, load_history loads them back, see HistoryBranches"""
+        self.branches.save(directory)
+
+    def close(self):
+        if self._compactor:
+            self._compactor.close()
+        self._autosave(lambda journal: journal.close())
+
+    def _autosave(self, write: Callable[[HistoryJournal], None]):
+        if self._journal is None:
+            return
+        try:
+            write(self._journal)
+        except OSError as e:
+            # The conversation goes on, it can still be saved manually
+            logger.warning(f"Failed to autosave the history to {self._journal.session_directory}: {e}")
 
     def save(self, filename: str):
-        """Save the conversation history to a JSON file.
+        """Save the conversation history to a JSON file, or to an indexed history if the filename ends with .hidx.
 
         Args:
             filename (str): Path to the file where history should be saved
         """
+        if filename.endswith(INDEXED_HISTORY_EXTENSION):
+            write_indexed_history(filename, (item.to_index_entry() for item in self._committed_items))
+            return
+
         history_data = {"messages": [item.to_json() for item in self._committed_items]}
 
         with open(filename, "w", encoding="utf-8") as f:
             json.dump(history_data, f, indent=2, ensure_ascii=False)
 
     def load(self, filename: str):
-        """Load conversation history from a JSON file.
+        """Load conversation history from a JSON file or an indexed history, or recover an autosaved session from its directory.
+
+        The messages of an indexed history (autosaved sessions included) are deserialized when they are first needed,
+        so loading only reads its index.
+
+        Loading a directory saved by save_branches replaces all the branches and checkpoints, otherwise the loaded history
+        replaces the current branch.
 
         Args:
-            filename (str): Path to the file containing saved history
+            filename (str): Path to the file containing saved history, or to an autosaved session or branches directory
 
         Raises:
             FileNotFoundError: If the specified file doesn't exist
             KeyError: If the file is missing required message data
             ValueError: If message type is not recognized
         """
+        if is_branches_directory(filename):
+            self.branches = HistoryBranches.load(filename, _create_lazy_items)
+            self._set_loaded_items(self.branches.get_items())
+            self._autosave(lambda journal: journal.write_snapshot(self._committed_items))
+            return
+
+        reader, indexed_items, following_items = self._read_history(filename)
+        self._set_loaded_items(indexed_items + following_items)
+        self.branches.reset(self._committed_items)
+        # The loaded messages are part of the current session from now on
+        self._autosave(lambda journal: self._start_journal_from_loaded_history(journal, reader, len(indexed_items), following_items))
+
+    def _set_loaded_items(self, items: list[HistoryItem]):
+        self._committed_items = items
+        self._uncommitted_items = []
+        # Created again on the next sync of each author, which deserializes the messages it sees
+        self._views = {}
+
+    @staticmethod
+    def _read_history(filename: str) -> tuple[IndexedHistoryReader | None, list[HistoryItem], list[HistoryItem]]:
+        """The indexed part of the history if any with its items still in the history, and the items following it"""
+        if is_session_directory(filename):
+            reader, kept_count, journaled_items = read_session(filename)
+            return reader, _create_lazy_items(reader)[:kept_count], _parse_history_items(journaled_items)
+        if is_indexed_history(filename):
+            reader = IndexedHistoryReader(filename)
+            return reader, _create_lazy_items(reader), []
+
         with open(filename, encoding="utf-8") as f:
             history_data = json.load(f)
+        return None, [], _parse_history_items(history_data["messages"])
+
+    def _start_journal_from_loaded_history(
+        self, journal: HistoryJournal, reader: IndexedHistoryReader | None, kept_count: int, following_items: list[HistoryItem]
+    ):
+        if reader is None:
+            journal.write_snapshot(self._committed_items)
+        else:
+            journal.start_from_indexed_history(reader, kept_count, following_items, self._committed_items)
+
+
+def _count_shared_items(items: list[HistoryItem], other_items: list[HistoryItem]) -> int:
+    """The length of the start the two histories share, branches share the same item objects"""
+    for index, (item, other_item) in enumerate(zip(items, other_items, strict=False)):
+        if item is not other_item:
+            return index
+    return min(len(items), len(other_items))
+
+
+def _create_lazy_items(reader: IndexedHistoryReader) -> list[HistoryItem]:
+    return [LazyHistoryItem(reader, index) for index in range(len(reader))]
 
-        self.clear()
 
-        for history_item in history_data["messages"]:
-            self._committed_items.append(HistoryItem.from_json(history_item))
+def _parse_history_items(history_items: list[dict]) -> list[HistoryItem]:
+    """Items without a message key are skipped, see HistoryItem.from_json"""
+    return [item for item in map(HistoryItem.from_json, history_items) if item is not None]
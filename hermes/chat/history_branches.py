@@ -0,0 +1,197 @@
+"""Checkpoints and branches of the committed history, sharing their common items instead of copying them.
+
+The history of a branch is a chain of segments, each holding the items committed after its parent segment. Creating a
+checkpoint or a branch seals the tip segment of the current branch, the following commits go to a new child segment, so
+it takes the same constant time and memory at any history length. Sealed segments never change, they're shared by all
+the checkpoints and branches that continue from them, in memory and on disk.
+
+On disk, each segment is an indexed history named by its id, and branches.json keeps the parent of each segment (the
+segments form a DAG), the tips of the branches and the checkpoints.
+"""
+
+import json
+import os
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from hermes.chat.indexed_history import INDEXED_HISTORY_EXTENSION, IndexedHistoryReader, write_indexed_history
+
+if TYPE_CHECKING:
+    from hermes.chat.history import HistoryItem
+
+DEFAULT_BRANCH = "main"
+BRANCHES_FILENAME = "branches.json"
+SEGMENTS_DIRECTORY = "segments"
+
+
+def is_branches_directory(path: str | Path) -> bool:
+    return os.path.isfile(Path(path) / BRANCHES_FILENAME)
+
+
+class HistorySegment:
+    """Items committed after the parent segment, the start of the history if there is no parent"""
+
+    def __init__(self, parent: "HistorySegment | None" = None, items: "list[HistoryItem] | None" = None, segment_id: str | None = None):
+        self.parent = parent
+        self.items = items if items is not None else []
+        self.segment_id = segment_id or uuid.uuid4().hex
+        # Sealed segments are shared, new items go to a child segment
+        self.is_sealed = False
+        # The parent is sealed, so its length doesn't change
+        self.start = parent.length if parent else 0
+
+    @property
+    def length(self) -> int:
+        return self.start + len(self.items)
+
+    def get_segments(self) -> "list[HistorySegment]":
+        """The chain of segments from the start of the history to this one"""
+        segments = []
+        segment: HistorySegment | None = self
+        while segment is not None:
+            segments.append(segment)
+            segment = segment.parent
+        return segments[::-1]
+
+    def get_items(self) -> "list[HistoryItem]":
+        return [item for segment in self.get_segments() for item in segment.items]
+
+
+class HistoryBranches:
+    """The named branches of the history, each pointing to its tip segment, and the named checkpoints"""
+
+    def __init__(self):
+        self.current_branch = DEFAULT_BRANCH
+        self._tips: dict[str, HistorySegment] = {DEFAULT_BRANCH: HistorySegment()}
+        self._checkpoints: dict[str, HistorySegment] = {}
+
+    def append(self, items: "list[HistoryItem]"):
+        tip = self._tips[self.current_branch]
+        if tip.is_sealed:
+            tip = self._tips[self.current_branch] = HistorySegment(tip)
+        tip.items.extend(items)
+
+    def reset(self, items: "list[HistoryItem]"):
+        """The current branch starts over with the items, after the history was cleared, loaded or compacted.
+
+        The other branches and the checkpoints keep their items.
+        """
+        self._tips[self.current_branch] = HistorySegment(items=list(items))
+
+    def create_checkpoint(self, name: str) -> int:
+        """Marks the current items of the current branch, replacing the checkpoint with the same name, returns its length"""
+        segment = self._seal(self.current_branch)
+        self._checkpoints[name] = segment
+        return segment.length
+
+    def create_branch(self, name: str, checkpoint: str | None = None):
+        """Creates a branch continuing from the checkpoint, or from the current items of the current branch
+
+        Raises:
+            ValueError: If the branch already exists or the checkpoint doesn't
+        """
+        if name in self._tips:
+            raise ValueError(f"Branch {name} already exists")
+        if checkpoint is None:
+            self._tips[name] = self._seal(self.current_branch)
+        elif checkpoint in self._checkpoints:
+            self._tips[name] = self._checkpoints[checkpoint]
+        else:
+            raise ValueError(f"Checkpoint {checkpoint} doesn't exist")
+
+    def switch(self, name: str):
+        if name not in self._tips:
+            raise ValueError(f"Branch {name} doesn't exist")
+        self.current_branch = name
+
+    def get_items(self) -> "list[HistoryItem]":
+        """The items of the current branch"""
+        return self._tips[self.current_branch].get_items()
+
+    def get_branches(self) -> dict[str, int]:
+        """The number of items of each branch"""
+        return {name: tip.length for name, tip in self._tips.items()}
+
+    def get_checkpoints(self) -> dict[str, int]:
+        """The number of items of each checkpoint"""
+        return {name: segment.length for name, segment in self._checkpoints.items()}
+
+    def _seal(self, branch: str) -> HistorySegment:
+        tip = self._tips[branch]
+        if not tip.items and tip.parent is not None:
+            # Nothing was committed since the parent was sealed, it's shared instead of sealing an empty segment
+            tip = self._tips[branch] = tip.parent
+        tip.is_sealed = True
+        return tip
+
+    def save(self, directory: str | Path):
+        """Saves all the branches and checkpoints, the segments already in the directory aren't written again"""
+        directory = Path(directory)
+        (directory / SEGMENTS_DIRECTORY).mkdir(parents=True, exist_ok=True)
+        # Sealed, so the saved segments are the same as the ones in memory from now on
+        for branch in self._tips:
+            self._seal(branch)
+        segments = self._get_saved_segments()
+        for segment in segments:
+            segment_path = _get_segment_path(directory, segment.segment_id)
+            if not segment_path.exists():
+                write_indexed_history(segment_path, (item.to_index_entry() for item in segment.items))
+
+        branches_data = {
+            "segments": {segment.segment_id: {"parent": segment.parent.segment_id if segment.parent else None} for segment in segments},
+            "branches": {name: tip.segment_id for name, tip in self._tips.items()},
+            "checkpoints": {name: segment.segment_id for name, segment in self._checkpoints.items()},
+            "current_branch": self.current_branch,
+        }
+        temporary_path = directory / f"{BRANCHES_FILENAME}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(branches_data, f, indent=2, ensure_ascii=False)
+        os.replace(temporary_path, directory / BRANCHES_FILENAME)
+
+    def _get_saved_segments(self) -> list[HistorySegment]:
+        """The segments of all the branches and checkpoints, each once"""
+        segments: dict[str, HistorySegment] = {}
+        for tip in [*self._tips.values(), *self._checkpoints.values()]:
+            segments.update((segment.segment_id, segment) for segment in tip.get_segments())
+        return list(segments.values())
+
+    @classmethod
+    def load(cls, directory: str | Path, create_items: "Callable[[IndexedHistoryReader], list[HistoryItem]]") -> "HistoryBranches":
+        """Loads the saved branches, the items of each segment are created from its indexed history"""
+        directory = Path(directory)
+        with open(directory / BRANCHES_FILENAME, encoding="utf-8") as f:
+            branches_data = json.load(f)
+
+        segments: dict[str, HistorySegment] = {}
+        for segment_id in branches_data["segments"]:
+            _load_segment(directory, segment_id, branches_data["segments"], segments, create_items)
+
+        branches = cls()
+        branches._tips = {name: segments[segment_id] for name, segment_id in branches_data["branches"].items()}
+        branches._checkpoints = {name: segments[segment_id] for name, segment_id in branches_data["checkpoints"].items()}
+        branches.current_branch = branches_data["current_branch"]
+        return branches
+
+
+def _load_segment(
+    directory: Path,
+    segment_id: str,
+    segments_data: dict[str, dict],
+    segments: dict[str, HistorySegment],
+    create_items: "Callable[[IndexedHistoryReader], list[HistoryItem]]",
+) -> HistorySegment:
+    """Loads the segment after its parents, each segment once"""
+    if segment_id in segments:
+        return segments[segment_id]
+    parent_id = segments_data[segment_id]["parent"]
+    parent = _load_segment(directory, parent_id, segments_data, segments, create_items) if parent_id else None
+    segment = HistorySegment(parent, create_items(IndexedHistoryReader(_get_segment_path(directory, segment_id))), segment_id)
+    segment.is_sealed = True
+    segments[segment_id] = segment
+    return segment
+
+
+def _get_segment_path(directory: Path, segment_id: str) -> Path:
+    return directory / SEGMENTS_DIRECTORY / f"{segment_id}{INDEXED_HISTORY_EXTENSION}"
@@ -0,0 +1,218 @@
+"""Compaction of long histories: the oldest messages are summarized by a cheap model in the background and replaced by the summary."""
+
+import logging
+import textwrap
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from hermes.chat.history import HistoryItem
+from hermes.chat.indexed_history import INDEXED_HISTORY_EXTENSION, write_indexed_history
+from hermes.chat.interface.assistant.chat.response_types import TextLLMResponse
+from hermes.chat.interface.assistant.models.request_builder.context_window import ContextWindow, ContextWindowFitter, TokenEstimator
+from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
+from hermes.chat.messages import HistorySummaryMessage, Message, TextMessage
+from hermes.utils.config_utils import parse_config_value
+
+if TYPE_CHECKING:
+    from hermes.chat.interface.assistant.models.chat_models.base import ChatModel
+
+logger = logging.getLogger(__name__)
+
+# Fewer items aren't worth a summary
+MIN_SUMMARIZED_ITEMS = 2
+# After a failed summary, compaction is tried again once this many items were committed
+RETRY_AFTER_ITEMS = 20
+
+SUMMARY_INSTRUCTIONS = textwrap.dedent(
+    """
+    Summarize the following start of a conversation between a user and an AI assistant. The summary replaces these
+    messages in the assistant's context, so keep everything the rest of the conversation may depend on: the user's goals
+    and preferences, decisions and their reasons, facts, file names, code identifiers, commands and their results, and
+    open questions. Leave out greetings and repetitions. Write only the summary.
+    """
+).strip()
+
+
+@dataclass(frozen=True)
+class HistoryCompactionSettings:
+    """Compaction of long chat histories, from the `compaction` config section"""
+
+    # provider/model_tag of the model writing the summaries, compaction is disabled without it
+    model: str = ""
+    # The history is compacted when it's estimated over this many tokens
+    threshold_tokens: int = 64_000
+    # The most recent messages, up to this many tokens, are kept as they are
+    kept_recent_tokens: int = 16_000
+    # Longer messages are cut in the transcript given to the summarizing model
+    max_message_characters: int = 4000
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "HistoryCompactionSettings":
+        values = {setting.name: parse_config_value(setting.type, config[setting.name]) for setting in fields(cls) if setting.name in config}
+        return cls(**values)
+
+
+class HistorySummarizer:
+    """Writes the summaries with a chat model, which is initialized on first use, in the compaction thread"""
+
+    def __init__(self, model: "ChatModel", max_message_characters: int):
+        self.model = model
+        self.max_message_characters = max_message_characters
+        self._initialized = False
+
+    def summarize(self, messages: list[Message]) -> str:
+        if not self._initialized:
+            self.model.initialize()
+            self._initialized = True
+        request = self.model.get_request_builder().build_request([TextMessage(author="user", text=self._build_prompt(messages))])
+        summary = "".join(_get_response_text(response) for response in self.model.send_request(request)).strip()
+        if not summary:
+            raise ValueError(f"{self.model.model_tag} returned an empty summary")
+        return summary
+
+    def _build_prompt(self, messages: list[Message]) -> str:
+        transcript = "\n\n".join(self._describe(message) for message in messages)
+        return f"{SUMMARY_INSTRUCTIONS}\n\n<conversation>\n{transcript}\n</conversation>"
+
+    def _describe(self, message: Message) -> str:
+        if isinstance(message, HistorySummaryMessage):
+            return f"Summary of the conversation before: {message.text}"
+        content = message.get_content_for_assistant()
+        text = content if isinstance(content, str) else str(content)
+        if len(text) > self.max_message_characters:
+            text = text[: self.max_message_characters] + f"\n[... {len(text) - self.max_message_characters} characters cut]"
+        return f"{message.author}: {text}"
+
+
+def _get_response_text(response: Any) -> str:
+    if isinstance(response, str):
+        return response
+    if isinstance(response, TextLLMResponse):
+        return response.text
+    return ""
+
+
+@dataclass
+class _Compaction:
+    summarized_items: list[HistoryItem]
+    summary_item: HistoryItem
+    archive_path: Path
+
+
+class HistoryCompactor:
+    """Replaces the oldest messages of a long history with their summary, written in a background thread.
+
+    After each commit the history is estimated (the counts are cached per item). Over threshold_tokens, the items before
+    the most recent kept_recent_tokens (cut at a message the user typed, so turns stay whole) are summarized along with
+    the previous summary, and archived to an indexed history for audit. The summary replaces them on a later commit, if
+    the history still starts with them, so the turns never wait for the summarizing model.
+    """
+
+    def __init__(
+        self,
+        settings: HistoryCompactionSettings,
+        summarize: Callable[[list[Message]], str],
+        archive_directory: Path,
+        notifications_printer: CLINotificationsPrinter,
+    ):
+        self.settings = settings
+        self._summarize = summarize
+        self.archive_directory = archive_directory
+        self.notifications_printer = notifications_printer
+        # Only used for its token estimates
+        self._fitter = ContextWindowFitter(ContextWindow(settings.threshold_tokens), TokenEstimator(), notifications_printer, str)
+        self._token_counts: dict[int, tuple[HistoryItem, int]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hermes-compaction")
+        self._pending: Future[_Compaction] | None = None
+        self._retry_after_count = 0
+
+    def compact(self, committed_items: list[HistoryItem]) -> list[HistoryItem] | None:
+        """The compacted items when a summary is ready, otherwise starts summarizing if the history grew too long"""
+        if self._pending is not None:
+            return self._take_compacted_items(self._pending, committed_items) if self._pending.done() else None
+        if len(committed_items) >= self._retry_after_count:
+            span_end = self._find_span_end(committed_items)
+            if span_end:
+                self._pending = self._executor.submit(self._run, committed_items[:span_end])
+        return None
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _take_compacted_items(self, future: Future[_Compaction], committed_items: list[HistoryItem]) -> list[HistoryItem] | None:
+        self._pending = None
+        try:
+            compaction = future.result()
+        except Exception as e:
+            logger.warning(f"Failed to summarize the start of the history: {e}")
+            self._retry_after_count = len(committed_items) + RETRY_AFTER_ITEMS
+            return None
+
+        summarized_count = len(compaction.summarized_items)
+        if not _starts_with(committed_items, compaction.summarized_items):
+            logger.debug("The history was replaced while its start was being summarized, the summary is discarded")
+            return None
+        self.notifications_printer.print_notification(
+            f"Compacted the {summarized_count} oldest history items into a summary, the originals are kept in {compaction.archive_path}"
+        )
+        return [compaction.summary_item, *committed_items[summarized_count:]]
+
+    def _find_span_end(self, committed_items: list[HistoryItem]) -> int:
+        """The number of oldest items to summarize, 0 if the history isn't over the threshold"""
+        counts = self._count_tokens(committed_items)
+        if sum(counts) <= self.settings.threshold_tokens:
+            return 0
+        end = len(committed_items)
+        kept_tokens = 0
+        while end > 0 and kept_tokens + counts[end - 1] <= self.settings.kept_recent_tokens:
+            end -= 1
+            kept_tokens += counts[end]
+        while end < len(committed_items) and not _is_typed_by_user(committed_items[end].message):
+            end += 1
+        # The current turn is kept even when it alone is over kept_recent_tokens (e.g. a large file and its answer)
+        end = min(end, _find_latest_turn_start(committed_items))
+        return end if end >= MIN_SUMMARIZED_ITEMS else 0
+
+    def _count_tokens(self, items: list[HistoryItem]) -> list[int]:
+        token_counts = {}
+        for item in items:
+            cached = self._token_counts.get(id(item))
+            if cached is None or cached[0] is not item:
+                cached = (item, self._fitter.count_message_tokens(item.message, None) if item.message else 0)
+            token_counts[id(item)] = cached
+        self._token_counts = token_counts
+        return [token_counts[id(item)][1] for item in items]
+
+    def _run(self, items: list[HistoryItem]) -> _Compaction:
+        messages = [item.message for item in items if item.message]
+        summary = self._summarize(messages)
+        archive_path = self._archive(items)
+        summarized_count = sum(message.summarized_count if isinstance(message, HistorySummaryMessage) else 1 for message in messages)
+        summary_message = HistorySummaryMessage(text=summary, summarized_count=summarized_count, archive_path=str(archive_path))
+        return _Compaction(items, HistoryItem(message=summary_message), archive_path)
+
+    def _archive(self, items: list[HistoryItem]) -> Path:
+        self.archive_directory.mkdir(parents=True, exist_ok=True)
+        archive_path = self.archive_directory / f"compacted-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}{INDEXED_HISTORY_EXTENSION}"
+        write_indexed_history(archive_path, (item.to_index_entry() for item in items))
+        return archive_path
+
+
+def _starts_with(items: list[HistoryItem], start_items: list[HistoryItem]) -> bool:
+    return len(items) >= len(start_items) and all(item is start_item for item, start_item in zip(items, start_items, strict=False))
+
+
+def _find_latest_turn_start(items: list[HistoryItem]) -> int:
+    """Index of the last message the user typed, 0 if there is none"""
+    for index in range(len(items) - 1, -1, -1):
+        if _is_typed_by_user(items[index].message):
+            return index
+    return 0
+
+
+def _is_typed_by_user(message: Message | None) -> bool:
+    return type(message) is TextMessage and message.author == "user" and message.is_directly_entered
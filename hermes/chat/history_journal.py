@@ -0,0 +1,294 @@
+"""Autosave of the chat history: an append-only journal of the committed messages, compacted into a snapshot now and then."""
+
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass, fields
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from hermes.chat.indexed_history import INDEXED_HISTORY_EXTENSION, IndexedHistoryReader, write_indexed_history
+from hermes.utils.config_utils import get_cache_dir_path, parse_config_value
+
+if TYPE_CHECKING:
+    from hermes.chat.history import HistoryItem
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATTERN = f"snapshot-*{INDEXED_HISTORY_EXTENSION}"
+JOURNAL_FILENAME = "journal.jsonl"
+COMPRESSED_JOURNAL_FILENAME = "journal.jsonl.zst"
+# Where the process of a session can't be probed (Windows), it's assumed to be running while the session was written recently
+ACTIVE_SESSION_SECONDS = 24 * 60 * 60
+
+
+class JournalFsyncPolicy(Enum):
+    # Every commit survives a power loss, one fsync per commit
+    ALWAYS = "always"
+    # At most fsync_interval_seconds of commits can be lost on a power loss
+    INTERVAL = "interval"
+    # Left to the OS, a crash of the process still loses nothing
+    NEVER = "never"
+
+
+class JournalCompression(Enum):
+    NONE = "none"
+    # Needs the zstandard package
+    ZSTD = "zstd"
+
+
+@dataclass(frozen=True)
+class HistoryJournalSettings:
+    """Autosave of the chat history, from the `history` config section"""
+
+    autosave: bool = True
+    # Each session gets its own directory in it, <cache directory>/sessions by default
+    directory: str = ""
+    fsync: JournalFsyncPolicy = JournalFsyncPolicy.INTERVAL
+    fsync_interval_seconds: float = 5.0
+    # The journal is compacted into the snapshot after this many entries
+    snapshot_every_entries: int = 500
+    compression: JournalCompression = JournalCompression.NONE
+    # The oldest sessions are deleted when a new one starts, except the ones of running Hermes processes
+    max_sessions: int = 50
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "HistoryJournalSettings":
+        values = {setting.name: parse_config_value(setting.type, config[setting.name]) for setting in fields(cls) if setting.name in config}
+        return cls(**values)
+
+    def get_sessions_directory(self) -> Path:
+        return Path(self.directory).expanduser() if self.directory else get_cache_dir_path() / "sessions"
+
+
+class HistoryJournal:
+    """Writes the committed history items of a session to disk as they are committed.
+
+    The session directory holds a snapshot (an indexed history, numbered by its generation) and a JSONL journal of the
+    items committed after it, so a commit only writes its own items. Every snapshot_every_entries entries the whole
+    history is written to the snapshot of the next generation, the journal is truncated and the old snapshot deleted.
+    The journal entries carry the generation of the snapshot they follow, so entries left over from a crash between
+    writing the snapshot and truncating the journal are skipped on recovery, as is a torn last line.
+    A branch switch is journaled as a rewind entry, keeping the items the branches have in common, followed by the
+    items of the new branch after them.
+    With zstd compression each commit is written as an independent frame.
+    """
+
+    def __init__(self, session_directory: Path, settings: HistoryJournalSettings):
+        self.session_directory = session_directory
+        self.settings = settings
+        self.compression = _get_available_compression(settings.compression)
+        self._generation = 0
+        self._entry_count = 0
+        self._last_fsync_time = time.monotonic()
+        self._journal_file: IO[bytes] | None = None
+        self._compressor = None
+
+    @classmethod
+    def create_session(cls, settings: HistoryJournalSettings) -> "HistoryJournal":
+        sessions_directory = settings.get_sessions_directory()
+        sessions_directory.mkdir(parents=True, exist_ok=True)
+        _delete_old_sessions(sessions_directory, settings.max_sessions - 1)
+        session_directory = sessions_directory / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        session_directory.mkdir()
+        journal = cls(session_directory, settings)
+        journal.write_snapshot([])
+        return journal
+
+    def append(self, new_items: list["HistoryItem"], committed_items: list["HistoryItem"]):
+        """Journals the newly committed items, or compacts the whole committed history into a snapshot when it's due"""
+        self._write_entries([{"item": item.to_json()} for item in new_items], committed_items)
+
+    def rewind(self, kept_count: int, new_items: list["HistoryItem"], committed_items: list["HistoryItem"]):
+        """Journals a committed history that keeps the first kept_count items and continues with the new items, as after
+        a branch switch, so only the items after the common start are written
+        """
+        self._write_entries([{"rewind": kept_count}, *({"item": item.to_json()} for item in new_items)], committed_items)
+
+    def _write_entries(self, entries: list[dict], committed_items: list["HistoryItem"]):
+        if self._entry_count + len(entries) >= self.settings.snapshot_every_entries:
+            self.write_snapshot(committed_items)
+            return
+        lines = "".join(json.dumps({"generation": self._generation, **entry}, ensure_ascii=False) + "\n" for entry in entries)
+        data = lines.encode("utf-8")
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        journal_file = self._get_journal_file()
+        journal_file.write(data)
+        journal_file.flush()
+        self._entry_count += len(entries)
+        self._fsync_if_due(journal_file)
+
+    def write_snapshot(self, committed_items: list["HistoryItem"]):
+        self._generation += 1
+        write_indexed_history(
+            _get_snapshot_path(self.session_directory, self._generation),
+            (item.to_index_entry() for item in committed_items),
+            fsync=self.settings.fsync != JournalFsyncPolicy.NEVER,
+        )
+        self._start_generation()
+
+    def start_from_indexed_history(
+        self, reader: IndexedHistoryReader, kept_count: int, following_items: list["HistoryItem"], committed_items: list["HistoryItem"]
+    ):
+        """Starts from a copy of the first kept_count items of a loaded indexed history followed by the items loaded on top
+        of it, the file is copied as is, so resuming a large history doesn't deserialize and rewrite its messages
+        """
+        self._generation += 1
+        reader.copy_to(_get_snapshot_path(self.session_directory, self._generation), fsync=self.settings.fsync != JournalFsyncPolicy.NEVER)
+        self._start_generation()
+        if kept_count < len(reader):
+            self.rewind(kept_count, following_items, committed_items)
+        elif following_items:
+            self.append(following_items, committed_items)
+
+    def _start_generation(self):
+        self._truncate_journal()
+        for snapshot_path in self.session_directory.glob(SNAPSHOT_PATTERN):
+            if _get_generation(snapshot_path) != self._generation:
+                snapshot_path.unlink(missing_ok=True)
+
+    def close(self):
+        if self._journal_file is None:
+            return
+        if self.settings.fsync != JournalFsyncPolicy.NEVER:
+            os.fsync(self._journal_file.fileno())
+        self._journal_file.close()
+        self._journal_file = None
+
+    def _get_journal_file(self) -> IO[bytes]:
+        if self._journal_file is None:
+            self._journal_file = open(self._get_journal_path(), "ab")  # noqa: SIM115
+        return self._journal_file
+
+    def _get_journal_path(self) -> Path:
+        filename = COMPRESSED_JOURNAL_FILENAME if self.compression == JournalCompression.ZSTD else JOURNAL_FILENAME
+        return self.session_directory / filename
+
+    def _truncate_journal(self):
+        self.close()
+        self._entry_count = 0
+        self._journal_file = open(self._get_journal_path(), "wb")  # noqa: SIM115
+        if self.compression == JournalCompression.ZSTD and self._compressor is None:
+            import zstandard
+
+            self._compressor = zstandard.ZstdCompressor()
+
+    def _fsync_if_due(self, journal_file: IO[bytes]):
+        if self.settings.fsync == JournalFsyncPolicy.NEVER:
+            return
+        now = time.monotonic()
+        if self.settings.fsync == JournalFsyncPolicy.ALWAYS or now - self._last_fsync_time >= self.settings.fsync_interval_seconds:
+            os.fsync(journal_file.fileno())
+            self._last_fsync_time = now
+
+
+def is_session_directory(path: str) -> bool:
+    return os.path.isdir(path) and any(Path(path).glob(SNAPSHOT_PATTERN))
+
+
+def read_session(session_directory: str) -> tuple[IndexedHistoryReader, int, list[dict]]:
+    """The latest snapshot of a session, the number of its items still in the history, and the history items journaled after it"""
+    snapshot_path = max(Path(session_directory).glob(SNAPSHOT_PATTERN), key=_get_generation)
+    generation = _get_generation(snapshot_path)
+    reader = IndexedHistoryReader(snapshot_path)
+    kept_count = len(reader)
+    journaled_items: list[dict] = []
+    for entry in _read_journal_entries(session_directory):
+        if entry.get("generation") != generation:
+            continue
+        if "rewind" in entry:
+            kept_count, journaled_items = _rewind(kept_count, journaled_items, entry["rewind"])
+        else:
+            journaled_items.append(entry["item"])
+    return reader, kept_count, journaled_items
+
+
+def _rewind(snapshot_count: int, journaled_items: list[dict], kept_count: int) -> tuple[int, list[dict]]:
+    if kept_count <= snapshot_count:
+        return kept_count, []
+    return snapshot_count, journaled_items[: kept_count - snapshot_count]
+
+
+def _get_snapshot_path(session_directory: Path, generation: int) -> Path:
+    return session_directory / f"snapshot-{generation}{INDEXED_HISTORY_EXTENSION}"
+
+
+def _get_generation(snapshot_path: Path) -> int:
+    return int(snapshot_path.name.removeprefix("snapshot-").removesuffix(INDEXED_HISTORY_EXTENSION))
+
+
+def _read_journal_entries(session_directory: str) -> list[dict]:
+    entries = []
+    for line in _read_journal_text(session_directory).splitlines():
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            # The last commit was being written when the process stopped
+            logger.warning(f"Skipping a torn journal entry in {session_directory}")
+    return entries
+
+
+def _read_journal_text(session_directory: str) -> str:
+    plain_path = os.path.join(session_directory, JOURNAL_FILENAME)
+    compressed_path = os.path.join(session_directory, COMPRESSED_JOURNAL_FILENAME)
+    if os.path.exists(compressed_path):
+        return _read_compressed_journal(compressed_path)
+    if os.path.exists(plain_path):
+        with open(plain_path, "rb") as f:
+            return f.read().decode("utf-8", "ignore")
+    return ""
+
+
+def _read_compressed_journal(path: str) -> str:
+    import zstandard
+
+    chunks = []
+    with open(path, "rb") as f:
+        reader = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+        try:
+            while chunk := reader.read(1 << 16):
+                chunks.append(chunk)
+        except zstandard.ZstdError:
+            # A torn last frame, the frames before it are complete
+            logger.warning(f"Skipping a torn journal frame in {path}")
+    return b"".join(chunks).decode("utf-8", "ignore")
+
+
+def _get_available_compression(compression: JournalCompression) -> JournalCompression:
+    if compression == JournalCompression.ZSTD:
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            logger.warning("The zstandard package isn't installed, the history journal is written uncompressed")
+            return JournalCompression.NONE
+    return compression
+
+
+def _delete_old_sessions(sessions_directory: Path, kept_count: int):
+    sessions = sorted(path for path in sessions_directory.iterdir() if is_session_directory(str(path)))
+    for session in sessions[: max(len(sessions) - kept_count, 0)]:
+        if not _is_session_in_use(session):
+            shutil.rmtree(session, ignore_errors=True)
+
+
+def _is_session_in_use(session_directory: Path) -> bool:
+    """Whether the process that created the session (its PID ends the directory name) is still running"""
+    _, _, pid = session_directory.name.rpartition("-")
+    if not pid.isdigit():
+        return False
+    if os.name == "nt":
+        # os.kill would terminate the process on Windows
+        return time.time() - max(path.stat().st_mtime for path in session_directory.iterdir()) < ACTIVE_SESSION_SECONDS
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Running as another user
+        return True
+    return True
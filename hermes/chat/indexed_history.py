@@ -0,0 +1,95 @@
+"""On-disk history format with an offset index, so a saved history opens without reading the message bodies.
+
+Layout: the magic line, the offset of the index (8 bytes, little-endian), the serialized message bodies one after another,
+then the index as JSON: [[offset, length, metadata], ...].
+The metadata of a message (its author, timestamp, ...) is enough to know who sees it without reading its body.
+"""
+
+import json
+import os
+import shutil
+import struct
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from typing import BinaryIO
+
+INDEXED_HISTORY_EXTENSION = ".hidx"
+MAGIC = b"HERMES-HISTORY-INDEX 1\n"
+_OFFSET_FORMAT = "<Q"
+_HEADER_SIZE = len(MAGIC) + struct.calcsize(_OFFSET_FORMAT)
+
+
+def is_indexed_history(path: str | Path) -> bool:
+    if not os.path.isfile(path):
+        return False
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_indexed_history(path: str | Path, entries: Iterable[tuple[bytes, dict]], fsync: bool = False):
+    """Writes the (serialized message, metadata) entries to a temporary file first, the readers of the previous file keep
+    reading it until they're closed
+    """
+    path = Path(path)
+    temporary_path = path.with_name(f"{path.name}.tmp")
+    index = []
+    with open(temporary_path, "wb") as f:
+        f.write(MAGIC + struct.pack(_OFFSET_FORMAT, 0))
+        for body, metadata in entries:
+            index.append([f.tell(), len(body), metadata])
+            f.write(body)
+        index_offset = f.tell()
+        f.write(json.dumps(index, ensure_ascii=False).encode("utf-8"))
+        f.seek(len(MAGIC))
+        f.write(struct.pack(_OFFSET_FORMAT, index_offset))
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+    os.replace(temporary_path, path)
+
+
+class IndexedHistoryReader:
+    """Reads the index of an indexed history eagerly and the message bodies on demand.
+
+    The file is opened once, so the bodies of a loaded history stay readable after the file is saved over.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._file: BinaryIO = open(self.path, "rb")  # noqa: SIM115
+        self._lock = threading.Lock()
+        header = self._file.read(_HEADER_SIZE)
+        if header[: len(MAGIC)] != MAGIC:
+            self._file.close()
+            raise ValueError(f"{path} isn't an indexed history")
+        (index_offset,) = struct.unpack(_OFFSET_FORMAT, header[len(MAGIC) :])
+        self._file.seek(index_offset)
+        self._index: list[list] = json.loads(self._file.read())
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get_metadata(self, index: int) -> dict:
+        return self._index[index][2]
+
+    def read_body(self, index: int) -> bytes:
+        offset, length, _ = self._index[index]
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(length)
+
+    def copy_to(self, path: str | Path, fsync: bool = False):
+        """Copies the history as it was read, even if its file was saved over since"""
+        path = Path(path)
+        temporary_path = path.with_name(f"{path.name}.tmp")
+        with self._lock, open(temporary_path, "wb") as f:
+            self._file.seek(0)
+            shutil.copyfileobj(self._file, f)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(temporary_path, path)
+
+    def close(self):
+        self._file.close()
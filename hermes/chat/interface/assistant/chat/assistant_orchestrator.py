@@ -1,5 +1,5 @@
 import logging
-from collections.abc import Generator, Iterable
+from collections.abc import Callable, Generator, Iterable
 from typing import Any
 
 from hermes.chat.events.base import (
@@ -9,15 +9,20 @@ from hermes.chat.events.history_recovery_event import HistoryRecoveryEvent
 from hermes.chat.events.message_event import MessageEvent
 from hermes.chat.interface import Orchestrator
 from hermes.chat.interface.assistant.chat.assistant_prompt import AssistantPromptFactory
+from hermes.chat.interface.assistant.chat.cascade_router import CascadeRouter, RoutingDecision
 from hermes.chat.interface.assistant.chat.control_panel import (
     ChatAssistantControlPanel,
 )
 from hermes.chat.interface.assistant.chat.response_types import (
     BaseLLMResponse,
     TextLLMResponse,
+    ToolCallLLMResponse,
 )
 from hermes.chat.interface.assistant.models.chat_models.base import ChatModel
+from hermes.chat.interface.commands.tool_schema import ToolDefinition, build_tool_definitions
+from hermes.chat.interface.helpers.terminal_coloring import CLIColors
 from hermes.chat.messages import (
+    Message,
     TextGeneratorMessage,
     TextMessage,
     ThinkingAndResponseGeneratorMessage,
@@ -31,11 +36,26 @@ class ChatAssistantOrchestrator(Orchestrator):
     model: ChatModel
     request: Any
 
-    def __init__(self, model: ChatModel, control_panel: ChatAssistantControlPanel):
+    def __init__(
+        self,
+        model: ChatModel,
+        control_panel: ChatAssistantControlPanel,
+        router: CascadeRouter | None = None,
+        native_tools: bool = False,
+    ):
         self.model = model
         self._initialized = False
         self.control_panel = control_panel
         self.assistant_prompt_factory = AssistantPromptFactory()
+        # Tries the simple turns on a fast model first, see CascadeRouter
+        self.router = router
+        self.routing_decision: RoutingDecision | None = None
+        self._primary_request_factory: Callable[[], Any] | None = None
+        # Send the commands as provider-native tools instead of describing their text syntax, if the models support it
+        self.native_tools = native_tools
+        self._use_native_tools = False
+        # Accumulated from the incremental history recovery events
+        self._history_messages: list[Message] = []
 
     def prepare(self):
         self._ensure_model_readiness()
@@ -45,28 +65,51 @@ class ChatAssistantOrchestrator(Orchestrator):
         self._ensure_model_readiness()
         request_builder = self.model.get_request_builder()
 
-        rendered_messages = []
-
+        active_commands = self.control_panel.get_active_commands()
         assistant_prompt = self.assistant_prompt_factory.build_for(
-            self.control_panel.get_active_commands(),
+            active_commands,
             is_agent_mode=self.control_panel.is_agent_mode,
+            native_tools=self._use_native_tools,
         )
-        rendered_messages.append(TextMessage(author="user", text=assistant_prompt))
+        if self._use_native_tools:
+            self._set_tools(build_tool_definitions(active_commands))
+        history_messages = self._collect_messages(events)
+        rendered_messages = [TextMessage(author="user", text=assistant_prompt), *history_messages]
+
+        self.routing_decision = self.router.decide(history_messages, self.control_panel.is_agent_mode) if self.router else None
+        if self.router and self.routing_decision and self.routing_decision.use_fast_model:
+            # The primary request is only built if the fast model escalates the turn
+            self.request = self.router.build_fast_request(assistant_prompt, history_messages)
+            self._primary_request_factory = lambda: request_builder.build_request(rendered_messages)
+        else:
+            self.request = request_builder.build_request(rendered_messages)
+        logger.debug("Request built", self.request)
 
+    def _collect_messages(self, events: Generator[Event, None, None]) -> list[Message]:
+        messages = []
         for event in events:
             if isinstance(event, HistoryRecoveryEvent):
-                for message in event.get_messages():
-                    rendered_messages.append(message)
+                messages.extend(self._recover_history(event))
             if not isinstance(event, MessageEvent):
                 continue
             message = event.get_message()
-            rendered_messages.append(message)
+            messages.append(message)
+        return messages
 
-        self.request = request_builder.build_request(rendered_messages)
-        logger.debug("Request built", self.request)
+    def _recover_history(self, event: HistoryRecoveryEvent) -> list[Message]:
+        if not event.is_incremental:
+            self._history_messages = []
+        self._history_messages.extend(event.get_messages())
+        return self._history_messages
+
+    def _set_tools(self, tools: list[ToolDefinition]):
+        self.model.get_request_builder().set_tools(tools)
+        if self.router:
+            self.router.set_tools(tools)
 
     def get_input(self) -> Generator[Event, None, None]:
         logger.debug("Sending request to LLM")
+        self.control_panel.start_response()
         response_message = self._send_request()
         recording_response_raw_generator = RecordingGenerator(response_message.get_content_for_user())
         yield self._build_text_generator_message_event(recording_response_raw_generator)
@@ -76,12 +119,40 @@ class ChatAssistantOrchestrator(Orchestrator):
     def _ensure_model_readiness(self):
         if not self._initialized:
             self.model.initialize()
+            if self.router:
+                self.router.initialize()
+            self._use_native_tools = self.native_tools and self._supports_native_tools()
             self._initialized = True
 
+    def _supports_native_tools(self) -> bool:
+        if self.model.get_request_builder().supports_native_tools and (not self.router or self.router.supports_native_tools):
+            return True
+        self.model.notifications_printer.print_notification(
+            f"{self.model.model_tag} doesn't support native tools, the commands are sent in the text syntax", CLIColors.YELLOW
+        )
+        return False
+
     def _send_request(self) -> ThinkingAndResponseGeneratorMessage:
-        llm_responses_generator = self._handle_string_output(self.model.send_request(self.request))
+        llm_responses_generator = self._handle_string_output(self._execute_tool_calls(self._stream_responses()))
         return ThinkingAndResponseGeneratorMessage(author="assistant", thinking_and_response_generator=llm_responses_generator)
 
+    def _stream_responses(self) -> Generator[str | BaseLLMResponse, None, None]:
+        primary_request_factory = self._primary_request_factory
+        if not self.router or not self.routing_decision or not self.routing_decision.use_fast_model or not primary_request_factory:
+            return self.model.send_request(self.request)
+        return self.router.stream(self.request, self.routing_decision, lambda: self.model.send_request(primary_request_factory()))
+
+    def _execute_tool_calls(
+        self, llm_response_generator: Generator[str | BaseLLMResponse, None, None]
+    ) -> Generator[str | BaseLLMResponse, None, None]:
+        """Native tool calls are executed as soon as they stream in, they stay in the response in the text syntax"""
+        for response in llm_response_generator:
+            if isinstance(response, ToolCallLLMResponse):
+                command_block = self.control_panel.execute_tool_call(response.name, response.arguments)
+                yield TextLLMResponse(f"\n{command_block}\n")
+            else:
+                yield response
+
     def _handle_string_output(
         self,
         llm_response_generator: Generator[str | BaseLLMResponse, None, None],
@@ -104,7 +175,11 @@ class ChatAssistantOrchestrator(Orchestrator):
         )
 
     def clear(self):
-        pass
+        self._history_messages = []
+        if self._initialized:
+            self.model.get_request_builder().reset_compilation_cache()
+            if self.router:
+                self.router.reset_compilation_cache()
 
     def change_thinking_level(self, level: int):
         if hasattr(self.model, "set_thinking_level"):
@@ -14,9 +14,12 @@ class AssistantPromptFactory:
         self.template_manager = TemplateManager(templates_dir)
         self.help_generator = CommandHelpGenerator()
 
-    def build_for(self, commands: list[Command[Any, Any]], is_agent_mode: bool) -> str:
-        commands_help = self._render_commands_help(commands)
-        return self.template_manager.render_template("assistant_static.mako", commands_help=commands_help, is_agent_mode=is_agent_mode)
+    def build_for(self, commands: list[Command[Any, Any]], is_agent_mode: bool, native_tools: bool = False) -> str:
+        # The native tools carry their own schemas, the text syntax help is left out
+        commands_help = "" if native_tools else self._render_commands_help(commands)
+        return self.template_manager.render_template(
+            "assistant_static.mako", commands_help=commands_help, is_agent_mode=is_agent_mode, native_tools=native_tools
+        )
 
     def _render_commands_help(self, commands: list[Command[Any, Any]]) -> str:
         command_help_contents = []
@@ -0,0 +1,245 @@
+import itertools
+import logging
+import threading
+from collections.abc import Callable, Generator, Sequence
+from dataclasses import dataclass, fields
+from typing import Any
+
+from hermes.chat.interface.assistant.chat.response_types import TextLLMResponse, ToolCallLLMResponse
+from hermes.chat.interface.assistant.models.chat_models.base import ChatModel
+from hermes.chat.interface.assistant.models.request_builder.context_window import TokenEstimator
+from hermes.chat.interface.commands.tool_schema import ToolDefinition, format_command_block
+from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
+from hermes.chat.interface.helpers.terminal_coloring import CLIColors
+from hermes.chat.messages import (
+    AudioFileMessage,
+    EmbeddedPDFMessage,
+    ImageMessage,
+    ImageUrlMessage,
+    Message,
+    TextMessage,
+    TextualFileMessage,
+    UrlMessage,
+    VideoMessage,
+)
+from hermes.utils.config_utils import parse_config_value
+
+logger = logging.getLogger(__name__)
+
+ESCALATION_MARKER = "[ESCALATE]"
+ESCALATION_INSTRUCTIONS = f"""
+
+You are a fast model answering simple requests. If the request needs deep reasoning, specialized knowledge or a long answer,
+or you are not confident that you can answer it fully and correctly, reply with only {ESCALATION_MARKER} and nothing else,
+a stronger model will take over."""
+
+ATTACHMENT_MESSAGE_TYPES = (
+    AudioFileMessage,
+    EmbeddedPDFMessage,
+    ImageMessage,
+    ImageUrlMessage,
+    TextualFileMessage,
+    UrlMessage,
+    VideoMessage,
+)
+
+
+@dataclass(frozen=True)
+class CascadeRoutingSettings:
+    """Which chat turns are tried on a fast model first, from the `routing` config section"""
+
+    # provider/model_tag of the fast model, routing is disabled without it
+    fast_model: str = ""
+    # Longer prompts of the user in the turn go to the primary model
+    max_prompt_characters: int = 500
+    route_attachments: bool = False
+    route_agent_mode: bool = False
+    # The fast model can hand the turn over to the primary model by replying with ESCALATION_MARKER
+    allow_escalation: bool = True
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "CascadeRoutingSettings":
+        values = {setting.name: parse_config_value(setting.type, config[setting.name]) for setting in fields(cls) if setting.name in config}
+        return cls(**values)
+
+
+@dataclass
+class RoutingDecision:
+    use_fast_model: bool
+    reason: str
+
+
+class CascadeRoutingStats:
+    """Session counters of the routing decisions, and of the tokens the primary model didn't have to process"""
+
+    def __init__(self):
+        self.fast_turns = 0
+        self.escalated_turns = 0
+        self.primary_turns = 0
+        self.saved_input_tokens = 0
+        self.saved_output_tokens = 0
+        self._lock = threading.Lock()
+
+    def record_primary_turn(self):
+        with self._lock:
+            self.primary_turns += 1
+
+    def record_escalation(self):
+        with self._lock:
+            self.escalated_turns += 1
+
+    def record_fast_turn(self, input_tokens: int, output_tokens: int):
+        with self._lock:
+            self.fast_turns += 1
+            self.saved_input_tokens += input_tokens
+            self.saved_output_tokens += output_tokens
+
+    def describe(self) -> str:
+        total_turns = self.fast_turns + self.escalated_turns + self.primary_turns
+        return (
+            f"{self.fast_turns}/{total_turns} turns answered by the fast model, {self.escalated_turns} escalated, "
+            f"~{self.saved_input_tokens} input and ~{self.saved_output_tokens} output tokens kept off the primary model"
+        )
+
+
+class CascadeRouter:
+    """Sends the simple chat turns (short questions, command output acknowledgements) to a fast, cheap model,
+    and the others to the primary model.
+
+    The fast model is told to reply with ESCALATION_MARKER when it isn't confident, its response is held back until
+    it's clear whether it starts with the marker, in which case the turn is sent to the primary model instead.
+    """
+
+    def __init__(self, fast_model: ChatModel, settings: CascadeRoutingSettings, notifications_printer: CLINotificationsPrinter):
+        self.fast_model = fast_model
+        self.settings = settings
+        self.notifications_printer = notifications_printer
+        self.stats = CascadeRoutingStats()
+        self._token_estimator = TokenEstimator()
+        self._initialized = False
+
+    def initialize(self):
+        if not self._initialized:
+            self.fast_model.initialize()
+            self._initialized = True
+
+    def decide(self, messages: Sequence[Message], is_agent_mode: bool) -> RoutingDecision:
+        """Route the turn, the messages after the last response of the assistant"""
+        turn_messages = _get_current_turn(messages)
+        if is_agent_mode and not self.settings.route_agent_mode:
+            return self._route_to_primary("agent mode")
+        if not self.settings.route_attachments and any(isinstance(message, ATTACHMENT_MESSAGE_TYPES) for message in turn_messages):
+            return self._route_to_primary("attachments")
+        prompt_characters = sum(len(message.text) for message in turn_messages if type(message) is TextMessage)
+        if prompt_characters > self.settings.max_prompt_characters:
+            return self._route_to_primary(f"prompt of {prompt_characters} characters")
+        return RoutingDecision(use_fast_model=True, reason="short prompt" if prompt_characters else "command output")
+
+    def build_fast_request(self, assistant_prompt: str, messages: Sequence[Message]) -> Any:
+        if self.settings.allow_escalation:
+            assistant_prompt += ESCALATION_INSTRUCTIONS
+        return self.fast_model.get_request_builder().build_request([TextMessage(author="user", text=assistant_prompt), *messages])
+
+    def stream(
+        self, fast_request: Any, decision: RoutingDecision, send_primary_request: Callable[[], Generator[Any, None, None]]
+    ) -> Generator[Any, None, None]:
+        """The response of the fast model, or of the primary model if the fast one escalated or failed before responding"""
+        responses = self.fast_model.send_request(fast_request)
+        try:
+            held_back, escalated = (
+                self._hold_back_until_decided(responses) if self.settings.allow_escalation else self._take_first(responses)
+            )
+        except Exception as e:
+            # Nothing was shown yet, so the turn can still go to the primary model
+            logger.debug(f"The fast model failed before responding: {e}")
+            reason = f"{decision.reason}, the fast model failed with {type(e).__name__}"
+            yield from self._escalate(responses, reason, send_primary_request)
+            return
+        if escalated:
+            yield from self._escalate(responses, decision.reason, send_primary_request)
+            return
+
+        output_texts = []
+        for response in itertools.chain(held_back, responses):
+            output_texts.append(_get_response_text(response))
+            yield response
+        self.stats.record_fast_turn(self._estimate_tokens(fast_request), self._token_estimator.count_text("".join(output_texts)))
+        self._notify(f"Answered by {self._describe_fast_model()} ({decision.reason}). {self.stats.describe()}")
+
+    @property
+    def supports_native_tools(self) -> bool:
+        return self.fast_model.get_request_builder().supports_native_tools
+
+    def set_tools(self, tools: list[ToolDefinition]):
+        self.fast_model.get_request_builder().set_tools(tools)
+
+    def reset_compilation_cache(self):
+        if self._initialized:
+            self.fast_model.get_request_builder().reset_compilation_cache()
+
+    def _route_to_primary(self, reason: str) -> RoutingDecision:
+        self.stats.record_primary_turn()
+        logger.debug(f"Routing the turn to the primary model: {reason}")
+        return RoutingDecision(use_fast_model=False, reason=reason)
+
+    def _escalate(
+        self, responses: Generator[Any, None, None], reason: str, send_primary_request: Callable[[], Generator[Any, None, None]]
+    ) -> Generator[Any, None, None]:
+        responses.close()
+        self.stats.record_escalation()
+        self._notify(f"The fast model escalated the turn ({reason}) to the primary model")
+        yield from send_primary_request()
+
+    @staticmethod
+    def _take_first(responses: Generator[Any, None, None]) -> tuple[list[Any], bool]:
+        """Without escalation the responses are passed through, the first one is read to catch a failure to respond"""
+        return list(itertools.islice(responses, 1)), False
+
+    def _hold_back_until_decided(self, responses: Generator[Any, None, None]) -> tuple[list[Any], bool]:
+        """Read the responses until the text either starts with the escalation marker or can't anymore"""
+        held_back = []
+        text = ""
+        for response in responses:
+            held_back.append(response)
+            text += _get_response_text(response)
+            escalated = _check_escalation(text)
+            if escalated is not None:
+                return held_back, escalated
+        # An empty response is escalated too
+        return held_back, _check_escalation(text) is not False
+
+    def _estimate_tokens(self, request: Any) -> int:
+        return self._token_estimator.count_text(str(request))
+
+    def _describe_fast_model(self) -> str:
+        return f"{self.fast_model.get_provider()}/{self.fast_model.model_tag}"
+
+    def _notify(self, message: str):
+        logger.info(message)
+        self.notifications_printer.print_notification(message, CLIColors.CYAN)
+
+
+def _get_current_turn(messages: Sequence[Message]) -> list[Message]:
+    last_assistant_index = max((index for index, message in enumerate(messages) if message.author == "assistant"), default=-1)
+    return list(messages[last_assistant_index + 1 :])
+
+
+def _get_response_text(response: Any) -> str:
+    if isinstance(response, str):
+        return response
+    if isinstance(response, TextLLMResponse):
+        return response.text
+    if isinstance(response, ToolCallLLMResponse):
+        # A tool call means the fast model is handling the turn
+        return format_command_block(response.name, response.arguments)
+    return ""
+
+
+def _check_escalation(text: str) -> bool | None:
+    """True when the text starts with the marker, False when it can't anymore, None while it's undecided"""
+    stripped_text = text.lstrip()
+    if stripped_text.startswith(ESCALATION_MARKER):
+        return True
+    if stripped_text and not ESCALATION_MARKER.startswith(stripped_text):
+        return False
+    return None
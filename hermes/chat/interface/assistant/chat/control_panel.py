@@ -6,7 +6,8 @@ from hermes.chat.events.base import Event
 from hermes.chat.events.message_event import MessageEvent
 from hermes.chat.interface.assistant.chat.command_status_override import ChatAssistantCommandStatusOverride
 from hermes.chat.interface.commands.command import Command, CommandRegistry
-from hermes.chat.interface.commands.command_parser import CommandParser
+from hermes.chat.interface.commands.command_parser import CommandError, CommandParser, ParseResult
+from hermes.chat.interface.commands.tool_schema import build_command_args, format_command_block
 from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
 from hermes.chat.interface.helpers.terminal_coloring import CLIColors
 from hermes.chat.interface.user.control_panel.exa_client import ExaClient
@@ -50,6 +51,10 @@ class ChatAssistantControlPanel:
         self.mcp_manager = mcp_manager
         self._agent_mode = False
         self._commands_processing_enabled = True
+        # Native tool calls executed while the response streamed, see execute_tool_call
+        self._tool_call_events: list[Event] = []
+        self._tool_call_blocks: list[str] = []
+        self._is_response_streaming = False
 
         # Create a command context that will be passed to commands during execution
         self.command_context = ChatAssistantCommandContext(self)
@@ -126,13 +131,40 @@ class ChatAssistantControlPanel:
             return self._agent_mode
         return bool(not is_agent_command or is_agent_command and self._agent_mode)
 
+    def start_response(self):
+        """Called before the response of the assistant streams in, the outputs of its tool calls are collected until
+        extract_and_execute_commands runs on the complete response.
+        """
+        self.command_context.clear_command_outputs()
+        self._tool_call_events = []
+        self._tool_call_blocks = []
+        self._is_response_streaming = True
+
+    def execute_tool_call(self, name: str, arguments: dict[str, Any]) -> str:
+        """Execute a native tool call as soon as it streams in, before the rest of the response.
+        Returns the call in the text syntax, to keep in the response. extract_and_execute_commands doesn't execute it again.
+        """
+        command_block = format_command_block(name, arguments)
+        self._tool_call_blocks.append(command_block)
+        if self._commands_processing_enabled:
+            # The events can only be yielded after the response message, they are kept until then
+            self._tool_call_events.extend(self._process_command_result(self._parse_tool_call(name, arguments)))
+        return command_block
+
+    def _parse_tool_call(self, name: str, arguments: dict[str, Any]) -> ParseResult:
+        command = self.command_registry.get_command(name)
+        if not command or not self._is_command_enabled(name, command):
+            return ParseResult(command_name=name, errors=[CommandError(command_name=name, message=f"Unknown command: '{name}'")])
+        args, errors = build_command_args(command, arguments)
+        return ParseResult(command_name=name, args=args, errors=[CommandError(command_name=name, message=error) for error in errors])
+
     def extract_and_execute_commands(self, message_content: str) -> Generator[Event, None, None]:
         if not self._commands_processing_enabled:
             yield from []
             return
 
-        self.command_context.clear_command_outputs()
-        sorted_results = self._get_sorted_parse_results(message_content)
+        yield from self._take_tool_call_events()
+        sorted_results = self._get_sorted_parse_results(self._remove_tool_call_blocks(message_content))
 
         # Execute commands
         for result in sorted_results:
@@ -141,6 +173,20 @@ class ChatAssistantControlPanel:
         # Format and yield outputs
         yield from self._yield_command_outputs()
 
+    def _take_tool_call_events(self) -> list[Event]:
+        """The events of the tool calls executed while the response streamed, the outputs are cleared if there was none"""
+        if not self._is_response_streaming:
+            self.command_context.clear_command_outputs()
+        events, self._tool_call_events = self._tool_call_events, []
+        self._is_response_streaming = False
+        return events
+
+    def _remove_tool_call_blocks(self, message_content: str) -> str:
+        for command_block in self._tool_call_blocks:
+            message_content = message_content.replace(command_block, "", 1)
+        self._tool_call_blocks = []
+        return message_content
+
     def _get_sorted_parse_results(self, message_content: str) -> list:
         """Parse and sort command results by position in text"""
         parse_results = self.command_parser.parse_text(message_content)
@@ -10,3 +10,12 @@ class ThinkingLLMResponse(BaseLLMResponse):
 class TextLLMResponse(BaseLLMResponse):
     def __init__(self, text: str):
         self.text = text
+
+
+class ToolCallLLMResponse(BaseLLMResponse):
+    """A native tool call, yielded once it's complete. The arguments are already decoded from JSON."""
+
+    def __init__(self, name: str, arguments: dict, tool_call_id: str | None = None):
+        self.name = name
+        self.arguments = arguments
+        self.tool_call_id = tool_call_id
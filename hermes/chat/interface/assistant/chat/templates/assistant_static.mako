@@ -13,6 +13,16 @@ ${'##'} Commands
 You are allowed to use the following commands.
 Use them **only** if the user directly asks for them.
 Understand that they can cause the user frustration and lose trust if used incorrectly.
+% if native_tools:
+The commands are provided to you as tools, use them through the tool calls of the API, not in the text of your message.
+You don't have access to tools other than these. Know that the user doesn't have access to your tools.
+
+${'###'} 🔄 How Commands Work 🔄
+
+Each tool call is executed as soon as you make it, while you keep writing your message.
+You'll see the results of all the calls in the NEXT message you receive, not in the current one.
+If you need the results before continuing, finish your message and wait for them.
+% else:
 The commands will be programmatically parsed, make sure to follow the instructions precisely when using them.
 You don't have access to tools other than these. Know that the user doesn't have access to your tools.
 If the content doesn't match these instructions, they will be ignored.
@@ -73,6 +83,7 @@ Another section's content
         #This is an example file content, but the file won't get created.
         #>>>
         ```
+% endif
 
 In case the interface has a bug and you are not able to navigate, you can use an escape code "SHUT_DOWN_DEEP_RESEARCHER".
 If the system detects this code anywhere in your response it will halt the system and the admin will check it.
@@ -167,6 +178,7 @@ A: If you already know that you'll need multiple pieces of information, and gett
 the need for others, send a command for all of them, don't spend another message/response cycle. Commands are parallelizable!
 You can go even with 20-30 commands without worry, you'll then receive all of their outputs in the response.
 
+% if not native_tools:
 ${'####'} Q: How to input same argument multiple times for a command?
 
 A: You need to put `///section_name` each time, example:
@@ -177,6 +189,7 @@ title 1
 title 2
 >>>
 
+% endif
 ${'####'} Q: When to finish problem?
 
 A: You should always verify the results (not details, but the completeness) before finishing the task.
@@ -18,12 +18,16 @@ from hermes.chat.interface.assistant.deep_research.context.interface import Deep
 from hermes.chat.interface.assistant.deep_research.engine import ResearchEngine
 from hermes.chat.interface.assistant.deep_research.report.report_generator import ReportGeneratorImpl
 from hermes.chat.interface.assistant.deep_research.report.status_printer import StatusPrinterImpl
+from hermes.chat.interface.assistant.framework.batching_llm_interface import BatchingLLMInterface, BatchRequestCollector
+from hermes.chat.interface.assistant.framework.llm_interface import LLMInterface
 from hermes.chat.interface.assistant.framework.llm_interface_impl import (
     ChatModelLLMInterface,
 )
 from hermes.chat.interface.assistant.models.chat_models.base import ChatModel
 from hermes.chat.interface.commands.command import CommandRegistry
 from hermes.chat.interface.commands.help_generator import CommandHelpGenerator
+from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
+from hermes.chat.interface.helpers.terminal_coloring import CLIColors
 from hermes.chat.interface.templates.template_manager import TemplateManager
 from hermes.chat.messages import Message, TextMessage, TextualFileMessage
 from hermes.mcp.mcp_manager import McpManager
@@ -42,11 +46,21 @@ class DeepResearchAssistantOrchestrator(Orchestrator):
         extension_commands: list | None,
         mcp_manager: McpManager,
         research_name: str | None = None,
+        batch_mode: bool = False,
+        native_tools: bool = False,
     ):
         self.model = model
         self.mcp_manager = mcp_manager
+        self.notifications_printer = CLINotificationsPrinter()
+
+        llm_interface = self._create_llm_interface(batch_mode)
+        # Batch requests are collected as text, only the streaming requests can use native tools
+        self._native_tools_llm_interface = llm_interface if native_tools and isinstance(llm_interface, ChatModelLLMInterface) else None
+        if native_tools and self._native_tools_llm_interface is None:
+            self.notifications_printer.print_notification(
+                "Native tools aren't supported in batch mode, the commands are sent in the text syntax", CLIColors.YELLOW
+            )
 
-        llm_interface = ChatModelLLMInterface(self.model)
         self.command_registry = CommandRegistry()
 
         if extension_commands:
@@ -65,6 +79,7 @@ class DeepResearchAssistantOrchestrator(Orchestrator):
             commands_help_generator,
             self.command_registry,
         )
+        self._research_interface = research_interface
         report_generator = ReportGeneratorImpl(template_manager)
         status_printer = StatusPrinterImpl(template_manager)
 
@@ -86,11 +101,36 @@ class DeepResearchAssistantOrchestrator(Orchestrator):
         self._instruction: str | None = None
         self._history_has_been_imported = False
 
+    def _create_llm_interface(self, batch_mode: bool) -> LLMInterface:
+        llm_interface = ChatModelLLMInterface(self.model)
+        if not batch_mode:
+            return llm_interface
+        batch_client = self.model.create_batch_client()
+        if batch_client is None:
+            self.notifications_printer.print_notification(
+                f"{self.model.get_provider()} doesn't support the batch API, streaming the requests instead", CLIColors.RED
+            )
+            return llm_interface
+        return BatchingLLMInterface(llm_interface, BatchRequestCollector(batch_client, self.notifications_printer))
+
     def prepare(self):
         if not self._initialized:
             self.model.initialize()
+            self._enable_native_tools()
             self._initialized = True
 
+    def _enable_native_tools(self):
+        """The request builder is created in initialize, only then it's known whether the model supports native tools"""
+        if self._native_tools_llm_interface is None:
+            return
+        if not self.model.get_request_builder().supports_native_tools:
+            self.notifications_printer.print_notification(
+                f"{self.model.model_tag} doesn't support native tools, the commands are sent in the text syntax", CLIColors.YELLOW
+            )
+            return
+        self._native_tools_llm_interface.enable_native_tools(self.command_registry)
+        self._research_interface.native_tools = True
+
     def render(self, events: Generator[Event, None, None]):
         """Render the interface with the given history and events"""
         logger.debug("Rendering Deep Research Assistant interface")
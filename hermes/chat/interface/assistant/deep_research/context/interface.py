@@ -48,6 +48,8 @@ class DeepResearcherInterface(AssistantInterface):
         self.template_manager = template_manager
         self.commands_help_generator = commands_help_generator
         self.command_registry = command_registry
+        # The commands are sent as native tools, the help of their text syntax is left out
+        self.native_tools = False
 
     def _get_parent_chain(self, node: ResearchNode | None) -> list[ResearchNode]:
         """Helper to get the parent chain including the given node"""
@@ -97,7 +99,8 @@ class DeepResearcherInterface(AssistantInterface):
         context = {
             "target_node": target_node,
             "commands": commands,  # Pass the commands dictionary directly
-            "commands_help_content": self._generate_command_help(),
+            "commands_help_content": "" if self.native_tools else self._generate_command_help(),
+            "native_tools": self.native_tools,
         }
 
         return self.template_manager.render_template("research_static.mako", **context)
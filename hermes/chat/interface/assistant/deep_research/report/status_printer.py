@@ -3,6 +3,7 @@ from hermes.chat.interface.assistant.deep_research.research import (
     Research,
 )
 from hermes.chat.interface.assistant.deep_research.status_printer import StatusPrinter
+from hermes.chat.interface.assistant.models.chat_models.stream_metrics import get_shared_stream_metrics
 from hermes.chat.interface.templates.template_manager import TemplateManager
 
 
@@ -39,3 +40,10 @@ class StatusPrinterImpl(StatusPrinter):
         status_output = self.template_manager.render_template("report/status_report.mako", **context)
         # Add a newline before and after the report for better separation
         print(f"\n{status_output}\n")
+        self._print_stream_metrics_summary()
+
+    def _print_stream_metrics_summary(self):
+        """Latency of the LLM responses so far, to tell slow providers apart from slow research steps"""
+        summary_lines = get_shared_stream_metrics().describe_summary()
+        if summary_lines:
+            print("LLM response latency:\n" + "\n".join(f"  {line}" for line in summary_lines) + "\n")
@@ -240,6 +240,9 @@ class TaskProcessor(Generic[ResearchCommandContextType]):
         except StopIteration:
             research_node.get_logger().log_llm_response("")
             return ""
+        finally:
+            # Releases the stream (or gives up the batched request) when the node is interrupted
+            response_generator.close()
 
     def _handle_llm_error(self, exception: Exception) -> bool:
         """Handle LLM interface errors with option to retry.
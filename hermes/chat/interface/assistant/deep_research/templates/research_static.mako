@@ -130,6 +130,14 @@ Message 3: activate_subproblems
 
 ${'##'} Commands
 
+% if native_tools:
+${'###'} Command Tools
+
+The commands are provided to you as tools, use them through the tool calls of the API, not in the text of your message.
+Each tool call counts as one command, you can make many of them in one message.
+They are executed after your message is complete, like the rest of the commands.
+
+% else:
 ${'###'} Command Syntax
 
 Commands use this exact format:
@@ -142,6 +150,7 @@ Commands use this exact format:
 - Commands must start from the first character of a new line
 - Closing tags are mandatory - parsing will break without them
 - Multiple arguments of same type require repeated `///argument_name` tags
+% endif
 
 ${'###'} Error Handling
 
@@ -168,6 +177,11 @@ You likely didn't finish your message. Commands execute only after sending the c
 **How many commands per message?**
 Send all independent commands together - even 20-30 is fine! This saves message cycles and leverages parallel processing.
 
+% if native_tools:
+**Multiple arguments of same type?**
+Pass all of them in the list of the argument.
+
+% else:
 **Multiple arguments of same type?**
 Repeat the argument tag:
 ```
@@ -179,6 +193,7 @@ Second subproblem
 >>>
 ```
 
+% endif
 **When to use finish_problem?**
 Only after verifying completeness. Wait for all subproblems to finish before closing the parent problem.
 
@@ -0,0 +1,149 @@
+import logging
+import threading
+import time
+import uuid
+from collections.abc import Generator
+from concurrent.futures import Future, wait
+
+from hermes.chat.interface.assistant.framework.llm_interface import LLMInterface
+from hermes.chat.interface.assistant.models.chat_models.batch_clients import BatchClient, BatchResult
+from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
+
+logger = logging.getLogger(__name__)
+
+
+class BatchRequestCollector:
+    """Collects the requests sent around the same time (e.g. by the deep research nodes running in parallel),
+    submits them as one batch and resolves each request's future once the batch is done.
+
+    A batch is submitted `collection_window_seconds` after its first request, or as soon as it has `max_batch_size` requests.
+    Cancelling a request's future leaves it out of the batch, the provider batch is cancelled once all its futures are.
+    """
+
+    def __init__(
+        self,
+        batch_client: BatchClient,
+        notifications_printer: CLINotificationsPrinter,
+        collection_window_seconds: float = 2.0,
+        max_batch_size: int = 100,
+        poll_interval_seconds: float = 10.0,
+    ):
+        self.batch_client = batch_client
+        self.notifications_printer = notifications_printer
+        self.collection_window_seconds = collection_window_seconds
+        self.max_batch_size = max_batch_size
+        self.poll_interval_seconds = poll_interval_seconds
+        self._pending: dict[str, tuple[dict, Future]] = {}
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, request: dict) -> Future:
+        future = Future()
+        with self._lock:
+            self._pending[uuid.uuid4().hex] = (request, future)
+            if len(self._pending) >= self.max_batch_size:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.collection_window_seconds, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return future
+
+    def _flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        if pending:
+            threading.Thread(target=self._run_batch, args=(pending,), daemon=True).start()
+
+    def _run_batch(self, pending: dict[str, tuple[dict, Future]]):
+        try:
+            batch = self._process_batch(pending)
+        except Exception as e:
+            logger.warning(f"Batch of {len(pending)} requests failed: {e}")
+            self._fail(pending, e)
+            return
+        if batch is None:
+            return
+
+        batch_id, results = batch
+        for custom_id, (_, future) in pending.items():
+            self._resolve(future, results.get(custom_id), f"No result for request {custom_id} in batch {batch_id}")
+
+    def _process_batch(self, pending: dict[str, tuple[dict, Future]]) -> tuple[str, dict[str, BatchResult]] | None:
+        """Submits the requests that are still waited for, and collects the results once the batch is done.
+        None if all of them were given up.
+        """
+        requests = {custom_id: request for custom_id, (request, future) in pending.items() if not future.cancelled()}
+        if not requests:
+            return None
+        batch_id = self.batch_client.submit(requests)
+        self.notifications_printer.print_notification(f"Submitted batch {batch_id} with {len(requests)} requests")
+        if not self._wait_for_batch(batch_id, [future for _, future in pending.values()]):
+            self._cancel_batch(batch_id)
+            return None
+        return batch_id, self.batch_client.get_results(batch_id)
+
+    def _wait_for_batch(self, batch_id: str, futures: list[Future]) -> bool:
+        """Polls until the batch is done, False if all the requests were given up before"""
+        while not self.batch_client.is_done(batch_id):
+            if all(future.cancelled() for future in futures):
+                return False
+            time.sleep(self.poll_interval_seconds)
+        return True
+
+    def _cancel_batch(self, batch_id: str):
+        try:
+            self.batch_client.cancel(batch_id)
+        except Exception as e:
+            logger.warning(f"Failed to cancel batch {batch_id}: {e}")
+            return
+        self.notifications_printer.print_notification(f"Cancelled batch {batch_id}, none of its requests are waited for")
+
+    @staticmethod
+    def _fail(pending: dict[str, tuple[dict, Future]], error: Exception):
+        for _, future in pending.values():
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    @staticmethod
+    def _resolve(future: Future, result: BatchResult | None, missing_message: str):
+        if not future.set_running_or_notify_cancel():
+            return
+        if result is None:
+            future.set_exception(RuntimeError(missing_message))
+        elif result.error is not None:
+            future.set_exception(RuntimeError(result.error))
+        else:
+            future.set_result(result.text)
+
+
+class BatchingLLMInterface(LLMInterface):
+    """Sends the requests through the provider's batch API instead of streaming them.
+    Each caller blocks until its batch is done, the response is returned in one piece.
+
+    While waiting, an empty piece is yielded every `wait_slice_seconds`, so the caller can check for interruption
+    and close the generator. Closing it (or an interrupt) gives up the request, see BatchRequestCollector.
+    """
+
+    def __init__(self, llm_interface: LLMInterface, collector: BatchRequestCollector, wait_slice_seconds: float = 1.0):
+        self.llm_interface = llm_interface
+        self.collector = collector
+        self.wait_slice_seconds = wait_slice_seconds
+
+    def generate_request(self, history_messages: list[dict]) -> dict:
+        return self.llm_interface.generate_request(history_messages)
+
+    def send_request(self, request: dict) -> Generator[str, None, None]:
+        future = self.collector.submit(request)
+        try:
+            while not wait([future], timeout=self.wait_slice_seconds).done:
+                yield ""
+        finally:
+            future.cancel()
+        yield future.result()
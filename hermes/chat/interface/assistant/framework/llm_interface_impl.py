@@ -5,11 +5,14 @@ from hermes.chat.interface.assistant.chat.response_types import (
     BaseLLMResponse,
     TextLLMResponse,
     ThinkingLLMResponse,
+    ToolCallLLMResponse,
 )
 from hermes.chat.interface.assistant.framework.llm_interface import (
     LLMInterface,
 )
 from hermes.chat.interface.assistant.models.chat_models.base import ChatModel
+from hermes.chat.interface.commands.command import CommandRegistry
+from hermes.chat.interface.commands.tool_schema import build_tool_definitions, format_command_block
 from hermes.chat.messages import TextMessage
 
 logger = logging.getLogger(__name__)
@@ -20,6 +23,13 @@ class ChatModelLLMInterface(LLMInterface):
 
     def __init__(self, model: ChatModel):
         self.model = model
+        self.tools_command_registry: CommandRegistry | None = None
+
+    def enable_native_tools(self, command_registry: CommandRegistry):
+        """Send the registered commands as provider-native tools. The tool calls are turned into the text syntax of the commands,
+        so the response is processed like any other.
+        """
+        self.tools_command_registry = command_registry
 
     def generate_request(
         self,
@@ -35,6 +45,10 @@ class ChatModelLLMInterface(LLMInterface):
         for message in history_messages:
             rendered_messages.append(TextMessage(author=message["author"], text=message["content"]))
 
+        if self.tools_command_registry is not None:
+            # Read on every request, the MCP commands can be registered later
+            request_builder.set_tools(build_tool_definitions(self.tools_command_registry.get_all_commands().values()))
+
         # Build and return the request
         return request_builder.build_request(rendered_messages)
 
@@ -58,6 +72,10 @@ class ChatModelLLMInterface(LLMInterface):
             # Log and yield the text response
             logger.debug(response.text)
             yield response.text
+        elif isinstance(response, ToolCallLLMResponse):
+            state["is_thinking"] = False
+            state["is_working"] = True
+            yield f"\n{format_command_block(response.name, response.arguments)}\n"
         else:
             # Must be a thinking response
             assert isinstance(response, ThinkingLLMResponse)
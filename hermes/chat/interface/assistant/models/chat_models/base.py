@@ -1,9 +1,25 @@
+import asyncio
 from abc import ABC, abstractmethod
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
+from contextlib import aclosing
 from typing import Any
 
+from hermes.chat.interface.assistant.models.chat_models.batch_clients import BatchClient
+from hermes.chat.interface.assistant.models.chat_models.prompt_cache_stats import PromptCacheStats
+from hermes.chat.interface.assistant.models.chat_models.rate_limiter import get_shared_rate_limiter
+from hermes.chat.interface.assistant.models.chat_models.retry_policy import (
+    RetryPolicy,
+    get_retry_after_seconds,
+    is_retryable_error,
+    is_throttling_error,
+)
+from hermes.chat.interface.assistant.models.chat_models.stream_metrics import get_shared_stream_metrics, measure_stream
+from hermes.chat.interface.assistant.models.chat_models.throttle_stats import ThrottleStats
 from hermes.chat.interface.assistant.models.request_builder.base import RequestBuilder
+from hermes.chat.interface.assistant.models.request_builder.content_dedupe import ContentDedupePolicy
+from hermes.chat.interface.assistant.models.request_builder.context_window import ContextFittingPolicy, ContextWindow
 from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
+from hermes.utils.event_loop_thread import get_shared_event_loop_thread
 
 
 class ChatModel(ABC):
@@ -16,14 +32,108 @@ class ChatModel(ABC):
         self.config = config
         self.model_tag = model_tag
         self.notifications_printer = notifications_printer
+        self.prompt_cache_stats = PromptCacheStats(model_tag)
+        self.throttle_stats = ThrottleStats(model_tag)
+        self.retry_policy = RetryPolicy()
+        # Read before initialize, some models replace their config there
+        self.rate_limiter = get_shared_rate_limiter(
+            self.get_provider(),
+            self._get_limit(config, "requests_per_minute"),
+            self._get_limit(config, "tokens_per_minute"),
+        )
+        self.context_window: ContextWindow | None = None
+        # Passed to the request builder in initialize, like the context window
+        self.content_dedupe_policy = ContentDedupePolicy(
+            (config or {}).get("content_dedupe_policy", ContentDedupePolicy.BACK_REFERENCE.value)
+        )
+
+    def configure_context_window(self, declared_limit_tokens: int | None):
+        """Called by ModelFactory with the declared context window of the model, `context_window_tokens` in the config overrides it.
+        Providers pass it to their request builder in initialize.
+        """
+        limit_tokens = self._get_limit(self.config, "context_window_tokens") or declared_limit_tokens
+        if not limit_tokens:
+            self.context_window = None
+            return
+        policy = ContextFittingPolicy((self.config or {}).get("context_fitting_policy", ContextFittingPolicy.DROP_OLDEST.value))
+        self.context_window = ContextWindow(int(limit_tokens), policy)
 
     @abstractmethod
     def initialize(self):
         pass
 
+    def set_thinking_level(self, level: int):  # noqa: B027
+        """Models without a controllable thinking budget ignore the level."""
+
     @abstractmethod
-    def send_request(self, request: Any) -> Generator[str, None, None]:
-        pass
+    def _stream(self, request: Any) -> AsyncGenerator[Any, None]:
+        """Stream the response chunks (strings or LLM responses) using the provider's async client.
+        Implemented as `async def` generators, any number of them can run concurrently on one event loop.
+        """
+
+    async def stream(self, request: Any) -> AsyncGenerator[Any, None]:
+        """Stream the response, throttled by the provider's shared rate limiter.
+        Throttling and transient server errors are retried with backoff, as long as nothing has been streamed yet.
+        With a single attempt allowed, the error is raised as is.
+        """
+        attempt = 0
+        while True:
+            await self._wait_for_rate_limit(request)
+            has_streamed = False
+            try:
+                # Closed explicitly, so an early close of this stream releases the provider's one right away
+                async with aclosing(self._stream(request)) as chunks:
+                    async for chunk in chunks:
+                        has_streamed = True
+                        yield chunk
+                return
+            except Exception as e:
+                if has_streamed or not is_retryable_error(e) or self.retry_policy.max_attempts <= 1:
+                    raise
+                attempt += 1
+                await self._back_off(e, attempt)
+
+    def send_request(self, request: Any) -> Generator[Any, None, None]:
+        """Blocking adapter over `stream`, driven by the shared event loop thread. The response is timed, see measure_stream."""
+        chunks = get_shared_event_loop_thread().iterate(self.stream(request))
+        return measure_stream(chunks, f"{self.get_provider()}/{self.model_tag}", get_shared_stream_metrics())
+
+    async def _wait_for_rate_limit(self, request: Any):
+        if not self.rate_limiter.is_limited:
+            return
+        wait_seconds = await self.rate_limiter.acquire(self._estimate_request_tokens(request))
+        if wait_seconds > 0:
+            self.throttle_stats.record_rate_limit_wait(wait_seconds)
+
+    async def _back_off(self, error: Exception, attempt: int):
+        is_throttled = is_throttling_error(error)
+        if attempt >= self.retry_policy.max_attempts:
+            if is_throttled:
+                message = f"{self.get_provider()} is still throttling {self.model_tag} after {attempt} attempts, try again later"
+            else:
+                message = f"{self.model_tag} still fails with transient errors after {attempt} attempts, try again later"
+            raise RuntimeError(message) from error
+        delay = self.retry_policy.get_delay(attempt - 1, get_retry_after_seconds(error))
+        self.throttle_stats.record_backoff(delay, error)
+        problem = "is throttled" if is_throttled else "failed with a transient error"
+        self.notifications_printer.print_notification(
+            f"{self.model_tag} {problem} ({type(error).__name__}), retrying in {delay:.1f}s, attempt {attempt + 1}. "
+            f"{self.throttle_stats.describe()}"
+        )
+        await asyncio.sleep(delay)
+
+    def _estimate_request_tokens(self, request: Any) -> int:
+        """Rough estimate for the tokens per minute limit, ~4 characters per token of all the strings in the request."""
+        return _count_characters(request) // 4
+
+    @staticmethod
+    def _get_limit(config: Any, key: str) -> float | None:
+        value = config.get(key) if config else None
+        return float(value) if value else None
+
+    def create_batch_client(self) -> BatchClient | None:
+        """Client of the provider's batch API, None when the provider doesn't have one."""
+        return None
 
     @abstractmethod
     def get_request_builder(self) -> RequestBuilder:
@@ -42,3 +152,13 @@ class ChatModel(ABC):
     @abstractmethod
     def get_model_tags() -> list[str]:
         pass
+
+
+def _count_characters(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_count_characters(item) for item in value.values())
+    if isinstance(value, list | tuple):
+        return sum(_count_characters(item) for item in value)
+    return len(str(value)) if hasattr(value, "model_dump_json") else 0
@@ -0,0 +1,153 @@
+import io
+import itertools
+import json
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+# Keys of the streaming requests that the batch endpoints don't accept
+STREAMING_ONLY_KEYS = ("stream", "stream_options")
+
+
+@dataclass
+class BatchResult:
+    text: str | None = None
+    error: str | None = None
+
+
+class BatchClient(ABC):
+    """Provider batch API: requests are submitted together, processed asynchronously (at a discount) and collected later"""
+
+    @abstractmethod
+    def submit(self, requests: dict[str, Any]) -> str:
+        """Submit the requests by custom id, returns the batch id."""
+
+    @abstractmethod
+    def is_done(self, batch_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def get_results(self, batch_id: str) -> dict[str, BatchResult]:
+        """The results by custom id, only called once the batch is done."""
+
+    @abstractmethod
+    def cancel(self, batch_id: str):
+        """Stop processing the batch, once none of its results are waited for."""
+
+    @staticmethod
+    def _to_batch_request(request: dict) -> dict:
+        return {key: value for key, value in request.items() if key not in STREAMING_ONLY_KEYS}
+
+
+class AnthropicBatchClient(BatchClient):
+    """Message Batches API"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def submit(self, requests: dict[str, Any]) -> str:
+        batch = self.client.messages.batches.create(
+            requests=[{"custom_id": custom_id, "params": self._to_batch_request(request)} for custom_id, request in requests.items()]
+        )
+        return batch.id
+
+    def is_done(self, batch_id: str) -> bool:
+        return self.client.messages.batches.retrieve(batch_id).processing_status == "ended"
+
+    def get_results(self, batch_id: str) -> dict[str, BatchResult]:
+        results = {}
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type != "succeeded":
+                results[entry.custom_id] = BatchResult(error=f"Batch request {entry.result.type}: {getattr(entry.result, 'error', '')}")
+                continue
+            text = "".join(block.text for block in entry.result.message.content if block.type == "text")
+            results[entry.custom_id] = BatchResult(text=text)
+        return results
+
+    def cancel(self, batch_id: str):
+        self.client.messages.batches.cancel(batch_id)
+
+
+class OpenAIBatchClient(BatchClient):
+    """Batch API over a JSONL file of chat completion requests"""
+
+    ENDPOINT = "/v1/chat/completions"
+    FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+    def __init__(self, client):
+        self.client = client
+
+    def submit(self, requests: dict[str, Any]) -> str:
+        lines = [
+            json.dumps({"custom_id": custom_id, "method": "POST", "url": self.ENDPOINT, "body": self._to_batch_request(request)})
+            for custom_id, request in requests.items()
+        ]
+        input_file = self.client.files.create(file=("batch.jsonl", io.BytesIO("\n".join(lines).encode())), purpose="batch")
+        batch = self.client.batches.create(input_file_id=input_file.id, endpoint=self.ENDPOINT, completion_window="24h")
+        return batch.id
+
+    def is_done(self, batch_id: str) -> bool:
+        return self.client.batches.retrieve(batch_id).status in self.FINAL_STATUSES
+
+    def get_results(self, batch_id: str) -> dict[str, BatchResult]:
+        batch = self.client.batches.retrieve(batch_id)
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                for line in self.client.files.content(file_id).text.splitlines():
+                    if line.strip():
+                        entry = json.loads(line)
+                        results[entry["custom_id"]] = self._parse_entry(entry)
+        return results
+
+    def _parse_entry(self, entry: dict) -> BatchResult:
+        response = entry.get("response") or {}
+        if entry.get("error") or response.get("status_code") != 200:
+            return BatchResult(error=f"Batch request failed: {entry.get('error') or response.get('body')}")
+        return BatchResult(text=response["body"]["choices"][0]["message"]["content"] or "")
+
+    def cancel(self, batch_id: str):
+        self.client.batches.cancel(batch_id)
+
+
+class LocalBatchClient(BatchClient):
+    """Stand-in batch server answering with a local function, to run and test the batch mode offline.
+    A batch is done after `polls_until_done` status checks, like a real batch that takes a while.
+    """
+
+    def __init__(self, respond: Callable[[dict], str], polls_until_done: int = 1):
+        self.respond = respond
+        self.polls_until_done = polls_until_done
+        self.submitted_batches: list[dict[str, Any]] = []
+        self.cancelled_batch_ids: list[str] = []
+        self._polls: dict[str, int] = {}
+        self._batch_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, requests: dict[str, Any]) -> str:
+        with self._lock:
+            batch_id = f"local-batch-{next(self._batch_ids)}"
+            self.submitted_batches.append({custom_id: self._to_batch_request(request) for custom_id, request in requests.items()})
+            self._polls[batch_id] = 0
+        return batch_id
+
+    def is_done(self, batch_id: str) -> bool:
+        with self._lock:
+            self._polls[batch_id] += 1
+            return self._polls[batch_id] >= self.polls_until_done
+
+    def get_results(self, batch_id: str) -> dict[str, BatchResult]:
+        requests = self.submitted_batches[int(batch_id.rsplit("-", 1)[1]) - 1]
+        results = {}
+        for custom_id, request in requests.items():
+            try:
+                results[custom_id] = BatchResult(text=self.respond(request))
+            except Exception as e:
+                results[custom_id] = BatchResult(error=str(e))
+        return results
+
+    def cancel(self, batch_id: str):
+        with self._lock:
+            self.cancelled_batch_ids.append(batch_id)
@@ -1,19 +1,26 @@
-import time
-from collections.abc import Generator
+import asyncio
+from collections.abc import AsyncGenerator, Generator
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from hermes.chat.interface.assistant.chat.response_types import (
     TextLLMResponse,
     ThinkingLLMResponse,
+    ToolCallLLMResponse,
 )
+from hermes.chat.interface.assistant.models.chat_models.prompt_cache_stats import PromptCacheUsage
 from hermes.chat.interface.assistant.models.prompt_builder.simple_prompt_builder import (
     SimplePromptBuilderFactory,
 )
 from hermes.chat.interface.assistant.models.request_builder.base import RequestBuilder
 from hermes.chat.interface.assistant.models.request_builder.bedrock import BedrockRequestBuilder
+from hermes.chat.interface.commands.tool_schema import decode_tool_arguments
 
 from .base import ChatModel
 
+# A stream holds a thread while it waits for its next event, one per pooled connection
+MAX_CONCURRENT_STREAMS = 100
+
 
 class BedrockModel(ChatModel):
     def initialize(self):
@@ -21,6 +28,8 @@ class BedrockModel(ChatModel):
         from botocore.config import Config
 
         self.request_builder = BedrockRequestBuilder(self.model_tag, self.notifications_printer, SimplePromptBuilderFactory())
+        self.request_builder.set_context_window(self.context_window)
+        self.request_builder.set_content_dedupe_policy(self.content_dedupe_policy)
 
         aws_region = self.config.get("aws_region")
         aws_profile_name = self.config.get("aws_profile_name")
@@ -35,12 +44,16 @@ class BedrockModel(ChatModel):
             "bedrock-runtime",
             region_name=aws_region,
             config=Config(
-                max_pool_connections=100,
+                max_pool_connections=MAX_CONCURRENT_STREAMS,
+                tcp_keepalive=True,
                 connect_timeout=5,
                 read_timeout=3600,
-                retries={"max_attempts": 5, "mode": "adaptive"},
+                # Throttling is retried by ChatModel.stream, with the provider's shared rate limiter
+                retries={"max_attempts": 1, "mode": "standard"},
             ),
         )
+        # Not the loop's default executor, its few threads are shared with every other blocking call
+        self._stream_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_STREAMS, thread_name_prefix="hermes-bedrock-stream")
 
     def _process_content_delta(self, delta: dict) -> Generator[Any, None, None]:
         """Process the content delta from Bedrock response and yield appropriate responses."""
@@ -51,36 +64,37 @@ class BedrockModel(ChatModel):
             content = delta.get("text", "")
             yield TextLLMResponse(content)
 
-    def send_request(self, request: Any) -> Generator[str, None, None]:
-        response = self._call_and_retry_if_needed(request)
-
-        for event in response["stream"]:
-            if "contentBlockDelta" in event:
-                delta = event["contentBlockDelta"]["delta"]
-                yield from self._process_content_delta(delta)
-            elif "messageStop" in event:
-                break
-
-    def _call_and_retry_if_needed(self, request, tries=1):
-        from botocore.exceptions import ClientError
-
-        try:
-            response = self.client.converse_stream(**request)
-        except ClientError as e:
-            if e.response["Error"]["Code"] == "ThrottlingException":
-                if tries <= 5:
-                    seconds = 20 * tries
-                    print("Throttling Exception Occured.")
-                    print("Retrying.....")
-                    print("Attempt No.: " + str(tries))
-                    print(f"Sleeping for {seconds}")
-                    time.sleep(seconds)
-                    return self._call_and_retry_if_needed(request, tries + 1)
-                print("Attempted 3 Times But No Success.")
-                print("Raising Exception.....")
-                raise
-            raise
-        return response
+    async def _stream(self, request: Any) -> AsyncGenerator[Any, None]:
+        """boto3 has no async client, the blocking calls and event reads run on the model's stream executor."""
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(self._stream_executor, lambda: self.client.converse_stream(**request))
+        events = iter(response["stream"])
+
+        tool_use = _StreamedToolUse()
+        while (event := await loop.run_in_executor(self._stream_executor, next, events, None)) is not None:
+            for llm_response in self._process_event(event, tool_use):
+                yield llm_response
+
+    def _process_event(self, event: dict, tool_use: "_StreamedToolUse") -> Generator[Any, None, None]:
+        if "contentBlockStart" in event:
+            tool_use.start(event["contentBlockStart"])
+        elif "contentBlockDelta" in event:
+            delta = event["contentBlockDelta"]["delta"]
+            tool_use.add_delta(delta)
+            yield from self._process_content_delta(delta)
+        elif "contentBlockStop" in event:
+            yield from tool_use.finish()
+        elif "metadata" in event:
+            self._record_prompt_cache_usage(event["metadata"].get("usage", {}))
+
+    def _record_prompt_cache_usage(self, usage: dict):
+        self.prompt_cache_stats.record(
+            PromptCacheUsage(
+                cache_read_tokens=usage.get("cacheReadInputTokens", 0),
+                cache_write_tokens=usage.get("cacheWriteInputTokens", 0),
+                uncached_tokens=usage.get("inputTokens", 0),
+            )
+        )
 
     def get_request_builder(self) -> RequestBuilder:
         return self.request_builder
@@ -102,3 +116,24 @@ class BedrockModel(ChatModel):
 
     def set_thinking_level(self, level: int):
         self.request_builder.set_reasoning_effort(level)
+
+
+class _StreamedToolUse:
+    """The tool call of the current content block, its input is streamed as fragments of a JSON string"""
+
+    def __init__(self):
+        self._tool_use: dict | None = None
+
+    def start(self, content_block_start: dict):
+        tool_use = content_block_start.get("start", {}).get("toolUse")
+        self._tool_use = {"id": tool_use.get("toolUseId"), "name": tool_use["name"], "input": ""} if tool_use else None
+
+    def add_delta(self, delta: dict):
+        if self._tool_use is not None and "toolUse" in delta:
+            self._tool_use["input"] += delta["toolUse"].get("input", "")
+
+    def finish(self) -> list[ToolCallLLMResponse]:
+        tool_use, self._tool_use = self._tool_use, None
+        if tool_use is None:
+            return []
+        return [ToolCallLLMResponse(tool_use["name"], decode_tool_arguments(tool_use["input"]), tool_use["id"])]
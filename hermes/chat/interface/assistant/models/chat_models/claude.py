@@ -1,11 +1,15 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator
 from typing import Any
 
+from hermes.chat.interface.assistant.chat.response_types import ToolCallLLMResponse
+from hermes.chat.interface.assistant.models.chat_models.batch_clients import AnthropicBatchClient, BatchClient
+from hermes.chat.interface.assistant.models.chat_models.prompt_cache_stats import PromptCacheUsage
 from hermes.chat.interface.assistant.models.prompt_builder.simple_prompt_builder import (
     SimplePromptBuilderFactory,
 )
 from hermes.chat.interface.assistant.models.request_builder.base import RequestBuilder
 from hermes.chat.interface.assistant.models.request_builder.claude import ClaudeRequestBuilder
+from hermes.utils.http_transport import get_shared_http_transport
 
 from .base import ChatModel
 
@@ -15,15 +19,51 @@ class ClaudeModel(ChatModel):
         import anthropic
 
         self.request_builder = ClaudeRequestBuilder(self.model_tag, self.notifications_printer, SimplePromptBuilderFactory())
+        self.request_builder.set_context_window(self.context_window)
+        self.request_builder.set_content_dedupe_policy(self.content_dedupe_policy)
 
         api_key = self.config.get("api_key")
         if not api_key:
             raise ValueError("API key is required for Claude model")
-        self.client = anthropic.Anthropic(api_key=api_key, default_headers={"anthropic-beta": "pdfs-2024-09-25"})
+        # Retries are done by ChatModel.stream, shared with the other providers
+        http_transport = get_shared_http_transport()
+        self.client = anthropic.AsyncAnthropic(
+            api_key=api_key,
+            base_url=self.config.get("base_url"),
+            default_headers={"anthropic-beta": "pdfs-2024-09-25"},
+            max_retries=0,
+            http_client=http_transport.get_client(anthropic.DefaultAsyncHttpxClient),
+        )
+        http_transport.warm_up(str(self.client.base_url), anthropic.DefaultAsyncHttpxClient)
 
-    def send_request(self, request: Any) -> Generator[str, None, None]:
-        with self.client.messages.stream(**request) as stream:
-            yield from stream.text_stream
+    async def _stream(self, request: Any) -> AsyncGenerator[Any, None]:
+        async with self.client.messages.stream(**request) as stream:
+            async for event in stream:
+                if event.type == "text":
+                    yield event.text
+                elif event.type == "content_block_stop" and event.content_block.type == "tool_use":
+                    block = event.content_block
+                    yield ToolCallLLMResponse(block.name, block.input if isinstance(block.input, dict) else {}, block.id)
+            final_message = await stream.get_final_message()
+            self._record_prompt_cache_usage(final_message.usage)
+
+    def create_batch_client(self) -> BatchClient:
+        import anthropic
+
+        return AnthropicBatchClient(
+            anthropic.Anthropic(
+                api_key=self.config.get("api_key"), http_client=get_shared_http_transport().get_client(anthropic.DefaultHttpxClient)
+            )
+        )
+
+    def _record_prompt_cache_usage(self, usage):
+        self.prompt_cache_stats.record(
+            PromptCacheUsage(
+                cache_read_tokens=usage.cache_read_input_tokens or 0,
+                cache_write_tokens=usage.cache_creation_input_tokens or 0,
+                uncached_tokens=usage.input_tokens,
+            )
+        )
 
     def get_request_builder(self) -> RequestBuilder:
         return self.request_builder
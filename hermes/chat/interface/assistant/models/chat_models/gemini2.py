@@ -1,19 +1,27 @@
-from collections.abc import Generator
-from typing import Any
+from collections.abc import AsyncGenerator, Generator
+from typing import TYPE_CHECKING, Any
 
 from hermes.chat.interface.assistant.chat.response_types import (
     BaseLLMResponse,
     TextLLMResponse,
     ThinkingLLMResponse,
+    ToolCallLLMResponse,
 )
+from hermes.chat.interface.assistant.models.chat_models.prompt_cache_stats import PromptCacheUsage
 from hermes.chat.interface.assistant.models.prompt_builder.simple_prompt_builder import (
     SimplePromptBuilderFactory,
 )
 from hermes.chat.interface.assistant.models.request_builder.base import RequestBuilder
 from hermes.chat.interface.assistant.models.request_builder.gemini2 import Gemini2RequestBuilder
+from hermes.utils.http_transport import get_shared_http_transport
 
 from .base import ChatModel
 
+if TYPE_CHECKING:
+    from google.genai.types import HttpOptions
+
+GEMINI_API_URL = "https://generativelanguage.googleapis.com"
+
 
 class Gemini2Model(ChatModel):
     def initialize(self):
@@ -24,7 +32,7 @@ class Gemini2Model(ChatModel):
         if not api_key:
             raise ValueError("API key is required for Gemini model")
 
-        self.client = genai.Client(api_key=api_key, http_options={"api_version": "v1alpha"})
+        self.client = genai.Client(api_key=api_key, http_options=self._create_http_options())
 
         self.request_builder = Gemini2RequestBuilder(
             self.model_tag,
@@ -32,45 +40,42 @@ class Gemini2Model(ChatModel):
             SimplePromptBuilderFactory(),
             self.client,
         )
+        self.request_builder.set_context_window(self.context_window)
+        self.request_builder.set_content_dedupe_policy(self.content_dedupe_policy)
 
         self.google_search_tool = Tool(google_search=GoogleSearch())
 
+    @staticmethod
+    def _create_http_options() -> "HttpOptions":
+        import httpx
+        from google.genai.types import HttpOptions
+
+        shared_clients: dict[str, Any] = {}
+        # Older google-genai versions create their own clients
+        if "httpx_async_client" in HttpOptions.model_fields:
+            http_transport = get_shared_http_transport()
+            shared_clients["httpx_client"] = http_transport.get_client(httpx.Client)
+            shared_clients["httpx_async_client"] = http_transport.get_client(httpx.AsyncClient)
+            http_transport.warm_up(GEMINI_API_URL, httpx.AsyncClient)
+        return HttpOptions(api_version="v1alpha", **shared_clients)
+
     @property
     def _supports_thinking(self) -> bool:
         return "thinking" in self.model_tag
 
-    def _make_api_call(self, request):
-        """Make the API call with retry logic and handle errors."""
-        from google.genai.errors import ClientError
+    async def _make_api_call(self, request):
+        """Make the API call, throttling errors are retried by ChatModel.stream."""
         from google.genai.types import GenerateContentConfig
-        from tenacity import (
-            retry,
-            retry_if_exception_type,
-            stop_after_attempt,
-            wait_exponential,
-        )
 
-        @retry(
-            stop=stop_after_attempt(5),
-            wait=wait_exponential(multiplier=1, max=60),
-            retry=retry_if_exception_type(ClientError),
+        return await self.client.aio.models.generate_content(
+            model=request["model_name"],
+            contents=request["contents"],
+            config=GenerateContentConfig(
+                response_modalities=["TEXT"],
+                tools=request["tools"],
+                cached_content=request.get("cached_content"),
+            ),
         )
-        def _send_request_with_retry():
-            return self.client.models.generate_content(
-                model=request["model_name"],
-                contents=request["contents"],
-                config=GenerateContentConfig(
-                    response_modalities=["TEXT"],
-                    tools=request["tools"],
-                ),
-            )
-
-        try:
-            return _send_request_with_retry()
-        except ClientError as e:
-            if e.status == 429:
-                raise RuntimeError("Gemini API quota exceeded - try again later or check your Google Cloud quota") from e
-            raise
 
     def _process_response_parts(self, response):
         """Process response parts and yield LLM responses."""
@@ -82,6 +87,10 @@ class Gemini2Model(ChatModel):
             return
 
         for part in response.candidates[0].content.parts or []:
+            function_call = getattr(part, "function_call", None)
+            if function_call:
+                yield ToolCallLLMResponse(function_call.name, dict(function_call.args or {}), function_call.id)
+                continue
             yield from self._convert_to_llm_response(
                 self._handle_part(part),
                 is_thinking=not has_finished_thinking,
@@ -90,10 +99,24 @@ class Gemini2Model(ChatModel):
             # Handle thinking state transitions
             has_finished_thinking = not (hasattr(part, "thought") and part.thought)
 
-    def send_request(self, request: Any) -> Generator[str, None, None]:
+    async def _stream(self, request: Any) -> AsyncGenerator[Any, None]:
         """Send a request to the Gemini API and yield responses."""
-        response = self._make_api_call(request)
-        yield from self._process_response_parts(response)
+        response = await self._make_api_call(request)
+        self._record_prompt_cache_usage(response)
+        for llm_response in self._process_response_parts(response):
+            yield llm_response
+
+    def _record_prompt_cache_usage(self, response):
+        usage = response.usage_metadata
+        if not usage:
+            return
+        cache_read_tokens = usage.cached_content_token_count or 0
+        self.prompt_cache_stats.record(
+            PromptCacheUsage(
+                cache_read_tokens=cache_read_tokens,
+                uncached_tokens=(usage.prompt_token_count or 0) - cache_read_tokens,
+            )
+        )
 
     def _handle_part(self, part) -> Generator[str, None, None]:
         if hasattr(part, "text"):
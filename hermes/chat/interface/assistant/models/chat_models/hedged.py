@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import threading
+from collections.abc import AsyncGenerator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from hermes.chat.interface.assistant.models.chat_models.base import ChatModel
+from hermes.chat.interface.assistant.models.chat_models.retry_policy import RetryPolicy
+from hermes.chat.interface.assistant.models.request_builder.base import RequestBuilder
+from hermes.chat.interface.assistant.models.request_builder.content_dedupe import ContentDedupePolicy
+from hermes.chat.interface.assistant.models.request_builder.context_window import ContextWindow
+from hermes.chat.interface.commands.tool_schema import ToolDefinition
+from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
+from hermes.chat.messages import Message
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEDGE_DEADLINE_SECONDS = 5.0
+# First chunk of a model that answered with an empty response
+_NO_CHUNK = object()
+
+
+class HedgedRequest:
+    """The request for the primary model, the ones for the fallback models are built only if they are started"""
+
+    def __init__(self, request_builders: list, messages: Sequence[Message], primary_request: Any):
+        self._request_builders = request_builders
+        self._messages = list(messages)
+        self._requests = {0: primary_request}
+        self._lock = threading.Lock()
+
+    def get_request(self, index: int) -> Any:
+        with self._lock:
+            if index not in self._requests:
+                self._requests[index] = self._request_builders[index].build_request(self._messages)
+            return self._requests[index]
+
+
+class HedgedRequestBuilder(RequestBuilder):
+    """Builds a HedgedRequest, the request builders of the underlying models do the actual work"""
+
+    def __init__(self, request_builders: list[RequestBuilder]):
+        primary = request_builders[0]
+        super().__init__(primary.model_tag, primary.notifications_printer, primary.prompt_builder_factory)
+        self.request_builders = request_builders
+        self.supports_native_tools = all(request_builder.supports_native_tools for request_builder in request_builders)
+
+    def set_tools(self, tools: list[ToolDefinition]):
+        for request_builder in self.request_builders:
+            request_builder.set_tools(tools)
+
+    def set_context_window(self, context_window: ContextWindow | None):
+        for request_builder in self.request_builders:
+            request_builder.set_context_window(context_window)
+
+    def set_content_dedupe_policy(self, policy: ContentDedupePolicy):
+        for request_builder in self.request_builders:
+            request_builder.set_content_dedupe_policy(policy)
+
+    def build_request(self, messages: Sequence[Message]) -> HedgedRequest:
+        return HedgedRequest(self.request_builders, messages, self.request_builders[0].build_request(messages))
+
+    def reset_compilation_cache(self):
+        for request_builder in self.request_builders:
+            request_builder.reset_compilation_cache()
+
+    def initialize_request(self):
+        """build_request is delegated as a whole, the primary builder is the one that compiles"""
+        self.request_builders[0].initialize_request()
+
+    def compile_request(self) -> Any:
+        return self.request_builders[0].compile_request()
+
+
+@dataclass
+class _Candidate:
+    index: int
+    responses: AsyncGenerator[Any, None]
+
+
+class HedgedChatModel(ChatModel):
+    """Sends the request to the primary model, and to the next configured model if no first token arrives
+    within the hedge deadline, or right away if the primary fails. Whichever streams first wins, the others are cancelled.
+    The models themselves don't retry, so a failing model is failed over at once. The hedged model retries the whole
+    race with backoff instead, once all the models failed with throttling or transient errors.
+
+    Created by ModelFactory for comma separated model specs, e.g. `ANTHROPIC/x,BEDROCK/y`.
+    """
+
+    def __init__(
+        self,
+        models: Sequence[ChatModel],
+        notifications_printer: CLINotificationsPrinter,
+        hedge_deadline_seconds: float | None = None,
+    ):
+        model_tag = ",".join(f"{model.get_provider()}/{model.model_tag}" for model in models)
+        super().__init__({}, model_tag, notifications_printer)
+        self.models = list(models)
+        for model in models:
+            model.retry_policy = RetryPolicy(max_attempts=1)
+        self.hedge_deadline_seconds = hedge_deadline_seconds or DEFAULT_HEDGE_DEADLINE_SECONDS
+
+    def initialize(self):
+        for model in self.models:
+            model.initialize()
+        self.request_builder = HedgedRequestBuilder([model.get_request_builder() for model in self.models])
+
+    def get_request_builder(self) -> HedgedRequestBuilder:
+        return self.request_builder
+
+    def set_thinking_level(self, level: int):
+        for model in self.models:
+            model.set_thinking_level(level)
+
+    async def _stream(self, request: HedgedRequest) -> AsyncGenerator[Any, None]:
+        candidates: dict[asyncio.Task, _Candidate] = {}
+        try:
+            winner, first_chunk = await self._race(request, candidates)
+        finally:
+            await self._cancel(candidates)
+        if winner is None:
+            return
+
+        try:
+            if first_chunk is not _NO_CHUNK:
+                yield first_chunk
+            async for chunk in winner.responses:
+                yield chunk
+        finally:
+            await winner.responses.aclose()
+
+    async def _race(self, request: HedgedRequest, candidates: dict[asyncio.Task, _Candidate]) -> tuple[_Candidate | None, Any]:
+        """Wait for the first candidate to produce a chunk, hedging and failing over on the way."""
+        next_index = await self._start(request, candidates, 0)
+        while candidates:
+            can_hedge = next_index < len(self.models)
+            done, _ = await asyncio.wait(
+                candidates, timeout=self.hedge_deadline_seconds if can_hedge else None, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                self._notify(f"No response from {self._describe(next_index - 1)} yet, also trying {self._describe(next_index)}")
+                next_index = await self._start(request, candidates, next_index)
+                continue
+
+            for task in done:
+                candidate = candidates.pop(task)
+                error = task.exception()
+                if error is None:
+                    return candidate, task.result()
+                next_index = await self._fail_over(request, candidates, candidate, error, next_index)
+        return None, None
+
+    async def _fail_over(
+        self, request: HedgedRequest, candidates: dict[asyncio.Task, _Candidate], failed: _Candidate, error: BaseException, next_index: int
+    ) -> int:
+        await failed.responses.aclose()
+        if candidates:
+            self._notify(f"{self._describe(failed.index)} failed ({error}), waiting for the other models")
+            return next_index
+        if next_index >= len(self.models):
+            raise error
+        self._notify(f"{self._describe(failed.index)} failed ({error}), failing over to {self._describe(next_index)}")
+        return await self._start(request, candidates, next_index)
+
+    async def _start(self, request: HedgedRequest, candidates: dict[asyncio.Task, _Candidate], index: int) -> int:
+        model_request = await asyncio.to_thread(request.get_request, index)
+        candidate = _Candidate(index=index, responses=self.models[index].stream(model_request))
+        candidates[asyncio.ensure_future(self._get_first_chunk(candidate))] = candidate
+        return index + 1
+
+    async def _get_first_chunk(self, candidate: _Candidate) -> Any:
+        try:
+            return await anext(candidate.responses)
+        except StopAsyncIteration:
+            return _NO_CHUNK
+
+    async def _cancel(self, candidates: dict[asyncio.Task, _Candidate]):
+        """Cancel the losers and close their streams, so their connections are released."""
+        for task in candidates:
+            task.cancel()
+        await asyncio.gather(*candidates, return_exceptions=True)
+        for candidate in candidates.values():
+            await candidate.responses.aclose()
+        candidates.clear()
+
+    def _describe(self, index: int) -> str:
+        model = self.models[index]
+        return f"{model.get_provider()}/{model.model_tag}"
+
+    def _notify(self, message: str):
+        logger.debug(message)
+        self.notifications_printer.print_notification(message)
+
+    @staticmethod
+    def get_provider() -> str:
+        return "HEDGED"
+
+    @staticmethod
+    def get_model_tags() -> list[str]:
+        return []
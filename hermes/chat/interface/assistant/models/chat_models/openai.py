@@ -1,22 +1,28 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from typing import Any
 
 from hermes.chat.interface.assistant.chat.response_types import (
     TextLLMResponse,
     ThinkingLLMResponse,
+    ToolCallLLMResponse,
 )
+from hermes.chat.interface.assistant.models.chat_models.batch_clients import BatchClient, OpenAIBatchClient
 from hermes.chat.interface.assistant.models.prompt_builder.simple_prompt_builder import (
     SimplePromptBuilderFactory,
 )
 from hermes.chat.interface.assistant.models.request_builder.base import RequestBuilder
 from hermes.chat.interface.assistant.models.request_builder.openai import OpenAIRequestBuilder
+from hermes.chat.interface.commands.tool_schema import decode_tool_arguments
+from hermes.utils.http_transport import get_shared_http_transport
 
 from .base import ChatModel
 
 
 class OpenAIModel(ChatModel):
     def initialize(self):
-        self.request_builder = OpenAIRequestBuilder(self.model_tag, self.notifications_printer, SimplePromptBuilderFactory())
+        self.request_builder = self._create_request_builder()
+        self.request_builder.set_context_window(self.context_window)
+        self.request_builder.set_content_dedupe_policy(self.content_dedupe_policy)
 
         import openai
 
@@ -25,20 +31,51 @@ class OpenAIModel(ChatModel):
             raise ValueError("API key is required for OpenAI model")
         base_url = self.config.get("base_url", "https://api.openai.com/v1")
         self.model = self.config.get("model", "gpt-4o")
-        self.client = openai.Client(api_key=api_key, base_url=base_url)
+        # Retries are done by ChatModel.stream, shared with the other providers
+        http_transport = get_shared_http_transport()
+        self.client = openai.AsyncClient(
+            api_key=api_key, base_url=base_url, max_retries=0, http_client=http_transport.get_client(openai.DefaultAsyncHttpxClient)
+        )
+        http_transport.warm_up(base_url, openai.DefaultAsyncHttpxClient)
 
-    def send_request(self, request: Any) -> Generator[str, None, None]:
+    def _create_request_builder(self) -> OpenAIRequestBuilder:
+        return OpenAIRequestBuilder(self.model_tag, self.notifications_printer, SimplePromptBuilderFactory())
+
+    async def _stream(self, request: Any) -> AsyncGenerator[Any, None]:
         import openai
 
         try:
-            stream = self.client.chat.completions.create(**request)
+            stream = await self.client.chat.completions.create(**request)
         except openai.AuthenticationError as e:
             raise Exception("Authentication failed. Please check your API key.") from e
-        for chunk in stream:
-            if hasattr(chunk.choices[0].delta, "reasoning_content") and chunk.choices[0].delta.reasoning_content is not None:
-                yield ThinkingLLMResponse(chunk.choices[0].delta.reasoning_content)
-            if chunk.choices[0].delta.content is not None:
-                yield TextLLMResponse(chunk.choices[0].delta.content)
+        tool_calls = _StreamedToolCalls()
+        async for chunk in stream:
+            for llm_response in self._process_delta(chunk.choices[0].delta, tool_calls):
+                yield llm_response
+        for tool_call in tool_calls.finish():
+            yield tool_call
+
+    def _process_delta(self, delta, tool_calls: "_StreamedToolCalls") -> Generator[Any, None, None]:
+        if hasattr(delta, "reasoning_content") and delta.reasoning_content is not None:
+            yield ThinkingLLMResponse(delta.reasoning_content)
+        if delta.content is not None:
+            yield TextLLMResponse(delta.content)
+        # A tool call is complete once the next one starts
+        yield from tool_calls.add_deltas(getattr(delta, "tool_calls", None) or [])
+
+    def create_batch_client(self) -> BatchClient | None:
+        # The OpenAI compatible providers don't have the batch API
+        if self.get_provider() != "OPENAI":
+            return None
+        import openai
+
+        return OpenAIBatchClient(
+            openai.OpenAI(
+                api_key=self.config.get("api_key"),
+                base_url=self.config.get("base_url", "https://api.openai.com/v1"),
+                http_client=get_shared_http_transport().get_client(openai.DefaultHttpxClient),
+            )
+        )
 
     @staticmethod
     def get_provider() -> str:
@@ -54,3 +91,30 @@ class OpenAIModel(ChatModel):
     def set_thinking_level(self, level: int):
         if hasattr(self.request_builder, "set_reasoning_effort"):
             self.request_builder.set_reasoning_effort(level)
+
+
+class _StreamedToolCalls:
+    """Assembles the tool calls from the streamed deltas, the arguments arrive as fragments of a JSON string"""
+
+    def __init__(self):
+        self._pending: dict[int, dict] = {}
+
+    def add_deltas(self, deltas: list) -> list[ToolCallLLMResponse]:
+        completed = []
+        for delta in deltas:
+            if delta.index not in self._pending:
+                completed.extend(self.finish())
+                self._pending[delta.index] = {"id": delta.id, "name": "", "arguments": ""}
+            function = delta.function
+            if function is not None:
+                self._pending[delta.index]["name"] += function.name or ""
+                self._pending[delta.index]["arguments"] += function.arguments or ""
+        return completed
+
+    def finish(self) -> list[ToolCallLLMResponse]:
+        completed = [
+            ToolCallLLMResponse(tool_call["name"], decode_tool_arguments(tool_call["arguments"]), tool_call["id"])
+            for tool_call in self._pending.values()
+        ]
+        self._pending = {}
+        return completed
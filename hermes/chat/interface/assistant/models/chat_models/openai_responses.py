@@ -0,0 +1,176 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
+from typing import Any
+
+from hermes.chat.interface.assistant.chat.response_types import TextLLMResponse, ThinkingLLMResponse, ToolCallLLMResponse
+from hermes.chat.interface.assistant.models.prompt_builder.simple_prompt_builder import SimplePromptBuilderFactory
+from hermes.chat.interface.assistant.models.request_builder.openai_responses import OpenAIResponsesRequestBuilder
+from hermes.chat.interface.commands.tool_schema import decode_tool_arguments
+from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
+
+from .openai import OpenAIModel
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class _StoredResponse:
+    response_id: str
+    output_text: str
+
+
+class ResponseChain:
+    """Remembers which stored response continues which conversation, so only the new input items have to be sent.
+
+    A response is keyed by the chained hash of the input items it was generated for. The next request continues it
+    if it starts with the same items followed by the response itself (its assistant message), editing anything
+    before that produces a different chain and the request is sent in full.
+    Several chains are kept (LRU), as deep research nodes share the same model.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self._max_entries = max_entries
+        self._responses: OrderedDict[str, _StoredResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def find_previous_response(self, input_items: list[dict]) -> tuple[str | None, int]:
+        """Returns (id of the stored response, number of input items it already covers), or (None, 0) on a miss."""
+        chain_hashes = _compute_chain_hashes(input_items)
+        with self._lock:
+            # The response is at index prefix_length, at least one new item has to follow it
+            for prefix_length in range(len(input_items) - 2, 0, -1):
+                stored = self._responses.get(chain_hashes[prefix_length - 1])
+                if stored and _is_same_response(input_items[prefix_length], stored.output_text):
+                    self._responses.move_to_end(chain_hashes[prefix_length - 1])
+                    return stored.response_id, prefix_length + 1
+        return None, 0
+
+    def record(self, input_items: list[dict], response_id: str, output_text: str):
+        if not input_items:
+            return
+        with self._lock:
+            chain_hash = _compute_chain_hashes(input_items)[-1]
+            self._responses[chain_hash] = _StoredResponse(response_id, output_text)
+            self._responses.move_to_end(chain_hash)
+            while len(self._responses) > self._max_entries:
+                self._responses.popitem(last=False)
+
+    def forget(self, response_id: str):
+        with self._lock:
+            for chain_hash in [key for key, stored in self._responses.items() if stored.response_id == response_id]:
+                del self._responses[chain_hash]
+
+
+def _compute_chain_hashes(input_items: list[dict]) -> list[str]:
+    chain_hashes = []
+    previous_hash = ""
+    for item in input_items:
+        item_hash = hashlib.sha256(json.dumps(item, sort_keys=True).encode()).hexdigest()
+        previous_hash = hashlib.sha256(f"{previous_hash}:{item_hash}".encode()).hexdigest()
+        chain_hashes.append(previous_hash)
+    return chain_hashes
+
+
+def _is_same_response(item: dict, output_text: str) -> bool:
+    """The history keeps the response wrapped by the prompt builder, an edited response won't contain the original text"""
+    content = item.get("content")
+    return item.get("role") == "assistant" and isinstance(content, str) and output_text.strip() in content
+
+
+class _ResponseStream:
+    """The state of one streamed response: its id, the output text and whether it called tools"""
+
+    def __init__(self):
+        self.response_id: str | None = None
+        self.output_texts: list[str] = []
+        self.has_tool_calls = False
+
+    def process_event(self, event: Any) -> list[Any]:
+        if event.type == "response.output_text.delta":
+            self.output_texts.append(event.delta)
+            return [TextLLMResponse(event.delta)]
+        if event.type == "response.reasoning_summary_text.delta":
+            return [ThinkingLLMResponse(event.delta)]
+        if event.type == "response.output_item.done" and event.item.type == "function_call":
+            self.has_tool_calls = True
+            return [ToolCallLLMResponse(event.item.name, decode_tool_arguments(event.item.arguments), event.item.call_id)]
+        self._process_status_event(event)
+        return []
+
+    def _process_status_event(self, event: Any):
+        if event.type == "response.completed":
+            self.response_id = event.response.id
+        elif event.type == "error":
+            raise Exception(f"OpenAI response failed: {event.message}")
+
+
+class OpenAIResponsesModel(OpenAIModel):
+    """OpenAI through the stateful Responses API, uses the `openai` config section.
+
+    The conversation is kept on the server: a request that continues a previous response sends only the new input items
+    with its previous_response_id. The full input is sent when the history was edited, and when the stored response
+    has expired or was deleted.
+    Responses that called tools aren't continued, the tool calls are answered as text messages in the history.
+    """
+
+    def __init__(self, config: dict, model_tag: str, notifications_printer: CLINotificationsPrinter):
+        super().__init__(config, model_tag, notifications_printer)
+        self.response_chain = ResponseChain()
+
+    def _create_request_builder(self) -> OpenAIResponsesRequestBuilder:
+        return OpenAIResponsesRequestBuilder(self.model_tag, self.notifications_printer, SimplePromptBuilderFactory())
+
+    async def _stream(self, request: Any) -> AsyncGenerator[Any, None]:
+        stream = await self._create_response(request)
+        response_stream = _ResponseStream()
+        async for event in stream:
+            for llm_response in response_stream.process_event(event):
+                yield llm_response
+        if response_stream.response_id and not response_stream.has_tool_calls:
+            self.response_chain.record(request["input"], response_stream.response_id, "".join(response_stream.output_texts))
+
+    async def _create_response(self, request: Any) -> Any:
+        import openai
+
+        previous_response_id, covered_count = self.response_chain.find_previous_response(request["input"])
+        try:
+            return await self.client.responses.create(**self._get_delta_request(request, previous_response_id, covered_count))
+        except openai.AuthenticationError as e:
+            raise Exception("Authentication failed. Please check your API key.") from e
+        except openai.APIStatusError as e:
+            if previous_response_id is None or not _is_previous_response_error(e):
+                raise
+            logger.info(f"The stored response {previous_response_id} isn't available anymore, sending the full conversation")
+            self.response_chain.forget(previous_response_id)
+            return await self.client.responses.create(**request)
+
+    @staticmethod
+    def _get_delta_request(request: dict, previous_response_id: str | None, covered_count: int) -> dict:
+        if previous_response_id is None:
+            return request
+        logger.debug(
+            f"Continuing {previous_response_id}, sending {len(request['input']) - covered_count}/{len(request['input'])} input items"
+        )
+        return {**request, "input": request["input"][covered_count:], "previous_response_id": previous_response_id}
+
+    @staticmethod
+    def get_provider() -> str:
+        return "OPENAI_RESPONSES"
+
+    @classmethod
+    def get_config_section_name(cls) -> str:
+        return "OPENAI"
+
+    @staticmethod
+    def get_model_tags() -> list[str]:
+        return ["gpt-4o"]
+
+
+def _is_previous_response_error(error: Exception) -> bool:
+    """The previous response expired, was deleted or was stored by another project"""
+    return getattr(error, "param", None) == "previous_response_id" or "previous response" in str(error).lower()
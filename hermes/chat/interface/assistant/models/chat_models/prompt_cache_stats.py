@@ -0,0 +1,45 @@
+import logging
+import threading
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PromptCacheUsage:
+    """Provider-reported prompt caching outcome of a single request, in input tokens"""
+
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    uncached_tokens: int = 0
+
+    @property
+    def is_hit(self) -> bool:
+        return self.cache_read_tokens > 0
+
+    def describe(self) -> str:
+        outcome = "hit" if self.is_hit else "miss"
+        return (
+            f"prompt cache {outcome}: {self.cache_read_tokens} tokens read from cache, "
+            f"{self.cache_write_tokens} written to cache, {self.uncached_tokens} uncached"
+        )
+
+
+class PromptCacheStats:
+    """Per-model prompt caching counters, updated after every request"""
+
+    def __init__(self, model_tag: str):
+        self.model_tag = model_tag
+        self.hits = 0
+        self.misses = 0
+        self.last_usage: PromptCacheUsage | None = None
+        self._lock = threading.Lock()
+
+    def record(self, usage: PromptCacheUsage):
+        with self._lock:
+            if usage.is_hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.last_usage = usage
+        logger.debug(f"{self.model_tag} {usage.describe()} (session: {self.hits} hits, {self.misses} misses)")
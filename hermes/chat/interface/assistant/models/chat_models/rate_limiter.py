@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Classic token bucket, refilled continuously up to its capacity.
+
+    Callers reserve what they need up front, the bucket may go negative and the caller is told how long to wait,
+    so concurrent callers are served in order without busy polling.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take the amount from the bucket, returns the seconds to wait before it's actually available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.refill_per_second)
+            self._updated_at = now
+            # A single request bigger than the whole bucket would otherwise wait forever
+            self._tokens -= min(amount, self.capacity)
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.refill_per_second
+
+
+class ProviderRateLimiter:
+    """Requests per minute and tokens per minute limits of a provider, shared by all the models and threads using it"""
+
+    def __init__(self, requests_per_minute: float | None = None, tokens_per_minute: float | None = None):
+        self._buckets: list[tuple[TokenBucket, bool]] = []
+        if requests_per_minute:
+            self._buckets.append((TokenBucket(requests_per_minute, requests_per_minute / 60), False))
+        if tokens_per_minute:
+            self._buckets.append((TokenBucket(tokens_per_minute, tokens_per_minute / 60), True))
+
+    @property
+    def is_limited(self) -> bool:
+        return bool(self._buckets)
+
+    async def acquire(self, estimated_tokens: int) -> float:
+        """Wait until the request fits in all the limits, returns the seconds waited."""
+        reservations = [bucket.reserve(estimated_tokens if counts_tokens else 1) for bucket, counts_tokens in self._buckets]
+        wait_seconds = max(reservations, default=0.0)
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+        return wait_seconds
+
+
+_shared_limiters: dict[str, ProviderRateLimiter] = {}
+_shared_limiters_lock = threading.Lock()
+
+
+def get_shared_rate_limiter(provider: str, requests_per_minute: float | None, tokens_per_minute: float | None) -> ProviderRateLimiter:
+    """The process-wide limiter of the provider. The limits of the first model of the provider are used."""
+    with _shared_limiters_lock:
+        if provider not in _shared_limiters:
+            _shared_limiters[provider] = ProviderRateLimiter(requests_per_minute, tokens_per_minute)
+        return _shared_limiters[provider]
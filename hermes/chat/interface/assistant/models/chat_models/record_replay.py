@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from collections.abc import AsyncGenerator
+from dataclasses import asdict, dataclass, is_dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+from hermes.chat.interface.assistant.chat.response_types import TextLLMResponse, ThinkingLLMResponse, ToolCallLLMResponse
+from hermes.chat.interface.assistant.models.chat_models.base import ChatModel
+from hermes.chat.interface.assistant.models.chat_models.hedged import HedgedRequest
+
+logger = logging.getLogger(__name__)
+
+# Timestamps of directly entered messages, they differ on every run and would make every request a miss
+TIMESTAMP_PATTERN = re.compile(r"\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\]")
+
+
+class RecordingMode(Enum):
+    OFF = "off"
+    RECORD = "record"
+    REPLAY = "replay"
+    RECORD_MISSING = "record-missing"
+
+
+@dataclass
+class RecordedChunk:
+    kind: str
+    text: str
+    delay_seconds: float
+
+
+def compute_request_hash(model_tag: str, request: Any) -> str:
+    """Hash of the canonical form of the compiled request: sorted keys, masked timestamps, binary payloads hashed."""
+    if isinstance(request, HedgedRequest):
+        request = request.get_request(0)
+    canonical_request = json.dumps(request, sort_keys=True, default=_to_canonical)
+    canonical_request = TIMESTAMP_PATTERN.sub("[timestamp]", canonical_request)
+    return hashlib.sha256(f"{model_tag}\0{canonical_request}".encode()).hexdigest()
+
+
+def _to_canonical(value: Any) -> Any:
+    if isinstance(value, bytes | bytearray):
+        return {"sha256": hashlib.sha256(value).hexdigest()}
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if isinstance(value, set | tuple):
+        return list(value)
+    return repr(value)
+
+
+class ResponseRecordingStore:
+    """Content-addressed store of recorded responses, one JSON file per request hash"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def load(self, request_hash: str) -> list[RecordedChunk] | None:
+        try:
+            data = json.loads(self._get_path(request_hash).read_text())
+            return [RecordedChunk(**chunk) for chunk in data["chunks"]]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable recording {request_hash}: {e}")
+            return None
+
+    def save(self, request_hash: str, model_tag: str, chunks: list[RecordedChunk]):
+        path = self._get_path(request_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"model": model_tag, "recorded_at": time.time(), "chunks": [asdict(chunk) for chunk in chunks]}
+        with tempfile.NamedTemporaryFile("w", dir=path.parent, delete=False) as temp_file:
+            json.dump(data, temp_file)
+        os.replace(temp_file.name, path)
+
+    def _get_path(self, request_hash: str) -> Path:
+        return self.directory / request_hash[:2] / f"{request_hash}.json"
+
+
+class RecordReplayChatModel(ChatModel):
+    """Wraps a chat model to record its streamed responses and replay them for identical requests.
+
+    - record: always call the model and (over)write the recording
+    - replay: never call the model, a missing recording is an error
+    - record-missing: replay when recorded, otherwise call the model and record
+    Responses are stored only when fully streamed. Replays are instant unless replay_with_timing is set,
+    then the recorded delays between chunks are reproduced.
+    """
+
+    def __init__(self, model: ChatModel, mode: RecordingMode, store: ResponseRecordingStore, replay_with_timing: bool = False):
+        super().__init__({}, model.model_tag, model.notifications_printer)
+        self.model = model
+        self.mode = mode
+        self.store = store
+        self.replay_with_timing = replay_with_timing
+
+    def initialize(self):
+        self.model.initialize()
+
+    def get_request_builder(self):
+        return self.model.get_request_builder()
+
+    def set_thinking_level(self, level: int):
+        self.model.set_thinking_level(level)
+
+    async def _stream(self, request: Any) -> AsyncGenerator[Any, None]:
+        request_hash = compute_request_hash(self.model_tag, request)
+        recording = self.store.load(request_hash) if self.mode != RecordingMode.RECORD else None
+        if recording is not None:
+            logger.debug(f"Replaying recorded response {request_hash}")
+            async for chunk in self._replay(recording):
+                yield chunk
+            return
+        if self.mode == RecordingMode.REPLAY:
+            raise RuntimeError(f"No recorded response for request {request_hash} of {self.model_tag}")
+
+        async for chunk in self._record(request, request_hash):
+            yield chunk
+
+    async def _replay(self, recording: list[RecordedChunk]) -> AsyncGenerator[Any, None]:
+        for recorded_chunk in recording:
+            if self.replay_with_timing and recorded_chunk.delay_seconds > 0:
+                await asyncio.sleep(recorded_chunk.delay_seconds)
+            yield self._from_recorded_chunk(recorded_chunk)
+
+    async def _record(self, request: Any, request_hash: str) -> AsyncGenerator[Any, None]:
+        recording = []
+        previous_chunk_at = time.monotonic()
+        async for chunk in self.model.stream(request):
+            now = time.monotonic()
+            recording.append(self._to_recorded_chunk(chunk, now - previous_chunk_at))
+            previous_chunk_at = now
+            yield chunk
+        self.store.save(request_hash, self.model_tag, recording)
+
+    def _to_recorded_chunk(self, chunk: Any, delay_seconds: float) -> RecordedChunk:
+        if isinstance(chunk, ThinkingLLMResponse):
+            return RecordedChunk("thinking", chunk.text, delay_seconds)
+        if isinstance(chunk, TextLLMResponse):
+            return RecordedChunk("text", chunk.text, delay_seconds)
+        if isinstance(chunk, ToolCallLLMResponse):
+            tool_call = {"id": chunk.tool_call_id, "name": chunk.name, "arguments": chunk.arguments}
+            return RecordedChunk("tool_call", json.dumps(tool_call), delay_seconds)
+        return RecordedChunk("raw", str(chunk), delay_seconds)
+
+    def _from_recorded_chunk(self, recorded_chunk: RecordedChunk) -> Any:
+        if recorded_chunk.kind == "thinking":
+            return ThinkingLLMResponse(recorded_chunk.text)
+        if recorded_chunk.kind == "text":
+            return TextLLMResponse(recorded_chunk.text)
+        if recorded_chunk.kind == "tool_call":
+            tool_call = json.loads(recorded_chunk.text)
+            return ToolCallLLMResponse(tool_call["name"], tool_call["arguments"], tool_call["id"])
+        return recorded_chunk.text
+
+    @staticmethod
+    def get_provider() -> str:
+        return "RECORD_REPLAY"
+
+    @staticmethod
+    def get_model_tags() -> list[str]:
+        return []
@@ -0,0 +1,95 @@
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504, 529}
+THROTTLING_STATUS_CODE = 429
+# botocore reports throttling through the error code rather than the status
+THROTTLING_ERROR_CODES = {"ThrottlingException", "TooManyRequestsException"}
+RETRYABLE_ERROR_CODES = {*THROTTLING_ERROR_CODES, "ServiceUnavailableException", "ModelNotReadyException"}
+# Dropped connections and timeouts have no status code: APIConnectionError/APITimeoutError of the openai, anthropic and groq SDKs,
+# ConnectionError/HTTPClientError of botocore (endpoint, connect timeout, read timeout, closed connection), TransportError of httpx
+RETRYABLE_ERROR_CLASS_NAMES = {"APIConnectionError", "APITimeoutError", "ConnectionError", "HTTPClientError", "TransportError"}
+
+
+@dataclass
+class RetryPolicy:
+    """Jittered exponential backoff, overridden by the server's Retry-After when it sends one"""
+
+    max_attempts: int = 6
+    base_delay_seconds: float = 1.0
+    max_delay_seconds: float = 60.0
+    max_retry_after_seconds: float = 300.0
+
+    def get_delay(self, attempt: int, retry_after_seconds: float | None) -> float:
+        if retry_after_seconds is not None:
+            return min(retry_after_seconds, self.max_retry_after_seconds)
+        # Full jitter, so throttled parallel requests don't retry in lockstep
+        return random.uniform(0, min(self.max_delay_seconds, self.base_delay_seconds * 2**attempt))
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Throttling, transient server errors, dropped connections and timeouts of any of the supported SDKs"""
+    if isinstance(error, (ConnectionError, TimeoutError)) or _has_class_name(error, RETRYABLE_ERROR_CLASS_NAMES):
+        return True
+    response = getattr(error, "response", None)
+    if isinstance(response, dict) and response.get("Error", {}).get("Code") in RETRYABLE_ERROR_CODES:
+        return True
+    return get_error_status_code(error) in RETRYABLE_STATUS_CODES
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """Rate limit errors, as opposed to the other retryable errors: server errors, dropped connections and timeouts"""
+    response = getattr(error, "response", None)
+    if isinstance(response, dict) and response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES:
+        return True
+    return get_error_status_code(error) == THROTTLING_STATUS_CODE
+
+
+def _has_class_name(error: Exception, class_names: set[str]) -> bool:
+    """Matched by name, so the SDKs don't have to be imported (or installed) to recognize their errors"""
+    return any(error_class.__name__ in class_names for error_class in type(error).__mro__)
+
+
+def get_error_status_code(error: Exception) -> int | None:
+    for attribute in ("status_code", "code", "status"):
+        value = getattr(error, attribute, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        return response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return None
+
+
+def get_retry_after_seconds(error: Exception) -> float | None:
+    """Delay requested by the server through the retry-after-ms or Retry-After headers, if any."""
+    headers = {key.lower(): value for key, value in _get_response_headers(error).items()}
+    if "retry-after-ms" in headers:
+        return _parse_float(headers["retry-after-ms"], scale=1 / 1000)
+    if "retry-after" not in headers:
+        return None
+    seconds = _parse_float(headers["retry-after"])
+    if seconds is not None:
+        return seconds
+    try:
+        return max(0.0, parsedate_to_datetime(headers["retry-after"]).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _get_response_headers(error: Exception) -> dict[str, Any]:
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        return response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+    headers = getattr(response, "headers", None)
+    return dict(headers) if headers else {}
+
+
+def _parse_float(value: Any, scale: float = 1.0) -> float | None:
+    try:
+        return max(0.0, float(value) * scale)
+    except (TypeError, ValueError):
+        return None
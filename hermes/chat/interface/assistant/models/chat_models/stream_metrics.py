@@ -0,0 +1,238 @@
+import json
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from collections.abc import Generator, Iterable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the inter-chunk gap histogram buckets, the last bucket takes everything slower
+GAP_BUCKETS_SECONDS = [0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+CHARACTERS_PER_TOKEN = 4
+
+_request_build = threading.local()
+
+
+def record_request_build_seconds(seconds: float, deduplicated_bytes: int = 0):
+    """Called by the request builders, the next request sent from the same thread reports it."""
+    _request_build.seconds = seconds
+    _request_build.deduplicated_bytes = deduplicated_bytes
+
+
+def _take_request_build() -> tuple[float | None, int]:
+    """(build seconds, bytes of repeated content left out) of the last built request"""
+    seconds = getattr(_request_build, "seconds", None)
+    deduplicated_bytes = getattr(_request_build, "deduplicated_bytes", 0)
+    _request_build.seconds = None
+    _request_build.deduplicated_bytes = 0
+    return seconds, deduplicated_bytes
+
+
+@dataclass
+class StreamMetrics:
+    """Timings of a single streamed response.
+
+    waiting_seconds is the time spent blocked on the provider (network, queueing, generation),
+    consumer_seconds the time the caller spent between chunks (rendering, command handling).
+    """
+
+    model: str
+    started_at: float
+    request_build_seconds: float | None = None
+    # Repeated content left out of the request, see ContentDeduplicator
+    deduplicated_bytes: int = 0
+    time_to_first_chunk_seconds: float | None = None
+    total_seconds: float = 0.0
+    waiting_seconds: float = 0.0
+    consumer_seconds: float = 0.0
+    chunk_count: int = 0
+    output_tokens: int = 0
+    completed: bool = False
+    gap_histogram: dict[str, int] = field(default_factory=lambda: _create_gap_histogram())
+    gap_p50_seconds: float | None = None
+    gap_p95_seconds: float | None = None
+    gap_max_seconds: float | None = None
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        """Output tokens over the time spent waiting for them after the first chunk, so rendering doesn't count."""
+        if self.time_to_first_chunk_seconds is None:
+            return None
+        generation_seconds = self.waiting_seconds - self.time_to_first_chunk_seconds
+        if generation_seconds <= 0:
+            return None
+        return self.output_tokens / generation_seconds
+
+    def describe(self) -> str:
+        return ", ".join(
+            [self.model, *self._describe_timings(), f"{self.chunk_count} chunks, ~{self.output_tokens} tokens", *self._describe_rates()]
+        )
+
+    def _describe_timings(self) -> list[str]:
+        timings = []
+        if self.request_build_seconds is not None:
+            timings.append(f"build {self.request_build_seconds * 1000:.0f}ms")
+        if self.deduplicated_bytes:
+            timings.append(f"deduplicated {self.deduplicated_bytes / 1024:.1f}KB")
+        if self.time_to_first_chunk_seconds is not None:
+            timings.append(f"first chunk {self.time_to_first_chunk_seconds:.2f}s")
+        timings.append(f"total {self.total_seconds:.2f}s (provider {self.waiting_seconds:.2f}s, rendering {self.consumer_seconds:.2f}s)")
+        return timings
+
+    def _describe_rates(self) -> list[str]:
+        rates = []
+        if self.tokens_per_second is not None:
+            rates.append(f"~{self.tokens_per_second:.0f} tokens/s")
+        if self.gap_p50_seconds is not None and self.gap_p95_seconds is not None:
+            rates.append(f"gaps p50 {self.gap_p50_seconds * 1000:.0f}ms p95 {self.gap_p95_seconds * 1000:.0f}ms")
+        if not self.completed:
+            rates.append("interrupted")
+        return rates
+
+    def to_json(self) -> dict:
+        return {**asdict(self), "tokens_per_second": self.tokens_per_second}
+
+
+def measure_stream(chunks: Iterable[Any], model: str, registry: "StreamMetricsRegistry") -> Generator[Any, None, None]:
+    """Pass the chunks through, timing how long each one was waited for. The metrics are recorded when the stream ends,
+    including when it's closed early or fails.
+    """
+    request_build_seconds, deduplicated_bytes = _take_request_build()
+    metrics = StreamMetrics(
+        model=model, started_at=time.time(), request_build_seconds=request_build_seconds, deduplicated_bytes=deduplicated_bytes
+    )
+    gaps = []
+    iterator = iter(chunks)
+    started = time.perf_counter()
+    try:
+        while True:
+            wait_started = time.perf_counter()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                metrics.completed = True
+                return
+            waited = time.perf_counter() - wait_started
+            _record_chunk(metrics, gaps, chunk, waited, wait_started - started)
+            yield chunk
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+        metrics.total_seconds = time.perf_counter() - started
+        metrics.consumer_seconds = max(metrics.total_seconds - metrics.waiting_seconds, 0.0)
+        _summarize_gaps(metrics, gaps)
+        registry.record(metrics)
+
+
+def _record_chunk(metrics: StreamMetrics, gaps: list[float], chunk: Any, waited: float, elapsed_before_wait: float):
+    metrics.waiting_seconds += waited
+    if metrics.chunk_count == 0:
+        metrics.time_to_first_chunk_seconds = elapsed_before_wait + waited
+    else:
+        gaps.append(waited)
+        metrics.gap_histogram[_get_bucket_label(_get_bucket_index(waited))] += 1
+    metrics.chunk_count += 1
+    text = chunk if isinstance(chunk, str) else getattr(chunk, "text", "")
+    metrics.output_tokens += len(text or "") // CHARACTERS_PER_TOKEN
+
+
+def _summarize_gaps(metrics: StreamMetrics, gaps: list[float]):
+    if not gaps:
+        return
+    metrics.gap_max_seconds = max(gaps)
+    if len(gaps) == 1:
+        metrics.gap_p50_seconds = metrics.gap_p95_seconds = gaps[0]
+        return
+    percentiles = statistics.quantiles(gaps, n=20, method="inclusive")
+    metrics.gap_p50_seconds = percentiles[9]
+    metrics.gap_p95_seconds = percentiles[18]
+
+
+def _create_gap_histogram() -> dict[str, int]:
+    return {_get_bucket_label(index): 0 for index in range(len(GAP_BUCKETS_SECONDS) + 1)}
+
+
+def _get_bucket_index(seconds: float) -> int:
+    for index, upper_bound in enumerate(GAP_BUCKETS_SECONDS):
+        if seconds < upper_bound:
+            return index
+    return len(GAP_BUCKETS_SECONDS)
+
+
+def _get_bucket_label(index: int) -> str:
+    if index == len(GAP_BUCKETS_SECONDS):
+        return f">={GAP_BUCKETS_SECONDS[-1] * 1000:g}ms"
+    return f"<{GAP_BUCKETS_SECONDS[index] * 1000:g}ms"
+
+
+class StreamMetricsRegistry:
+    """Metrics of all the streamed responses of the process, optionally appended to a JSONL file"""
+
+    def __init__(self, max_kept: int = 1000):
+        self._metrics: deque[StreamMetrics] = deque(maxlen=max_kept)
+        self._unreported: deque[StreamMetrics] = deque(maxlen=max_kept)
+        self._export_path: Path | None = None
+        self._lock = threading.Lock()
+
+    def set_export_path(self, export_path: Path | None):
+        self._export_path = export_path
+
+    def record(self, metrics: StreamMetrics):
+        logger.debug(f"Stream metrics: {metrics.describe()}")
+        with self._lock:
+            self._metrics.append(metrics)
+            self._unreported.append(metrics)
+            if self._export_path is not None:
+                self._export(metrics, self._export_path)
+
+    def _export(self, metrics: StreamMetrics, export_path: Path):
+        try:
+            export_path.parent.mkdir(parents=True, exist_ok=True)
+            with export_path.open("a") as export_file:
+                export_file.write(json.dumps(metrics.to_json()) + "\n")
+        except OSError as e:
+            logger.warning(f"Failed to export the stream metrics to {export_path}: {e}")
+
+    def take_unreported(self) -> list[StreamMetrics]:
+        """The metrics recorded since the last call"""
+        with self._lock:
+            unreported = list(self._unreported)
+            self._unreported.clear()
+        return unreported
+
+    def describe_summary(self) -> list[str]:
+        """One line per model: medians over the session"""
+        with self._lock:
+            metrics_by_model: dict[str, list[StreamMetrics]] = {}
+            for metrics in self._metrics:
+                metrics_by_model.setdefault(metrics.model, []).append(metrics)
+        return [self._describe_model(model, model_metrics) for model, model_metrics in metrics_by_model.items()]
+
+    def _describe_model(self, model: str, model_metrics: list[StreamMetrics]) -> str:
+        parts = [f"{model}: {len(model_metrics)} responses"]
+        first_chunk_seconds = [m.time_to_first_chunk_seconds for m in model_metrics if m.time_to_first_chunk_seconds is not None]
+        if first_chunk_seconds:
+            parts.append(f"median first chunk {statistics.median(first_chunk_seconds):.2f}s, max {max(first_chunk_seconds):.2f}s")
+        tokens_per_second = [m.tokens_per_second for m in model_metrics if m.tokens_per_second is not None]
+        if tokens_per_second:
+            parts.append(f"median ~{statistics.median(tokens_per_second):.0f} tokens/s")
+        parts.append(f"median total {statistics.median(m.total_seconds for m in model_metrics):.2f}s")
+        return ", ".join(parts)
+
+
+_shared_registry: StreamMetricsRegistry | None = None
+_shared_registry_lock = threading.Lock()
+
+
+def get_shared_stream_metrics() -> StreamMetricsRegistry:
+    global _shared_registry
+    with _shared_registry_lock:
+        if _shared_registry is None:
+            _shared_registry = StreamMetricsRegistry()
+        return _shared_registry
@@ -0,0 +1,36 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ThrottleStats:
+    """Per-model time spent waiting for the rate limiter and backing off after throttling errors"""
+
+    def __init__(self, model_tag: str):
+        self.model_tag = model_tag
+        self.rate_limit_wait_seconds = 0.0
+        self.backoff_wait_seconds = 0.0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def record_rate_limit_wait(self, seconds: float):
+        with self._lock:
+            self.rate_limit_wait_seconds += seconds
+        logger.debug(f"{self.model_tag} waited {seconds:.2f}s for the rate limiter ({self.describe()})")
+
+    def record_backoff(self, seconds: float, error: Exception):
+        with self._lock:
+            self.backoff_wait_seconds += seconds
+            self.retries += 1
+        logger.debug(f"{self.model_tag} backing off {seconds:.2f}s after {type(error).__name__} ({self.describe()})")
+
+    @property
+    def total_wait_seconds(self) -> float:
+        return self.rate_limit_wait_seconds + self.backoff_wait_seconds
+
+    def describe(self) -> str:
+        return (
+            f"session: {self.total_wait_seconds:.1f}s throttled, {self.rate_limit_wait_seconds:.1f}s rate limited, "
+            f"{self.backoff_wait_seconds:.1f}s backing off over {self.retries} retries"
+        )
@@ -7,19 +7,38 @@ from hermes.chat.interface.assistant.models.chat_models.claude import ClaudeMode
 from hermes.chat.interface.assistant.models.chat_models.deepseek import DeepSeekModel
 from hermes.chat.interface.assistant.models.chat_models.gemini2 import Gemini2Model
 from hermes.chat.interface.assistant.models.chat_models.groq import GroqModel
+from hermes.chat.interface.assistant.models.chat_models.hedged import HedgedChatModel
 from hermes.chat.interface.assistant.models.chat_models.open_router import OpenRouterModel
 from hermes.chat.interface.assistant.models.chat_models.openai import OpenAIModel
+from hermes.chat.interface.assistant.models.chat_models.openai_responses import OpenAIResponsesModel
 from hermes.chat.interface.assistant.models.chat_models.sambanova import SambanovaModel
 from hermes.chat.interface.assistant.models.chat_models.xai import XAIModel
 from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
 from hermes.utils.config_utils import extract_config_section
 
+OPENAI_CONTEXT_WINDOW_TOKENS = {"": 128_000, "gpt-4.1": 1_047_576, "gpt-5": 400_000, "o1": 200_000, "o3": 200_000, "o4": 200_000}
+
+# Context window sizes in tokens by provider and model tag prefix, the longest matching prefix wins.
+# Models without a declared size (and without `context_window_tokens` in their config) are sent unfitted.
+CONTEXT_WINDOW_TOKENS: dict[str, dict[str, int]] = {
+    "OPENAI": OPENAI_CONTEXT_WINDOW_TOKENS,
+    "OPENAI_RESPONSES": OPENAI_CONTEXT_WINDOW_TOKENS,
+    "ANTHROPIC": {"": 200_000},
+    "GEMINI": {"": 1_048_576},
+    "BEDROCK": {"anthropic.": 200_000, "mistral.": 128_000, "amazon.nova": 300_000},
+    "DEEPSEEK": {"": 64_000},
+    "GROQ": {"llama3-8b-8192": 8192},
+    "SAMBANOVA": {"": 16_384},
+    "XAI": {"": 131_072},
+}
+
 
 class ModelFactory:
     def __init__(self, notifications_printer: CLINotificationsPrinter):
         self.notifications_printer = notifications_printer
         self.model_classes: list[type[ChatModel]] = [
             OpenAIModel,
+            OpenAIResponsesModel,
             ClaudeModel,
             Gemini2Model,
             GroqModel,
@@ -48,6 +67,29 @@ class ModelFactory:
         """
         return self.provider_and_model_tag_pairs
 
+    def get_model_from_info_string(
+        self,
+        model_info_string: str,
+        config: ConfigParser | dict[str, Any],
+        hedge_deadline_seconds: float | None = None,
+    ) -> ChatModel:
+        """Creates the chat model for a `provider/model_tag` string.
+
+        Several comma separated models (e.g. `ANTHROPIC/x,BEDROCK/y`) create a hedged model, that starts the next model
+        when the previous one doesn't stream a first token within hedge_deadline_seconds, or fails.
+        """
+        models = []
+        for model_spec in self.split_model_info_string(model_info_string):
+            provider, model_tag = model_spec.split("/", 1)
+            models.append(self.get_model(provider, model_tag, config))
+        if len(models) == 1:
+            return models[0]
+        return HedgedChatModel(models, self.notifications_printer, hedge_deadline_seconds)
+
+    @staticmethod
+    def split_model_info_string(model_info_string: str) -> list[str]:
+        return [model_spec.strip() for model_spec in model_info_string.split(",") if model_spec.strip()]
+
     def get_model(self, provider: str, model_tag: str, config: ConfigParser | dict[str, Any]) -> ChatModel:
         """Creates and returns an appropriate chat model instance based on the provider and model tag.
 
@@ -69,7 +111,7 @@ class ModelFactory:
         if model_class:
             config_section_name = model_class.get_config_section_name()
             config_section = extract_config_section(config, config_section_name)
-            return model_class(config_section, model_tag, self.notifications_printer)
+            return self._create_model(model_class, config_section, model_tag)
 
         # If no exact match, find all classes for this provider
         matching_classes = [m for m in self.model_classes if m.get_provider().upper() == provider]
@@ -89,4 +131,18 @@ class ModelFactory:
         config_section_name = model_class.get_config_section_name()
         config_section = extract_config_section(config, config_section_name)
         # Use first matching class
-        return model_class(config_section, model_tag, self.notifications_printer)
+        return self._create_model(model_class, config_section, model_tag)
+
+    def _create_model(self, model_class: type[ChatModel], config_section: Any, model_tag: str) -> ChatModel:
+        model = model_class(config_section, model_tag, self.notifications_printer)
+        model.configure_context_window(self.get_context_window_tokens(model_class.get_provider(), model_tag))
+        return model
+
+    @staticmethod
+    def get_context_window_tokens(provider: str, model_tag: str) -> int | None:
+        """The declared context window of the model, see CONTEXT_WINDOW_TOKENS."""
+        prefixes = CONTEXT_WINDOW_TOKENS.get(provider.upper(), {})
+        matching_prefixes = [prefix for prefix in prefixes if model_tag.startswith(prefix)]
+        if not matching_prefixes:
+            return None
+        return prefixes[max(matching_prefixes, key=len)]
@@ -42,3 +42,10 @@ class AllMessagesAggregator:
         result.append((current_messages, current_author))
 
         return result
+
+    def get_state(self) -> tuple:
+        """Immutable snapshot of the added messages, can be restored with restore_state."""
+        return tuple(self._message_pairs)
+
+    def restore_state(self, state: tuple):
+        self._message_pairs = list(state)
@@ -0,0 +1,127 @@
+import base64
+import os
+import tempfile
+import threading
+from collections.abc import Callable
+
+from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
+from hermes.utils.config_utils import get_cache_dir_path
+from hermes.utils.disk_cache import DiskCache
+
+MAX_DISK_BYTES = 2 * 1024 * 1024 * 1024
+MAX_MEMORY_BYTES = 256 * 1024 * 1024
+
+
+class AttachmentCache:
+    """Cache of attachment payloads (raw bytes or base64), shared by all request builders.
+
+    Entries are keyed by (path, size, mtime, page selection, encoding), so a modified file is a miss.
+    Base64 payloads and extracted PDF pages are persisted on disk to survive restarts,
+    raw payloads of whole files are kept only in memory, as the original file is already on disk.
+    """
+
+    def __init__(self, disk_cache: DiskCache):
+        self._disk_cache = disk_cache
+
+    def get_base64(self, file_path: str, pages: list[int] | None, load_bytes: Callable[[], bytes]) -> str:
+        """Return the base64 encoded payload, loading and encoding it with load_bytes on a miss."""
+        key = self._build_key(file_path, pages, "base64")
+        cached_value = self._disk_cache.get(key)
+        if cached_value is not None:
+            return cached_value.decode("ascii")
+
+        encoded = base64.b64encode(load_bytes())
+        self._disk_cache.set(key, encoded)
+        return encoded.decode("ascii")
+
+    def get_bytes(self, file_path: str, pages: list[int] | None, load_bytes: Callable[[], bytes]) -> bytes:
+        """Return the raw payload, loading it with load_bytes on a miss."""
+        key = self._build_key(file_path, pages, "raw")
+        cached_value = self._disk_cache.get(key)
+        if cached_value is not None:
+            return cached_value
+
+        value = load_bytes()
+        self._disk_cache.set(key, value, persist=bool(pages))
+        return value
+
+    def get_text(self, file_path: str, load_text: Callable[[], tuple[str, bool]]) -> tuple[str, bool]:
+        """Return (content, success) of a textual file, loading it with load_text on a miss. Failed reads are not cached."""
+        try:
+            key = self._build_key(file_path, None, "text")
+        except OSError:
+            return load_text()
+        cached_value = self._disk_cache.get(key)
+        if cached_value is not None:
+            return cached_value.decode("utf-8"), True
+
+        content, success = load_text()
+        if success:
+            self._disk_cache.set(key, content.encode("utf-8"))
+        return content, success
+
+    def _build_key(self, file_path: str, pages: list[int] | None, encoding: str) -> str:
+        stat = os.stat(file_path)
+        pages_marker = ",".join(str(page) for page in pages or [])
+        return f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}|{pages_marker}|{encoding}"
+
+
+def read_attachment_bytes(file_path: str, pages: list[int] | None, notifications_printer: CLINotificationsPrinter) -> bytes:
+    """Content of the file, or of a PDF with only the selected pages."""
+    source_path = extract_pages_from_pdf(file_path, pages, notifications_printer) if pages else file_path
+    try:
+        with open(source_path, "rb") as file:
+            return file.read()
+    finally:
+        if source_path != file_path:
+            os.remove(source_path)
+
+
+def extract_pages_from_pdf(pdf_path: str, pages: list[int], notifications_printer: CLINotificationsPrinter) -> str:
+    """Extract the specified pages from the PDF, create a temporary pdf file with the extracted pages and return the path
+    to the temporary file.
+    If a given page is not present, skip it.
+    """
+    try:
+        from PyPDF2 import PdfReader, PdfWriter
+
+        # Create a PDF reader object
+        reader = PdfReader(pdf_path)
+        writer = PdfWriter()
+
+        # Get total pages in the PDF
+        total_pages = len(reader.pages)
+
+        # Add requested pages to the writer
+        for page_num in pages:
+            # Convert to 0-based index and check if page exists
+            idx = page_num - 1
+            if 0 <= idx < total_pages:
+                writer.add_page(reader.pages[idx])
+            else:
+                notifications_printer.print_error(f"Page {page_num} not found in PDF. Skipping.")
+
+        # Create a temporary file
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False, mode="wb") as temp_file:
+            temp_path = temp_file.name
+            writer.write(temp_file)
+
+        return temp_path
+
+    except Exception as e:
+        notifications_printer.print_error(f"Error extracting pages from PDF {pdf_path}, sending whole file: {e}")
+        return pdf_path  # Return original file path if extraction fails
+
+
+_shared_cache: AttachmentCache | None = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_attachment_cache() -> AttachmentCache:
+    """The process-wide attachment cache, so all models and builders reuse the same encoded blobs."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            disk_cache = DiskCache(get_cache_dir_path() / "attachments", MAX_DISK_BYTES, MAX_MEMORY_BYTES)
+            _shared_cache = AttachmentCache(disk_cache)
+        return _shared_cache
@@ -1,14 +1,41 @@
 import logging
 import os
+import threading
+import time
 from abc import ABC, abstractmethod
 from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Any
 
+from hermes.chat.interface.assistant.models.chat_models.stream_metrics import record_request_build_seconds
 from hermes.chat.interface.assistant.models.prompt_builder.base import PromptBuilderFactory
+from hermes.chat.interface.assistant.models.request_builder.attachment_cache import (
+    AttachmentCache,
+    extract_pages_from_pdf,
+    get_shared_attachment_cache,
+    read_attachment_bytes,
+)
+from hermes.chat.interface.assistant.models.request_builder.compilation_cache import MessageFingerprints, RequestCompilationCache
+from hermes.chat.interface.assistant.models.request_builder.content_dedupe import ContentDedupePolicy, ContentDeduplicator
+from hermes.chat.interface.assistant.models.request_builder.context_window import ContextWindow, ContextWindowFitter, TokenEstimator
+from hermes.chat.interface.assistant.models.request_builder.image_preprocessing import (
+    ImageLimits,
+    ImagePreprocessor,
+    PreparedImage,
+    get_shared_image_preprocessor,
+)
+from hermes.chat.interface.assistant.models.request_builder.ingestion_pipeline import (
+    AttachmentIngestionPipeline,
+    get_shared_ingestion_pipeline,
+)
+from hermes.chat.interface.assistant.models.request_builder.url_content_cache import UrlContentCache, get_shared_url_content_cache
+from hermes.chat.interface.commands.tool_schema import ToolDefinition
 from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
 from hermes.chat.messages import (
     AudioFileMessage,
     EmbeddedPDFMessage,
+    HistorySummaryMessage,
     ImageMessage,
     ImageUrlMessage,
     InvisibleMessage,
@@ -21,6 +48,7 @@ from hermes.chat.messages import (
     UrlMessage,
     VideoMessage,
 )
+from hermes.utils.file_extension import get_file_extension
 from hermes.utils.file_reader import FileReader
 
 logger = logging.getLogger(__name__)
@@ -41,6 +69,19 @@ HEADERS = {
 }
 
 
+@dataclass(frozen=True)
+class RequestBuilderCaches:
+    """The caches the request builders read the attachments through, the process-wide ones by default"""
+
+    url_content_cache: UrlContentCache
+    attachment_cache: AttachmentCache
+    image_preprocessor: ImagePreprocessor
+
+    @classmethod
+    def get_shared(cls) -> "RequestBuilderCaches":
+        return cls(get_shared_url_content_cache(HEADERS), get_shared_attachment_cache(), get_shared_image_preprocessor())
+
+
 class RequestBuilder(ABC):
     """
     RequestBuilder is responsible for building the actual API request to the LLM provider.
@@ -48,20 +89,77 @@ class RequestBuilder(ABC):
     translate the internal message format to the provider's message format.
     """
 
+    # The aggregators (attribute names) snapshotted after each compiled prefix, builders that have some
+    # only process the new messages of a conversation, see _get_compilation_state
+    compilation_state_attributes: tuple[str, ...] = ()
+    # The largest images the provider uses as they are, None sends the images without preprocessing
+    image_limits: ImageLimits | None = None
+    # Builders that can send the commands as provider-native tools, see set_tools
+    supports_native_tools = False
+
     def __init__(
         self,
         model_tag: str,
         notifications_printer: CLINotificationsPrinter,
         prompt_builder_factory: PromptBuilderFactory,
+        caches: RequestBuilderCaches | None = None,
     ):
         self.model_tag = model_tag
         self.notifications_printer = notifications_printer
         self.prompt_builder_factory = prompt_builder_factory
 
-        self._url_contents = {}
+        if caches is None:
+            caches = RequestBuilderCaches.get_shared()
+            self._ingestion_pipeline = get_shared_ingestion_pipeline(notifications_printer)
+        else:
+            # The shared pipeline fills the shared caches, other caches get their own
+            self._ingestion_pipeline = AttachmentIngestionPipeline(caches.url_content_cache, caches.attachment_cache, notifications_printer)
+        self._url_content_cache = caches.url_content_cache
+        self._attachment_cache = caches.attachment_cache
+        self._image_preprocessor = caches.image_preprocessor
+        self._compilation_cache = RequestCompilationCache()
+        self._context_window_fitter: ContextWindowFitter | None = None
+        self._content_deduplicator = ContentDeduplicator(
+            ContentDedupePolicy.BACK_REFERENCE,
+            lambda file_path: self._attachment_cache.get_text(file_path, lambda: FileReader.read_file(file_path))[0],
+            self._url_content_cache.get_markdown,
+        )
+        self._tools: list[ToolDefinition] = []
+        self._build_lock = threading.Lock()
+
+    def set_context_window(self, context_window: ContextWindow | None):
+        """Fit the messages in the context window before building the requests, None sends them as they are."""
+        if context_window is None:
+            self._context_window_fitter = None
+            return
+        self._context_window_fitter = ContextWindowFitter(
+            context_window,
+            self._create_token_estimator(),
+            self.notifications_printer,
+            lambda file_path: self._attachment_cache.get_text(file_path, lambda: FileReader.read_file(file_path))[0],
+        )
+
+    def set_content_dedupe_policy(self, policy: ContentDedupePolicy):
+        """How the repeated copies of the same file, webpage or command output are left out, see ContentDeduplicator."""
+        self._content_deduplicator.policy = policy
+
+    def set_tools(self, tools: list[ToolDefinition]):
+        """Send the tools with the next requests (in compile_request), an empty list sends none."""
+        if tools and not self.supports_native_tools:
+            raise ValueError(f"{type(self).__name__} doesn't support native tools")
+        self._tools = list(tools)
+
+    def _create_token_estimator(self) -> TokenEstimator:
+        """The token counting of the provider, a ~4 characters per token heuristic by default."""
+        return TokenEstimator()
 
     def build_request(self, messages: Sequence[Message]) -> Any:
         """Build a request for the LLM provider from a sequence of messages.
+        The already compiled prefix of the conversation is restored from the compilation cache,
+        only the new messages are processed. Their attachments are prepared in parallel by the ingestion pipeline
+        (most of them already started when the user command was parsed), so the handlers read warm caches.
+        When a context window is set, the messages are first fitted in it (see ContextWindowFitter),
+        then the repeated copies of the same content are replaced with references (see ContentDeduplicator).
 
         Args:
             messages: A sequence of Message objects to include in the request.
@@ -69,12 +167,62 @@ class RequestBuilder(ABC):
         Returns:
             A provider-specific request object.
         """
-        self.initialize_request()
+        started = time.perf_counter()
+        with self._build_lock:
+            # Shared by the steps below, so each message is fingerprinted once
+            fingerprints = MessageFingerprints()
+            if self._context_window_fitter is not None:
+                messages = self._context_window_fitter.fit(messages, fingerprints)
+            # After fitting, so the references never point to a copy that was dropped
+            messages, dedupe_report = self._content_deduplicator.dedupe(messages, fingerprints)
+            if dedupe_report.deduplicated_blocks:
+                logger.debug(f"{self.model_tag}: {dedupe_report.describe()}")
+            self.initialize_request()
+
+            chain_hashes = self._compilation_cache.compute_chain_hashes(messages, fingerprints) if self.compilation_state_attributes else []
+            start_index = self._restore_longest_compiled_prefix(chain_hashes)
+            self._prepare_attachments(messages[start_index:])
+
+            for index in range(start_index, len(messages)):
+                self._store_compiled_prefix(chain_hashes, index, start_index)
+                self._process_message(messages[index])
+            self._store_compiled_prefix(chain_hashes, len(messages), start_index)
+
+            request = self.compile_request()
+        record_request_build_seconds(time.perf_counter() - started, dedupe_report.saved_bytes)
+        return request
+
+    def reset_compilation_cache(self):
+        """Drop the compiled prefixes, e.g. when the history is cleared."""
+        self._compilation_cache.clear()
+
+    def _restore_longest_compiled_prefix(self, chain_hashes: list[str]) -> int:
+        compiled_count, state = self._compilation_cache.find_longest_prefix(chain_hashes)
+        if state is None:
+            return 0
+        self._restore_compilation_state(state)
+        return compiled_count
+
+    def _store_compiled_prefix(self, chain_hashes: list[str], processed_count: int, start_index: int):
+        """Store the state once the cacheable prefix (the messages that have a fingerprint) is fully processed."""
+        if processed_count != len(chain_hashes) or processed_count <= start_index:
+            return
+        self._compilation_cache.store(chain_hashes[processed_count - 1], self._get_compilation_state())
+
+    def _get_compilation_state(self) -> tuple:
+        """Snapshot of the builder state after processing some messages, before compile_request:
+        the states of the compilation_state_attributes aggregators.
+        """
+        return tuple(getattr(self, attribute).get_state() for attribute in self.compilation_state_attributes)
 
-        for message in messages:
-            self._process_message(message)
+    def _restore_compilation_state(self, state: tuple):
+        """Restore a snapshot returned by _get_compilation_state on a freshly initialized request."""
+        for attribute, aggregator_state in zip(self.compilation_state_attributes, state, strict=True):
+            getattr(self, attribute).restore_state(aggregator_state)
 
-        return self.compile_request()
+    def _prepare_attachments(self, messages: Sequence[Message]):
+        """Prepare the attachments of the messages about to be processed, in parallel, before the handlers need them."""
+        self._ingestion_pipeline.collect(messages)
 
     def _process_message(self, message: Message) -> None:
         """Process a single message and delegate to the appropriate handler.
@@ -126,6 +274,7 @@ class RequestBuilder(ABC):
             TextualFileMessage: self._process_textual_file_message,
             UrlMessage: self._process_url_message,
             LLMRunCommandOutput: self._process_llm_run_command_output,
+            HistorySummaryMessage: self._process_history_summary_message,
         }
 
     def handle_text_message(
@@ -135,6 +284,7 @@ class RequestBuilder(ABC):
         message_id: int,
         name: str | None = None,
         text_role: str | None = None,
+        timestamp: datetime | None = None,
     ):
         self.notifications_printer.print_error(f"Text message not supported by {self.model_tag}. Discarding message.")
 
@@ -192,42 +342,21 @@ class RequestBuilder(ABC):
             self.handle_text_message(markdown_content, author, message_id, name=url, text_role="webpage")
 
     def _get_url_text_content(self, url: str, message_id: int) -> str:
-        if message_id in self._url_contents:
-            return self._url_contents[message_id]
         try:
-            import requests
-            from markitdown import MarkItDown
-
-            response = requests.get(url, headers=HEADERS)
-            response.raise_for_status()
-            markitdown = MarkItDown()
-            conversion_result = markitdown.convert(response)
-            markdown_content = conversion_result.text_content
-            if not markdown_content:
-                markdown_content = "No content found in the URL"
-                self.notifications_printer.print_error(f"No content found in the URL {url}")
-            self._url_contents[message_id] = markdown_content
-            return markdown_content
+            markdown_content = self._url_content_cache.get_markdown(url)
         except Exception as e:
             self.notifications_printer.print_error(f"Error fetching URL {url}: {e}")
-            placeholder_content = f"Error getting the contents of the URL {url}"
-            self._url_contents[message_id] = placeholder_content
-            return placeholder_content
+            return f"Error getting the contents of the URL {url}"
+        if not markdown_content:
+            self.notifications_printer.print_error(f"No content found in the URL {url}")
+            return "No content found in the URL"
+        return markdown_content
 
     def _get_url_image_content(self, url: str, message_id: int):
-        if message_id in self._url_contents:
-            return self._url_contents[message_id]
         try:
-            import requests
-
-            response = requests.get(url)
-            response.raise_for_status()
-            content = response.content
-            self._url_contents[message_id] = content
-            return content
+            return self._url_content_cache.get_bytes(url)
         except Exception as e:
             self.notifications_printer.print_error(f"Error fetching URL {url}: {e}")
-            self._url_contents[message_id] = None
             return None
 
     def _default_handle_textual_file_message(
@@ -257,8 +386,8 @@ class RequestBuilder(ABC):
         file_role: str | None = None,
     ):
         """Process a single file and send its content as a message."""
-        # Use the shared FileReader utility to get file content
-        file_content, success = FileReader.read_file(text_filepath)
+        # Use the shared FileReader utility to get file content, converted files are reused through the attachment cache
+        file_content, success = self._attachment_cache.get_text(text_filepath, lambda: FileReader.read_file(text_filepath))
 
         if success:
             role = self._determine_file_role(text_filepath, file_role)
@@ -315,42 +444,31 @@ class RequestBuilder(ABC):
 
         return role
 
-    def _extract_pages_from_pdf(self, pdf_path: str, pages: list[int]) -> str:
-        """Extract the specified pages from the PDF, create a temporary pdf file with the extracted pages and return the path
-        to the temporary file.
-        If a given page is not present, skip it.
-        """
-        try:
-            import tempfile
-
-            from PyPDF2 import PdfReader, PdfWriter
+    def _get_attachment_base64(self, file_path: str, pages: list[int] | None = None) -> str:
+        """Base64 payload of the file (or of the selected PDF pages), reused across turns through the attachment cache."""
+        return self._attachment_cache.get_base64(file_path, pages, lambda: self._read_attachment_bytes(file_path, pages))
 
-            # Create a PDF reader object
-            reader = PdfReader(pdf_path)
-            writer = PdfWriter()
+    def _get_attachment_bytes(self, file_path: str, pages: list[int] | None = None) -> bytes:
+        """Raw payload of the file (or of the selected PDF pages), reused across turns through the attachment cache."""
+        return self._attachment_cache.get_bytes(file_path, pages, lambda: self._read_attachment_bytes(file_path, pages))
 
-            # Get total pages in the PDF
-            total_pages = len(reader.pages)
+    def _get_prepared_image(self, image_path: str) -> PreparedImage:
+        """The image downscaled and recompressed for the provider (see ImagePreprocessor)"""
+        extension = get_file_extension(image_path).lower()
+        media_type = "image/jpeg" if extension in ("jpg", "jpeg") else f"image/{extension}"
+        return self._prepare_image(self._get_attachment_bytes(image_path), media_type)
 
-            # Add requested pages to the writer
-            for page_num in pages:
-                # Convert to 0-based index and check if page exists
-                idx = page_num - 1
-                if 0 <= idx < total_pages:
-                    writer.add_page(reader.pages[idx])
-                else:
-                    self.notifications_printer.print_error(f"Page {page_num} not found in PDF. Skipping.")
+    def _prepare_image(self, data: bytes, media_type: str) -> PreparedImage:
+        if self.image_limits is None:
+            return PreparedImage(data, media_type)
+        return self._image_preprocessor.prepare(data, media_type, self.image_limits)
 
-            # Create a temporary file
-            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False, mode="wb") as temp_file:
-                temp_path = temp_file.name
-                writer.write(temp_file)
+    def _read_attachment_bytes(self, file_path: str, pages: list[int] | None) -> bytes:
+        return read_attachment_bytes(file_path, pages, self.notifications_printer)
 
-            return temp_path
-
-        except Exception as e:
-            self.notifications_printer.print_error(f"Error extracting pages from PDF {pdf_path}, sending whole file: {e}")
-            return pdf_path  # Return original file path if extraction fails
+    def _extract_pages_from_pdf(self, pdf_path: str, pages: list[int]) -> str:
+        """Extract the specified pages into a temporary pdf file and return its path, see extract_pages_from_pdf."""
+        return extract_pages_from_pdf(pdf_path, pages, self.notifications_printer)
 
     def _process_text_message(self, message: TextMessage) -> None:
         """Process a text message."""
@@ -364,6 +482,7 @@ class RequestBuilder(ABC):
                     message_id=id(message),
                     name=message.name,
                     text_role=message.text_role,
+                    timestamp=self._get_displayed_timestamp(message),
                 )
 
     def _process_text_generator_message(
@@ -380,8 +499,17 @@ class RequestBuilder(ABC):
                     id(message),
                     message.name,
                     message.text_role,
+                    timestamp=self._get_displayed_timestamp(message),
                 )
 
+    def _get_displayed_timestamp(self, message: Message) -> datetime | None:
+        """Only messages entered by the participant carry their timestamp into the request.
+        The timestamp is the message's own, so the rendered prefix is byte-stable across requests (needed for prompt caching).
+        """
+        if getattr(message, "is_directly_entered", False):
+            return message.timestamp
+        return None
+
     def _process_image_url_message(self, message: ImageUrlMessage) -> None:
         """Process an image URL message."""
         content = message.get_content_for_assistant()
@@ -452,3 +580,14 @@ class RequestBuilder(ABC):
                 message_id=id(message),
                 name=message.name,
             )
+
+    def _process_history_summary_message(self, message: HistorySummaryMessage) -> None:
+        """Process the summary of the compacted start of the conversation."""
+        content = message.get_content_for_assistant()
+        if content:
+            self.handle_text_message(
+                text=f"Summary of the earlier conversation ({message.summarized_count} messages left out of this request):\n{content}",
+                author=message.author,
+                message_id=id(message),
+                text_role="ConversationSummary",
+            )
@@ -1,25 +1,42 @@
+import os
+from datetime import datetime
 from typing import Any
 
 from hermes.chat.interface.assistant.models.request_builder.all_messages_aggregator import (
     AllMessagesAggregator,
 )
 from hermes.chat.interface.assistant.models.request_builder.base import RequestBuilder
+from hermes.chat.interface.assistant.models.request_builder.claude import CLAUDE_CHARACTERS_PER_TOKEN
+from hermes.chat.interface.assistant.models.request_builder.context_window import TokenEstimator
+from hermes.chat.interface.assistant.models.request_builder.image_preprocessing import CLAUDE_IMAGE_LIMITS
 from hermes.chat.interface.assistant.models.request_builder.text_messages_aggregator import (
     TextMessagesAggregator,
 )
 
 MODEL_TAG_TO_MAX_TOKENS = {"claude-opus-4-20250514-v1": 32768, "claude-sonnet-4-20250514-v1": 64000, "claude-3-7": 124_000}
 
+# Converse API rejects cachePoint blocks for models without prompt caching support
+PROMPT_CACHING_MODEL_MARKERS = ["claude-opus-4", "claude-sonnet-4", "claude-3-7-sonnet", "claude-3-5-haiku", "amazon.nova"]
+
 
 class BedrockRequestBuilder(RequestBuilder):
-    def __init__(self, model_tag, notifications_printer, prompt_builder_factory):
-        super().__init__(model_tag, notifications_printer, prompt_builder_factory)
+    compilation_state_attributes = ("text_messages_aggregator", "all_messages_aggregator")
+    # Most of the Bedrock models with image support are Claude models
+    image_limits = CLAUDE_IMAGE_LIMITS
+    supports_native_tools = True
+
+    def __init__(self, model_tag, notifications_printer, prompt_builder_factory, caches=None):
+        super().__init__(model_tag, notifications_printer, prompt_builder_factory, caches)
         self.reasoning_effort: int | None = None
 
+    def _create_token_estimator(self) -> TokenEstimator:
+        if "anthropic." in self.model_tag:
+            return TokenEstimator(CLAUDE_CHARACTERS_PER_TOKEN)
+        return TokenEstimator()
+
     def initialize_request(self):
         self.text_messages_aggregator = TextMessagesAggregator(self.prompt_builder_factory)
         self.all_messages_aggregator = AllMessagesAggregator()
-        self._extracted_pdfs = {}
 
     def _add_content(self, content: dict, author: str):
         self.all_messages_aggregator.add_message(content, author)
@@ -29,8 +46,23 @@ class BedrockRequestBuilder(RequestBuilder):
         final_messages = []
         for messages, author in self.all_messages_aggregator.get_aggregated_messages():
             final_messages.append({"role": self._get_message_role(author), "content": messages})
+        if self._supports_prompt_caching():
+            self._add_cache_points(final_messages)
         return final_messages
 
+    def _supports_prompt_caching(self) -> bool:
+        return any(marker in self.model_tag for marker in PROMPT_CACHING_MODEL_MARKERS)
+
+    def _add_cache_points(self, final_messages: list[dict]):
+        """Add cachePoint blocks after the stable prefix: the first message (assistant prompt/static interface),
+        the previous user message and the last message, so the next turn reads the conversation from cache.
+        """
+        user_indices = [index for index, message in enumerate(final_messages) if message["role"] == "user"]
+        previous_user_index = user_indices[-2] if len(user_indices) > 1 else 0
+        for index in sorted({0, previous_user_index, len(final_messages) - 1}):
+            if 0 <= index < len(final_messages):
+                final_messages[index]["content"] = [*final_messages[index]["content"], {"cachePoint": {"type": "default"}}]
+
     def _get_max_tokens_for_model(self) -> int | None:
         """Determine max tokens based on model tag."""
         for tag, tokens in MODEL_TAG_TO_MAX_TOKENS.items():
@@ -61,10 +93,16 @@ class BedrockRequestBuilder(RequestBuilder):
             "modelId": self.model_tag,
             "system": [],
             "inferenceConfig": {},
-            # "toolConfig": {},
             # "guardrailConfig": {},
             "messages": final_messages,
         }
+        if self._tools:
+            response["toolConfig"] = {
+                "tools": [
+                    {"toolSpec": {"name": tool.name, "description": tool.description, "inputSchema": {"json": tool.parameters}}}
+                    for tool in self._tools
+                ]
+            }
 
         max_tokens = self._get_max_tokens_for_model()
         self._configure_inference_parameters(response, max_tokens)
@@ -84,6 +122,7 @@ class BedrockRequestBuilder(RequestBuilder):
         message_id: int,
         name: str | None = None,
         text_role: str | None = None,
+        timestamp: datetime | None = None,
     ):
         if self.text_messages_aggregator.get_current_author() != author and not self.text_messages_aggregator.is_empty():
             self._flush_text_messages()
@@ -93,6 +132,7 @@ class BedrockRequestBuilder(RequestBuilder):
             message_id=message_id,
             name=name,
             text_role=text_role,
+            timestamp=timestamp,
         )
 
     def _get_message_role(self, role: str) -> str:
@@ -101,21 +141,13 @@ class BedrockRequestBuilder(RequestBuilder):
         return "assistant"
 
     def handle_embedded_pdf_message(self, pdf_path: str, pages: list[int], author: str, message_id: int):
-        extracted_pdf_key = (pdf_path, tuple(pages))
-        # Extract specified pages if pages are provided
-        if extracted_pdf_key in self._extracted_pdfs:
-            final_pdf_path = self._extracted_pdfs[extracted_pdf_key]
-        else:
-            final_pdf_path = self._extract_pages_from_pdf(pdf_path, pages) if pages else pdf_path
-            self._extracted_pdfs[extracted_pdf_key] = final_pdf_path
-
         self._add_content(
             {
                 "document": {
                     "format": "pdf",
                     "name": self._get_file_name(pdf_path),  # Using original name for PDF file
                     "source": {
-                        "bytes": self._get_file_bytes(final_pdf_path),  # Using the extracted document
+                        "bytes": self._get_attachment_bytes(pdf_path, pages),  # Using the extracted pages
                     },
                 },
             },
@@ -127,42 +159,33 @@ class BedrockRequestBuilder(RequestBuilder):
 
         return os.path.basename(file_path)
 
-    def _get_file_bytes(self, file_path: str) -> bytes:
-        with open(file_path, "rb") as file:
-            return file.read()
-
     def handle_image_message(self, image_path: str, author: str, message_id: int):
-        image_format = self._get_image_format(image_path)
-        image_content = self._get_file_bytes(image_path)
+        image = self._get_prepared_image(image_path)
         self._add_content(
-            {"image": {"format": image_format, "source": {"bytes": image_content}}},
+            {"image": {"format": image.format, "source": {"bytes": image.data}}},
             author,
         )
 
-    def _get_image_format(self, image_path: str) -> str:
-        import os
+    def handle_image_url_message(self, url: str, author: str, message_id: int):
+        image_content = self._get_url_image_content(url, message_id)
+        if image_content is None:
+            return
+        image = self._prepare_image(image_content, f"image/{self._get_image_url_format(url)}")
+        self._add_content(
+            {"image": {"format": image.format, "source": {"bytes": image.data}}},
+            author,
+        )
 
+    def _get_image_format(self, image_path: str) -> str:
         _, file_extension = os.path.splitext(image_path)
         file_extension = file_extension[1:].lower()
         if file_extension in ["jpg", "jpeg"]:
             return "jpeg"
         return file_extension
 
-    def handle_image_url_message(self, url: str, author: str, message_id: int):
-        import requests
-
-        image_content = requests.get(url).content
-        self._add_content(
-            {
-                "type": "image",
-                "source": {
-                    "type": "base64",
-                    "media_type": "image/jpeg",
-                    "data": image_content,
-                },
-            },
-            author,
-        )
+    def _get_image_url_format(self, url: str) -> str:
+        image_format = self._get_image_format(url.split("?", 1)[0])
+        return image_format if image_format in ["png", "jpeg", "gif", "webp"] else "jpeg"
 
     def handle_textual_file_message(
         self,
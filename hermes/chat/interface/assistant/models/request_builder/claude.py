@@ -1,21 +1,31 @@
-from base64 import b64encode
+from datetime import datetime
 from typing import Any
 
 from hermes.chat.interface.assistant.models.request_builder.all_messages_aggregator import (
     AllMessagesAggregator,
 )
 from hermes.chat.interface.assistant.models.request_builder.base import RequestBuilder
+from hermes.chat.interface.assistant.models.request_builder.context_window import TokenEstimator
+from hermes.chat.interface.assistant.models.request_builder.image_preprocessing import CLAUDE_IMAGE_LIMITS, PreparedImage
 from hermes.chat.interface.assistant.models.request_builder.text_messages_aggregator import (
     TextMessagesAggregator,
 )
-from hermes.utils.file_extension import get_file_extension
+
+CLAUDE_CHARACTERS_PER_TOKEN = 3.5
 
 
 class ClaudeRequestBuilder(RequestBuilder):
+    compilation_state_attributes = ("text_messages_aggregator", "all_messages_aggregator")
+    image_limits = CLAUDE_IMAGE_LIMITS
+    supports_native_tools = True
+
     def initialize_request(self):
         self.text_messages_aggregator = TextMessagesAggregator(self.prompt_builder_factory)
         self.all_messages_aggregator = AllMessagesAggregator()
-        self._extracted_pdfs = {}
+
+    def _create_token_estimator(self) -> TokenEstimator:
+        # Claude's tokenizer isn't published and counting tokens is an API call, its tokens are shorter than OpenAI's
+        return TokenEstimator(CLAUDE_CHARACTERS_PER_TOKEN)
 
     def _add_content(self, content: dict, author: str):
         self.all_messages_aggregator.add_message(content, author)
@@ -34,12 +44,38 @@ class ClaudeRequestBuilder(RequestBuilder):
         final_messages = []
         for messages, author in self.all_messages_aggregator.get_aggregated_messages():
             final_messages.append({"role": self._get_message_role(author), "content": messages})
+        self._add_cache_breakpoints(final_messages)
 
-        return {
+        request = {
             "model": self.model_tag,
             "messages": final_messages,
             "max_tokens": 4096,
         }
+        if self._tools:
+            request["tools"] = [
+                {"name": tool.name, "description": tool.description, "input_schema": tool.parameters} for tool in self._tools
+            ]
+        return request
+
+    def _add_cache_breakpoints(self, final_messages: list[dict]):
+        """Mark the stable prefix for prompt caching.
+        The first message holds the assistant prompt/static interface and the initial attachments.
+        The last message makes the whole conversation readable from cache on the next turn,
+        the previous user message covers the case when the last one gets replaced (e.g. a retry).
+        """
+        for index in sorted({0, self._get_previous_user_message_index(final_messages), len(final_messages) - 1}):
+            if 0 <= index < len(final_messages):
+                self._mark_cache_breakpoint(final_messages[index])
+
+    def _get_previous_user_message_index(self, final_messages: list[dict]) -> int:
+        user_indices = [index for index, message in enumerate(final_messages) if message["role"] == "user"]
+        return user_indices[-2] if len(user_indices) > 1 else -1
+
+    def _mark_cache_breakpoint(self, message: dict):
+        # Content blocks are shared with the compilation cache, so they are copied instead of modified
+        content = list(message["content"])
+        content[-1] = {**content[-1], "cache_control": {"type": "ephemeral"}}
+        message["content"] = content
 
     def handle_text_message(
         self,
@@ -48,6 +84,7 @@ class ClaudeRequestBuilder(RequestBuilder):
         message_id: int,
         name: str | None = None,
         text_role: str | None = None,
+        timestamp: datetime | None = None,
     ):
         if self.text_messages_aggregator.get_current_author() != author and not self.text_messages_aggregator.is_empty():
             self._flush_text_messages()
@@ -57,6 +94,7 @@ class ClaudeRequestBuilder(RequestBuilder):
             message_id=message_id,
             name=name,
             text_role=text_role,
+            timestamp=timestamp,
         )
 
     def _get_message_role(self, role: str) -> str:
@@ -64,60 +102,39 @@ class ClaudeRequestBuilder(RequestBuilder):
             return "user"
         return "assistant"
 
-    def _get_base64(self, file_path: str) -> str:
-        import base64
-
-        with open(file_path, "rb") as file:
-            return base64.b64encode(file.read()).decode("utf-8")
+    def _get_base64(self, file_path: str, pages: list[int] | None = None) -> str:
+        return self._get_attachment_base64(file_path, pages)
 
     def handle_embedded_pdf_message(self, pdf_path: str, pages: list[int], author: str, message_id: int):
-        extracted_pdf_key = (pdf_path, tuple(pages))
-        # Extract specified pages if pages are provided
-        if extracted_pdf_key in self._extracted_pdfs:
-            pdf_path = self._extracted_pdfs[extracted_pdf_key]
-        else:
-            if pages:
-                pdf_path = self._extract_pages_from_pdf(pdf_path, pages)
-            self._extracted_pdfs[extracted_pdf_key] = pdf_path
-
         self._add_content(
             {
                 "type": "document",
                 "source": {
                     "type": "base64",
                     "media_type": "application/pdf",
-                    "data": self._get_base64(pdf_path),
+                    "data": self._get_base64(pdf_path, pages),
                 },
             },
             author,
         )
 
-    def _get_image_extension(self, image_path: str) -> str:
-        return get_file_extension(image_path)
-
     def handle_image_message(self, image_path: str, author: str, message_id: int):
-        self._add_content(
-            {
-                "type": "image",
-                "source": {
-                    "type": "base64",
-                    "media_type": f"image/{self._get_image_extension(image_path)}",
-                    "data": self._get_base64(image_path),
-                },
-            },
-            author,
-        )
+        self._add_image_content(self._get_prepared_image(image_path), author)
 
     def handle_image_url_message(self, url: str, author: str, message_id: int):
         image_data = self._get_url_image_content(url, message_id)
-        base64_image = b64encode(image_data).decode("utf-8")
+        if image_data is None:
+            return
+        self._add_image_content(self._prepare_image(image_data, "image/jpeg"), author)
+
+    def _add_image_content(self, image: PreparedImage, author: str):
         self._add_content(
             {
                 "type": "image",
                 "source": {
                     "type": "base64",
-                    "media_type": "image/jpeg",
-                    "data": base64_image,
+                    "media_type": image.media_type,
+                    "data": image.base64,
                 },
             },
             author,
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any
+
+from hermes.chat.messages import (
+    AudioFileMessage,
+    EmbeddedPDFMessage,
+    ImageMessage,
+    Message,
+    TextualFileMessage,
+    VideoMessage,
+)
+
+
+def get_message_fingerprint(message: Message) -> str | None:
+    """Hash of everything that affects how the message is rendered into a request.
+
+    The timestamp is included only for directly entered messages, the only ones rendered with it.
+    Files referenced by path are stamped with their size and modification time, so editing an attached file
+    invalidates the fingerprint. Returns None for messages that can't be fingerprinted cheaply (e.g. directories),
+    these are always recompiled.
+    """
+    hasher = hashlib.sha256()
+    content = message.get_content_for_assistant()
+    for part in (
+        type(message).__name__,
+        message.author,
+        getattr(message, "name", None),
+        getattr(message, "text_role", None),
+        getattr(message, "file_role", None),
+        message.timestamp.isoformat() if getattr(message, "is_directly_entered", False) else None,
+        json.dumps(content, sort_keys=True, default=str),
+    ):
+        hasher.update(str(part).encode("utf-8"))
+        hasher.update(b"\0")
+
+    for path in _get_referenced_paths(message, content):
+        stamp = _get_path_stamp(path)
+        if stamp is None:
+            return None
+        hasher.update(stamp.encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def _get_referenced_paths(message: Message, content: Any) -> list[str]:
+    if isinstance(message, ImageMessage | AudioFileMessage | VideoMessage):
+        return [content] if content else []
+    if isinstance(message, EmbeddedPDFMessage):
+        return [content["pdf_filepath"]]
+    if isinstance(message, TextualFileMessage) and not content["textual_content"] and content["text_filepath"]:
+        return [content["text_filepath"]]
+    return []
+
+
+def _get_path_stamp(path: str) -> str | None:
+    if os.path.isdir(path):
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return f"{path}:missing"
+    return f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class MessageFingerprints:
+    """The fingerprints of the messages of one request, so each message is fingerprinted once however many steps
+    of the build need it (context window fitting, deduplication, compilation cache).
+    Only valid for one build, the attached files can change between requests.
+    """
+
+    def __init__(self):
+        # Keyed by id, the message is kept so its id isn't reused while the build runs
+        self._fingerprints: dict[int, tuple[Message, str | None]] = {}
+
+    def get(self, message: Message) -> str | None:
+        entry = self._fingerprints.get(id(message))
+        if entry is None:
+            entry = self._fingerprints[id(message)] = (message, get_message_fingerprint(message))
+        return entry[1]
+
+
+class RequestCompilationCache:
+    """Keeps the builder state after compiling a prefix of the conversation, so the next request only processes new messages.
+
+    States are keyed by a chained hash of the message fingerprints, so any edit in the middle of the history produces
+    a different chain from that point on and the stale prefix is simply not found.
+    Several chains are kept (LRU), as deep research nodes share the same request builder.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self._max_entries = max_entries
+        self._states: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def compute_chain_hashes(messages: Sequence[Message], fingerprints: MessageFingerprints | None = None) -> list[str]:
+        """Chained hashes for the longest prefix of messages that can be fingerprinted."""
+        fingerprints = fingerprints or MessageFingerprints()
+        chain_hashes = []
+        previous_hash = ""
+        for message in messages:
+            fingerprint = fingerprints.get(message)
+            if fingerprint is None:
+                break
+            previous_hash = hashlib.sha256(f"{previous_hash}:{fingerprint}".encode()).hexdigest()
+            chain_hashes.append(previous_hash)
+        return chain_hashes
+
+    def find_longest_prefix(self, chain_hashes: list[str]) -> tuple[int, Any]:
+        """Returns (number of messages already compiled, builder state), or (0, None) on a miss."""
+        with self._lock:
+            for index in range(len(chain_hashes), 0, -1):
+                chain_hash = chain_hashes[index - 1]
+                if chain_hash in self._states:
+                    self._states.move_to_end(chain_hash)
+                    return index, self._states[chain_hash]
+        return 0, None
+
+    def store(self, chain_hash: str, state: Any):
+        with self._lock:
+            self._states[chain_hash] = state
+            self._states.move_to_end(chain_hash)
+            while len(self._states) > self._max_entries:
+                self._states.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
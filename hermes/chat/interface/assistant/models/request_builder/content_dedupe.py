@@ -0,0 +1,172 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from enum import Enum
+
+from hermes.chat.interface.assistant.models.request_builder.compilation_cache import MessageFingerprints
+from hermes.chat.interface.assistant.models.request_builder.url_content_cache import normalize_url
+from hermes.chat.messages import LLMRunCommandOutput, Message, TextualFileMessage, UrlMessage
+
+logger = logging.getLogger(__name__)
+
+# Shorter blocks cost about as much as the reference that would replace them
+MIN_DEDUPED_CHARACTERS = 256
+
+
+class ContentDedupePolicy(Enum):
+    OFF = "off"
+    BACK_REFERENCE = "back-reference"
+    KEEP_LATEST = "keep-latest"
+
+
+@dataclass
+class DedupeReport:
+    deduplicated_blocks: int = 0
+    saved_bytes: int = 0
+
+    def describe(self) -> str:
+        return f"{self.deduplicated_blocks} repeated blocks left out of the request, {self.saved_bytes / 1024:.1f} KB saved"
+
+
+@dataclass(frozen=True)
+class _Block:
+    # Hash of the content, the same file or command output attached several times has the same key.
+    # Webpages are keyed by their normalized URL, all the copies are served by the same URL content cache entry.
+    key: str
+    # None for webpages, they aren't fetched unless a copy is left out
+    size_bytes: int | None
+
+
+class ContentDeduplicator:
+    """Leaves the repeated copies of the same content out of the request, e.g. a file opened several times in agent mode.
+
+    The attached files, webpages and command outputs are keyed by their content, the messages of the copies are
+    replaced with a short reference to the kept one. Policies:
+    - back-reference: keep the first copy, the following ones refer back to it (the prefix of the request stays stable)
+    - keep-latest: keep the most recent copy, the earlier ones refer to it
+    - off: send every copy
+
+    The blocks are cached by message fingerprint, so a growing conversation only reads and hashes the new messages.
+    """
+
+    def __init__(
+        self,
+        policy: ContentDedupePolicy,
+        load_file_text: Callable[[str], str],
+        load_url_text: Callable[[str], str],
+        max_cached_blocks: int = 4096,
+    ):
+        self.policy = policy
+        self._load_file_text = load_file_text
+        self._load_url_text = load_url_text
+        self._max_cached_blocks = max_cached_blocks
+        self._blocks: OrderedDict[str, _Block | None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def dedupe(
+        self, messages: Sequence[Message], message_fingerprints: MessageFingerprints | None = None
+    ) -> tuple[Sequence[Message], DedupeReport]:
+        report = DedupeReport()
+        if self.policy == ContentDedupePolicy.OFF:
+            return messages, report
+
+        message_fingerprints = message_fingerprints or MessageFingerprints()
+        blocks = [self._get_block(message, message_fingerprints) for message in messages]
+        kept_indices = self._find_kept_indices(blocks)
+        deduped_messages = list(messages)
+        for index, block in enumerate(blocks):
+            if block is None or kept_indices[block.key] == index:
+                continue
+            deduped_messages[index] = _create_reference(messages[index], messages[kept_indices[block.key]], index < kept_indices[block.key])
+            report.deduplicated_blocks += 1
+            report.saved_bytes += self._get_size_bytes(messages[index], block)
+        return deduped_messages, report
+
+    def _find_kept_indices(self, blocks: list[_Block | None]) -> dict[str, int]:
+        """Index of the kept copy of each content"""
+        kept_indices: dict[str, int] = {}
+        for index, block in enumerate(blocks):
+            if block is not None and (block.key not in kept_indices or self.policy == ContentDedupePolicy.KEEP_LATEST):
+                kept_indices[block.key] = index
+        return kept_indices
+
+    def _get_block(self, message: Message, message_fingerprints: MessageFingerprints) -> _Block | None:
+        if not isinstance(message, LLMRunCommandOutput | TextualFileMessage | UrlMessage):
+            return None
+        fingerprint = message_fingerprints.get(message)
+        if fingerprint is None:
+            return self._read_block(message)
+        with self._lock:
+            if fingerprint in self._blocks:
+                self._blocks.move_to_end(fingerprint)
+                return self._blocks[fingerprint]
+
+        block = self._read_block(message)
+        with self._lock:
+            self._blocks[fingerprint] = block
+            while len(self._blocks) > self._max_cached_blocks:
+                self._blocks.popitem(last=False)
+        return block
+
+    def _read_block(self, message: Message) -> _Block | None:
+        if isinstance(message, UrlMessage):
+            return _Block(f"url|{normalize_url(message.url)}", None)
+        try:
+            text = self._read_text(message)
+        except Exception as e:
+            logger.debug(f"Can't read the content of {_describe(message)} for deduplication: {e}")
+            return None
+        if text is None or len(text) < MIN_DEDUPED_CHARACTERS:
+            return None
+        encoded = text.encode("utf-8", "ignore")
+        return _Block(hashlib.sha256(encoded).hexdigest(), len(encoded))
+
+    def _read_text(self, message: Message) -> str | None:
+        if isinstance(message, LLMRunCommandOutput):
+            return message.text
+        if not isinstance(message, TextualFileMessage):
+            return None
+        if message.textual_content:
+            return message.textual_content
+        # Directories are sent file by file, they aren't deduplicated as a whole
+        if message.text_filepath and not os.path.isdir(message.text_filepath):
+            return self._load_file_text(message.text_filepath)
+        return None
+
+    def _get_size_bytes(self, message: Message, block: _Block) -> int:
+        if block.size_bytes is not None:
+            return block.size_bytes
+        if not isinstance(message, UrlMessage):
+            return 0
+        try:
+            return len(self._load_url_text(message.url).encode("utf-8", "ignore"))
+        except Exception as e:
+            logger.debug(f"Can't get the size of {_describe(message)}: {e}")
+            return 0
+
+
+def _create_reference(message: Message, kept_message: Message, is_kept_later: bool) -> Message:
+    position = "later" if is_kept_later else "earlier"
+    text = f"[The same content as {_describe(kept_message)} {position} in the conversation, this repeated copy is left out]"
+    if isinstance(message, LLMRunCommandOutput):
+        return LLMRunCommandOutput(text=text, timestamp=message.timestamp, name=message.name)
+    return TextualFileMessage(
+        author=message.author,
+        text_filepath=None,
+        textual_content=text,
+        timestamp=message.timestamp,
+        file_role=f"{getattr(message, 'file_role', None) or 'TextualFile'} (repeated)",
+        name=getattr(message, "name", None) or getattr(message, "text_filepath", None) or getattr(message, "url", None),
+    )
+
+
+def _describe(message: Message) -> str:
+    if isinstance(message, UrlMessage):
+        return f"the webpage {message.url}"
+    if isinstance(message, TextualFileMessage):
+        return f"the file {message.name or message.text_filepath or ''}".strip()
+    return f"the command output {getattr(message, 'name', None) or ''}".strip()
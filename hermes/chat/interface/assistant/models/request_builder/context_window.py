@@ -0,0 +1,319 @@
+import logging
+import math
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from enum import Enum
+
+from hermes.chat.interface.assistant.models.request_builder.compilation_cache import MessageFingerprints
+from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
+from hermes.chat.messages import (
+    AudioFileMessage,
+    EmbeddedPDFMessage,
+    ImageMessage,
+    ImageUrlMessage,
+    LLMRunCommandOutput,
+    Message,
+    TextualFileMessage,
+    UrlMessage,
+    VideoMessage,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rough costs of the attachments that can't be counted without fetching or decoding them
+IMAGE_TOKENS = 1600
+URL_TOKENS = 4000
+PDF_PAGE_TOKENS = 1500
+PDF_BYTES_PER_PAGE = 100_000
+AUDIO_VIDEO_TOKENS = 30_000
+# Overhead of a message in the request (role, separators, names)
+MESSAGE_OVERHEAD_TOKENS = 8
+DEFAULT_RESERVED_OUTPUT_TOKENS = 8192
+# When messages have to be dropped, drop down to this share of the budget, so the following requests keep the same
+# first message for a while (and so the compilation cache and the provider's prompt cache keep working)
+LOW_WATER_RATIO = 0.8
+MIN_TRUNCATED_ATTACHMENT_TOKENS = 1000
+
+FIXED_COST_MESSAGE_TOKENS = [
+    ((ImageMessage, ImageUrlMessage), IMAGE_TOKENS),
+    ((AudioFileMessage, VideoMessage), AUDIO_VIDEO_TOKENS),
+    ((UrlMessage,), URL_TOKENS),
+]
+
+
+class ContextFittingPolicy(Enum):
+    DROP_OLDEST = "drop-oldest"
+    TRUNCATE_ATTACHMENTS = "truncate-attachments"
+    FAIL_FAST = "fail-fast"
+
+
+@dataclass
+class ContextWindow:
+    limit_tokens: int
+    policy: ContextFittingPolicy = ContextFittingPolicy.DROP_OLDEST
+    reserved_output_tokens: int | None = None
+    # The leading messages are the assistant prompt (or the deep research interface), they are never dropped
+    kept_leading_messages: int = 1
+
+    @property
+    def input_budget_tokens(self) -> int:
+        reserved = self.reserved_output_tokens
+        if reserved is None:
+            reserved = min(DEFAULT_RESERVED_OUTPUT_TOKENS, self.limit_tokens // 4)
+        return self.limit_tokens - reserved
+
+
+class ContextWindowExceededError(ValueError):
+    pass
+
+
+class TokenEstimator:
+    """Calibrated heuristic: ASCII text is counted by characters per token, the extra UTF-8 bytes of other scripts
+    (which tokenize much worse) are counted separately.
+    """
+
+    def __init__(self, characters_per_token: float = 4.0):
+        self.characters_per_token = characters_per_token
+
+    def count_text(self, text: str) -> int:
+        extra_bytes = len(text.encode("utf-8", "ignore")) - len(text)
+        return math.ceil(len(text) / self.characters_per_token + extra_bytes / 2)
+
+    def count_file(self, size_bytes: int) -> int:
+        return math.ceil(size_bytes / self.characters_per_token)
+
+    def get_characters_for_tokens(self, tokens: int) -> int:
+        return int(tokens * self.characters_per_token)
+
+
+class TiktokenEstimator(TokenEstimator):
+    """Exact counts of the text with OpenAI's tokenizer, the attachments are still estimated"""
+
+    def __init__(self, encoding):
+        super().__init__()
+        self._encoding = encoding
+
+    def count_text(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+def get_openai_token_estimator(model_tag: str) -> TokenEstimator:
+    """tiktoken is optional, without it the heuristic is used."""
+    try:
+        import tiktoken
+    except ImportError:
+        logger.debug("tiktoken is not installed, estimating OpenAI tokens heuristically")
+        return TokenEstimator(4.0)
+
+    try:
+        encoding = _get_tiktoken_encoding(tiktoken, model_tag)
+    except Exception as e:
+        # The encodings are downloaded on first use, offline the heuristic has to do
+        logger.debug(f"Failed to load the tiktoken encoding of {model_tag}, estimating OpenAI tokens heuristically: {e}")
+        return TokenEstimator(4.0)
+    return TiktokenEstimator(encoding)
+
+
+def _get_tiktoken_encoding(tiktoken, model_tag: str):
+    try:
+        return tiktoken.encoding_for_model(model_tag)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+class ContextWindowFitter:
+    """Makes the messages fit in the model's context window before the request is built.
+
+    Per message token counts are cached by message fingerprint, so estimating a growing conversation only counts
+    the new messages. Policies:
+    - drop-oldest: drop the oldest messages after the leading prompt, the last message is always kept
+    - truncate-attachments: cut the largest textual attachments and command outputs first, then drop the oldest messages
+    - fail-fast: raise ContextWindowExceededError before anything is sent
+    """
+
+    def __init__(
+        self,
+        context_window: ContextWindow,
+        token_estimator: TokenEstimator,
+        notifications_printer: CLINotificationsPrinter,
+        load_text: Callable[[str], str],
+        max_cached_counts: int = 4096,
+    ):
+        self.context_window = context_window
+        self.token_estimator = token_estimator
+        self.notifications_printer = notifications_printer
+        self._load_text = load_text
+        self._max_cached_counts = max_cached_counts
+        self._counts: OrderedDict[str, int] = OrderedDict()
+        self._first_kept_fingerprint: str | None = None
+        self._lock = threading.Lock()
+
+    def fit(self, messages: Sequence[Message], message_fingerprints: MessageFingerprints | None = None) -> Sequence[Message]:
+        budget = self.context_window.input_budget_tokens
+        message_fingerprints = message_fingerprints or MessageFingerprints()
+        fingerprints = [message_fingerprints.get(message) for message in messages]
+        counts = [self.count_message_tokens(message, fingerprint) for message, fingerprint in zip(messages, fingerprints, strict=True)]
+        total = sum(counts)
+        if total <= budget:
+            return messages
+
+        policy = self.context_window.policy
+        if policy == ContextFittingPolicy.FAIL_FAST:
+            raise ContextWindowExceededError(
+                f"The request is ~{total} tokens, over the {budget} tokens input budget of the context window "
+                f"({self.context_window.limit_tokens} tokens). Clear the history or use a model with a larger context window."
+            )
+
+        messages = list(messages)
+        if policy == ContextFittingPolicy.TRUNCATE_ATTACHMENTS:
+            self._truncate_attachments(messages, message_fingerprints, fingerprints, counts, total - budget)
+        if sum(counts) > budget:
+            messages = self._drop_oldest(messages, fingerprints, counts, budget)
+        return messages
+
+    def count_message_tokens(self, message: Message, fingerprint: str | None) -> int:
+        if fingerprint is None:
+            return self._estimate_message_tokens(message)
+        with self._lock:
+            if fingerprint in self._counts:
+                self._counts.move_to_end(fingerprint)
+                return self._counts[fingerprint]
+
+        tokens = self._estimate_message_tokens(message)
+        with self._lock:
+            self._counts[fingerprint] = tokens
+            while len(self._counts) > self._max_cached_counts:
+                self._counts.popitem(last=False)
+        return tokens
+
+    def _estimate_message_tokens(self, message: Message) -> int:
+        return MESSAGE_OVERHEAD_TOKENS + self._estimate_content_tokens(message)
+
+    def _estimate_content_tokens(self, message: Message) -> int:
+        for message_types, tokens in FIXED_COST_MESSAGE_TOKENS:
+            if isinstance(message, message_types):
+                return tokens
+        if isinstance(message, EmbeddedPDFMessage):
+            return self._estimate_pdf_tokens(message)
+        if isinstance(message, TextualFileMessage):
+            return self._estimate_textual_file_tokens(message)
+        return self.token_estimator.count_text(str(message.get_content_for_assistant() or ""))
+
+    def _estimate_pdf_tokens(self, message: EmbeddedPDFMessage) -> int:
+        content = message.get_content_for_assistant()
+        if content["pages"]:
+            return len(content["pages"]) * PDF_PAGE_TOKENS
+        page_count = math.ceil(_get_size(content["pdf_filepath"]) / PDF_BYTES_PER_PAGE)
+        return max(page_count, 1) * PDF_PAGE_TOKENS
+
+    def _estimate_textual_file_tokens(self, message: TextualFileMessage) -> int:
+        if message.textual_content:
+            return self.token_estimator.count_text(message.textual_content)
+        if not message.text_filepath:
+            return 0
+        if not os.path.isdir(message.text_filepath):
+            return self.token_estimator.count_file(_get_size(message.text_filepath))
+        return sum(
+            self.token_estimator.count_file(_get_size(os.path.join(directory, file_name)))
+            for directory, _, file_names in os.walk(message.text_filepath)
+            for file_name in file_names
+        )
+
+    def _truncate_attachments(
+        self,
+        messages: list[Message],
+        message_fingerprints: MessageFingerprints,
+        fingerprints: list[str | None],
+        counts: list[int],
+        overflow: int,
+    ):
+        """Cut the largest attachments first, each down to no less than MIN_TRUNCATED_ATTACHMENT_TOKENS. Updates the lists in place."""
+        truncatable = [index for index, message in enumerate(messages) if self._is_truncatable(message)]
+        truncated_names = []
+        for index in sorted(truncatable, key=lambda index: counts[index], reverse=True):
+            kept_tokens = max(counts[index] - overflow, MIN_TRUNCATED_ATTACHMENT_TOKENS)
+            if overflow <= 0 or kept_tokens >= counts[index]:
+                continue
+            messages[index] = self._truncate(messages[index], kept_tokens)
+            fingerprints[index] = message_fingerprints.get(messages[index])
+            overflow -= counts[index] - kept_tokens
+            counts[index] = kept_tokens
+            truncated_names.append(getattr(messages[index], "name", None) or "command output")
+
+        if truncated_names:
+            self.notifications_printer.print_notification(
+                f"The request doesn't fit in the context window, truncated: {', '.join(truncated_names)}"
+            )
+
+    def _is_truncatable(self, message: Message) -> bool:
+        if isinstance(message, LLMRunCommandOutput):
+            return True
+        if isinstance(message, TextualFileMessage):
+            return bool(message.textual_content) or (bool(message.text_filepath) and not os.path.isdir(message.text_filepath))
+        return False
+
+    def _truncate(self, message: Message, kept_tokens: int) -> Message:
+        kept_characters = self.token_estimator.get_characters_for_tokens(kept_tokens)
+        if isinstance(message, LLMRunCommandOutput):
+            return LLMRunCommandOutput(text=_cut(message.text, kept_characters), timestamp=message.timestamp, name=message.name)
+        if not isinstance(message, TextualFileMessage):
+            return message
+
+        if message.textual_content or not message.text_filepath:
+            text = message.textual_content or ""
+        else:
+            text = self._load_text(message.text_filepath)
+        return TextualFileMessage(
+            author=message.author,
+            text_filepath=None,
+            textual_content=_cut(text, kept_characters),
+            timestamp=message.timestamp,
+            file_role=f"{message.file_role or 'TextualFile'} (truncated)",
+            name=message.name or message.text_filepath,
+        )
+
+    def _drop_oldest(self, messages: list[Message], fingerprints: list[str | None], counts: list[int], budget: int) -> list[Message]:
+        """Keep the same first history message as the previous request while the rest fits, otherwise drop down to the low water mark.
+        The leading prompt messages are always kept.
+        """
+        leading_count = min(self.context_window.kept_leading_messages, len(messages) - 1)
+        start = self._find_previous_start(fingerprints, counts, budget, leading_count)
+        if start is None:
+            start = self._find_start(messages, counts, int(budget * LOW_WATER_RATIO), leading_count)
+            self.notifications_printer.print_notification(
+                f"The conversation doesn't fit in the context window of {self.context_window.limit_tokens} tokens, "
+                f"the oldest {start - leading_count} messages are left out of the request"
+            )
+        self._first_kept_fingerprint = fingerprints[start]
+        return messages[:leading_count] + messages[start:]
+
+    def _find_previous_start(self, fingerprints: list[str | None], counts: list[int], budget: int, leading_count: int) -> int | None:
+        if self._first_kept_fingerprint is None or self._first_kept_fingerprint not in fingerprints[leading_count:]:
+            return None
+        start = fingerprints.index(self._first_kept_fingerprint, leading_count)
+        return start if sum(counts[:leading_count]) + sum(counts[start:]) <= budget else None
+
+    def _find_start(self, messages: list[Message], counts: list[int], target: int, leading_count: int) -> int:
+        """Index of the first kept history message, the last message is always kept and the kept ones start with a user message."""
+        total = sum(counts)
+        start = leading_count
+        while start < len(counts) - 1 and (total > target or messages[start].author != "user"):
+            total -= counts[start]
+            start += 1
+        return start
+
+
+def _cut(text: str, kept_characters: int) -> str:
+    if len(text) <= kept_characters:
+        return text
+    return f"{text[:kept_characters]}\n[... truncated {len(text) - kept_characters} characters to fit in the context window]"
+
+
+def _get_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
@@ -1,12 +1,13 @@
 import time
 from base64 import b64encode
+from datetime import datetime
 from typing import Any
 
 from hermes.chat.interface.assistant.models.prompt_builder.base import PromptBuilderFactory
 from hermes.chat.interface.assistant.models.request_builder.all_messages_aggregator import (
     AllMessagesAggregator,
 )
-from hermes.chat.interface.assistant.models.request_builder.base import RequestBuilder
+from hermes.chat.interface.assistant.models.request_builder.base import RequestBuilder, RequestBuilderCaches
 from hermes.chat.interface.assistant.models.request_builder.text_messages_aggregator import (
     TextMessagesAggregator,
 )
@@ -20,8 +21,9 @@ class GeminiRequestBuilder(RequestBuilder):
         model_tag: str,
         notifications_printer: CLINotificationsPrinter,
         prompt_builder_factory: PromptBuilderFactory,
+        caches: RequestBuilderCaches | None = None,
     ):
-        super().__init__(model_tag, notifications_printer, prompt_builder_factory)
+        super().__init__(model_tag, notifications_printer, prompt_builder_factory, caches)
         if model_tag.endswith("/grounded"):
             self.grounded = True
             self.model_tag = model_tag[: -len("/grounded")]
@@ -50,6 +52,7 @@ class GeminiRequestBuilder(RequestBuilder):
         message_id: int,
         name: str | None = None,
         text_role: str | None = None,
+        timestamp: datetime | None = None,
     ):
         if self.text_messages_aggregator.get_current_author() != author and not self.text_messages_aggregator.is_empty():
             self._flush_text_messages()
@@ -59,6 +62,7 @@ class GeminiRequestBuilder(RequestBuilder):
             message_id=message_id,
             name=name,
             text_role=text_role,
+            timestamp=timestamp,
         )
 
     def compile_request(self) -> Any:
@@ -125,6 +129,8 @@ class GeminiRequestBuilder(RequestBuilder):
 
     def handle_image_url_message(self, url: str, author: str, message_id: int):
         image_data = self._get_url_image_content(url, message_id)
+        if image_data is None:
+            return
         base64_image = b64encode(image_data).decode("utf-8")
         self._add_content({"mime_type": "image/jpeg", "data": base64_image}, author)
 
@@ -1,15 +1,23 @@
 import typing
 from base64 import b64encode
+from collections.abc import Sequence
+from datetime import datetime
 
 from hermes.chat.interface.assistant.models.prompt_builder.base import PromptBuilderFactory
 from hermes.chat.interface.assistant.models.request_builder.all_messages_aggregator import (
     AllMessagesAggregator,
 )
-from hermes.chat.interface.assistant.models.request_builder.base import RequestBuilder
+from hermes.chat.interface.assistant.models.request_builder.base import RequestBuilder, RequestBuilderCaches
+from hermes.chat.interface.assistant.models.request_builder.gemini_context_cache import GeminiContextCache
+from hermes.chat.interface.assistant.models.request_builder.gemini_upload_registry import (
+    UploadedFileRecord,
+    get_shared_gemini_upload_registry,
+)
 from hermes.chat.interface.assistant.models.request_builder.text_messages_aggregator import (
     TextMessagesAggregator,
 )
 from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
+from hermes.chat.messages import AudioFileMessage, EmbeddedPDFMessage, ImageMessage, Message, VideoMessage
 from hermes.utils.file_extension import get_file_extension
 
 if typing.TYPE_CHECKING:
@@ -17,26 +25,33 @@ if typing.TYPE_CHECKING:
 
 
 class Gemini2RequestBuilder(RequestBuilder):
+    compilation_state_attributes = ("text_messages_aggregator", "all_messages_aggregator")
+    supports_native_tools = True
+
     def __init__(
         self,
         model_tag: str,
         notifications_printer: CLINotificationsPrinter,
         prompt_builder_factory: PromptBuilderFactory,
         google_client: "Client",
+        caches: RequestBuilderCaches | None = None,
     ):
-        super().__init__(model_tag, notifications_printer, prompt_builder_factory)
+        super().__init__(model_tag, notifications_printer, prompt_builder_factory, caches)
         from google.genai.types import GoogleSearch, Tool
 
         if model_tag.endswith("/grounded"):
             self.grounded = True
             self.model_tag = model_tag[: -len("/grounded")]
+            # The search tool can't be combined with function declarations
+            self.supports_native_tools = False
         else:
             self.grounded = False
 
-        self.uploaded_files = {}
         self.extracted_pdfs = {}
         self.google_search_tool = Tool(google_search=GoogleSearch())
         self.google_client = google_client
+        self.context_cache = GeminiContextCache(google_client)
+        self.upload_registry = get_shared_gemini_upload_registry(google_client)
 
     def initialize_request(self):
         self.text_messages_aggregator = TextMessagesAggregator(self.prompt_builder_factory)
@@ -60,6 +75,7 @@ class Gemini2RequestBuilder(RequestBuilder):
         message_id: int,
         name: str | None = None,
         text_role: str | None = None,
+        timestamp: datetime | None = None,
     ):
         if self.text_messages_aggregator.get_current_author() != author and not self.text_messages_aggregator.is_empty():
             self._flush_text_messages()
@@ -69,12 +85,13 @@ class Gemini2RequestBuilder(RequestBuilder):
             message_id=message_id,
             name=name,
             text_role=text_role,
+            timestamp=timestamp,
         )
 
     def compile_request(self) -> typing.Any:
         from google.genai.types import Content
 
-        # self._wait_for_uploaded_files()
+        self._wait_for_uploaded_files()
         self._flush_text_messages()
 
         final_messages = []
@@ -83,16 +100,35 @@ class Gemini2RequestBuilder(RequestBuilder):
             final_messages.append(Content(role=role, parts=parts))
 
         tools = []
+        cached_content = None
         if self.grounded:
             tools.append(self.google_search_tool)
+        elif self._tools:
+            tools.append(self._create_function_declarations_tool())
+        else:
+            # Tools would have to be part of the cache, only plain requests use context caching
+            cached_content, final_messages = self.context_cache.apply(self.model_tag, final_messages)
 
         return {
             "model_name": self.model_tag,
             "contents": final_messages,
             "tools": tools,
+            "cached_content": cached_content,
             "config": {"response_modalities": ["TEXT"]},
         }
 
+    def _create_function_declarations_tool(self):
+        from google.genai.types import FunctionDeclaration, Schema, Tool
+
+        return Tool(
+            function_declarations=[
+                FunctionDeclaration(
+                    name=tool.name, description=tool.description, parameters=Schema.model_validate(_to_gemini_schema(tool.parameters))
+                )
+                for tool in self._tools
+            ]
+        )
+
     def handle_url_message(self, url: str, author: str, message_id: int):
         return self._default_handle_url_message(url, author, message_id)
 
@@ -121,38 +157,47 @@ class Gemini2RequestBuilder(RequestBuilder):
 
     def handle_image_url_message(self, url: str, author: str, message_id: int):
         image_data = self._get_url_image_content(url, message_id)
+        if image_data is None:
+            return
         base64_image = b64encode(image_data).decode("utf-8")
         self._add_part({"mime_type": "image/jpeg", "data": base64_image}, author)
 
-    def _get_file_hash(self, file_path: str):
-        import hashlib
-
-        return hashlib.md5(open(file_path, "rb").read()).hexdigest()
-
-    def _upload_file(self, file_path: str):
-        file_hash = self._get_file_hash(file_path)
-        if file_path in self.uploaded_files and self.uploaded_files[file_path]["hash"] == file_hash:
-            return self.uploaded_files[file_path]["uploaded_file"]
-
-        uploaded_file = self.google_client.files.upload(path=file_path)
-        self.uploaded_files[file_path] = {
-            "uploaded_file": uploaded_file,
-            "hash": file_hash,
-        }
-        return uploaded_file
+    def _prepare_attachments(self, messages: Sequence[Message]):
+        """Media and PDFs are uploaded to the Files API instead of being inlined, start all the uploads at once."""
+        inlined_messages = []
+        for message in messages:
+            upload_path = self._get_upload_path(message)
+            if upload_path:
+                self.upload_registry.submit(upload_path)
+            else:
+                inlined_messages.append(message)
+        super()._prepare_attachments(inlined_messages)
+
+    def _get_upload_path(self, message: Message) -> str | None:
+        if isinstance(message, ImageMessage):
+            return message.image_path
+        if isinstance(message, AudioFileMessage):
+            return message.audio_filepath
+        if isinstance(message, VideoMessage):
+            return message.video_filepath
+        if isinstance(message, EmbeddedPDFMessage):
+            return self._get_pdf_upload_path(message.pdf_filepath, message.pages)
+        return None
+
+    def _get_pdf_upload_path(self, pdf_path: str, pages: list[int] | None) -> str:
+        extracted_pdf_key = (pdf_path, tuple(pages or ()))
+        if extracted_pdf_key not in self.extracted_pdfs:
+            # Extract specified pages if pages are provided
+            self.extracted_pdfs[extracted_pdf_key] = self._extract_pages_from_pdf(pdf_path, pages) if pages else pdf_path
+        return self.extracted_pdfs[extracted_pdf_key]
 
-    # def _get_uploaded_file_status(self, uploaded_file):
-    #     recent_file = self.google_client.files.get(name=uploaded_file.name)
-    #     return recent_file.state
+    def _upload_file(self, file_path: str) -> UploadedFileRecord:
+        return self.upload_registry.get(file_path)
 
-    # def _wait_for_uploaded_files(self):
-    #     for file_path, uploaded_file_details in self.uploaded_files.items():
-    #         current_status = self._get_uploaded_file_status(uploaded_file_details["uploaded_file"])
-    #         while current_status == 'PROCESSING':
-    #             self.notifications_printer.print_info(f"Waiting for file {file_path} to be processed...")
-    #             time.sleep(0.5)
-    #             current_status = self._get_uploaded_file_status(uploaded_file_details["uploaded_file"])
-    #         print(f"File {file_path} processed, status: {current_status}")
+    def _wait_for_uploaded_files(self):
+        """Files that are still being processed by Gemini can't be used yet, wait for the background polling to finish."""
+        for record in self.upload_registry.wait_until_ready():
+            self.notifications_printer.print_error(f"Uploaded file {record.name} is not usable, its state is {record.state}")
 
     def handle_audio_file_message(self, audio_path: str, author: str, message_id: int):
         from google.genai.types import Part
@@ -171,15 +216,18 @@ class Gemini2RequestBuilder(RequestBuilder):
     def handle_embedded_pdf_message(self, pdf_path: str, pages: list[int], author: str, message_id: int):
         from google.genai.types import Part
 
-        extracted_pdf_key = (pdf_path, tuple(pages))
-        if extracted_pdf_key in self.extracted_pdfs:
-            pdf_path = self.extracted_pdfs[extracted_pdf_key]
-        else:
-            # Extract specified pages if pages are provided
-            if pages:
-                pdf_path = self._extract_pages_from_pdf(pdf_path, pages)
-            self.extracted_pdfs[extracted_pdf_key] = pdf_path
-
-        uploaded_file = self._upload_file(pdf_path)
+        uploaded_file = self._upload_file(self._get_pdf_upload_path(pdf_path, pages))
         uploaded_file = Part.from_uri(file_uri=uploaded_file.uri, mime_type=uploaded_file.mime_type)
         self._add_part(uploaded_file, author)
+
+
+def _to_gemini_schema(schema: dict) -> dict:
+    """Gemini takes an OpenAPI subset of the JSON schema, with the types in uppercase"""
+    converted = {key: value for key, value in schema.items() if key not in ("type", "properties", "items")}
+    if "type" in schema:
+        converted["type"] = schema["type"].upper()
+    if "properties" in schema:
+        converted["properties"] = {name: _to_gemini_schema(value) for name, value in schema["properties"].items()}
+    if "items" in schema:
+        converted["items"] = _to_gemini_schema(schema["items"])
+    return converted
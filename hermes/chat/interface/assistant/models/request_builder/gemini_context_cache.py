@@ -0,0 +1,117 @@
+import hashlib
+import logging
+import threading
+import time
+import typing
+from dataclasses import dataclass
+
+from hermes.chat.interface.assistant.models.chat_models.retry_policy import get_error_status_code, is_retryable_error
+
+if typing.TYPE_CHECKING:
+    from google.genai import Client
+    from google.genai.types import Content
+
+logger = logging.getLogger(__name__)
+
+# Explicit caches below the provider minimum are rejected, and small prefixes are cheap to resend anyway
+MIN_UNCACHED_PREFIX_TOKENS = 32_768
+ESTIMATED_TOKENS_PER_FILE_PART = 1_000
+CACHE_TTL_SECONDS = 3600
+# Don't reuse a cache that is about to expire in the middle of a request
+EXPIRY_SAFETY_MARGIN_SECONDS = 120
+# After a transient failure (5xx, timeout, throttling) the caches aren't created for a while, then it's tried again
+FAILED_CREATE_BACKOFF_SECONDS = 300
+
+
+@dataclass
+class _CachedPrefix:
+    name: str
+    length: int
+    expires_at: float
+
+
+class GeminiContextCache:
+    """Creates and reuses Gemini cachedContents for the stable prefix of the conversation.
+
+    The prefix is everything except the last turn. Caches are immutable, so while the conversation grows
+    the longest still valid cache is reused, and a new one is created only when the uncached part of the
+    prefix is large enough to be worth it.
+    """
+
+    def __init__(self, google_client: "Client"):
+        self.google_client = google_client
+        self._cached_prefixes: dict[str, _CachedPrefix] = {}
+        self._is_supported = True
+        self._create_after = 0.0
+        self._lock = threading.Lock()
+
+    def apply(self, model_name: str, contents: list["Content"]) -> tuple[str | None, list["Content"]]:
+        """Returns the cached content name to use (if any) and the contents that still have to be sent."""
+        if not self._is_supported or len(contents) < 2:
+            return None, contents
+
+        prefix_hashes = self._compute_prefix_hashes(contents[:-1])
+        cached_prefix = self._find_longest_cached_prefix(prefix_hashes)
+        cached_length = cached_prefix.length if cached_prefix else 0
+
+        if time.time() >= self._create_after and self._estimate_tokens(contents[cached_length:-1]) >= MIN_UNCACHED_PREFIX_TOKENS:
+            cached_prefix = self._create_cache(model_name, contents[:-1], prefix_hashes[-1]) or cached_prefix
+
+        if not cached_prefix:
+            return None, contents
+        return cached_prefix.name, contents[cached_prefix.length :]
+
+    def _compute_prefix_hashes(self, contents: list["Content"]) -> list[str]:
+        prefix_hashes = []
+        hasher = hashlib.sha256()
+        for content in contents:
+            hasher.update(content.model_dump_json(exclude_none=True).encode("utf-8"))
+            prefix_hashes.append(hasher.copy().hexdigest())
+        return prefix_hashes
+
+    def _find_longest_cached_prefix(self, prefix_hashes: list[str]) -> _CachedPrefix | None:
+        now = time.time()
+        with self._lock:
+            for prefix_hash in reversed(prefix_hashes):
+                cached_prefix = self._cached_prefixes.get(prefix_hash)
+                if cached_prefix and cached_prefix.expires_at - EXPIRY_SAFETY_MARGIN_SECONDS > now:
+                    return cached_prefix
+        return None
+
+    def _create_cache(self, model_name: str, contents: list["Content"], prefix_hash: str) -> _CachedPrefix | None:
+        from google.genai.types import CreateCachedContentConfig
+
+        try:
+            cached_content = self.google_client.caches.create(
+                model=model_name,
+                config=CreateCachedContentConfig(contents=[*contents], ttl=f"{CACHE_TTL_SECONDS}s"),
+            )
+        except Exception as e:
+            if _is_unsupported_error(e):
+                # Not all models support explicit caching (or the prefix is below their minimum), don't retry on every turn
+                logger.debug(f"Gemini context caching disabled for {model_name}: {e}")
+                self._is_supported = False
+            else:
+                logger.debug(f"Failed to create a Gemini context cache for {model_name}, retrying later: {e}")
+                self._create_after = time.time() + FAILED_CREATE_BACKOFF_SECONDS
+            return None
+        if not cached_content.name:
+            return None
+
+        cached_prefix = _CachedPrefix(name=cached_content.name, length=len(contents), expires_at=time.time() + CACHE_TTL_SECONDS)
+        with self._lock:
+            self._cached_prefixes[prefix_hash] = cached_prefix
+        return cached_prefix
+
+    def _estimate_tokens(self, contents: list["Content"]) -> int:
+        tokens = 0
+        for content in contents:
+            for part in content.parts or []:
+                tokens += len(part.text) // 4 if part.text else ESTIMATED_TOKENS_PER_FILE_PART
+        return tokens
+
+
+def _is_unsupported_error(error: Exception) -> bool:
+    """Client errors (4xx) other than throttling and timeouts, the same request would fail again"""
+    status_code = get_error_status_code(error)
+    return status_code is not None and 400 <= status_code < 500 and not is_retryable_error(error)
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import typing
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from hermes.utils.config_utils import get_cache_dir_path
+
+if typing.TYPE_CHECKING:
+    from google.genai import Client
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+MAX_PARALLEL_UPLOADS = 4
+POLL_INTERVAL_SECONDS = 0.5
+MAX_PROCESSING_WAIT_SECONDS = 300
+# Don't reuse an upload that would expire in the middle of the conversation turn
+EXPIRY_SAFETY_MARGIN_SECONDS = 10 * 60
+# Gemini keeps uploaded files for 48 hours, used when the response doesn't say
+DEFAULT_FILE_TTL_SECONDS = 48 * 60 * 60
+
+
+def compute_file_hash(file_path: str) -> str:
+    """sha256 of the file, read in chunks so large videos are never fully loaded in memory."""
+    hasher = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+@dataclass
+class UploadedFileRecord:
+    """The remote file backing a local file, as much as needed to reference it in a request"""
+
+    name: str
+    uri: str
+    mime_type: str | None
+    expires_at: float
+    state: str
+
+    @property
+    def is_expired(self) -> bool:
+        return self.expires_at - EXPIRY_SAFETY_MARGIN_SECONDS < time.time()
+
+
+class GeminiUploadRegistry:
+    """Uploads files to the Gemini Files API at most once per content and remembers them across sessions.
+
+    The registry file maps (path, size, mtime) to the content hash, so unchanged files are never rehashed,
+    and the content hash to the remote file (name, uri, expiry, processing state), so identical content is uploaded once,
+    even under another path or after a restart.
+    Uploads run concurrently in a thread pool, and each upload job keeps polling in the background until the file
+    has finished processing. Callers get the record as soon as the file is uploaded and wait for the processing
+    only right before sending the request.
+    """
+
+    def __init__(self, google_client: "Client", registry_path: Path, max_workers: int = MAX_PARALLEL_UPLOADS):
+        self.google_client = google_client
+        self.registry_path = registry_path
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hermes-gemini-upload")
+        # Polling mostly sleeps, it has its own pool so it never delays the uploads
+        self._polling_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hermes-gemini-polling")
+        self._uploads: dict[str, Future] = {}
+        self._readiness: dict[str, tuple[UploadedFileRecord, Future]] = {}
+        self._verified_hashes: set[str] = set()
+        self._lock = threading.RLock()
+        self._file_hashes, self._records = self._load()
+
+    def submit(self, file_path: str) -> Future:
+        """Start uploading the file in the background (no-op if it's already uploaded or uploading)."""
+        file_path = os.path.abspath(file_path)
+        with self._lock:
+            future = self._uploads.get(file_path)
+            if future is None or (future.done() and self._is_outdated(file_path, future)):
+                future = self._executor.submit(self._get_or_upload, file_path)
+                self._uploads[file_path] = future
+            return future
+
+    def get(self, file_path: str) -> UploadedFileRecord:
+        """The remote file for the local file, uploading it if needed. Raises if the upload fails."""
+        return self.submit(file_path).result()
+
+    def wait_until_ready(self) -> list[UploadedFileRecord]:
+        """Wait for the files that are still processing, returns the ones that didn't become active."""
+        with self._lock:
+            pending = [(record, future) for record, future in self._readiness.values() if not future.done()]
+        wait([future for _, future in pending], timeout=MAX_PROCESSING_WAIT_SECONDS)
+        return [record for record, _ in pending if record.state != "ACTIVE"]
+
+    def _is_outdated(self, file_path: str, future: Future) -> bool:
+        if future.exception() is not None:
+            return True
+        try:
+            stat_key = self._get_stat_key(file_path)
+        except OSError:
+            return True
+        return stat_key not in self._file_hashes or future.result().is_expired
+
+    def _get_or_upload(self, file_path: str) -> UploadedFileRecord:
+        file_hash = self._get_file_hash(file_path)
+        with self._lock:
+            record = self._records.get(file_hash)
+        if record and not record.is_expired and self._verify(file_hash, record):
+            return record
+
+        record = self._upload(file_path)
+        with self._lock:
+            self._records[file_hash] = record
+            self._verified_hashes.add(file_hash)
+            self._save()
+        self._track_readiness(record)
+        return record
+
+    def _get_file_hash(self, file_path: str) -> str:
+        stat_key = self._get_stat_key(file_path)
+        with self._lock:
+            file_hash = self._file_hashes.get(stat_key)
+        if file_hash is None:
+            file_hash = compute_file_hash(file_path)
+            with self._lock:
+                self._file_hashes[stat_key] = file_hash
+        return file_hash
+
+    def _get_stat_key(self, file_path: str) -> str:
+        stat = os.stat(file_path)
+        return f"{file_path}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    def _verify(self, file_hash: str, record: UploadedFileRecord) -> bool:
+        """Records from previous sessions are checked once per session, the file could have been deleted remotely."""
+        with self._lock:
+            if file_hash in self._verified_hashes:
+                return True
+        try:
+            remote_file = self.google_client.files.get(name=record.name)
+        except Exception as e:
+            logger.debug(f"Uploaded file {record.name} is no longer available, uploading again: {e}")
+            return False
+        record.state = self._get_state_name(remote_file.state)
+        with self._lock:
+            self._verified_hashes.add(file_hash)
+        self._track_readiness(record)
+        return record.state != "FAILED"
+
+    def _upload(self, file_path: str) -> UploadedFileRecord:
+        uploaded_file = self.google_client.files.upload(file=file_path)
+        if not uploaded_file.name or not uploaded_file.uri:
+            raise ValueError(f"Gemini returned no reference for the uploaded file {file_path}")
+        expiration_time = uploaded_file.expiration_time
+        return UploadedFileRecord(
+            name=uploaded_file.name,
+            uri=uploaded_file.uri,
+            mime_type=uploaded_file.mime_type,
+            expires_at=expiration_time.timestamp() if expiration_time else time.time() + DEFAULT_FILE_TTL_SECONDS,
+            state=self._get_state_name(uploaded_file.state),
+        )
+
+    def _track_readiness(self, record: UploadedFileRecord):
+        if record.state != "PROCESSING":
+            return
+        with self._lock:
+            if record.name not in self._readiness or self._readiness[record.name][1].done():
+                self._readiness[record.name] = record, self._polling_executor.submit(self._poll_until_processed, record)
+
+    def _poll_until_processed(self, record: UploadedFileRecord):
+        deadline = time.time() + MAX_PROCESSING_WAIT_SECONDS
+        while record.state == "PROCESSING" and time.time() < deadline:
+            time.sleep(POLL_INTERVAL_SECONDS)
+            try:
+                record.state = self._get_state_name(self.google_client.files.get(name=record.name).state)
+            except Exception as e:
+                logger.debug(f"Failed to check the processing state of {record.name}: {e}")
+        with self._lock:
+            self._save()
+
+    def _get_state_name(self, state) -> str:
+        state = getattr(state, "value", state)
+        return str(state) if state else "ACTIVE"
+
+    def _load(self) -> tuple[dict[str, str], dict[str, UploadedFileRecord]]:
+        try:
+            data = json.loads(self.registry_path.read_text())
+            records = {file_hash: UploadedFileRecord(**record) for file_hash, record in data["uploads"].items()}
+            return data["files"], records
+        except FileNotFoundError:
+            return {}, {}
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logger.debug(f"Ignoring unreadable Gemini upload registry {self.registry_path}: {e}")
+            return {}, {}
+
+    def _save(self):
+        """Persist the registry, dropping expired uploads and the hashes that are not used by any upload anymore."""
+        self._records = {file_hash: record for file_hash, record in self._records.items() if not record.is_expired}
+        self._file_hashes = {key: file_hash for key, file_hash in self._file_hashes.items() if file_hash in self._records}
+        data = {"files": self._file_hashes, "uploads": {file_hash: asdict(record) for file_hash, record in self._records.items()}}
+        try:
+            self.registry_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", dir=self.registry_path.parent, delete=False) as temp_file:
+                json.dump(data, temp_file)
+            os.replace(temp_file.name, self.registry_path)
+        except OSError as e:
+            logger.debug(f"Failed to save the Gemini upload registry {self.registry_path}: {e}")
+
+
+_shared_registry: GeminiUploadRegistry | None = None
+_shared_registry_lock = threading.Lock()
+
+
+def get_shared_gemini_upload_registry(google_client: "Client") -> GeminiUploadRegistry:
+    """The process-wide registry, so all Gemini models reuse the same uploads and write the registry file from one place."""
+    global _shared_registry
+    with _shared_registry_lock:
+        if _shared_registry is None:
+            _shared_registry = GeminiUploadRegistry(google_client, get_cache_dir_path() / "gemini_uploads.json")
+        return _shared_registry
@@ -0,0 +1,167 @@
+import base64
+import hashlib
+import io
+import logging
+import threading
+from dataclasses import dataclass
+from functools import cached_property
+
+from hermes.utils.config_utils import get_cache_dir_path
+from hermes.utils.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+MAX_DISK_BYTES = 512 * 1024 * 1024
+MAX_MEMORY_BYTES = 64 * 1024 * 1024
+
+JPEG_QUALITY = 85
+# Images with at most this many colors (screenshots, diagrams) stay lossless, compression artifacts hurt text legibility
+MAX_LOSSLESS_COLORS = 256
+MEDIA_TYPE_SEPARATOR = b"\n"
+# The formats all the providers accept, other originals are always converted
+UPLOADABLE_MEDIA_TYPES = ("image/png", "image/jpeg", "image/gif", "image/webp")
+
+
+@dataclass(frozen=True)
+class ImageLimits:
+    """The largest image a provider uses as is, bigger images are downscaled on the provider side anyway"""
+
+    max_long_edge: int
+    max_short_edge: int | None = None
+    max_pixels: int | None = None
+
+
+# ~1.15 megapixels, at most 1568px on the long edge
+CLAUDE_IMAGE_LIMITS = ImageLimits(max_long_edge=1568, max_pixels=1_150_000)
+# High detail images are fitted in 2048x2048, then scaled so that the short edge is at most 768px
+OPENAI_IMAGE_LIMITS = ImageLimits(max_long_edge=2048, max_short_edge=768)
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    data: bytes
+    media_type: str
+
+    @property
+    def format(self) -> str:
+        return self.media_type.split("/", 1)[1]
+
+    @cached_property
+    def base64(self) -> str:
+        return base64.b64encode(self.data).decode("ascii")
+
+
+class ImagePreprocessor:
+    """Downscale images to the provider limits, strip their metadata and recompress them before they are uploaded.
+
+    Screenshots and images with transparency are kept as optimized PNGs, photos are converted to JPEG.
+    Results are cached by the hash of the original content and the limits, so the same image is processed once.
+    Pillow comes with the `images` extra, without it (or for images it can't read, or animations) the original bytes are sent.
+    """
+
+    def __init__(self, disk_cache: DiskCache):
+        self._disk_cache = disk_cache
+
+    @cached_property
+    def _has_pillow(self) -> bool:
+        """Checked on the first image, so the missing package is reported once and only when it matters"""
+        return _is_pillow_installed()
+
+    def prepare(self, data: bytes, media_type: str, limits: ImageLimits) -> PreparedImage:
+        key = f"{hashlib.sha256(data).hexdigest()}|{limits.max_long_edge}|{limits.max_short_edge}|{limits.max_pixels}"
+        cached_value = self._disk_cache.get(key)
+        if cached_value is not None:
+            cached_media_type, _, cached_data = cached_value.partition(MEDIA_TYPE_SEPARATOR)
+            return PreparedImage(cached_data, cached_media_type.decode("ascii"))
+
+        prepared = self._process(data, limits) or PreparedImage(data, media_type)
+        self._disk_cache.set(key, prepared.media_type.encode("ascii") + MEDIA_TYPE_SEPARATOR + prepared.data)
+        return prepared
+
+    def _process(self, data: bytes, limits: ImageLimits) -> PreparedImage | None:
+        if not self._has_pillow:
+            return None
+        from PIL import Image
+
+        try:
+            return _process_image(data, limits)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            logger.debug(f"Failed to preprocess the image, sending it as it is: {e}")
+            return None
+
+
+def _is_pillow_installed() -> bool:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        logger.warning("Pillow isn't installed (the images extra), images are sent without downscaling or recompression")
+        return False
+    return True
+
+
+def _process_image(data: bytes, limits: ImageLimits) -> PreparedImage | None:
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as image:
+        if getattr(image, "is_animated", False):
+            return None
+        # The orientation is in the EXIF metadata, which is dropped
+        processed = ImageOps.exif_transpose(image)
+        target_size = get_target_size(processed.size, limits)
+        if target_size != processed.size:
+            processed = processed.resize(target_size, Image.Resampling.LANCZOS)
+        prepared = _encode(processed)
+        original_media_type = Image.MIME.get(image.format or "")
+        # Originals with metadata are always re-encoded, to strip it
+        is_original_usable = original_media_type in UPLOADABLE_MEDIA_TYPES and target_size == image.size and not image.getexif()
+
+    if original_media_type and is_original_usable and len(prepared.data) >= len(data):
+        # Re-encoding didn't help, the original is already compact
+        return PreparedImage(data, original_media_type)
+    return prepared
+
+
+def get_target_size(size: tuple[int, int], limits: ImageLimits) -> tuple[int, int]:
+    """The size of the image scaled down (never up) to fit the limits, keeping its aspect ratio"""
+    width, height = size
+    scale = min(1.0, limits.max_long_edge / max(width, height))
+    if limits.max_short_edge:
+        scale = min(scale, limits.max_short_edge / min(width, height))
+    if limits.max_pixels:
+        scale = min(scale, (limits.max_pixels / (width * height)) ** 0.5)
+    if scale >= 1.0:
+        return size
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def _encode(image) -> PreparedImage:
+    output = io.BytesIO()
+    if _needs_lossless(image):
+        if image.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+            image = image.convert("RGBA")
+        image.save(output, format="PNG", optimize=True)
+        return PreparedImage(output.getvalue(), "image/png")
+    image.convert("RGB").save(output, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+    return PreparedImage(output.getvalue(), "image/jpeg")
+
+
+def _needs_lossless(image) -> bool:
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        return True
+    if image.mode in ("P", "1"):
+        return True
+    return image.getcolors(MAX_LOSSLESS_COLORS) is not None
+
+
+_shared_preprocessor: ImagePreprocessor | None = None
+_shared_preprocessor_lock = threading.Lock()
+
+
+def get_shared_image_preprocessor() -> ImagePreprocessor:
+    """The process-wide image preprocessor, so all models and builders reuse the processed images"""
+    global _shared_preprocessor
+    with _shared_preprocessor_lock:
+        if _shared_preprocessor is None:
+            disk_cache = DiskCache(get_cache_dir_path() / "images", MAX_DISK_BYTES, MAX_MEMORY_BYTES)
+            _shared_preprocessor = ImagePreprocessor(disk_cache)
+        return _shared_preprocessor
@@ -0,0 +1,155 @@
+import logging
+import os
+import threading
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from hermes.chat.interface.assistant.models.request_builder.attachment_cache import (
+    AttachmentCache,
+    get_shared_attachment_cache,
+    read_attachment_bytes,
+)
+from hermes.chat.interface.assistant.models.request_builder.url_content_cache import (
+    UrlContentCache,
+    get_shared_url_content_cache,
+    normalize_url,
+)
+from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
+from hermes.chat.messages import EmbeddedPDFMessage, ImageMessage, ImageUrlMessage, Message, TextualFileMessage, UrlMessage
+from hermes.utils.file_reader import FileReader
+
+logger = logging.getLogger(__name__)
+
+# Attachments are mostly network and disk bound, a few more threads than cores is fine
+DEFAULT_MAX_WORKERS = 16
+
+
+class AttachmentIngestionPipeline:
+    """Prepares attachments in a thread pool as soon as they are added to the conversation.
+
+    Preparing means warming the shared caches: fetching and converting URLs, reading textual files,
+    reading images, extracting PDF pages and encoding PDFs. When the request is built, the handlers only read cached results,
+    so attaching many URLs costs about as much as the slowest one.
+    Jobs are deduplicated while in flight, a request built before a job has finished waits for it instead of redoing the work.
+    Failures are left to the request builder, which redoes the failed job and reports the error as before.
+    """
+
+    def __init__(
+        self,
+        url_content_cache: UrlContentCache,
+        attachment_cache: AttachmentCache,
+        notifications_printer: CLINotificationsPrinter,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ):
+        self._url_content_cache = url_content_cache
+        self._attachment_cache = attachment_cache
+        self._notifications_printer = notifications_printer
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hermes-ingestion")
+        self._in_flight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, message: Message) -> Future | None:
+        """Start preparing the message's attachment in the background. Returns None if there is nothing to prepare."""
+        job = self._get_job(message)
+        if job is None:
+            return None
+        job_key, prepare = job
+
+        with self._lock:
+            future = self._in_flight.get(job_key)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._run_job, job_key, prepare)
+            self._in_flight[job_key] = future
+        future.add_done_callback(lambda _: self._forget(job_key))
+        return future
+
+    def collect(self, messages: Sequence[Message]):
+        """Prepare the attachments of all the messages (reusing already running jobs) and wait until they are done."""
+        futures = [future for future in (self.submit(message) for message in messages) if future is not None]
+        if futures:
+            wait(futures)
+
+    def _run_job(self, job_key: str, prepare: Callable[[], object]):
+        try:
+            prepare()
+        except Exception as e:
+            logger.debug(f"Background preparation of {job_key} failed: {e}")
+
+    def _forget(self, job_key: str):
+        with self._lock:
+            self._in_flight.pop(job_key, None)
+
+    def _get_job(self, message: Message) -> tuple[str, Callable[[], object]] | None:
+        if isinstance(message, UrlMessage | ImageUrlMessage):
+            return self._get_url_job(message)
+        if isinstance(message, ImageMessage):
+            return self._get_image_job(message)
+        if isinstance(message, EmbeddedPDFMessage):
+            return self._get_base64_job(message)
+        if isinstance(message, TextualFileMessage):
+            return self._get_textual_file_job(message)
+        return None
+
+    def _get_url_job(self, message: UrlMessage | ImageUrlMessage) -> tuple[str, Callable[[], object]]:
+        if isinstance(message, UrlMessage):
+            url = message.url
+            return f"markdown|{normalize_url(url)}", lambda: self._url_content_cache.get_markdown(url)
+        url = message.image_url
+        return f"raw|{normalize_url(url)}", lambda: self._url_content_cache.get_bytes(url)
+
+    def _get_image_job(self, message: ImageMessage) -> tuple[str, Callable[[], object]] | None:
+        file_path = message.image_path
+        if not os.path.isfile(file_path):
+            return None
+
+        def prepare():
+            # The request builders downscale and recompress the raw image for their provider, see ImagePreprocessor
+            return self._attachment_cache.get_bytes(
+                file_path, None, lambda: read_attachment_bytes(file_path, None, self._notifications_printer)
+            )
+
+        return f"raw|{os.path.abspath(file_path)}", prepare
+
+    def _get_base64_job(self, message: EmbeddedPDFMessage) -> tuple[str, Callable[[], object]] | None:
+        file_path, pages = message.pdf_filepath, message.pages
+        if not os.path.isfile(file_path):
+            return None
+
+        def prepare():
+            return self._attachment_cache.get_base64(
+                file_path, pages, lambda: read_attachment_bytes(file_path, pages, self._notifications_printer)
+            )
+
+        pages_marker = ",".join(str(page) for page in pages or [])
+        return f"base64|{os.path.abspath(file_path)}|{pages_marker}", prepare
+
+    def _get_textual_file_job(self, message: TextualFileMessage) -> tuple[str, Callable[[], object]] | None:
+        file_path = message.text_filepath
+        # Directories are read file by file while building the request, their content is too volatile to prepare ahead
+        if message.textual_content or not file_path or not os.path.isfile(file_path):
+            return None
+
+        def prepare():
+            return self._attachment_cache.get_text(file_path, lambda: FileReader.read_file(file_path))
+
+        return f"text|{os.path.abspath(file_path)}", prepare
+
+
+_shared_pipeline: AttachmentIngestionPipeline | None = None
+_shared_pipeline_lock = threading.Lock()
+
+
+def get_shared_ingestion_pipeline(notifications_printer: CLINotificationsPrinter) -> AttachmentIngestionPipeline:
+    """The process-wide ingestion pipeline, shared by the user control panel (which feeds it) and the request builders."""
+    global _shared_pipeline
+    with _shared_pipeline_lock:
+        if _shared_pipeline is None:
+            from hermes.chat.interface.assistant.models.request_builder.base import HEADERS
+
+            _shared_pipeline = AttachmentIngestionPipeline(
+                url_content_cache=get_shared_url_content_cache(HEADERS),
+                attachment_cache=get_shared_attachment_cache(),
+                notifications_printer=notifications_printer,
+            )
+        return _shared_pipeline
@@ -1,19 +1,24 @@
-from base64 import b64encode
+from datetime import datetime
 from typing import Any
 
 from hermes.chat.interface.assistant.models.request_builder.all_messages_aggregator import (
     AllMessagesAggregator,
 )
-from hermes.chat.interface.assistant.models.request_builder.base import RequestBuilder
+from hermes.chat.interface.assistant.models.request_builder.base import RequestBuilder, RequestBuilderCaches
+from hermes.chat.interface.assistant.models.request_builder.context_window import TokenEstimator, get_openai_token_estimator
+from hermes.chat.interface.assistant.models.request_builder.image_preprocessing import OPENAI_IMAGE_LIMITS
 from hermes.chat.interface.assistant.models.request_builder.text_messages_aggregator import (
     TextMessagesAggregator,
 )
-from hermes.utils.file_extension import get_file_extension
 
 
 class OpenAIRequestBuilder(RequestBuilder):
-    def __init__(self, model_tag: str, notifications_printer: Any, prompt_builder_factory: Any):
-        super().__init__(model_tag, notifications_printer, prompt_builder_factory)
+    compilation_state_attributes = ("text_messages_aggregator", "all_messages_aggregator")
+    image_limits = OPENAI_IMAGE_LIMITS
+    supports_native_tools = True
+
+    def __init__(self, model_tag: str, notifications_printer: Any, prompt_builder_factory: Any, caches: RequestBuilderCaches | None = None):
+        super().__init__(model_tag, notifications_printer, prompt_builder_factory, caches)
         self.reasoning_effort = None
 
     def initialize_request(self):
@@ -23,6 +28,9 @@ class OpenAIRequestBuilder(RequestBuilder):
     def set_reasoning_effort(self, level: int):
         self.reasoning_effort = level
 
+    def _create_token_estimator(self) -> TokenEstimator:
+        return get_openai_token_estimator(self.model_tag)
+
     def _add_content(self, content: dict, author: str):
         self.all_messages_aggregator.add_message(content, author)
 
@@ -41,6 +49,7 @@ class OpenAIRequestBuilder(RequestBuilder):
         message_id: int,
         name: str | None = None,
         text_role: str | None = None,
+        timestamp: datetime | None = None,
     ):
         if self.text_messages_aggregator.get_current_author() != author and not self.text_messages_aggregator.is_empty():
             self._flush_text_messages()
@@ -50,26 +59,20 @@ class OpenAIRequestBuilder(RequestBuilder):
             message_id=message_id,
             name=name,
             text_role=text_role,
+            timestamp=timestamp,
         )
 
     def handle_image_message(self, image_path: str, author: str, message_id: int):
-        base64_image = self._get_base64_image(image_path)
+        image = self._get_prepared_image(image_path)
 
         self._add_content(
             {
                 "type": "image_url",
-                "image_url": {"url": f"data:image/{self._get_extension(image_path)};base64,{base64_image}"},
+                "image_url": {"url": f"data:{image.media_type};base64,{image.base64}"},
             },
             author,
         )
 
-    def _get_base64_image(self, image_path: str) -> str:
-        with open(image_path, "rb") as image_file:
-            return b64encode(image_file.read()).decode("utf-8")
-
-    def _get_extension(self, image_path: str) -> str:
-        return get_file_extension(image_path)
-
     def handle_image_url_message(self, url: str, author: str, message_id: int):
         self._add_content({"type": "image_url", "image_url": {"url": url}}, author)
 
@@ -106,4 +109,9 @@ class OpenAIRequestBuilder(RequestBuilder):
             self.model_tag in ["o1", "o3-mini"] or self.model_tag.endswith("/o1") or self.model_tag.endswith("/o3-mini")
         ):
             request["reasoning_effort"] = self.reasoning_effort
+        if self._tools:
+            request["tools"] = [
+                {"type": "function", "function": {"name": tool.name, "description": tool.description, "parameters": tool.parameters}}
+                for tool in self._tools
+            ]
         return request
@@ -0,0 +1,44 @@
+from typing import Any
+
+from hermes.chat.interface.assistant.models.request_builder.openai import OpenAIRequestBuilder
+
+
+class OpenAIResponsesRequestBuilder(OpenAIRequestBuilder):
+    """Builds requests for the Responses API, the messages are compiled as for chat completions and converted to input items.
+
+    The request always holds the full conversation in `input`, OpenAIResponsesModel decides how much of it is sent.
+    """
+
+    def compile_request(self) -> dict:
+        chat_request = super().compile_request()
+        request = {
+            "model": chat_request["model"],
+            "input": [_to_input_item(message) for message in chat_request["messages"]],
+            "stream": True,
+            # Stored responses can be continued with previous_response_id
+            "store": True,
+        }
+        if "reasoning_effort" in chat_request:
+            request["reasoning"] = {"effort": chat_request["reasoning_effort"]}
+        if self._tools:
+            request["tools"] = [
+                {"type": "function", "name": tool.name, "description": tool.description, "parameters": tool.parameters}
+                for tool in self._tools
+            ]
+        return request
+
+
+def _to_input_item(message: dict) -> dict:
+    content = message["content"]
+    if isinstance(content, str):
+        return {"role": message["role"], "content": content}
+    if message["role"] == "assistant":
+        # The outputs of the assistant can only be text
+        return {"role": "assistant", "content": "\n\n".join(part["text"] for part in content if part["type"] == "text")}
+    return {"role": message["role"], "content": [_to_input_content(part) for part in content]}
+
+
+def _to_input_content(part: dict) -> dict[str, Any]:
+    if part["type"] == "image_url":
+        return {"type": "input_image", "image_url": part["image_url"]["url"], "detail": "auto"}
+    return {"type": "input_text", "text": part["text"]}
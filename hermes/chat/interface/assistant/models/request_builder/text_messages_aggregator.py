@@ -16,6 +16,7 @@ class TextMessagesAggregator:
         message_id: int,
         name: str | None = None,
         text_role: str | None = None,
+        timestamp: datetime | None = None,
     ):
         if message:
             msg = {"role": author, "content": message}
@@ -23,9 +24,8 @@ class TextMessagesAggregator:
                 msg["name"] = name
             if text_role:
                 msg["text_role"] = text_role
-            if author == "user":
-                current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                msg["content"] = f"[{current_time}] {msg['content']}"
+            if author == "user" and timestamp:
+                msg["content"] = f"[{timestamp.strftime('%Y-%m-%d %H:%M:%S')}] {msg['content']}"
             self.messages.append(msg)
 
     def get_current_author(self) -> str | None:
@@ -55,3 +55,9 @@ class TextMessagesAggregator:
 
     def clear(self):
         self.messages = []
+
+    def get_state(self) -> tuple:
+        return tuple(self.messages)
+
+    def restore_state(self, state: tuple):
+        self.messages = list(state)
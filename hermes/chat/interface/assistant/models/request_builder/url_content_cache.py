@@ -0,0 +1,176 @@
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from hermes.utils.config_utils import get_cache_dir_path
+from hermes.utils.disk_cache import DiskCache
+from hermes.utils.http_transport import get_shared_http_transport
+
+logger = logging.getLogger(__name__)
+
+MAX_DISK_BYTES = 512 * 1024 * 1024
+MAX_MEMORY_BYTES = 64 * 1024 * 1024
+# Within the TTL the cached content is used as is, after it the entry is revalidated with a conditional GET
+FRESHNESS_TTL_SECONDS = 60 * 60
+# Failed fetches aren't retried within this TTL, so unreachable URLs don't cost a timeout on every rebuild
+FAILURE_TTL_SECONDS = 5 * 60
+REQUEST_TIMEOUT_SECONDS = 30
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """Normalize the URL for cache lookups: lowercase scheme and host, no default port, no fragment, sorted query."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{parts.port}"
+    if parts.username:
+        netloc = f"{parts.username}@{netloc}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+@dataclass
+class _CacheEntryMetadata:
+    fetched_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class UrlContentCache:
+    """Disk-backed cache of fetched URLs, shared by all request builders.
+
+    Webpages are stored already converted to markdown, images as raw bytes.
+    Entries are keyed by the normalized URL, so new messages, `open_url` and restarts reuse them.
+    Stale entries are revalidated with ETag/Last-Modified, a 304 response costs no download and no conversion.
+    Failed fetches are remembered in memory for FAILURE_TTL_SECONDS, the stale content (or the error) is served meanwhile.
+    """
+
+    def __init__(self, disk_cache: DiskCache, headers: dict[str, str]):
+        self._disk_cache = disk_cache
+        self._headers = headers
+        self._session = None
+        self._markitdown = None
+        self._failures: dict[str, tuple[float, Exception]] = {}
+        self._lock = threading.Lock()
+
+    def get_markdown(self, url: str) -> str:
+        """Markdown content of the webpage. Raises if the URL can't be fetched and nothing is cached."""
+        content = self._get("markdown", url, self._convert_to_markdown)
+        return content.decode("utf-8")
+
+    def get_bytes(self, url: str) -> bytes:
+        """Raw content of the URL, used for images. Raises if the URL can't be fetched and nothing is cached."""
+        return self._get("raw", url, lambda response: response.content)
+
+    def _get(self, kind: str, url: str, convert) -> bytes:
+        key = f"{kind}|{normalize_url(url)}"
+        cached = self._load_entry(key)
+        if cached and time.time() - cached[0].fetched_at < FRESHNESS_TTL_SECONDS:
+            return cached[1]
+
+        error = self._get_recent_failure(key)
+        if error is None:
+            try:
+                return self._fetch_and_store(key, url, cached, convert)
+            except Exception as e:
+                error = e
+                with self._lock:
+                    self._failures[key] = (time.time(), e)
+        if cached is None:
+            raise error
+        logger.debug(f"Failed to revalidate {url}, using the cached content: {error}")
+        return cached[1]
+
+    def _get_recent_failure(self, key: str) -> Exception | None:
+        with self._lock:
+            failure = self._failures.get(key)
+            if failure is None:
+                return None
+            if time.time() - failure[0] >= FAILURE_TTL_SECONDS:
+                del self._failures[key]
+                return None
+            return failure[1]
+
+    def _fetch_and_store(self, key: str, url: str, cached: tuple[_CacheEntryMetadata, bytes] | None, convert) -> bytes:
+        response = self._get_session().get(
+            url,
+            headers={**self._headers, **self._get_conditional_headers(cached)},
+            timeout=REQUEST_TIMEOUT_SECONDS,
+        )
+        if response.status_code == 304 and cached:
+            metadata, content = cached
+            metadata.fetched_at = time.time()
+            self._store_entry(key, metadata, content)
+            return content
+
+        response.raise_for_status()
+        content = convert(response)
+        metadata = _CacheEntryMetadata(
+            fetched_at=time.time(),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        self._store_entry(key, metadata, content)
+        return content
+
+    def _get_conditional_headers(self, cached: tuple[_CacheEntryMetadata, bytes] | None) -> dict[str, str]:
+        if not cached:
+            return {}
+        headers = {}
+        if cached[0].etag:
+            headers["If-None-Match"] = cached[0].etag
+        if cached[0].last_modified:
+            headers["If-Modified-Since"] = cached[0].last_modified
+        return headers
+
+    def _convert_to_markdown(self, response) -> bytes:
+        markdown_content = self._get_markitdown().convert(response).text_content
+        return (markdown_content or "").encode("utf-8")
+
+    def _load_entry(self, key: str) -> tuple[_CacheEntryMetadata, bytes] | None:
+        """Entries are stored as a JSON metadata line followed by the content."""
+        value = self._disk_cache.get(key)
+        if value is None:
+            return None
+        raw_metadata, _, content = value.partition(b"\n")
+        try:
+            return _CacheEntryMetadata(**json.loads(raw_metadata)), content
+        except (ValueError, TypeError):
+            self._disk_cache.delete(key)
+            return None
+
+    def _store_entry(self, key: str, metadata: _CacheEntryMetadata, content: bytes):
+        self._disk_cache.set(key, json.dumps(asdict(metadata)).encode("utf-8") + b"\n" + content)
+
+    def _get_session(self):
+        with self._lock:
+            if self._session is None:
+                self._session = get_shared_http_transport().get_session()
+            return self._session
+
+    def _get_markitdown(self):
+        with self._lock:
+            if self._markitdown is None:
+                from markitdown import MarkItDown
+
+                self._markitdown = MarkItDown()
+            return self._markitdown
+
+
+_shared_cache: UrlContentCache | None = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_url_content_cache(headers: dict[str, str]) -> UrlContentCache:
+    """The process-wide URL cache, so all models and builders reuse fetched pages and the pooled session."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            disk_cache = DiskCache(get_cache_dir_path() / "urls", MAX_DISK_BYTES, MAX_MEMORY_BYTES)
+            _shared_cache = UrlContentCache(disk_cache, headers)
+        return _shared_cache
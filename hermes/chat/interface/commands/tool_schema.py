@@ -0,0 +1,97 @@
+import json
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from .command import Command, CommandSection
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ToolDefinition:
+    """A command exposed as a provider-native tool, the request builders convert it to the provider's format"""
+
+    name: str
+    description: str
+    # JSON schema of the arguments, one string property per section (an array of strings if it allows multiple)
+    parameters: dict[str, Any]
+
+
+def build_tool_definition(command: Command[Any, Any]) -> ToolDefinition:
+    properties = {}
+    for section in command.sections:
+        string_schema = {"type": "string", "description": section.help_text or f"The {section.name}"}
+        properties[section.name] = {"type": "array", "items": string_schema} if section.allow_multiple else string_schema
+    parameters = {"type": "object", "properties": properties, "required": command.get_required_sections()}
+    return ToolDefinition(command.name, command.help_text or command.name, parameters)
+
+
+def build_tool_definitions(commands: Iterable[Command[Any, Any]]) -> list[ToolDefinition]:
+    return [build_tool_definition(command) for command in sorted(commands, key=lambda command: command.name)]
+
+
+def decode_tool_arguments(raw_arguments: str | None) -> dict[str, Any]:
+    """The arguments of a streamed tool call, providers send them as a JSON string"""
+    if not raw_arguments:
+        return {}
+    try:
+        arguments = json.loads(raw_arguments)
+    except json.JSONDecodeError:
+        logger.warning(f"Received tool call arguments that are not valid JSON: {raw_arguments[:200]}")
+        return {}
+    return arguments if isinstance(arguments, dict) else {}
+
+
+def build_command_args(command: Command[Any, Any], arguments: dict[str, Any]) -> tuple[dict[str, Any], list[str]]:
+    """The args of the command from the arguments of a tool call, with the same checks as the text parser.
+
+    Returns:
+        The transformed args, and the error messages (the command shouldn't be executed if there are any).
+    """
+    args: dict[str, Any] = {}
+    errors: list[str] = []
+    sections = {section.name: section for section in command.sections}
+    for name, value in arguments.items():
+        section = sections.get(name)
+        if section is None:
+            errors.append(f"Unknown section '{name}' for command '{command.name}'.")
+            continue
+        error = _add_section_value(args, section, value)
+        if error:
+            errors.append(error)
+    if errors:
+        return args, errors
+    return _transform_and_validate(command, args)
+
+
+def _transform_and_validate(command: Command[Any, Any], args: dict[str, Any]) -> tuple[dict[str, Any], list[str]]:
+    try:
+        args = command.transform_args(args)
+    except Exception as e:
+        return args, [f"Error during argument transformation: {e}"]
+    return args, command.validate(args)
+
+
+def _add_section_value(args: dict[str, Any], section: CommandSection, value: Any) -> str | None:
+    values = [str(item) for item in (value if isinstance(value, list) else [value]) if item is not None and str(item).strip()]
+    if not values:
+        return f"Section '{section.name}' cannot be empty."
+    if section.allow_multiple:
+        args[section.name] = values
+    elif len(values) > 1:
+        return f"Multiple values of section '{section.name}' found, but only one is allowed."
+    else:
+        args[section.name] = values[0]
+    return None
+
+
+def format_command_block(name: str, arguments: dict[str, Any]) -> str:
+    """The tool call in the text syntax of the commands, how it's kept in the response and the history"""
+    lines = [f"<<< {name}"]
+    for section_name, value in arguments.items():
+        for item in value if isinstance(value, list) else [value]:
+            lines.extend([f"///{section_name}", str(item)])
+    lines.append(">>>")
+    return "\n".join(lines)
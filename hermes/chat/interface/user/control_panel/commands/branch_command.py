@@ -0,0 +1,28 @@
+"""Branch command for the user control panel."""
+
+from hermes.chat.events.engine_commands import BranchEvent
+from hermes.chat.interface.control_panel import ControlPanelCommand
+
+
+def _parse_branch_command(content: str) -> BranchEvent:
+    """Parse the /branch command: /branch [<name> [<checkpoint>]]"""
+    name, checkpoint = [*content.split(maxsplit=1), None, None][:2]
+    return BranchEvent(name=name, checkpoint=checkpoint.strip() if checkpoint else None)
+
+
+def register() -> ControlPanelCommand:
+    """Register the branch command."""
+    return ControlPanelCommand(
+        command_id="branch",
+        command_label="/branch",
+        description=(
+            "Switch to a history branch, creating it from the checkpoint or the current history if it doesn't exist. "
+            "Lists the branches and checkpoints without arguments"
+        ),
+        short_description="Switch history branch",
+        parser=lambda line, control_panel: _parse_branch_command(line),
+        visible_from_cli=False,
+        is_chat_command=True,
+        is_agent_command=True,
+        is_research_command=False,
+    )
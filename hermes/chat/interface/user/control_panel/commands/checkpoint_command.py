@@ -0,0 +1,29 @@
+"""Checkpoint command for the user control panel."""
+
+from hermes.chat.events.engine_commands import CheckpointEvent
+from hermes.chat.interface.control_panel import ControlPanelCommand
+from hermes.chat.interface.helpers.terminal_coloring import CLIColors
+
+
+def _parse_checkpoint_command(control_panel, content: str) -> CheckpointEvent | None:
+    """Parse the /checkpoint command"""
+    name = content.strip()
+    if not name:
+        control_panel.notifications_printer.print_notification("Please provide the name of the checkpoint", CLIColors.RED)
+        return None
+
+    return CheckpointEvent(name=name)
+
+
+def register() -> ControlPanelCommand:
+    """Register the checkpoint command."""
+    return ControlPanelCommand(
+        command_id="checkpoint",
+        command_label="/checkpoint",
+        description="Mark the current history with a name, to start a branch from it later with /branch <name> <checkpoint>",
+        short_description="Checkpoint the history",
+        parser=lambda line, control_panel: _parse_checkpoint_command(control_panel, line),
+        is_chat_command=True,
+        is_agent_command=True,
+        is_research_command=False,
+    )
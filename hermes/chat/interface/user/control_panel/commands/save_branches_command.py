@@ -0,0 +1,30 @@
+"""Save branches command for the user control panel."""
+
+from hermes.chat.events.engine_commands import SaveBranchesEvent
+from hermes.chat.interface.control_panel import ControlPanelCommand
+from hermes.chat.interface.helpers.terminal_coloring import CLIColors
+
+
+def _parse_save_branches_command(control_panel, content: str) -> SaveBranchesEvent | None:
+    """Parse the /save_branches command"""
+    directory = content.strip()
+    if not directory:
+        control_panel.notifications_printer.print_notification("Please provide the directory to save the branches to", CLIColors.RED)
+        return None
+
+    return SaveBranchesEvent(directory=directory)
+
+
+def register() -> ControlPanelCommand:
+    """Register the save branches command."""
+    return ControlPanelCommand(
+        command_id="save_branches",
+        command_label="/save_branches",
+        description="Save all the history branches and checkpoints to a directory, load them back with /load_history <directory>",
+        short_description="Save history branches",
+        parser=lambda line, control_panel: _parse_save_branches_command(control_panel, line),
+        visible_from_cli=False,
+        is_chat_command=True,
+        is_agent_command=True,
+        is_research_command=False,
+    )
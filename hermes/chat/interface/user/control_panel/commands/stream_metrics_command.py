@@ -0,0 +1,21 @@
+"""Stream metrics command for the user control panel."""
+
+from hermes.chat.events.engine_commands import StreamMetricsEvent
+from hermes.chat.interface.control_panel import ControlPanelCommand
+
+STREAM_METRICS_VISIBILITY = {"on": True, "off": False, "": None}
+
+
+def register() -> ControlPanelCommand:
+    """Register the stream metrics command."""
+    return ControlPanelCommand(
+        command_id="stream_metrics",
+        command_label="/stream_metrics",
+        description="Show the latency metrics after each response (on/off), or the session summary without arguments",
+        short_description="Show response latency metrics",
+        parser=lambda line, control_panel: StreamMetricsEvent(show=STREAM_METRICS_VISIBILITY.get(line.strip().lower())),
+        visible_from_cli=False,
+        is_chat_command=True,
+        is_agent_command=True,
+        is_research_command=True,
+    )
@@ -3,6 +3,7 @@ from typing import TYPE_CHECKING, Any
 
 from hermes.chat.events.base import Event
 from hermes.chat.events.message_event import MessageEvent
+from hermes.chat.interface.assistant.models.request_builder.ingestion_pipeline import AttachmentIngestionPipeline
 from hermes.chat.interface.helpers.chunks_to_lines import chunks_to_lines
 from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
 from hermes.chat.interface.helpers.peekable_generator import PeekableGenerator
@@ -15,11 +16,17 @@ if TYPE_CHECKING:
 
 class UserCommandsExecutor:
     def __init__(
-        self, *, notifications_printer: CLINotificationsPrinter, commands_registry: UserCommandsRegistry, control_panel: "UserControlPanel"
+        self,
+        *,
+        notifications_printer: CLINotificationsPrinter,
+        commands_registry: UserCommandsRegistry,
+        control_panel: "UserControlPanel",
+        ingestion_pipeline: AttachmentIngestionPipeline,
     ):
         self.notifications_printer = notifications_printer
         self.commands_registry = commands_registry
         self.control_panel = control_panel
+        self.ingestion_pipeline = ingestion_pipeline
 
     def extract_and_execute_commands(self, message: Message) -> Generator[Event, None, None]:
         peekable_generator = PeekableGenerator(self._lines_from_message(message))
@@ -98,8 +105,14 @@ class UserCommandsExecutor:
                 )
                 continue
             result_events.append((command_priority, parsed_event))
+            self._start_ingestion(parsed_event)
         return result_events
 
+    def _start_ingestion(self, event: Event):
+        """Start preparing the attachment right away, it runs while the rest of the input is parsed and the request is built."""
+        if isinstance(event, MessageEvent):
+            self.ingestion_pipeline.submit(event.get_message())
+
     def _process_command_line(self, command_label: str, line: str) -> list[tuple[int, Event]]:
         command = self.commands_registry.get_command(command_label)
         if not command:
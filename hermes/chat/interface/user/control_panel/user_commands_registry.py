@@ -2,7 +2,9 @@ from hermes.chat.interface.control_panel import ControlPanelCommand
 from hermes.chat.interface.user.control_panel.commands import (
     agent_mode_command,
     audio_command,
+    branch_command,
     budget_command,
+    checkpoint_command,
     clear_command,
     exa_url_command,
     exit_command,
@@ -18,8 +20,10 @@ from hermes.chat.interface.user.control_panel.commands import (
     once_command,
     pdf_command,
     print_research_status,
+    save_branches_command,
     save_history_command,
     set_assistant_command_status_command,
+    stream_metrics_command,
     switch_research_command,
     text_command,
     textual_file_command,
@@ -46,7 +50,9 @@ class UserCommandsRegistry:
     def _register_all_commands(self, extra_commands: list[ControlPanelCommand] | None = None) -> None:
         self._register_command(agent_mode_command.register())
         self._register_command(audio_command.register())
+        self._register_command(branch_command.register())
         self._register_command(budget_command.register())
+        self._register_command(checkpoint_command.register())
         self._register_command(clear_command.register())
         self._register_command(exa_url_command.register())
         self._register_command(exit_command.register())
@@ -61,8 +67,10 @@ class UserCommandsRegistry:
         self._register_command(load_history_command.register())
         self._register_command(once_command.register())
         self._register_command(pdf_command.register())
+        self._register_command(save_branches_command.register())
         self._register_command(save_history_command.register())
         self._register_command(set_assistant_command_status_command.register())
+        self._register_command(stream_metrics_command.register())
         self._register_command(switch_research_command.register())
         self._register_command(text_command.register())
         self._register_command(textual_file_command.register())
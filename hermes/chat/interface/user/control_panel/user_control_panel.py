@@ -2,6 +2,7 @@ from collections.abc import Generator
 
 from hermes.chat.events.base import Event
 from hermes.chat.interface.assistant.chat.control_panel import ChatAssistantControlPanel
+from hermes.chat.interface.assistant.models.request_builder.ingestion_pipeline import AttachmentIngestionPipeline
 from hermes.chat.interface.control_panel import ControlPanelCommand
 from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
 from hermes.chat.interface.user.control_panel.cli_adapter import CLIAdapter
@@ -20,6 +21,7 @@ class UserControlPanel:
         extra_commands: list[ControlPanelCommand],
         exa_client: ExaClient,
         llm_control_panel: ChatAssistantControlPanel,
+        ingestion_pipeline: AttachmentIngestionPipeline,
         is_deep_research_mode=False,
     ):
         self.tree_generator = TreeGenerator()
@@ -37,6 +39,7 @@ class UserControlPanel:
             notifications_printer=notifications_printer,
             commands_registry=self.commands_registry,
             control_panel=self,
+            ingestion_pipeline=ingestion_pipeline,
         )
 
         self.cli_adapter = CLIAdapter(
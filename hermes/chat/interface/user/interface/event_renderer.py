@@ -3,6 +3,7 @@ from collections.abc import Generator, Iterable
 from hermes.chat.events.base import Event
 from hermes.chat.events.message_event import MessageEvent
 from hermes.chat.events.notification_event import NotificationEvent
+from hermes.chat.interface.assistant.models.chat_models.stream_metrics import get_shared_stream_metrics
 from hermes.chat.interface.helpers.cli_notifications import (
     CLIColors,
     CLINotificationsPrinter,
@@ -17,9 +18,11 @@ class EventRenderer:
         self,
         markdown_highlighter: MarkdownHighlighter | None,
         notifications_printer: CLINotificationsPrinter,
+        show_stream_metrics: bool = False,
     ):
         self.markdown_highlighter = markdown_highlighter
         self.notifications_printer = notifications_printer
+        self.show_stream_metrics = show_stream_metrics
 
     def render_events(self, events: Generator[Event, None, None]):
         last_author = None
@@ -61,8 +64,16 @@ class EventRenderer:
             last_author = message.author
 
         self._print_content(message.get_content_for_user())
+        self._print_stream_metrics()
         return last_author
 
+    def _print_stream_metrics(self):
+        """The metrics of the responses streamed while rendering, only collected when they are shown."""
+        if not self.show_stream_metrics:
+            return
+        for metrics in get_shared_stream_metrics().take_unreported():
+            self.notifications_printer.print_notification(f"\n{metrics.describe()}", CLIColors.BLUE)
+
     def _should_print_author(self, author: str, last_author: str | None) -> bool:
         return author != last_author
 
@@ -1,9 +1,11 @@
-from groq import Groq
+from groq import DefaultHttpxClient, Groq
+
+from hermes.utils.http_transport import get_shared_http_transport
 
 
 class AudioTranscriber:
     def __init__(self, api_key: str):
-        self.client = Groq(api_key=api_key)
+        self.client = Groq(api_key=api_key, http_client=get_shared_http_transport().get_client(DefaultHttpxClient))
 
     def transcribe(self, audio_file: str) -> str:
         with open(audio_file, "rb") as audio:
@@ -26,10 +26,11 @@ class UserOrchestrator(Orchestrator):
         stt_input_handler: "STTInputHandler | None",
         notifications_printer: CLINotificationsPrinter,
         user_input_from_cli: str,
+        show_stream_metrics: bool = False,
     ):
         self.control_panel = control_panel
         self.control_panel_has_rendered = False
-        self.event_renderer = EventRenderer(markdown_highlighter, notifications_printer)
+        self.event_renderer = EventRenderer(markdown_highlighter, notifications_printer, show_stream_metrics)
         self.input_handler = InputHandler(control_panel, command_completer, stt_input_handler, user_input_from_cli)
 
     def render(self, events: Generator[Event, None, None]):
@@ -6,9 +6,10 @@ With difference that you can send multiple messages at once.
 
 from hermes.chat.messages.base import Message
 from hermes.chat.messages.command import LLMRunCommandOutput
-from hermes.chat.messages.deserialization import DESERIALIZATION_KEYMAP
+from hermes.chat.messages.deserialization import DESERIALIZATION_KEYMAP, deserialize_message
 from hermes.chat.messages.file import EmbeddedPDFMessage, TextualFileMessage
 from hermes.chat.messages.media import AudioFileMessage, ImageMessage, ImageUrlMessage, VideoMessage
+from hermes.chat.messages.summary import HistorySummaryMessage
 from hermes.chat.messages.text import AssistantNotificationMessage, InvisibleMessage, TextMessage
 from hermes.chat.messages.text_generator import TextGeneratorMessage
 from hermes.chat.messages.thinking_and_response import ThinkingAndResponseGeneratorMessage
@@ -29,5 +30,7 @@ __all__ = [
     "EmbeddedPDFMessage",
     "LLMRunCommandOutput",
     "UrlMessage",
+    "HistorySummaryMessage",
     "DESERIALIZATION_KEYMAP",
+    "deserialize_message",
 ]
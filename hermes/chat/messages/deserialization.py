@@ -1,6 +1,8 @@
+from hermes.chat.messages.base import Message
 from hermes.chat.messages.command import LLMRunCommandOutput
 from hermes.chat.messages.file import EmbeddedPDFMessage, TextualFileMessage
 from hermes.chat.messages.media import AudioFileMessage, ImageMessage, ImageUrlMessage, VideoMessage
+from hermes.chat.messages.summary import HistorySummaryMessage
 from hermes.chat.messages.text import AssistantNotificationMessage, InvisibleMessage, TextMessage
 from hermes.chat.messages.text_generator import TextGeneratorMessage
 from hermes.chat.messages.thinking_and_response import ThinkingAndResponseGeneratorMessage
@@ -20,4 +22,12 @@ DESERIALIZATION_KEYMAP = {
     "url": UrlMessage.from_json,
     "thinking_and_response_generator": ThinkingAndResponseGeneratorMessage.from_json,
     "assistant_notification": AssistantNotificationMessage.from_json,
+    "history_summary": HistorySummaryMessage.from_json,
 }
+
+
+def deserialize_message(message_data: dict) -> Message:
+    message_type = message_data["type"]
+    if message_type not in DESERIALIZATION_KEYMAP:
+        raise ValueError(f"Unknown message type: {message_type}")
+    return DESERIALIZATION_KEYMAP[message_type](message_data)
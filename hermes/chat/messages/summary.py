@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from hermes.chat.messages.base import Message
+
+
+@dataclass(init=False)
+class HistorySummaryMessage(Message):
+    """Class for the summary that replaces the oldest messages of a compacted history, see HistoryCompactor"""
+
+    text: str
+    summarized_count: int
+    # Indexed history with the summarized messages, kept for audit
+    archive_path: str | None
+
+    def __init__(
+        self,
+        *,
+        text: str,
+        summarized_count: int,
+        archive_path: str | None = None,
+        timestamp: datetime | None = None,
+    ):
+        super().__init__(author="user", timestamp=timestamp)
+        self.text = text
+        self.summarized_count = summarized_count
+        self.archive_path = archive_path
+
+    def get_content_for_user(self) -> str:
+        return f"Summary of {self.summarized_count} earlier messages: {self.text}"
+
+    def get_content_for_assistant(self) -> str:
+        return self.text
+
+    def to_json(self) -> dict:
+        return {
+            "type": "history_summary",
+            "text": self.text,
+            "summarized_count": self.summarized_count,
+            "archive_path": self.archive_path,
+            "timestamp": self.timestamp.isoformat(),
+        }
+
+    @staticmethod
+    def from_json(json_data: dict) -> "HistorySummaryMessage":
+        return HistorySummaryMessage(
+            text=json_data["text"],
+            summarized_count=json_data["summarized_count"],
+            archive_path=json_data.get("archive_path"),
+            timestamp=datetime.fromisoformat(json_data["timestamp"]),
+        )
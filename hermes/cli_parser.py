@@ -1,6 +1,7 @@
 from argparse import ArgumentParser, Namespace
 from enum import Enum, auto
 
+from hermes.chat.interface.assistant.models.chat_models.record_replay import RecordingMode
 from hermes.chat.interface.user.control_panel.user_control_panel import UserControlPanel
 
 
@@ -74,6 +75,10 @@ class CLIParser:
             help="Enable verbose logging (DEBUG level)",
         )
 
+        self._add_native_tools_argument(chat_parser)
+        self._add_llm_recording_arguments(chat_parser)
+        self._add_stream_metrics_arguments(chat_parser)
+
         return chat_parser
 
     def _build_simple_agent_parser(self, subparsers):
@@ -99,6 +104,10 @@ class CLIParser:
             help="Enable verbose logging (DEBUG level)",
         )
 
+        self._add_native_tools_argument(simple_agent_parser)
+        self._add_llm_recording_arguments(simple_agent_parser)
+        self._add_stream_metrics_arguments(simple_agent_parser)
+
         return simple_agent_parser
 
     def _build_research_parser(self, subparsers):
@@ -128,9 +137,55 @@ class CLIParser:
             action="store_true",
             help="Enable verbose logging (DEBUG level)",
         )
+        research_parser.add_argument(
+            "--batch",
+            action="store_true",
+            help="Send the research requests through the provider's batch API (Anthropic, OpenAI): cheaper, but slower",
+        )
+
+        self._add_native_tools_argument(research_parser)
+        self._add_llm_recording_arguments(research_parser)
+        self._add_stream_metrics_arguments(research_parser)
 
         return research_parser
 
+    def _add_native_tools_argument(self, parser):
+        parser.add_argument(
+            "--native-tools",
+            action="store_true",
+            help="Send the commands as the provider's native tools instead of the <<< >>> text syntax (OpenAI, Anthropic, Gemini, Bedrock)",
+        )
+
+    def _add_llm_recording_arguments(self, parser):
+        parser.add_argument(
+            "--llm-recording",
+            choices=[mode.value for mode in RecordingMode],
+            default=RecordingMode.OFF.value,
+            help="Record the LLM responses, replay them for identical requests, or both (record-missing)",
+        )
+        parser.add_argument(
+            "--llm-recordings-dir",
+            type=str,
+            help="Directory of the LLM recordings (defaults to the recordings in the hermes cache)",
+        )
+        parser.add_argument(
+            "--replay-with-timing",
+            action="store_true",
+            help="Reproduce the recorded delays between the response chunks when replaying",
+        )
+
+    def _add_stream_metrics_arguments(self, parser):
+        parser.add_argument(
+            "--show-stream-metrics",
+            action="store_true",
+            help="Show the latency metrics (time to first chunk, tokens/s) after each response, /stream_metrics toggles them",
+        )
+        parser.add_argument(
+            "--stream-metrics-file",
+            type=str,
+            help="Append the latency metrics of every response to this JSONL file",
+        )
+
     def _build_utils_parser(self, subparsers):
         utils_parser = subparsers.add_parser("utils", help="Utility commands")
         utils_subparsers = utils_parser.add_subparsers(dest="utils_command", required=True)
@@ -75,6 +75,52 @@ class ConfigManager:
         base_section = self._ini_config_manager["BASE"]
         return base_section.get("model")
 
+    def get_hedge_deadline_seconds(self) -> float | None:
+        """Seconds to wait for the first token of a hedged model's provider before starting the next one"""
+        if self._json_config_manager:
+            return self._json_config_manager.get_hedge_deadline_seconds()
+
+        if not self._ini_config_manager or "BASE" not in self._ini_config_manager:
+            return None
+        value = self._ini_config_manager["BASE"].get("hedge_deadline_seconds")
+        return float(value) if value else None
+
+    def get_http_settings(self) -> dict[str, Any]:
+        """Connection pooling and warm-up settings of the shared HTTP transport"""
+        if self._json_config_manager:
+            return self._json_config_manager.get_http_settings()
+
+        if self._ini_config_manager and "HTTP" in self._ini_config_manager:
+            return dict(self._ini_config_manager["HTTP"].items())
+        return {}
+
+    def get_routing_settings(self) -> dict[str, Any]:
+        """Which chat turns are tried on a fast model before the primary one"""
+        if self._json_config_manager:
+            return self._json_config_manager.get_routing_settings()
+
+        if self._ini_config_manager and "ROUTING" in self._ini_config_manager:
+            return dict(self._ini_config_manager["ROUTING"].items())
+        return {}
+
+    def get_history_settings(self) -> dict[str, Any]:
+        """Autosave of the chat history to a journal"""
+        if self._json_config_manager:
+            return self._json_config_manager.get_history_settings()
+
+        if self._ini_config_manager and "HISTORY" in self._ini_config_manager:
+            return dict(self._ini_config_manager["HISTORY"].items())
+        return {}
+
+    def get_compaction_settings(self) -> dict[str, Any]:
+        """Background summarization of the start of long chat histories"""
+        if self._json_config_manager:
+            return self._json_config_manager.get_compaction_settings()
+
+        if self._ini_config_manager and "COMPACTION" in self._ini_config_manager:
+            return dict(self._ini_config_manager["COMPACTION"].items())
+        return {}
+
     def get_mcp_chat_assistant_servers(self) -> dict[str, dict[str, Any] | str]:
         if self._json_config_manager:
             return self._json_config_manager.get_mcp_chat_assistant_servers()
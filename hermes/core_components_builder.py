@@ -4,6 +4,7 @@ from typing import TYPE_CHECKING
 from hermes.chat.interface.assistant.chat.command_status_override import ChatAssistantCommandStatusOverride
 from hermes.chat.interface.assistant.chat.control_panel import ChatAssistantControlPanel
 from hermes.chat.interface.assistant.models.model_factory import ModelFactory
+from hermes.chat.interface.assistant.models.request_builder.ingestion_pipeline import get_shared_ingestion_pipeline
 from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
 from hermes.chat.interface.user.control_panel.exa_client import ExaClient
 from hermes.chat.interface.user.control_panel.user_control_panel import UserControlPanel
@@ -75,4 +76,5 @@ class CoreComponentsBuilder:
             extra_commands=user_commands,
             exa_client=exa_client,
             llm_control_panel=llm_control_panel,
+            ingestion_pipeline=get_shared_ingestion_pipeline(self.notifications_printer),
         )
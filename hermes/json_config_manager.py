@@ -66,6 +66,23 @@ class JsonConfigManager:
         base_config = self.config.get("base", {})
         return base_config.get("model")
 
+    def get_hedge_deadline_seconds(self) -> float | None:
+        # Same lookup as the model, top level first, then the base section
+        value = self.config.get("hedge_deadline_seconds", self.config.get("base", {}).get("hedge_deadline_seconds"))
+        return float(value) if value is not None else None
+
+    def get_http_settings(self) -> dict[str, Any]:
+        return self.config.get("http", {})
+
+    def get_routing_settings(self) -> dict[str, Any]:
+        return self.config.get("routing", {})
+
+    def get_history_settings(self) -> dict[str, Any]:
+        return self.config.get("history", {})
+
+    def get_compaction_settings(self) -> dict[str, Any]:
+        return self.config.get("compaction", {})
+
     def get_mcp_chat_assistant_servers(self) -> dict[str, dict[str, Any] | str]:
         return self.config.get("mcp_chat_assistant", {})
 
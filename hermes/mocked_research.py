@@ -77,9 +77,10 @@ class MockedChatModel(ChatModel):
         # Return a dummy request builder since we're not using it
         return None
 
-    def send_request(self, request: dict):
-        # Forward the request to our mocked interface
-        pass
+    async def _stream(self, request: dict):
+        # The mocked interface produces the responses, nothing is streamed from here
+        return
+        yield
 
     @staticmethod
     def get_provider() -> str:
@@ -4,7 +4,10 @@ from pathlib import Path
 from typing import TYPE_CHECKING
 
 from hermes.chat.interface.assistant.chat.assistant_orchestrator import ChatAssistantOrchestrator
+from hermes.chat.interface.assistant.chat.cascade_router import CascadeRouter, CascadeRoutingSettings
 from hermes.chat.interface.assistant.chat.control_panel import ChatAssistantControlPanel
+from hermes.chat.interface.assistant.models.chat_models.record_replay import RecordingMode, RecordReplayChatModel, ResponseRecordingStore
+from hermes.chat.interface.assistant.models.chat_models.stream_metrics import get_shared_stream_metrics
 from hermes.chat.interface.assistant.models.model_factory import ModelFactory
 from hermes.chat.interface.debug.debug_interface import DebugInterface
 from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
@@ -15,8 +18,10 @@ from hermes.chat.interface.user.interface.user_interface import UserOrchestrator
 from hermes.chat.participants import DebugParticipant, LLMParticipant, UserParticipant
 from hermes.cli_parser import ExecutionMode
 from hermes.components_container import Participants
+from hermes.utils.config_utils import get_cache_dir_path
 
 if TYPE_CHECKING:
+    from hermes.chat.interface.assistant.models.chat_models.base import ChatModel
     from hermes.chat.interface.user.interface.stt_input_handler.stt_input_handler import STTInputHandler
     from hermes.config_manager import ConfigManager
     from hermes.mcp.mcp_manager import McpManager
@@ -38,6 +43,8 @@ class ParticipantsFactory:
         model_info_string: str | None,
     ) -> Participants:
         execution_mode = ExecutionMode.get_from_cli_args(cli_args)
+        if cli_args.stream_metrics_file:
+            get_shared_stream_metrics().set_export_path(Path(cli_args.stream_metrics_file).absolute())
         user_participant = self._create_user_participant(cli_args, user_control_panel, execution_mode)
         assistant_participant = self._create_assistant_participant(
             cli_args, model_factory, llm_control_panel, extension_deep_research_commands, mcp_manager, model_info_string, execution_mode
@@ -71,6 +78,7 @@ class ParticipantsFactory:
             stt_input_handler=stt_input_handler,
             notifications_printer=self.notifications_printer,
             user_input_from_cli=user_input_from_cli,
+            show_stream_metrics=cli_args.show_stream_metrics,
         )
         return UserParticipant(user_interface)
 
@@ -98,16 +106,29 @@ class ParticipantsFactory:
     ):
         model_info_string = self._validate_model_info_string(model_info_string)
 
-        provider, model_tag = model_info_string.split("/", 1)
-        provider = provider.upper()
-
-        model = model_factory.get_model(provider, model_tag, self.config_manager.get_config())
+        model = model_factory.get_model_from_info_string(
+            model_info_string,
+            self.config_manager.get_config(),
+            self.config_manager.get_hedge_deadline_seconds(),
+        )
+        model = self._wrap_with_recording(cli_args, model)
 
         if cli_args.debug:
             return self._create_debug_participant(model, llm_control_panel)
         if execution_mode == ExecutionMode.RESEARCH:
             return self._create_deep_research_participant(cli_args, model, extension_deep_research_commands, mcp_manager)
-        return self._create_chat_participant(model, llm_control_panel, execution_mode == ExecutionMode.SIMPLE_AGENT)
+        router = self._create_cascade_router(cli_args, model_factory)
+        return self._create_chat_participant(
+            model, llm_control_panel, execution_mode == ExecutionMode.SIMPLE_AGENT, router, native_tools=cli_args.native_tools
+        )
+
+    def _wrap_with_recording(self, cli_args: Namespace, model: "ChatModel") -> "ChatModel":
+        mode = RecordingMode(cli_args.llm_recording)
+        if mode == RecordingMode.OFF:
+            return model
+        recordings_dir = Path(cli_args.llm_recordings_dir) if cli_args.llm_recordings_dir else get_cache_dir_path() / "llm_recordings"
+        self.notifications_printer.print_notification(f"LLM recording mode {mode.value}, recordings in {recordings_dir}")
+        return RecordReplayChatModel(model, mode, ResponseRecordingStore(recordings_dir), cli_args.replay_with_timing)
 
     def _create_debug_participant(self, model, llm_control_panel) -> DebugParticipant:
         debug_interface = DebugInterface(control_panel=llm_control_panel, model=model)
@@ -137,14 +158,30 @@ class ParticipantsFactory:
             extension_commands=extension_deep_research_commands,
             mcp_manager=mcp_manager,
             research_name=research_name,
+            batch_mode=cli_args.batch,
+            native_tools=cli_args.native_tools,
         )
         self.notifications_printer.print_notification(
             f"Using Deep Research Assistant interface with research directory: {research_repo_path}",
         )
         return LLMParticipant(deep_research_interface)
 
-    def _create_chat_participant(self, model, llm_control_panel, is_agent: bool) -> LLMParticipant:
-        llm_interface = ChatAssistantOrchestrator(model, control_panel=llm_control_panel)
+    def _create_cascade_router(self, cli_args: Namespace, model_factory: ModelFactory) -> CascadeRouter | None:
+        settings = CascadeRoutingSettings.from_config(self.config_manager.get_routing_settings())
+        if not settings.fast_model:
+            return None
+        fast_model = model_factory.get_model_from_info_string(
+            self._validate_model_info_string(settings.fast_model),
+            self.config_manager.get_config(),
+            self.config_manager.get_hedge_deadline_seconds(),
+        )
+        self.notifications_printer.print_notification(f"Simple turns are tried on {settings.fast_model} first")
+        return CascadeRouter(self._wrap_with_recording(cli_args, fast_model), settings, self.notifications_printer)
+
+    def _create_chat_participant(
+        self, model, llm_control_panel, is_agent: bool, router: CascadeRouter | None = None, native_tools: bool = False
+    ) -> LLMParticipant:
+        llm_interface = ChatAssistantOrchestrator(model, control_panel=llm_control_panel, router=router, native_tools=native_tools)
         if is_agent:
             llm_control_panel.enable_agent_mode()
         return LLMParticipant(llm_interface)
@@ -155,6 +192,6 @@ class ParticipantsFactory:
                 "No model specified. Please specify a model using the --model argument or add a default model in the config "
                 "file ~/.config/hermes/config.json.",
             )
-        if "/" not in model_info_string:
-            raise ValueError("Model info string should be in the format provider/model_tag")
+        if any("/" not in model_spec for model_spec in ModelFactory.split_model_info_string(model_info_string)):
+            raise ValueError("Model info string should be in the format provider/model_tag, or several of them separated by commas")
         return model_info_string
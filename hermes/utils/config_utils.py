@@ -39,6 +39,11 @@ def get_extensions_dir_path() -> Path:
     return _get_config_root_dir() / "extensions"
 
 
+def get_cache_dir_path() -> Path:
+    """Returns the full path to the cache directory, used for reusable artifacts (encoded attachments, fetched URLs)."""
+    return _get_config_root_dir() / "cache"
+
+
 def convert_ini_to_json(ini_config: ConfigParser) -> dict[str, Any]:
     """Convert ConfigParser (INI) object to a JSON-compatible dictionary.
 
@@ -75,6 +80,13 @@ def _add_value_to_json(json_config: dict, section_name: str, key: str, value: An
         json_config[section_name][key] = value
 
 
+def parse_config_value(value_type: Any, value: Any) -> Any:
+    """Convert a setting to the type of its dataclass field, INI configs give strings and JSON configs give typed values."""
+    if value_type is bool:
+        return value if isinstance(value, bool) else str(value).lower() == "true"
+    return value_type(value)
+
+
 def extract_config_section(config: ConfigParser | dict[str, Any], section: str) -> dict[str, Any]:
     """Extract a section from either ConfigParser or a dict-based config.
 
@@ -0,0 +1,137 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """Size-capped LRU store of byte blobs, kept on disk with an in-memory LRU layer in front of it.
+
+    Each entry is a file named after the hash of its key. The file modification time is bumped on every hit,
+    so eviction removes the least recently used files first once the directory exceeds max_disk_bytes.
+    Disk errors are logged and treated as misses, the cache must never break the caller.
+    """
+
+    def __init__(self, directory: Path, max_disk_bytes: int, max_memory_bytes: int):
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: int | None = None
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        value = self._read_from_disk(key)
+        if value is not None:
+            self._remember(key, value)
+        return value
+
+    def set(self, key: str, value: bytes, persist: bool = True):
+        self._remember(key, value)
+        if persist:
+            self._write_to_disk(key, value)
+
+    def delete(self, key: str):
+        with self._lock:
+            value = self._memory.pop(key, None)
+            if value is not None:
+                self._memory_bytes -= len(value)
+        path = self._get_entry_path(key)
+        try:
+            size = path.stat().st_size
+            path.unlink()
+            self._track_disk_bytes(-size)
+        except OSError:
+            pass
+
+    def _remember(self, key: str, value: bytes):
+        if len(value) > self.max_memory_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[key] = value
+            self._memory_bytes += len(value)
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _get_entry_path(self, key: str) -> Path:
+        return self.directory / hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _read_from_disk(self, key: str) -> bytes | None:
+        path = self._get_entry_path(key)
+        try:
+            value = path.read_bytes()
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.debug(f"Failed to read cache entry {path}: {e}")
+            return None
+
+    def _write_to_disk(self, key: str, value: bytes):
+        if len(value) > self.max_disk_bytes:
+            return
+        path = self._get_entry_path(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            previous_size = path.stat().st_size if path.exists() else 0
+            with tempfile.NamedTemporaryFile(dir=self.directory, delete=False, prefix=".tmp-") as temp_file:
+                temp_file.write(value)
+            os.replace(temp_file.name, path)
+            self._track_disk_bytes(len(value) - previous_size)
+        except OSError as e:
+            logger.debug(f"Failed to write cache entry {path}: {e}")
+            return
+        self._evict_disk_entries_if_needed()
+
+    def _track_disk_bytes(self, delta: int):
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += delta
+
+    def _get_disk_bytes(self) -> int:
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._list_disk_entries())
+            return self._disk_bytes
+
+    def _list_disk_entries(self) -> list[tuple[Path, int, float]]:
+        entries = []
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    entries.append((Path(entry.path), stat.st_size, stat.st_mtime))
+        except OSError:
+            pass
+        return entries
+
+    def _evict_disk_entries_if_needed(self):
+        excess = self._get_disk_bytes() - self.max_disk_bytes
+        if excess <= 0:
+            return
+        for path, size, _ in sorted(self._list_disk_entries(), key=lambda entry: entry[2]):
+            if excess <= 0:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            excess -= size
+            self._track_disk_bytes(-size)
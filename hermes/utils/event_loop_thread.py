@@ -0,0 +1,70 @@
+import asyncio
+import threading
+from collections.abc import AsyncGenerator, Coroutine, Generator
+from typing import Any, TypeVar
+
+ItemType = TypeVar("ItemType")
+
+
+class EventLoopThread:
+    """An asyncio event loop running forever on a daemon thread, for driving async code from sync callers.
+
+    All coroutines submitted to the same instance share one loop, so any number of concurrent streams cost no extra threads.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="hermes-event-loop", daemon=True)
+        self.thread.start()
+
+    def run(self, coroutine: Coroutine[Any, Any, ItemType]) -> ItemType:
+        """Run the coroutine on the loop and block until it's done."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def iterate(self, async_generator: AsyncGenerator[ItemType, None]) -> Generator[ItemType, None, None]:
+        """Sync adapter over an async generator, items are produced on the loop and handed over one by one.
+        Closing the returned generator early also closes the async one, so streams and connections are released.
+        An interrupt (Ctrl-C) while waiting for an item cancels the pending step on the loop before closing and re-raising.
+        """
+        pending_task: list[asyncio.Task] = []
+        try:
+            while True:
+                try:
+                    yield self.run(self._next_item(async_generator, pending_task))
+                except StopAsyncIteration:
+                    return
+        finally:
+            self.run(self._cancel_and_close(async_generator, pending_task))
+
+    @staticmethod
+    async def _next_item(async_generator: AsyncGenerator[ItemType, None], pending_task: list[asyncio.Task]) -> ItemType:
+        current_task = asyncio.current_task()
+        if current_task is not None:
+            pending_task[:] = [current_task]
+        try:
+            return await async_generator.__anext__()
+        finally:
+            pending_task.clear()
+
+    @staticmethod
+    async def _cancel_and_close(async_generator: AsyncGenerator[Any, None], pending_task: list[asyncio.Task]):
+        """aclose() fails while __anext__ is still running, so the interrupted step is cancelled and awaited first.
+        Runs after the step started, as both are scheduled on the loop in submission order.
+        """
+        for task in list(pending_task):
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await async_generator.aclose()
+
+
+_shared_event_loop_thread: EventLoopThread | None = None
+_shared_event_loop_thread_lock = threading.Lock()
+
+
+def get_shared_event_loop_thread() -> EventLoopThread:
+    """The process-wide loop used by the sync adapters of the async model clients."""
+    global _shared_event_loop_thread
+    with _shared_event_loop_thread_lock:
+        if _shared_event_loop_thread is None:
+            _shared_event_loop_thread = EventLoopThread()
+        return _shared_event_loop_thread
@@ -0,0 +1,126 @@
+import asyncio
+import importlib.util
+import logging
+import threading
+from dataclasses import dataclass, fields
+from types import ModuleType
+from typing import TYPE_CHECKING, Any
+
+from hermes.utils.config_utils import parse_config_value
+from hermes.utils.event_loop_thread import get_shared_event_loop_thread
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_TIMEOUT_SECONDS = 10.0
+
+
+@dataclass(frozen=True)
+class HttpTransportSettings:
+    """Connection pooling of the shared HTTP clients, tunable from the `http` config section"""
+
+    max_connections: int = 64
+    max_keepalive_connections: int = 32
+    keepalive_expiry_seconds: float = 120.0
+    connect_timeout_seconds: float = 10.0
+    # Only used when the h2 package is installed
+    http2: bool = True
+    # Open the connection to the model's API in the background when the model is initialized
+    warm_up: bool = True
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "HttpTransportSettings":
+        values = {setting.name: parse_config_value(setting.type, config[setting.name]) for setting in fields(cls) if setting.name in config}
+        return cls(**values)
+
+
+class HttpTransport:
+    """Keep-alive connection pools shared by all the HTTP clients of the process (model SDKs, URL fetching, STT),
+    so the DNS, TCP and TLS setup is paid once per host instead of once per client.
+
+    The SDKs ship their own httpx client classes (some on an httpx fork), so there is one shared client per class.
+    The async clients are only used on the shared event loop, where all the async model calls run.
+    """
+
+    def __init__(self, settings: HttpTransportSettings | None = None):
+        self.settings = settings or HttpTransportSettings()
+        self._clients: dict[type, Any] = {}
+        self._session: requests.Session | None = None
+        self._warmed_up_urls: set[tuple[str, type]] = set()
+        self._lock = threading.Lock()
+
+    def configure(self, settings: HttpTransportSettings):
+        with self._lock:
+            if self._clients or self._session:
+                logger.warning("The HTTP clients are already created, the new transport settings are ignored")
+                return
+            self.settings = settings
+
+    def get_client(self, client_class: type):
+        """The shared instance of an httpx client class, sync or async (e.g. httpx.AsyncClient, openai.DefaultAsyncHttpxClient)"""
+        with self._lock:
+            if client_class not in self._clients:
+                self._clients[client_class] = client_class(**self._get_httpx_arguments(_get_httpx_module(client_class)))
+            return self._clients[client_class]
+
+    def get_session(self) -> "requests.Session":
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=16, pool_maxsize=self.settings.max_keepalive_connections)
+                self._session.mount("http://", adapter)
+                self._session.mount("https://", adapter)
+            return self._session
+
+    def warm_up(self, url: str, client_class: type):
+        """Open a connection to the host in the background, in the pool of the async client class the model uses,
+        so the first real request finds it there.
+        """
+        with self._lock:
+            if not self.settings.warm_up or (url, client_class) in self._warmed_up_urls:
+                return
+            self._warmed_up_urls.add((url, client_class))
+        asyncio.run_coroutine_threadsafe(self._warm_up(url, client_class), get_shared_event_loop_thread().loop)
+
+    async def _warm_up(self, url: str, client_class: type):
+        try:
+            # Any response will do, only the connection is kept
+            await self.get_client(client_class).head(url, timeout=WARM_UP_TIMEOUT_SECONDS)
+        except _get_httpx_module(client_class).HTTPError as e:
+            logger.debug(f"Failed to warm up the connection to {url}: {e}")
+
+    def _get_httpx_arguments(self, httpx_module: ModuleType) -> dict[str, Any]:
+        return {
+            "limits": httpx_module.Limits(
+                max_connections=self.settings.max_connections,
+                max_keepalive_connections=self.settings.max_keepalive_connections,
+                keepalive_expiry=self.settings.keepalive_expiry_seconds,
+            ),
+            # The SDKs pass their own timeouts with every request, this is the default for everything else
+            "timeout": httpx_module.Timeout(600.0, connect=self.settings.connect_timeout_seconds),
+            "http2": self.settings.http2 and importlib.util.find_spec("h2") is not None,
+            "follow_redirects": True,
+        }
+
+
+def _get_httpx_module(client_class: type) -> ModuleType:
+    """httpx itself or the fork the client class is built on"""
+    base_class = next(base for base in client_class.__mro__ if base.__name__ in ("Client", "AsyncClient"))
+    return importlib.import_module(base_class.__module__.split(".")[0])
+
+
+_shared_http_transport: HttpTransport | None = None
+_shared_http_transport_lock = threading.Lock()
+
+
+def get_shared_http_transport() -> HttpTransport:
+    global _shared_http_transport
+    with _shared_http_transport_lock:
+        if _shared_http_transport is None:
+            _shared_http_transport = HttpTransport()
+        return _shared_http_transport
@@ -5,6 +5,7 @@ from typing import Any
 
 from hermes.chat.interface.user.control_panel.exa_client import ExaClient
 from hermes.utils.config_utils import extract_config_section
+from hermes.utils.http_transport import get_shared_http_transport
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
@@ -62,10 +63,9 @@ class UtilsCommandExecutor:
         print(f"Extracted pages saved to: {output_path}")
 
     def _get_url(self, cli_args: Namespace):
-        import requests
         from markitdown import MarkItDown
 
-        response = requests.get(cli_args.url, headers=HEADERS)
+        response = get_shared_http_transport().get_session().get(cli_args.url, headers=HEADERS)
         response.raise_for_status()
         markitdown = MarkItDown()
         conversion_result = markitdown.convert(response)
@@ -4,3 +4,23 @@ from invoke import task
 @task
 def performance_test_with_import(c):
     c.run("uv run python -X importtime -m hermes.main")
+
+
+@task
+def fake_llm_server(c, port=8765, ttft=0.3, tokens_per_second=80.0, response_tokens=400, script=None):
+    """Local server streaming like the OpenAI and Anthropic APIs, e.g. for manual runs with base_url pointed at it"""
+    script_argument = f" --script {script}" if script else ""
+    c.run(
+        "uv run python -m hermes.benchmarks.fake_llm_server"
+        f" --port {port} --ttft {ttft} --tokens-per-second {tokens_per_second} --response-tokens {response_tokens}{script_argument}"
+    )
+
+
+@task
+def benchmark_latency(c, scenario="all", provider="openai", turns=5, history_messages=200, output=None):
+    """Hermes' own overhead (CPU, memory, rendering, per-phase latency) against the fake LLM server"""
+    output_argument = f" --output {output}" if output else ""
+    c.run(
+        "uv run python -m hermes.benchmarks.latency_benchmark"
+        f" --scenario {scenario} --provider {provider} --turns {turns} --history-messages {history_messages}{output_argument}"
+    )
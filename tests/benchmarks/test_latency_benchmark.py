@@ -0,0 +1,64 @@
+from unittest.mock import Mock
+
+import pytest
+
+from hermes.benchmarks.fake_llm_server import FakeLLMServer, FakeLLMServerSettings, ResponseScript
+from hermes.benchmarks.latency_benchmark import BenchmarkSettings, ScriptedUserInterface, ScriptedUserParticipant, run_chat_benchmark
+from hermes.chat.events.engine_commands.stream_metrics import StreamMetricsEvent
+from hermes.chat.interface.assistant.models.model_factory import ModelFactory
+from hermes.chat.interface.user.interface.event_renderer import EventRenderer
+from hermes.chat.messages import TextMessage
+
+FAST_SETTINGS = FakeLLMServerSettings(time_to_first_token_seconds=0, tokens_per_second=0, response_tokens=0)
+
+
+def _stream_text(provider: str, model_tag: str, server: FakeLLMServer) -> str:
+    base_url = f"{server.url}/v1" if provider == "OPENAI" else server.url
+    model = ModelFactory(Mock()).get_model(provider, model_tag, {provider.lower(): {"api_key": "fake", "base_url": base_url}})
+    model.initialize()
+    request = model.get_request_builder().build_request([TextMessage(author="user", text="hello")])
+    return "".join(getattr(chunk, "text", chunk) for chunk in model.send_request(request))
+
+
+class TestLatencyBenchmark:
+    @pytest.mark.parametrize(("provider", "model_tag"), [("OPENAI", "gpt-4o"), ("ANTHROPIC", "claude-3-5-haiku-20241022")])
+    def test_fake_server_streams_in_the_provider_protocol(self, provider, model_tag):
+        with FakeLLMServer(FAST_SETTINGS, ResponseScript(["first answer", "second answer"])) as server:
+            assert _stream_text(provider, model_tag, server) == "first answer"
+            assert _stream_text(provider, model_tag, server) == "second answer"
+            assert server.request_count == 2
+
+    def test_responses_are_padded_to_the_configured_length(self):
+        server = FakeLLMServer(FakeLLMServerSettings(response_tokens=10, tokens_per_chunk=2), ResponseScript(["abc"]))
+
+        chunks = server.get_response_chunks()
+        server.stop()
+
+        assert "".join(chunks) == ("abc" * 14)[:40]
+        assert len(chunks) == 5
+
+    def test_response_script_file_uses_the_mocked_research_format(self, tmp_path):
+        script_path = tmp_path / "script.txt"
+        script_path.write_text("one\n$%%\ntwo\n")
+
+        script = ResponseScript.from_file(script_path)
+
+        assert [script.next_response() for _ in range(3)] == ["one", "two", "one"]
+
+    def test_chat_benchmark_runs_the_conversation(self):
+        settings = BenchmarkSettings(turns=2, history_messages=10, time_to_first_token_seconds=0, tokens_per_second=0, response_tokens=20)
+
+        result = run_chat_benchmark(settings)
+
+        assert len(result.turn_seconds) == 2
+        assert len(result.stream_metrics) == 2
+        assert all(metrics.completed and metrics.chunk_count for metrics in result.stream_metrics)
+        assert "request build" in result.describe()
+
+    def test_stream_metrics_can_be_shown_in_the_scripted_interface(self):
+        user_interface = ScriptedUserInterface(["hello"], EventRenderer(None, Mock()))
+        orchestrator = Mock(user_participant=ScriptedUserParticipant(user_interface))
+
+        StreamMetricsEvent(show=True).execute(orchestrator)
+
+        assert user_interface.event_renderer.show_stream_metrics
@@ -0,0 +1,153 @@
+from unittest.mock import Mock
+
+import pytest
+
+from hermes.chat.events.message_event import MessageEvent
+from hermes.chat.interface.assistant.chat.assistant_orchestrator import ChatAssistantOrchestrator
+from hermes.chat.interface.assistant.chat.cascade_router import (
+    ESCALATION_MARKER,
+    CascadeRouter,
+    CascadeRoutingSettings,
+    CascadeRoutingStats,
+)
+from hermes.chat.interface.assistant.models.chat_models.base import ChatModel
+from hermes.chat.messages import ImageMessage, LLMRunCommandOutput, TextMessage
+
+
+class FakeModel(ChatModel):
+    def __init__(self, name: str, chunks: list[str], error: Exception | None = None):
+        super().__init__({}, name, Mock())
+        self.chunks = chunks
+        self.error = error
+        self.request_builder = Mock()
+        self.request_builder.build_request.side_effect = lambda messages: {"model": name, "messages": messages}
+        self.requests = []
+
+    def initialize(self):
+        pass
+
+    async def _stream(self, request):
+        self.requests.append(request)
+        if self.error:
+            raise self.error
+        for chunk in self.chunks:
+            yield chunk
+
+    def get_request_builder(self):
+        return self.request_builder
+
+    @staticmethod
+    def get_provider() -> str:
+        return "FAKE"
+
+    @staticmethod
+    def get_model_tags() -> list[str]:
+        return ["fake"]
+
+
+def create_orchestrator(primary: FakeModel, fast: FakeModel, settings: CascadeRoutingSettings | None = None, is_agent_mode=False):
+    control_panel = Mock(is_agent_mode=is_agent_mode)
+    control_panel.get_active_commands.return_value = []
+    router = CascadeRouter(fast, settings or CascadeRoutingSettings(fast_model="FAKE/fast"), Mock())
+    return ChatAssistantOrchestrator(primary, control_panel, router=router)
+
+
+def run_turn(orchestrator: ChatAssistantOrchestrator, messages) -> str:
+    orchestrator.render(MessageEvent(message) for message in messages)
+    response_event = next(orchestrator.get_input())
+    assert isinstance(response_event, MessageEvent)
+    return "".join(response_event.get_message().get_content_for_user())
+
+
+def routing_stats(orchestrator: ChatAssistantOrchestrator) -> CascadeRoutingStats:
+    assert orchestrator.router is not None
+    return orchestrator.router.stats
+
+
+class TestCascadeRouter:
+    def test_short_prompt_is_answered_by_the_fast_model(self):
+        primary, fast = FakeModel("primary", ["primary answer"]), FakeModel("fast", ["fast ", "answer"])
+        orchestrator = create_orchestrator(primary, fast)
+
+        response = run_turn(orchestrator, [TextMessage(author="user", text="What's 2+2?")])
+
+        assert response == "fast answer"
+        assert primary.requests == []
+        assert routing_stats(orchestrator).fast_turns == 1
+        assert routing_stats(orchestrator).saved_output_tokens > 0
+
+    def test_fast_model_can_escalate(self):
+        primary, fast = FakeModel("primary", ["primary answer"]), FakeModel("fast", ["[ESC", "ALATE]"])
+        orchestrator = create_orchestrator(primary, fast)
+
+        response = run_turn(orchestrator, [TextMessage(author="user", text="Prove the Riemann hypothesis")])
+
+        assert response == "primary answer"
+        assert len(primary.requests) == 1
+        assert routing_stats(orchestrator).escalated_turns == 1
+
+    @pytest.mark.parametrize("allow_escalation", [True, False])
+    def test_failed_fast_model_escalates(self, allow_escalation):
+        primary, fast = FakeModel("primary", ["primary answer"]), FakeModel("fast", [], error=PermissionError("invalid API key"))
+        orchestrator = create_orchestrator(primary, fast, CascadeRoutingSettings(fast_model="FAKE/fast", allow_escalation=allow_escalation))
+
+        response = run_turn(orchestrator, [TextMessage(author="user", text="What's 2+2?")])
+
+        assert response == "primary answer"
+        assert len(fast.requests) == 1
+        assert routing_stats(orchestrator).escalated_turns == 1
+
+    def test_fast_model_is_told_about_the_marker(self):
+        fast = FakeModel("fast", ["answer"])
+        orchestrator = create_orchestrator(FakeModel("primary", []), fast)
+
+        run_turn(orchestrator, [TextMessage(author="user", text="Hi")])
+
+        assert ESCALATION_MARKER in fast.requests[0]["messages"][0].text
+
+    @pytest.mark.parametrize(
+        ("messages", "is_agent_mode"),
+        [
+            ([TextMessage(author="user", text="x" * 1000)], False),
+            ([TextMessage(author="user", text="Describe it"), ImageMessage(author="user", image_path="image.png")], False),
+            ([TextMessage(author="user", text="Hi")], True),
+        ],
+    )
+    def test_complex_turns_go_to_the_primary_model(self, messages, is_agent_mode):
+        primary, fast = FakeModel("primary", ["primary answer"]), FakeModel("fast", ["fast answer"])
+        orchestrator = create_orchestrator(primary, fast, is_agent_mode=is_agent_mode)
+
+        assert run_turn(orchestrator, messages) == "primary answer"
+        assert fast.requests == []
+        assert routing_stats(orchestrator).primary_turns == 1
+
+    def test_only_the_current_turn_is_considered(self):
+        primary, fast = FakeModel("primary", ["primary answer"]), FakeModel("fast", ["fast answer"])
+        orchestrator = create_orchestrator(primary, fast)
+        messages = [
+            TextMessage(author="user", text="x" * 1000),
+            TextMessage(author="assistant", text="Long answer"),
+            LLMRunCommandOutput(text="done"),
+        ]
+
+        assert run_turn(orchestrator, messages) == "fast answer"
+        assert orchestrator.routing_decision is not None
+        assert orchestrator.routing_decision.reason == "command output"
+
+    def test_settings_are_parsed_from_ini_strings(self):
+        settings = CascadeRoutingSettings.from_config(
+            {"fast_model": "GROQ/fast", "max_prompt_characters": "100", "route_agent_mode": "true"}
+        )
+
+        assert settings == CascadeRoutingSettings(fast_model="GROQ/fast", max_prompt_characters=100, route_agent_mode=True)
+
+    def test_responses_are_passed_through_without_escalation(self):
+        fast = FakeModel("fast", [ESCALATION_MARKER])
+        router = CascadeRouter(fast, CascadeRoutingSettings(fast_model="FAKE/fast", allow_escalation=False), Mock())
+        router.initialize()
+        decision = router.decide([TextMessage(author="user", text="Hi")], is_agent_mode=False)
+
+        responses = list(router.stream(router.build_fast_request("prompt", []), decision, Mock()))
+
+        assert responses == [ESCALATION_MARKER]
+        assert fast.requests[0]["messages"][0].text == "prompt"
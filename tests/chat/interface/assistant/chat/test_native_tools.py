@@ -0,0 +1,194 @@
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from hermes.chat.events.message_event import MessageEvent
+from hermes.chat.interface.assistant.chat.assistant_orchestrator import ChatAssistantOrchestrator
+from hermes.chat.interface.assistant.chat.command_status_override import ChatAssistantCommandStatusOverride
+from hermes.chat.interface.assistant.chat.control_panel import ChatAssistantControlPanel
+from hermes.chat.interface.assistant.chat.response_types import TextLLMResponse, ToolCallLLMResponse
+from hermes.chat.interface.assistant.models.chat_models.base import ChatModel
+from hermes.chat.interface.assistant.models.chat_models.openai import _StreamedToolCalls
+from hermes.chat.interface.assistant.models.prompt_builder.simple_prompt_builder import SimplePromptBuilderFactory
+from hermes.chat.interface.assistant.models.request_builder.claude import ClaudeRequestBuilder
+from hermes.chat.interface.assistant.models.request_builder.openai import OpenAIRequestBuilder
+from hermes.chat.interface.commands.command import Command
+from hermes.chat.interface.commands.tool_schema import build_command_args, build_tool_definition, format_command_block
+from hermes.chat.interface.helpers.cli_notifications import CLINotificationsPrinter
+from hermes.chat.messages import TextMessage
+
+
+class RecordCommand(Command):
+    def __init__(self, on_execute=None):
+        super().__init__("record", "Record the values")
+        self.add_section("value", help_text="The value to record")
+        self.add_section("tag", required=False, allow_multiple=True)
+        self.executed_args = []
+        self.on_execute = on_execute
+
+    def execute(self, context, args):
+        self.executed_args.append(args)
+        if self.on_execute:
+            self.on_execute()
+        yield from []
+
+
+class FakeModel(ChatModel):
+    def __init__(self, chunks: list):
+        super().__init__({}, "fake", Mock())
+        self.chunks = chunks
+        self.streamed_count = 0
+        self.request_builder = OpenAIRequestBuilder("fake", Mock(), SimplePromptBuilderFactory())
+
+    def initialize(self):
+        pass
+
+    async def _stream(self, request):
+        for chunk in self.chunks:
+            self.streamed_count += 1
+            yield chunk
+
+    def get_request_builder(self):
+        return self.request_builder
+
+    @staticmethod
+    def get_provider() -> str:
+        return "FAKE"
+
+    @staticmethod
+    def get_model_tags() -> list[str]:
+        return ["fake"]
+
+
+def create_control_panel(command: Command) -> ChatAssistantControlPanel:
+    command_status_overrides: dict[str, ChatAssistantCommandStatusOverride] = {}
+    control_panel = ChatAssistantControlPanel(Mock(spec=CLINotificationsPrinter), [command], Mock(), command_status_overrides, Mock())
+    # Only the test command is active, the control panel keeps the passed overrides
+    for name in control_panel.command_registry.get_command_names():
+        if name != command.name:
+            command_status_overrides[name] = ChatAssistantCommandStatusOverride.OFF
+    return control_panel
+
+
+def run_turn(orchestrator: ChatAssistantOrchestrator) -> tuple[str, list]:
+    orchestrator.render(MessageEvent(message) for message in [TextMessage(author="user", text="Record x")])
+    events = orchestrator.get_input()
+    response_event = next(events)
+    assert isinstance(response_event, MessageEvent)
+    response_text = "".join(response_event.get_message().get_content_for_user())
+    return response_text, list(events)
+
+
+class TestToolSchema:
+    def test_sections_become_string_properties(self):
+        tool = build_tool_definition(RecordCommand())
+
+        assert tool.name == "record"
+        assert tool.description == "Record the values"
+        assert tool.parameters == {
+            "type": "object",
+            "properties": {
+                "value": {"type": "string", "description": "The value to record"},
+                "tag": {"type": "array", "items": {"type": "string", "description": "The tag"}},
+            },
+            "required": ["value"],
+        }
+
+    def test_arguments_are_checked_like_parsed_sections(self):
+        command = RecordCommand()
+
+        assert build_command_args(command, {"value": "x", "tag": ["a", "b"]}) == ({"value": "x", "tag": ["a", "b"]}, [])
+        assert build_command_args(command, {"tag": "a"}) == ({"tag": ["a"]}, ["Missing required section 'value'"])
+        assert build_command_args(command, {"value": "x", "other": "y"})[1] == ["Unknown section 'other' for command 'record'."]
+        assert build_command_args(command, {"value": ["x", "y"]})[1] == [
+            "Multiple values of section 'value' found, but only one is allowed."
+        ]
+
+    def test_tool_call_is_formatted_in_the_text_syntax(self):
+        assert format_command_block("record", {"value": "x", "tag": ["a", "b"]}) == "<<< record\n///value\nx\n///tag\na\n///tag\nb\n>>>"
+
+
+class TestRequestBuilders:
+    def test_openai_request_has_function_tools(self):
+        request_builder = OpenAIRequestBuilder("gpt-4o", Mock(), Mock())
+        tool = build_tool_definition(RecordCommand())
+        request_builder.set_tools([tool])
+
+        request = request_builder.build_request([TextMessage(author="user", text="Hi")])
+
+        assert request["tools"] == [
+            {"type": "function", "function": {"name": "record", "description": tool.description, "parameters": tool.parameters}}
+        ]
+
+    def test_claude_request_has_tools(self):
+        request_builder = ClaudeRequestBuilder("claude", Mock(), Mock())
+        tool = build_tool_definition(RecordCommand())
+        request_builder.set_tools([tool])
+
+        request = request_builder.build_request([TextMessage(author="user", text="Hi")])
+
+        assert request["tools"] == [{"name": "record", "description": tool.description, "input_schema": tool.parameters}]
+
+    def test_requests_have_no_tools_by_default(self):
+        request = OpenAIRequestBuilder("gpt-4o", Mock(), Mock()).build_request([TextMessage(author="user", text="Hi")])
+
+        assert "tools" not in request
+
+    def test_openai_tool_call_deltas_are_assembled(self):
+        def delta(index, arguments, name=None, tool_call_id=None):
+            return SimpleNamespace(index=index, id=tool_call_id, function=SimpleNamespace(name=name, arguments=arguments))
+
+        tool_calls = _StreamedToolCalls()
+
+        assert tool_calls.add_deltas([delta(0, '{"value": ', "record", "call_1")]) == []
+        assert tool_calls.add_deltas([delta(0, '"x"}')]) == []
+        [first] = tool_calls.add_deltas([delta(1, "{}", "record", "call_2")])
+        [second] = tool_calls.finish()
+
+        assert (first.tool_call_id, first.name, first.arguments) == ("call_1", "record", {"value": "x"})
+        assert (second.tool_call_id, second.arguments) == ("call_2", {})
+
+
+class TestStreamingExecution:
+    def test_tool_call_is_executed_while_the_response_streams(self):
+        model = FakeModel([TextLLMResponse("Recording"), ToolCallLLMResponse("record", {"value": "x"}, "call_1"), TextLLMResponse("done")])
+        command = RecordCommand(on_execute=lambda: executed_at.append(model.streamed_count))
+        executed_at = []
+        orchestrator = ChatAssistantOrchestrator(model, create_control_panel(command), native_tools=True)
+
+        response_text, events = run_turn(orchestrator)
+
+        assert command.executed_args == [{"value": "x"}]
+        # Executed before the text after the tool call streamed in
+        assert executed_at == [2]
+        assert "<<< record\n///value\nx\n>>>" in response_text
+        assert "Successfully executed" in events[-1].get_message().text
+
+    def test_native_tools_leave_out_the_text_syntax_help(self):
+        model = FakeModel([TextLLMResponse("Hi")])
+        orchestrator = ChatAssistantOrchestrator(model, create_control_panel(RecordCommand()), native_tools=True)
+
+        orchestrator.render(MessageEvent(message) for message in [TextMessage(author="user", text="Hi")])
+
+        assert [tool["function"]["name"] for tool in orchestrator.request["tools"]] == ["record"]
+        prompt = orchestrator.request["messages"][0]["content"]
+        assert "tool calls" in prompt
+        assert "///value" not in prompt
+
+    def test_invalid_tool_call_is_reported(self):
+        command = RecordCommand()
+        model = FakeModel([ToolCallLLMResponse("record", {"tag": ["a"]}, "call_1")])
+        orchestrator = ChatAssistantOrchestrator(model, create_control_panel(command), native_tools=True)
+
+        _, events = run_turn(orchestrator)
+
+        assert command.executed_args == []
+        assert "Missing required section 'value'" in events[-1].get_message().text
+
+    def test_text_commands_are_still_parsed(self):
+        command = RecordCommand()
+        model = FakeModel([TextLLMResponse("<<< record\n///value\ny\n>>>\n"), ToolCallLLMResponse("record", {"value": "x"})])
+        orchestrator = ChatAssistantOrchestrator(model, create_control_panel(command), native_tools=True)
+
+        run_turn(orchestrator)
+
+        assert command.executed_args == [{"value": "x"}, {"value": "y"}]
@@ -0,0 +1,111 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import pytest
+
+from hermes.chat.interface.assistant.framework.batching_llm_interface import BatchingLLMInterface, BatchRequestCollector
+from hermes.chat.interface.assistant.models.chat_models.batch_clients import BatchResult, LocalBatchClient, OpenAIBatchClient
+
+
+def _collector(batch_client, **kwargs) -> BatchRequestCollector:
+    return BatchRequestCollector(batch_client, Mock(), poll_interval_seconds=0, **kwargs)
+
+
+def _echo(request: dict) -> str:
+    return f"answer to {request['messages'][-1]}"
+
+
+class TestBatchMode:
+    def test_concurrent_requests_are_sent_as_one_batch(self):
+        batch_client = LocalBatchClient(_echo, polls_until_done=3)
+        collector = _collector(batch_client, collection_window_seconds=0.2)
+        llm_interface = BatchingLLMInterface(Mock(), collector)
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            responses = list(
+                executor.map(lambda node: "".join(llm_interface.send_request({"messages": [node], "stream": True})), ["a", "b", "c"])
+            )
+
+        assert responses == ["answer to a", "answer to b", "answer to c"]
+        assert len(batch_client.submitted_batches) == 1
+        assert all("stream" not in request for request in batch_client.submitted_batches[0].values())
+
+    def test_full_batch_is_submitted_without_waiting_for_the_window(self):
+        batch_client = LocalBatchClient(_echo)
+        collector = _collector(batch_client, collection_window_seconds=60, max_batch_size=2)
+
+        futures = [collector.submit({"messages": [node]}) for node in ["a", "b"]]
+
+        assert [future.result(timeout=5) for future in futures] == ["answer to a", "answer to b"]
+
+    def test_failed_requests_fail_only_their_node(self):
+        def respond(request):
+            if request["messages"][-1] == "bad":
+                raise ValueError("invalid request")
+            return "ok"
+
+        collector = _collector(LocalBatchClient(respond), collection_window_seconds=0, max_batch_size=2)
+
+        good, bad = collector.submit({"messages": ["good"]}), collector.submit({"messages": ["bad"]})
+
+        assert good.result(timeout=5) == "ok"
+        with pytest.raises(RuntimeError, match="invalid request"):
+            bad.result(timeout=5)
+
+    def test_submit_errors_fail_the_whole_batch(self):
+        batch_client = Mock()
+        batch_client.submit.side_effect = ConnectionError("offline")
+        collector = _collector(batch_client, collection_window_seconds=0)
+
+        with pytest.raises(ConnectionError):
+            collector.submit({"messages": ["a"]}).result(timeout=5)
+
+    def test_closing_the_last_waiting_request_cancels_the_batch(self):
+        batch_client = LocalBatchClient(_echo, polls_until_done=10_000)
+        collector = _collector(batch_client, collection_window_seconds=0)
+        responses = BatchingLLMInterface(Mock(), collector, wait_slice_seconds=0.01).send_request({"messages": ["a"]})
+
+        assert next(responses) == ""
+        responses.close()
+
+        deadline = time.monotonic() + 5
+        while not batch_client.cancelled_batch_ids and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert batch_client.cancelled_batch_ids == ["local-batch-1"]
+
+    def test_batch_keeps_running_while_a_request_still_waits(self):
+        batch_client = LocalBatchClient(_echo, polls_until_done=20)
+        collector = _collector(batch_client, collection_window_seconds=0.2)
+
+        abandoned, waiting = collector.submit({"messages": ["a"]}), collector.submit({"messages": ["b"]})
+        abandoned.cancel()
+
+        assert waiting.result(timeout=5) == "answer to b"
+        assert batch_client.cancelled_batch_ids == []
+
+    def test_generate_request_is_delegated(self):
+        wrapped = Mock()
+        wrapped.generate_request.return_value = {"messages": []}
+
+        assert BatchingLLMInterface(wrapped, Mock()).generate_request([]) == {"messages": []}
+
+    def test_openai_results_are_parsed_from_the_output_and_error_files(self):
+        client = Mock()
+        client.batches.retrieve.return_value = Mock(output_file_id="out", error_file_id="err")
+        files = {
+            "out": '{"custom_id": "a", "response": {"status_code": 200, "body": {"choices": [{"message": {"content": "hi"}}]}}}',
+            "err": '{"custom_id": "b", "response": {"status_code": 400, "body": {"error": "bad"}}}',
+        }
+        client.files.content.side_effect = lambda file_id: Mock(text=files[file_id])
+
+        results = OpenAIBatchClient(client).get_results("batch")
+
+        assert results["a"] == BatchResult(text="hi")
+        assert "bad" in (results["b"].error or "")
+
+    def test_local_batch_is_done_after_the_polls(self):
+        batch_client = LocalBatchClient(_echo, polls_until_done=2)
+        batch_id = batch_client.submit({"x": {"messages": ["a"]}})
+
+        assert [batch_client.is_done(batch_id), batch_client.is_done(batch_id)] == [False, True]
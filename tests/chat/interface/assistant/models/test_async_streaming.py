@@ -0,0 +1,127 @@
+import asyncio
+import os
+import signal
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from hermes.chat.interface.assistant.chat.response_types import TextLLMResponse, ThinkingLLMResponse
+from hermes.chat.interface.assistant.models.chat_models.base import ChatModel
+from hermes.chat.interface.assistant.models.chat_models.bedrock import BedrockModel
+from hermes.chat.interface.assistant.models.chat_models.openai import OpenAIModel
+from hermes.utils.event_loop_thread import EventLoopThread
+
+
+class FakeStreamingModel(ChatModel):
+    def __init__(self):
+        super().__init__({}, "fake", Mock())
+        self.closed = False
+
+    def initialize(self):
+        pass
+
+    async def _stream(self, request):
+        try:
+            for chunk in request:
+                await asyncio.sleep(0.1)
+                yield chunk
+        finally:
+            self.closed = True
+
+    def get_request_builder(self):
+        return Mock()
+
+    @staticmethod
+    def get_provider() -> str:
+        return "FAKE"
+
+    @staticmethod
+    def get_model_tags() -> list[str]:
+        return ["fake"]
+
+
+def _chunk(content=None, reasoning_content=None):
+    delta = SimpleNamespace(content=content, reasoning_content=reasoning_content)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+async def _async_iter(items):
+    for item in items:
+        yield item
+
+
+def _bedrock_events(all_streams_started: threading.Barrier):
+    # Only passes once every stream is reading its events at the same time
+    all_streams_started.wait()
+    yield {"contentBlockDelta": {"delta": {"text": "answer"}}}
+
+
+class TestAsyncStreaming:
+    def test_send_request_adapts_the_async_stream(self):
+        assert list(FakeStreamingModel().send_request(["Hello", " world"])) == ["Hello", " world"]
+
+    def test_closing_the_sync_generator_closes_the_stream(self):
+        model = FakeStreamingModel()
+        responses = model.send_request(["Hello", " world"])
+
+        assert next(responses) == "Hello"
+        responses.close()
+        assert model.closed
+
+    def test_interrupt_while_waiting_cancels_the_stream(self):
+        model = FakeStreamingModel()
+        responses = model.send_request(["Hello", " world"])
+        interrupt = threading.Timer(0.05, lambda: os.kill(os.getpid(), signal.SIGINT))
+
+        interrupt.start()
+        with pytest.raises(KeyboardInterrupt):
+            list(responses)
+        assert model.closed
+
+    def test_many_streams_share_one_event_loop(self):
+        model = FakeStreamingModel()
+
+        async def consume_all():
+            async def consume():
+                return [chunk async for chunk in model.stream(["a", "b"])]
+
+            return await asyncio.gather(*(consume() for _ in range(200)))
+
+        started_at = time.monotonic()
+        results = EventLoopThread().run(consume_all())
+
+        assert results == [["a", "b"]] * 200
+        assert time.monotonic() - started_at < 2
+
+    def test_openai_stream_uses_the_async_client(self):
+        model = OpenAIModel({"api_key": "key"}, "gpt-4o", Mock())
+        model.initialize()
+        model.client = Mock()
+        model.client.chat.completions.create = AsyncMock(
+            return_value=_async_iter([_chunk(reasoning_content="thinking"), _chunk(content="answer")])
+        )
+
+        responses = list(model.send_request({"model": "gpt-4o"}))
+
+        assert isinstance(responses[0], ThinkingLLMResponse)
+        assert isinstance(responses[1], TextLLMResponse)
+        model.client.chat.completions.create.assert_awaited_once_with(model="gpt-4o")
+
+    def test_bedrock_streams_are_not_limited_by_the_default_executor(self):
+        model = BedrockModel({"aws_region": "us-east-1"}, "anthropic.claude-3-5-haiku-20241022-v1:0", Mock())
+        model.initialize()
+        streams_count = min(32, (os.cpu_count() or 1) + 4) + 8
+        all_streams_started = threading.Barrier(streams_count, timeout=5)
+        model.client = Mock()
+        model.client.converse_stream.side_effect = lambda **_: {"stream": _bedrock_events(all_streams_started)}
+
+        async def consume_all():
+            async def consume():
+                return [response.text async for response in model.stream({"modelId": model.model_tag})]
+
+            return await asyncio.gather(*(consume() for _ in range(streams_count)))
+
+        assert EventLoopThread().run(consume_all()) == [["answer"]] * streams_count
@@ -0,0 +1,84 @@
+import base64
+import os
+from unittest.mock import Mock
+
+import pytest
+
+from hermes.chat.interface.assistant.models.prompt_builder.simple_prompt_builder import SimplePromptBuilderFactory
+from hermes.chat.interface.assistant.models.request_builder.attachment_cache import AttachmentCache
+from hermes.chat.interface.assistant.models.request_builder.base import RequestBuilderCaches
+from hermes.chat.interface.assistant.models.request_builder.image_preprocessing import ImagePreprocessor
+from hermes.chat.interface.assistant.models.request_builder.openai import OpenAIRequestBuilder
+from hermes.chat.messages import TextualFileMessage
+from hermes.utils.disk_cache import DiskCache
+
+
+class TestAttachmentCache:
+    @pytest.fixture
+    def disk_cache(self, tmp_path):
+        return DiskCache(tmp_path / "cache", max_disk_bytes=1024, max_memory_bytes=1024)
+
+    @pytest.fixture
+    def attachment(self, tmp_path):
+        path = tmp_path / "image.png"
+        path.write_bytes(b"image bytes")
+        return path
+
+    def test_payload_is_encoded_once(self, disk_cache, attachment):
+        cache = AttachmentCache(disk_cache)
+        load_bytes = Mock(return_value=attachment.read_bytes())
+
+        first = cache.get_base64(str(attachment), None, load_bytes)
+        second = cache.get_base64(str(attachment), None, load_bytes)
+
+        assert first == second == base64.b64encode(b"image bytes").decode("ascii")
+        load_bytes.assert_called_once()
+
+    def test_encoded_payload_survives_restart(self, tmp_path, disk_cache, attachment):
+        AttachmentCache(disk_cache).get_base64(str(attachment), [1, 2], Mock(return_value=b"pages"))
+
+        restarted_cache = AttachmentCache(DiskCache(tmp_path / "cache", max_disk_bytes=1024, max_memory_bytes=1024))
+        load_bytes = Mock()
+        assert restarted_cache.get_base64(str(attachment), [1, 2], load_bytes) == base64.b64encode(b"pages").decode("ascii")
+        load_bytes.assert_not_called()
+
+    def test_modified_file_is_reencoded(self, disk_cache, attachment):
+        cache = AttachmentCache(disk_cache)
+        cache.get_base64(str(attachment), None, Mock(return_value=b"image bytes"))
+
+        attachment.write_bytes(b"new image bytes")
+        load_bytes = Mock(return_value=b"new image bytes")
+        assert cache.get_base64(str(attachment), None, load_bytes) == base64.b64encode(b"new image bytes").decode("ascii")
+        load_bytes.assert_called_once()
+
+    def test_page_selection_is_part_of_the_key(self, disk_cache, attachment):
+        cache = AttachmentCache(disk_cache)
+        assert cache.get_bytes(str(attachment), [1], Mock(return_value=b"page 1")) == b"page 1"
+        assert cache.get_bytes(str(attachment), [2], Mock(return_value=b"page 2")) == b"page 2"
+
+    def test_request_builder_reads_through_the_injected_caches(self, tmp_path, isolated_cache_dir):
+        notes = tmp_path / "notes.md"
+        notes.write_text("# Notes")
+        disk_cache = DiskCache(tmp_path / "injected", max_disk_bytes=1024, max_memory_bytes=1024)
+        caches = RequestBuilderCaches(Mock(), AttachmentCache(disk_cache), ImagePreprocessor(disk_cache))
+        builder = OpenAIRequestBuilder("gpt-4o", Mock(), SimplePromptBuilderFactory(), caches=caches)
+
+        request = builder.build_request([TextualFileMessage(author="user", text_filepath=str(notes), textual_content=None)])
+
+        assert "# Notes" in str(request["messages"])
+        assert any((tmp_path / "injected").iterdir())
+        assert not isolated_cache_dir.exists()
+
+
+class TestDiskCache:
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        cache = DiskCache(tmp_path, max_disk_bytes=250, max_memory_bytes=0)
+        cache.set("first", b"a" * 100)
+        for entry in tmp_path.iterdir():
+            os.utime(entry, (0, 0))
+        cache.set("second", b"b" * 100)
+        cache.set("third", b"c" * 100)
+
+        assert cache.get("first") is None
+        assert cache.get("second") == b"b" * 100
+        assert cache.get("third") == b"c" * 100
@@ -0,0 +1,120 @@
+from unittest.mock import Mock
+
+from hermes.chat.interface.assistant.models.chat_models.stream_metrics import StreamMetricsRegistry, measure_stream
+from hermes.chat.interface.assistant.models.prompt_builder.simple_prompt_builder import SimplePromptBuilderFactory
+from hermes.chat.interface.assistant.models.request_builder.content_dedupe import ContentDedupePolicy, ContentDeduplicator
+from hermes.chat.interface.assistant.models.request_builder.context_window import ContextWindow
+from hermes.chat.interface.assistant.models.request_builder.openai import OpenAIRequestBuilder
+from hermes.chat.messages import LLMRunCommandOutput, TextMessage, TextualFileMessage, UrlMessage
+
+TREE = "src/\n" + "  module.py\n" * 50
+
+
+def _deduplicator(policy=ContentDedupePolicy.BACK_REFERENCE, load_file_text=None, load_url_text=None) -> ContentDeduplicator:
+    return ContentDeduplicator(policy, load_file_text or Mock(), load_url_text or Mock(return_value="page " * 100))
+
+
+def _file(tmp_path, name: str = "notes.txt", content: str = "line of the file\n" * 40) -> str:
+    file_path = tmp_path / name
+    file_path.write_text(content)
+    return str(file_path)
+
+
+class TestContentDeduplicator:
+    def test_repeated_command_output_refers_back_to_the_first_copy(self):
+        messages = [
+            LLMRunCommandOutput(text=TREE, name="Directory Tree"),
+            TextMessage(author="assistant", text="Let me look again"),
+            LLMRunCommandOutput(text=TREE, name="Directory Tree"),
+        ]
+
+        deduped, report = _deduplicator().dedupe(messages)
+
+        assert deduped[0] is messages[0]
+        assert isinstance(deduped[2], LLMRunCommandOutput)
+        assert "earlier in the conversation" in deduped[2].text
+        assert report.deduplicated_blocks == 1
+        assert report.saved_bytes == len(TREE)
+
+    def test_keep_latest_keeps_the_last_copy(self):
+        messages = [LLMRunCommandOutput(text=TREE), LLMRunCommandOutput(text=TREE), LLMRunCommandOutput(text=TREE)]
+
+        deduped, report = _deduplicator(ContentDedupePolicy.KEEP_LATEST).dedupe(messages)
+
+        assert deduped[2] is messages[2]
+        assert all(isinstance(message, LLMRunCommandOutput) and "later in the conversation" in message.text for message in deduped[:2])
+        assert report.deduplicated_blocks == 2
+
+    def test_files_are_compared_by_content(self, tmp_path):
+        file_path = _file(tmp_path)
+        content = (tmp_path / "notes.txt").read_text()
+        load_file_text = Mock(return_value=content)
+        opened_file = TextualFileMessage(author="user", text_filepath=file_path, textual_content=None, file_role="CommandOutput")
+        pasted_copy = TextualFileMessage(author="user", text_filepath=None, textual_content=content, name="copy")
+        deduplicator = _deduplicator(load_file_text=load_file_text)
+
+        deduped, _ = deduplicator.dedupe([opened_file, pasted_copy])
+        deduplicator.dedupe([opened_file, pasted_copy])
+
+        assert isinstance(deduped[1], TextualFileMessage)
+        assert (deduped[1].textual_content or "").startswith(f"[The same content as the file {file_path}")
+        assert deduped[1].name == "copy"
+        # The blocks are cached by message fingerprint
+        load_file_text.assert_called_once()
+
+    def test_urls_are_not_fetched_unless_repeated(self):
+        load_url_text = Mock(return_value="page " * 100)
+        deduplicator = _deduplicator(load_url_text=load_url_text)
+
+        deduplicator.dedupe(
+            [UrlMessage(author="user", url="https://example.com/a"), UrlMessage(author="user", url="https://example.com/b")]
+        )
+        load_url_text.assert_not_called()
+
+        deduped, report = deduplicator.dedupe(
+            [UrlMessage(author="user", url="https://example.com/a"), UrlMessage(author="user", url="https://EXAMPLE.com/a#top")]
+        )
+        assert isinstance(deduped[1], TextualFileMessage)
+        assert "the webpage https://example.com/a" in (deduped[1].textual_content or "")
+        assert report.saved_bytes == len("page " * 100)
+
+    def test_short_and_distinct_blocks_are_kept(self):
+        messages = [LLMRunCommandOutput(text="done"), LLMRunCommandOutput(text="done"), LLMRunCommandOutput(text=TREE)]
+
+        deduped, report = _deduplicator().dedupe(messages)
+
+        assert deduped == messages
+        assert report.deduplicated_blocks == 0
+
+    def test_off_sends_every_copy(self):
+        messages = [LLMRunCommandOutput(text=TREE), LLMRunCommandOutput(text=TREE)]
+
+        assert _deduplicator(ContentDedupePolicy.OFF).dedupe(messages)[0] is messages
+
+
+class TestRequestBuilderDedupe:
+    def test_saved_bytes_are_reported_with_the_stream_metrics(self):
+        request_builder = OpenAIRequestBuilder("gpt-4o", Mock(), SimplePromptBuilderFactory())
+        registry = StreamMetricsRegistry()
+
+        request = request_builder.build_request([LLMRunCommandOutput(text=TREE), LLMRunCommandOutput(text=TREE)])
+        list(measure_stream(["a"], "TEST/model", registry))
+
+        assert request["messages"][0]["content"].count("module.py") == 50
+        [metrics] = registry.take_unreported()
+        assert metrics.deduplicated_bytes == len(TREE)
+        assert "deduplicated" in metrics.describe()
+
+    def test_copy_is_kept_when_the_earlier_one_is_dropped_to_fit(self):
+        request_builder = OpenAIRequestBuilder("gpt-4o", Mock(), SimplePromptBuilderFactory())
+        request_builder.set_context_window(ContextWindow(1000, reserved_output_tokens=0))
+        messages = [TextMessage(author="user", text="assistant prompt"), LLMRunCommandOutput(text=TREE, name="Directory Tree")]
+        for turn in range(8):
+            messages.append(TextMessage(author="user", text=f"question {turn} " + "word " * 100))
+            messages.append(TextMessage(author="assistant", text=f"answer {turn} " + "word " * 100))
+        messages.append(LLMRunCommandOutput(text=TREE, name="Directory Tree"))
+
+        request = request_builder.build_request(messages)
+
+        assert "question 0" not in str(request["messages"])
+        assert request["messages"][-1]["content"].count("module.py") == 50
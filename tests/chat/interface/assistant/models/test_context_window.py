@@ -0,0 +1,129 @@
+from unittest.mock import Mock
+
+import pytest
+
+from hermes.chat.interface.assistant.models.model_factory import ModelFactory
+from hermes.chat.interface.assistant.models.prompt_builder.simple_prompt_builder import SimplePromptBuilderFactory
+from hermes.chat.interface.assistant.models.request_builder.context_window import (
+    ContextFittingPolicy,
+    ContextWindow,
+    ContextWindowExceededError,
+    ContextWindowFitter,
+    TokenEstimator,
+)
+from hermes.chat.interface.assistant.models.request_builder.openai import OpenAIRequestBuilder
+from hermes.chat.messages import LLMRunCommandOutput, TextMessage, TextualFileMessage
+
+
+def _conversation(turns: int, words_per_message: int = 100) -> list:
+    messages = [TextMessage(author="user", text="assistant prompt")]
+    for turn in range(turns):
+        messages.append(TextMessage(author="user", text=f"question {turn} " + "word " * words_per_message))
+        messages.append(TextMessage(author="assistant", text=f"answer {turn} " + "word " * words_per_message))
+    return messages
+
+
+def _fitter(limit_tokens: int, policy=ContextFittingPolicy.DROP_OLDEST, load_text=None) -> ContextWindowFitter:
+    context_window = ContextWindow(limit_tokens, policy, reserved_output_tokens=0)
+    return ContextWindowFitter(context_window, TokenEstimator(4.0), Mock(), load_text or Mock())
+
+
+class TestContextWindow:
+    def test_fitting_messages_are_returned_as_is(self):
+        messages = _conversation(2)
+
+        assert _fitter(10_000).fit(messages) is messages
+
+    def test_token_counts_are_cached_per_message(self):
+        token_estimator = Mock(wraps=TokenEstimator(4.0))
+        fitter = ContextWindowFitter(ContextWindow(100_000, ContextFittingPolicy.DROP_OLDEST), token_estimator, Mock(), Mock())
+        messages = _conversation(3)
+
+        fitter.fit(messages)
+        messages.append(TextMessage(author="user", text="follow up"))
+        fitter.fit(messages)
+
+        assert token_estimator.count_text.call_count == 8
+
+    def test_oldest_messages_are_dropped_starting_with_a_user_message(self):
+        messages = _conversation(10)
+
+        fitted = _fitter(1000).fit(messages)
+
+        assert fitted[-1] is messages[-1]
+        assert fitted[1].author == "user"
+        assert sum(_fitter(1000).count_message_tokens(message, None) for message in fitted) <= 800
+
+    def test_first_kept_message_is_stable_while_the_rest_fits(self):
+        fitter = _fitter(1000)
+        messages = _conversation(10)
+        first_fitted = fitter.fit(messages)
+
+        messages.append(TextMessage(author="user", text="short follow up"))
+        second_fitted = fitter.fit(messages)
+
+        assert second_fitted[1] is first_fitted[1]
+
+    def test_leading_prompt_is_never_dropped(self):
+        messages = _conversation(20)
+
+        fitted = _fitter(1000).fit(messages)
+
+        assert fitted[0] is messages[0]
+        assert fitted[1] is not messages[1]
+        assert fitted[-1] is messages[-1]
+
+    def test_fail_fast_raises_before_sending(self):
+        with pytest.raises(ContextWindowExceededError, match="over the 500 tokens"):
+            _fitter(500, ContextFittingPolicy.FAIL_FAST).fit(_conversation(10))
+
+    def test_largest_attachments_are_truncated_first(self):
+        messages = [
+            TextMessage(author="user", text="look at these"),
+            TextualFileMessage(author="user", text_filepath=None, textual_content="x" * 40_000, name="big.txt"),
+            LLMRunCommandOutput(text="y" * 8_000, name="small command"),
+        ]
+
+        fitted = _fitter(6000, ContextFittingPolicy.TRUNCATE_ATTACHMENTS).fit(messages)
+
+        assert len(fitted) == 3
+        assert isinstance(fitted[1], TextualFileMessage)
+        assert fitted[1].name == "big.txt"
+        truncated_content = fitted[1].textual_content or ""
+        assert len(truncated_content) < 40_000
+        assert "truncated" in truncated_content
+        assert fitted[2] is messages[2]
+
+    def test_file_attachments_are_read_when_truncated(self, tmp_path):
+        file_path = tmp_path / "notes.txt"
+        file_path.write_text("z" * 40_000)
+        messages = [TextualFileMessage(author="user", text_filepath=str(file_path), textual_content=None)]
+
+        fitted = _fitter(2000, ContextFittingPolicy.TRUNCATE_ATTACHMENTS, load_text=lambda path: file_path.read_text()).fit(messages)
+
+        assert isinstance(fitted[0], TextualFileMessage)
+        assert fitted[0].text_filepath is None
+        assert fitted[0].name == str(file_path)
+        assert fitted[0].file_role == "TextualFile (truncated)"
+
+    def test_request_builder_fits_the_messages(self):
+        request_builder = OpenAIRequestBuilder("gpt-4o", Mock(), SimplePromptBuilderFactory())
+        request_builder.set_context_window(ContextWindow(1000, reserved_output_tokens=0))
+
+        request = request_builder.build_request(_conversation(10))
+
+        assert "answer 9" in str(request["messages"][-1])
+        assert "assistant prompt" in str(request["messages"][0])
+        assert "question 0" not in str(request["messages"])
+
+    def test_declared_context_windows(self):
+        assert ModelFactory.get_context_window_tokens("OPENAI", "gpt-4.1-mini") == 1_047_576
+        assert ModelFactory.get_context_window_tokens("openai", "gpt-4o") == 128_000
+        assert ModelFactory.get_context_window_tokens("OPENROUTER", "openai/o1-mini-2024-09-12") is None
+
+    def test_config_overrides_the_declared_context_window(self):
+        config = {"openai": {"api_key": "key", "context_window_tokens": "5000", "context_fitting_policy": "fail-fast"}}
+
+        model = ModelFactory(Mock()).get_model("OPENAI", "gpt-4o", config)
+
+        assert model.context_window == ContextWindow(5000, ContextFittingPolicy.FAIL_FAST)
@@ -0,0 +1,133 @@
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from hermes.chat.interface.assistant.models.request_builder import gemini_upload_registry
+from hermes.chat.interface.assistant.models.request_builder.gemini_upload_registry import GeminiUploadRegistry, compute_file_hash
+
+
+def _remote_file(name: str, state: str = "ACTIVE"):
+    return SimpleNamespace(
+        name=name,
+        uri=f"https://files.example/{name}",
+        mime_type="video/mp4",
+        expiration_time=datetime.now() + timedelta(hours=48),
+        state=state,
+    )
+
+
+class TestGeminiUploadRegistry:
+    @pytest.fixture
+    def google_client(self):
+        client = Mock()
+        client.files.upload.side_effect = lambda file: _remote_file(f"files/{len(client.files.upload.call_args_list)}")
+        client.files.get.side_effect = lambda name: _remote_file(name)
+        return client
+
+    @pytest.fixture
+    def registry_path(self, tmp_path):
+        return tmp_path / "cache" / "gemini_uploads.json"
+
+    @pytest.fixture
+    def video(self, tmp_path):
+        path = tmp_path / "video.mp4"
+        path.write_bytes(b"video bytes")
+        return str(path)
+
+    def test_file_is_uploaded_once(self, google_client, registry_path, video):
+        registry = GeminiUploadRegistry(google_client, registry_path)
+
+        first = registry.get(video)
+        second = registry.get(video)
+
+        assert first is second
+        google_client.files.upload.assert_called_once()
+
+    def test_upload_is_reused_after_restart(self, google_client, registry_path, video):
+        uploaded = GeminiUploadRegistry(google_client, registry_path).get(video)
+
+        restarted_client = Mock()
+        restarted_client.files.get.side_effect = lambda name: _remote_file(name)
+        record = GeminiUploadRegistry(restarted_client, registry_path).get(video)
+
+        assert record.uri == uploaded.uri
+        restarted_client.files.upload.assert_not_called()
+        restarted_client.files.get.assert_called_once_with(name=uploaded.name)
+
+    def test_upload_missing_remotely_is_redone(self, google_client, registry_path, video):
+        GeminiUploadRegistry(google_client, registry_path).get(video)
+
+        restarted_client = Mock()
+        restarted_client.files.get.side_effect = RuntimeError("404")
+        restarted_client.files.upload.return_value = _remote_file("files/new")
+
+        assert GeminiUploadRegistry(restarted_client, registry_path).get(video).name == "files/new"
+
+    def test_modified_file_is_uploaded_again(self, google_client, registry_path, video):
+        registry = GeminiUploadRegistry(google_client, registry_path)
+        first = registry.get(video)
+
+        with open(video, "wb") as file:
+            file.write(b"edited video bytes")
+
+        assert registry.get(video).name != first.name
+        assert google_client.files.upload.call_count == 2
+
+    def test_same_content_under_another_path_is_not_uploaded_again(self, google_client, registry_path, video, tmp_path):
+        copy = tmp_path / "copy.mp4"
+        copy.write_bytes(b"video bytes")
+        registry = GeminiUploadRegistry(google_client, registry_path)
+
+        assert registry.get(video).name == registry.get(str(copy)).name
+        google_client.files.upload.assert_called_once()
+
+    def test_uploads_run_concurrently(self, registry_path, tmp_path):
+        barrier = threading.Barrier(3, timeout=5)
+        client = Mock()
+
+        def upload(file):
+            barrier.wait()
+            return _remote_file(f"files/{file}")
+
+        client.files.upload.side_effect = upload
+        paths = []
+        for index in range(3):
+            path = tmp_path / f"video_{index}.mp4"
+            path.write_bytes(f"video {index}".encode())
+            paths.append(str(path))
+
+        registry = GeminiUploadRegistry(client, registry_path)
+        futures = [registry.submit(path) for path in paths]
+
+        assert {future.result(timeout=5).name for future in futures} == {f"files/{path}" for path in paths}
+
+    def test_processing_is_polled_in_the_background(self, monkeypatch, registry_path, video):
+        monkeypatch.setattr(gemini_upload_registry, "POLL_INTERVAL_SECONDS", 0.01)
+        states = iter(["PROCESSING", "ACTIVE"])
+        client = Mock()
+        client.files.upload.return_value = _remote_file("files/video", state="PROCESSING")
+        client.files.get.side_effect = lambda name: _remote_file(name, state=next(states))
+        registry = GeminiUploadRegistry(client, registry_path)
+
+        record = registry.get(video)
+        assert registry.wait_until_ready() == []
+        assert record.state == "ACTIVE"
+
+    def test_hash_is_computed_in_chunks(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(gemini_upload_registry, "HASH_CHUNK_SIZE", 4)
+        path = tmp_path / "file.bin"
+        path.write_bytes(b"0123456789")
+
+        assert compute_file_hash(str(path)) == hashlib.sha256(b"0123456789").hexdigest()
+
+    def test_expired_upload_is_not_reused(self, google_client, registry_path, video):
+        registry = GeminiUploadRegistry(google_client, registry_path)
+        registry.get(video).expires_at = time.time()
+
+        registry.get(video)
+        assert google_client.files.upload.call_count == 2
@@ -0,0 +1,116 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from hermes.chat.interface.assistant.models.chat_models.base import ChatModel
+from hermes.chat.interface.assistant.models.chat_models.hedged import HedgedChatModel
+from hermes.chat.interface.assistant.models.model_factory import ModelFactory
+from hermes.chat.interface.assistant.models.request_builder.base import RequestBuilder
+
+
+class FakeModel(ChatModel):
+    def __init__(self, name: str, first_chunk_delay: float = 0, error: Exception | None = None):
+        super().__init__({}, name, Mock())
+        self.first_chunk_delay = first_chunk_delay
+        self.error = error
+        self.request_builder = Mock()
+        self.request_builder.build_request.side_effect = lambda messages: f"{name} request"
+        self.requests = []
+        self.closed = False
+
+    def initialize(self):
+        pass
+
+    async def _stream(self, request):
+        self.requests.append(request)
+        try:
+            await asyncio.sleep(self.first_chunk_delay)
+            if self.error:
+                raise self.error
+            yield f"{self.model_tag} first"
+            yield f"{self.model_tag} second"
+        finally:
+            self.closed = True
+
+    def get_request_builder(self):
+        return self.request_builder
+
+    @staticmethod
+    def get_provider() -> str:
+        return "FAKE"
+
+    @staticmethod
+    def get_model_tags() -> list[str]:
+        return ["fake"]
+
+
+def _send(model: HedgedChatModel, messages=()) -> list:
+    model.initialize()
+    request = model.get_request_builder().build_request(list(messages))
+    return list(model.send_request(request))
+
+
+class TestHedgedChatModel:
+    def test_fast_primary_doesnt_start_the_secondary(self):
+        primary, secondary = FakeModel("primary"), FakeModel("secondary")
+
+        responses = _send(HedgedChatModel([primary, secondary], Mock(), hedge_deadline_seconds=1))
+
+        assert responses == ["primary first", "primary second"]
+        assert secondary.requests == []
+        secondary.request_builder.build_request.assert_not_called()
+
+    def test_slow_primary_is_hedged_and_cancelled(self):
+        primary, secondary = FakeModel("primary", first_chunk_delay=5), FakeModel("secondary")
+
+        responses = _send(HedgedChatModel([primary, secondary], Mock(), hedge_deadline_seconds=0.05))
+
+        assert responses == ["secondary first", "secondary second"]
+        assert secondary.requests == ["secondary request"]
+        assert primary.closed
+
+    def test_failed_primary_fails_over_immediately(self):
+        primary = FakeModel("primary", error=ValueError("boom"))
+        secondary = FakeModel("secondary")
+
+        responses = _send(HedgedChatModel([primary, secondary], Mock(), hedge_deadline_seconds=60))
+
+        assert responses == ["secondary first", "secondary second"]
+
+    def test_throttled_primary_fails_over_without_backing_off(self):
+        throttled = ConnectionError("connection reset")
+        primary, secondary = FakeModel("primary", error=throttled), FakeModel("secondary")
+
+        responses = _send(HedgedChatModel([primary, secondary], Mock(), hedge_deadline_seconds=60))
+
+        assert responses == ["secondary first", "secondary second"]
+        assert primary.requests == ["primary request"]
+
+    def test_hedged_builder_is_a_request_builder(self):
+        model = HedgedChatModel([FakeModel("primary"), FakeModel("secondary")], Mock())
+        model.initialize()
+
+        assert isinstance(model.get_request_builder(), RequestBuilder)
+
+    def test_error_is_raised_when_all_models_fail(self):
+        models = [FakeModel("primary", error=ValueError("first")), FakeModel("secondary", error=ValueError("second"))]
+
+        with pytest.raises(ValueError, match="second"):
+            _send(HedgedChatModel(models, Mock(), hedge_deadline_seconds=60))
+
+
+class TestModelFactoryHedging:
+    def test_comma_separated_models_are_hedged(self):
+        config = {"anthropic": {"api_key": "key"}, "openai": {"api_key": "key"}}
+
+        model = ModelFactory(Mock()).get_model_from_info_string("ANTHROPIC/claude-3-5-haiku-20241022, OPENAI/gpt-4o", config, 2)
+
+        assert isinstance(model, HedgedChatModel)
+        assert [m.get_provider() for m in model.models] == ["ANTHROPIC", "OPENAI"]
+        assert model.hedge_deadline_seconds == 2
+
+    def test_single_model_is_not_hedged(self):
+        model = ModelFactory(Mock()).get_model_from_info_string("OPENAI/gpt-4o", {"openai": {"api_key": "key"}})
+
+        assert model.get_provider() == "OPENAI"
@@ -0,0 +1,126 @@
+import io
+from unittest.mock import patch
+
+import pytest
+
+from hermes.chat.interface.assistant.models.request_builder.image_preprocessing import (
+    CLAUDE_IMAGE_LIMITS,
+    OPENAI_IMAGE_LIMITS,
+    ImageLimits,
+    ImagePreprocessor,
+    get_target_size,
+)
+from hermes.utils.disk_cache import DiskCache
+
+Image = pytest.importorskip("PIL.Image")
+
+# Small limits keep the test images small
+LIMITS = ImageLimits(max_long_edge=256)
+
+
+def create_image(mode: str, size: tuple[int, int], image_format: str, noisy: bool = True, **save_options) -> bytes:
+    if noisy:
+        # Random pixels, like a photo: too many colors for a lossless encoding
+        image = Image.merge("RGB", [Image.effect_noise(size, sigma) for sigma in (32, 48, 64)]).convert(mode)
+    else:
+        image = Image.new(mode, size, "white")
+    output = io.BytesIO()
+    image.save(output, format=image_format, **save_options)
+    return output.getvalue()
+
+
+def open_image(data: bytes):
+    return Image.open(io.BytesIO(data))
+
+
+class TestGetTargetSize:
+    def test_small_images_are_not_upscaled(self):
+        assert get_target_size((800, 600), CLAUDE_IMAGE_LIMITS) == (800, 600)
+
+    def test_claude_limits_the_pixel_count(self):
+        width, height = get_target_size((4000, 3000), CLAUDE_IMAGE_LIMITS)
+        assert width * height <= 1_150_000
+        assert width / height == pytest.approx(4 / 3, rel=0.01)
+
+    def test_openai_limits_the_short_edge(self):
+        assert get_target_size((4000, 2000), OPENAI_IMAGE_LIMITS) == (1536, 768)
+
+
+class TestImagePreprocessor:
+    @pytest.fixture
+    def preprocessor(self, tmp_path):
+        return ImagePreprocessor(DiskCache(tmp_path / "images", max_disk_bytes=50 * 1024 * 1024, max_memory_bytes=50 * 1024 * 1024))
+
+    def test_large_photo_is_downscaled_to_jpeg(self, preprocessor):
+        data = create_image("RGB", (800, 600), "PNG")
+
+        prepared = preprocessor.prepare(data, "image/png", LIMITS)
+
+        assert prepared.media_type == "image/jpeg"
+        assert max(open_image(prepared.data).size) <= 256
+        assert len(prepared.data) < len(data)
+
+    def test_screenshot_stays_lossless(self, preprocessor):
+        data = create_image("RGB", (800, 600), "PNG", noisy=False)
+
+        prepared = preprocessor.prepare(data, "image/png", LIMITS)
+
+        assert prepared.media_type == "image/png"
+        assert max(open_image(prepared.data).size) <= 256
+
+    def test_transparency_is_kept(self, preprocessor):
+        data = create_image("RGBA", (600, 600), "PNG")
+
+        prepared = preprocessor.prepare(data, "image/png", LIMITS)
+
+        assert prepared.media_type == "image/png"
+        assert open_image(prepared.data).mode == "RGBA"
+
+    def test_metadata_is_stripped(self, preprocessor):
+        exif = Image.Exif()
+        exif[0x010F] = "Camera maker"
+        data = create_image("RGB", (400, 300), "JPEG", exif=exif.tobytes())
+
+        prepared = preprocessor.prepare(data, "image/jpeg", LIMITS)
+
+        assert not open_image(prepared.data).getexif()
+
+    def test_compact_original_is_kept(self, preprocessor):
+        data = create_image("RGB", (200, 100), "JPEG", quality=50)
+
+        prepared = preprocessor.prepare(data, "image/jpeg", LIMITS)
+
+        assert prepared.data == data
+        assert prepared.media_type == "image/jpeg"
+
+    def test_result_is_cached_by_content(self, preprocessor):
+        data = create_image("RGB", (800, 600), "PNG")
+        first = preprocessor.prepare(data, "image/png", LIMITS)
+
+        with patch(
+            "hermes.chat.interface.assistant.models.request_builder.image_preprocessing._process_image", return_value=first
+        ) as process_image:
+            second = preprocessor.prepare(data, "image/png", LIMITS)
+            process_image.assert_not_called()
+            preprocessor.prepare(data, "image/png", ImageLimits(max_long_edge=128))
+            process_image.assert_called_once()
+
+        assert second == first
+
+    def test_unreadable_image_is_sent_as_it_is(self, preprocessor):
+        prepared = preprocessor.prepare(b"not an image", "image/png", LIMITS)
+
+        assert prepared.data == b"not an image"
+        assert prepared.media_type == "image/png"
+
+    def test_missing_pillow_sends_the_original(self, preprocessor, monkeypatch, caplog):
+        data, other_data = create_image("RGB", (1024, 768), "PNG"), create_image("RGB", (512, 384), "PNG")
+        monkeypatch.setitem(__import__("sys").modules, "PIL", None)
+
+        prepared = preprocessor.prepare(data, "image/png", LIMITS)
+        preprocessor.prepare(other_data, "image/png", LIMITS)
+
+        assert prepared.data == data
+        assert [record.message for record in caplog.records].count(
+            "Pillow isn't installed (the images extra), images are sent without downscaling or recompression"
+        ) == 1
@@ -0,0 +1,90 @@
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from hermes.chat.interface.assistant.models.request_builder.attachment_cache import AttachmentCache
+from hermes.chat.interface.assistant.models.request_builder.ingestion_pipeline import AttachmentIngestionPipeline
+from hermes.chat.messages import ImageMessage, TextMessage, TextualFileMessage, UrlMessage
+from hermes.utils.disk_cache import DiskCache
+
+
+class TestAttachmentIngestionPipeline:
+    @pytest.fixture
+    def url_content_cache(self):
+        def get_markdown(url):
+            time.sleep(0.2)
+            return f"content of {url}"
+
+        cache = Mock()
+        cache.get_markdown.side_effect = get_markdown
+        return cache
+
+    @pytest.fixture
+    def attachment_cache(self, tmp_path):
+        return AttachmentCache(DiskCache(tmp_path / "cache", max_disk_bytes=1024 * 1024, max_memory_bytes=1024 * 1024))
+
+    @pytest.fixture
+    def pipeline(self, url_content_cache, attachment_cache):
+        return AttachmentIngestionPipeline(url_content_cache, attachment_cache, Mock(), max_workers=8)
+
+    def test_urls_are_fetched_in_parallel(self, pipeline, url_content_cache):
+        messages = [UrlMessage(author="user", url=f"https://example.com/{index}") for index in range(8)]
+
+        started_at = time.monotonic()
+        pipeline.collect(messages)
+
+        assert time.monotonic() - started_at < 0.2 * 4
+        assert url_content_cache.get_markdown.call_count == 8
+
+    def test_in_flight_jobs_are_not_repeated(self, pipeline, url_content_cache):
+        first = pipeline.submit(UrlMessage(author="user", url="https://example.com/page#intro"))
+        second = pipeline.submit(UrlMessage(author="user", url="https://EXAMPLE.com/page"))
+        pipeline.collect([UrlMessage(author="user", url="https://example.com/page")])
+
+        assert first is second
+        url_content_cache.get_markdown.assert_called_once()
+
+    def test_messages_without_attachments_are_ignored(self, pipeline):
+        assert pipeline.submit(TextMessage(author="user", text="hello")) is None
+        assert pipeline.submit(TextualFileMessage(author="user", text_filepath=None, textual_content="inline")) is None
+        assert pipeline.submit(ImageMessage(author="user", image_path="/does/not/exist.png")) is None
+
+    def test_textual_file_is_read_into_the_attachment_cache(self, pipeline, attachment_cache, tmp_path):
+        path = tmp_path / "notes.md"
+        path.write_text("# Notes")
+
+        pipeline.collect([TextualFileMessage(author="user", text_filepath=str(path), textual_content=None)])
+
+        load_text = Mock()
+        assert attachment_cache.get_text(str(path), load_text) == ("# Notes", True)
+        load_text.assert_not_called()
+
+    def test_failures_are_left_to_the_request_builder(self, url_content_cache, attachment_cache):
+        url_content_cache.get_markdown.side_effect = ConnectionError("offline")
+        pipeline = AttachmentIngestionPipeline(url_content_cache, attachment_cache, Mock())
+
+        future = pipeline.submit(UrlMessage(author="user", url="https://example.com"))
+        assert future is not None
+        future.result(timeout=5)
+
+        assert future.exception() is None
+
+    def test_request_waits_for_a_running_job(self, url_content_cache, attachment_cache):
+        release = threading.Event()
+        url_content_cache.get_markdown.side_effect = lambda url: release.wait(5)
+        pipeline = AttachmentIngestionPipeline(url_content_cache, attachment_cache, Mock())
+        message = UrlMessage(author="user", url="https://example.com")
+        future = pipeline.submit(message)
+        assert future is not None
+
+        collector = threading.Thread(target=pipeline.collect, args=([message],))
+        collector.start()
+        collector.join(0.1)
+        assert collector.is_alive()
+
+        release.set()
+        collector.join(5)
+        assert future.done()
+        url_content_cache.get_markdown.assert_called_once()
@@ -0,0 +1,139 @@
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import httpx
+import openai
+import pytest
+
+from hermes.chat.interface.assistant.chat.response_types import ToolCallLLMResponse
+from hermes.chat.interface.assistant.models.chat_models.openai_responses import OpenAIResponsesModel
+from hermes.chat.interface.assistant.models.prompt_builder.simple_prompt_builder import SimplePromptBuilderFactory
+from hermes.chat.interface.assistant.models.request_builder.openai_responses import OpenAIResponsesRequestBuilder
+from hermes.chat.interface.commands.tool_schema import ToolDefinition
+from hermes.chat.messages import TextMessage
+
+
+class FakeResponsesClient:
+    def __init__(self):
+        self.requests = []
+        self.errors = []
+        self.responses = SimpleNamespace(create=self.create)
+
+    async def create(self, **request):
+        self.requests.append(request)
+        if self.errors:
+            raise self.errors.pop(0)
+        return self._stream(f"resp_{len(self.requests)}", f"answer {len(self.requests)}")
+
+    @staticmethod
+    async def _stream(response_id: str, text: str):
+        yield SimpleNamespace(type="response.created", response=SimpleNamespace(id=response_id))
+        yield SimpleNamespace(type="response.output_text.delta", delta=text)
+        yield SimpleNamespace(type="response.completed", response=SimpleNamespace(id=response_id))
+
+
+@pytest.fixture
+def client(monkeypatch) -> FakeResponsesClient:
+    client = FakeResponsesClient()
+    monkeypatch.setattr(openai, "AsyncClient", lambda **kwargs: client)
+    monkeypatch.setattr("hermes.chat.interface.assistant.models.chat_models.openai.get_shared_http_transport", Mock)
+    return client
+
+
+@pytest.fixture
+def model(client) -> OpenAIResponsesModel:
+    model = OpenAIResponsesModel({"api_key": "key"}, "gpt-4o", Mock())
+    model.initialize()
+    return model
+
+
+def run_turn(model: OpenAIResponsesModel, messages: list[TextMessage]) -> str:
+    responses = model.send_request(model.get_request_builder().build_request(messages))
+    text = "".join(response.text for response in responses)
+    messages.append(TextMessage(author="assistant", text=text))
+    return text
+
+
+def create_not_found_error() -> openai.NotFoundError:
+    # The SDK may be built against a different httpx release, only the attribute access matters here
+    response = Mock(spec=httpx.Response, status_code=404, headers={}, request=Mock(spec=httpx.Request))
+    return openai.NotFoundError("Previous response with id 'resp_1' not found.", response=response, body=None)
+
+
+class TestOpenAIResponsesRequestBuilder:
+    def test_messages_become_input_items(self):
+        request_builder = OpenAIResponsesRequestBuilder("gpt-4o", Mock(), SimplePromptBuilderFactory())
+        request_builder.set_tools([ToolDefinition("record", "Record the value", {"type": "object"})])
+
+        request = request_builder.build_request(
+            [TextMessage(author="user", text="Hi"), TextMessage(author="assistant", text="Hello"), TextMessage(author="user", text="Bye")]
+        )
+
+        assert [item["role"] for item in request["input"]] == ["user", "assistant", "user"]
+        assert "Hello" in request["input"][1]["content"]
+        assert request["store"] is True
+        assert request["tools"] == [
+            {"type": "function", "name": "record", "description": "Record the value", "parameters": {"type": "object"}}
+        ]
+
+
+class TestOpenAIResponsesModel:
+    def test_follow_up_sends_only_the_new_input(self, model, client):
+        messages = [TextMessage(author="user", text="First question")]
+
+        assert run_turn(model, messages) == "answer 1"
+        messages.append(TextMessage(author="user", text="Second question"))
+        run_turn(model, messages)
+
+        assert "previous_response_id" not in client.requests[0]
+        assert client.requests[1]["previous_response_id"] == "resp_1"
+        assert len(client.requests[1]["input"]) == 1
+        assert "Second question" in client.requests[1]["input"][0]["content"]
+
+    def test_edited_history_is_sent_in_full(self, model, client):
+        messages = [TextMessage(author="user", text="First question")]
+        run_turn(model, messages)
+
+        messages[0] = TextMessage(author="user", text="Edited question")
+        messages.append(TextMessage(author="user", text="Second question"))
+        run_turn(model, messages)
+
+        assert "previous_response_id" not in client.requests[1]
+        assert len(client.requests[1]["input"]) == 3
+
+    def test_expired_response_falls_back_to_the_full_input(self, model, client):
+        messages = [TextMessage(author="user", text="First question")]
+        run_turn(model, messages)
+        messages.append(TextMessage(author="user", text="Second question"))
+        client.errors.append(create_not_found_error())
+
+        assert run_turn(model, messages) == "answer 3"
+        assert client.requests[1]["previous_response_id"] == "resp_1"
+        assert "previous_response_id" not in client.requests[2]
+        assert len(client.requests[2]["input"]) == 3
+        # The expired response isn't tried again
+        assert model.response_chain.find_previous_response(client.requests[2]["input"]) == (None, 0)
+
+    def test_responses_with_tool_calls_are_not_continued(self, model, client):
+
+        async def stream_tool_call():
+            item = SimpleNamespace(type="function_call", name="record", arguments='{"value": "x"}', call_id="call_1")
+            yield SimpleNamespace(type="response.output_item.done", item=item)
+            yield SimpleNamespace(type="response.completed", response=SimpleNamespace(id="resp_1"))
+
+        async def create(**request):
+            client.requests.append(request)
+            return stream_tool_call()
+
+        client.responses.create = create
+        request = model.get_request_builder().build_request([TextMessage(author="user", text="Record x")])
+
+        [tool_call] = list(model.send_request(request))
+        assert isinstance(tool_call, ToolCallLLMResponse)
+        assert (tool_call.name, tool_call.arguments, tool_call.tool_call_id) == ("record", {"value": "x"}, "call_1")
+        messages = [
+            TextMessage(author="user", text="Record x"),
+            TextMessage(author="assistant", text=""),
+            TextMessage(author="user", text="ok"),
+        ]
+        assert model.response_chain.find_previous_response(model.get_request_builder().build_request(messages)["input"]) == (None, 0)
@@ -0,0 +1,112 @@
+from datetime import datetime
+from unittest.mock import Mock
+
+from google.genai import errors
+from google.genai.types import Content, Part
+
+from hermes.chat.interface.assistant.models.prompt_builder.simple_prompt_builder import SimplePromptBuilderFactory
+from hermes.chat.interface.assistant.models.request_builder import gemini_context_cache
+from hermes.chat.interface.assistant.models.request_builder.bedrock import BedrockRequestBuilder
+from hermes.chat.interface.assistant.models.request_builder.claude import ClaudeRequestBuilder
+from hermes.chat.interface.assistant.models.request_builder.gemini_context_cache import GeminiContextCache
+from hermes.chat.messages import TextMessage
+
+
+def _conversation() -> list:
+    return [
+        TextMessage(author="user", text="assistant prompt"),
+        TextMessage(author="user", text="first question", is_directly_entered=True, timestamp=datetime(2025, 1, 1, 10, 0)),
+        TextMessage(author="assistant", text="first answer"),
+        TextMessage(author="user", text="second question", is_directly_entered=True, timestamp=datetime(2025, 1, 1, 10, 5)),
+        TextMessage(author="assistant", text="second answer"),
+        TextMessage(author="user", text="third question", is_directly_entered=True, timestamp=datetime(2025, 1, 1, 10, 9)),
+    ]
+
+
+def _get_cached_message_indices(request: dict) -> list[int]:
+    return [index for index, message in enumerate(request["messages"]) if "cache_control" in message["content"][-1]]
+
+
+class TestClaudePromptCaching:
+    def test_stable_prefix_and_conversation_tail_are_marked(self):
+        builder = ClaudeRequestBuilder("claude", Mock(), SimplePromptBuilderFactory())
+        request = builder.build_request(_conversation())
+
+        # Prompt and first question are merged into the first user message
+        assert _get_cached_message_indices(request) == [0, 2, 4]
+
+    def test_rebuilt_request_is_byte_stable(self):
+        builder = ClaudeRequestBuilder("claude", Mock(), SimplePromptBuilderFactory())
+        messages = _conversation()
+        first_request = builder.build_request(messages)
+
+        builder.reset_compilation_cache()
+        second_request = builder.build_request(messages)
+
+        assert first_request == second_request
+        assert "[2025-01-01 10:00:00] first question" in first_request["messages"][0]["content"][0]["text"]
+
+    def test_cache_markers_do_not_leak_into_compilation_cache(self):
+        builder = ClaudeRequestBuilder("claude", Mock(), SimplePromptBuilderFactory())
+        messages = _conversation()
+        builder.build_request(messages)
+        messages.append(TextMessage(author="assistant", text="third answer"))
+        messages.append(TextMessage(author="user", text="fourth question", is_directly_entered=True))
+
+        request = builder.build_request(messages)
+
+        assert _get_cached_message_indices(request) == [0, 4, 6]
+
+
+class TestBedrockPromptCaching:
+    def test_cache_points_only_for_supported_models(self):
+        messages = _conversation()
+        supported = BedrockRequestBuilder("us.anthropic.claude-sonnet-4-20250514-v1:0", Mock(), SimplePromptBuilderFactory())
+        unsupported = BedrockRequestBuilder("mistral.mistral-large-2407-v1:0", Mock(), SimplePromptBuilderFactory())
+
+        cache_points = [
+            index
+            for index, message in enumerate(supported.build_request(messages)["messages"])
+            if message["content"][-1] == {"cachePoint": {"type": "default"}}
+        ]
+
+        assert cache_points == [0, 2, 4]
+        assert all("cachePoint" not in block for message in unsupported.build_request(messages)["messages"] for block in message["content"])
+
+
+def _gemini_contents() -> list:
+    return [Content(role="user", parts=[Part(text="x" * 200_000)]), Content(role="user", parts=[Part(text="question")])]
+
+
+class TestGeminiContextCache:
+    def test_unsupported_model_disables_caching(self):
+        client = Mock()
+        client.caches.create.side_effect = errors.ClientError(400, {"error": {"message": "caching not supported"}})
+        context_cache = GeminiContextCache(client)
+
+        context_cache.apply("gemini-model", _gemini_contents())
+        context_cache.apply("gemini-model", _gemini_contents())
+
+        client.caches.create.assert_called_once()
+
+    def test_transient_error_backs_off_without_disabling(self):
+        client = Mock()
+        client.caches.create.side_effect = errors.ServerError(503, {"error": {"message": "unavailable"}})
+        context_cache = GeminiContextCache(client)
+
+        assert context_cache.apply("gemini-model", _gemini_contents())[0] is None
+        context_cache.apply("gemini-model", _gemini_contents())
+
+        client.caches.create.assert_called_once()
+
+    def test_cache_is_created_after_the_backoff(self, monkeypatch):
+        monkeypatch.setattr(gemini_context_cache, "FAILED_CREATE_BACKOFF_SECONDS", 0)
+        client = Mock()
+        client.caches.create.side_effect = [errors.ServerError(503, {}), Mock()]
+        context_cache = GeminiContextCache(client)
+
+        context_cache.apply("gemini-model", _gemini_contents())
+        cached_content_name, contents = context_cache.apply("gemini-model", _gemini_contents())
+
+        assert cached_content_name is not None
+        assert len(contents) == 1
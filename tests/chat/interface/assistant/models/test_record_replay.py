@@ -0,0 +1,107 @@
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from hermes.chat.interface.assistant.chat.response_types import TextLLMResponse, ThinkingLLMResponse
+from hermes.chat.interface.assistant.models.chat_models.base import ChatModel
+from hermes.chat.interface.assistant.models.chat_models.record_replay import (
+    RecordedChunk,
+    RecordingMode,
+    RecordReplayChatModel,
+    ResponseRecordingStore,
+    compute_request_hash,
+)
+
+
+class CountingModel(ChatModel):
+    def __init__(self):
+        super().__init__({}, "counting", Mock())
+        self.calls = 0
+
+    def initialize(self):
+        pass
+
+    async def _stream(self, request):
+        self.calls += 1
+        yield ThinkingLLMResponse("hmm")
+        yield TextLLMResponse(f"answer {self.calls}")
+
+    def get_request_builder(self):
+        return Mock()
+
+    @staticmethod
+    def get_provider() -> str:
+        return "COUNTING"
+
+    @staticmethod
+    def get_model_tags() -> list[str]:
+        return ["counting"]
+
+
+REQUEST = {"messages": [{"role": "user", "content": "[2024-01-01 10:00:00] hi"}], "model": "counting"}
+
+
+def _texts(model: ChatModel, request=REQUEST) -> list[str]:
+    return [chunk.text for chunk in model.send_request(request)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResponseRecordingStore(tmp_path)
+
+
+class TestRecordReplay:
+    def test_canonical_hash_ignores_key_order_and_timestamps(self):
+        reordered = {"model": "counting", "messages": [{"content": "[2025-06-30 23:59:59] hi", "role": "user"}]}
+
+        assert compute_request_hash("counting", REQUEST) == compute_request_hash("counting", reordered)
+        assert compute_request_hash("counting", REQUEST) != compute_request_hash("other", REQUEST)
+        assert compute_request_hash("counting", {"data": b"one"}) != compute_request_hash("counting", {"data": b"two"})
+
+    def test_record_missing_replays_the_recorded_response(self, store):
+        inner = CountingModel()
+        model = RecordReplayChatModel(inner, RecordingMode.RECORD_MISSING, store)
+
+        first = _texts(model)
+        second = _texts(model)
+
+        assert first == second == ["hmm", "answer 1"]
+        assert inner.calls == 1
+        assert isinstance(list(model.send_request(REQUEST))[0], ThinkingLLMResponse)
+
+    def test_record_overwrites_the_recording(self, store):
+        inner = CountingModel()
+        recorder = RecordReplayChatModel(inner, RecordingMode.RECORD, store)
+
+        _texts(recorder)
+        _texts(recorder)
+
+        assert inner.calls == 2
+        assert _texts(RecordReplayChatModel(CountingModel(), RecordingMode.REPLAY, store)) == ["hmm", "answer 2"]
+
+    def test_replay_miss_is_an_error(self, store):
+        inner = CountingModel()
+
+        with pytest.raises(RuntimeError, match="No recorded response"):
+            _texts(RecordReplayChatModel(inner, RecordingMode.REPLAY, store))
+        assert inner.calls == 0
+
+    def test_replay_with_timing_reproduces_the_delays(self, store):
+        chunks = [RecordedChunk("text", "slow", 0.5), RecordedChunk("text", " answer", 0.25)]
+        store.save(compute_request_hash("counting", REQUEST), "counting", chunks)
+        replayer = RecordReplayChatModel(CountingModel(), RecordingMode.REPLAY, store, replay_with_timing=True)
+
+        with patch("hermes.chat.interface.assistant.models.chat_models.record_replay.asyncio.sleep", new_callable=AsyncMock) as sleep:
+            assert _texts(replayer) == ["slow", " answer"]
+
+        assert [call.args for call in sleep.await_args_list] == [(0.5,), (0.25,)]
+
+    def test_interrupted_stream_is_not_recorded(self, store):
+        recorder = RecordReplayChatModel(CountingModel(), RecordingMode.RECORD, store)
+
+        responses = recorder.send_request(REQUEST)
+        next(responses)
+        responses.close()
+
+        with pytest.raises(RuntimeError):
+            _texts(RecordReplayChatModel(CountingModel(), RecordingMode.REPLAY, store))
@@ -0,0 +1,78 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from hermes.chat.interface.assistant.models.prompt_builder.simple_prompt_builder import SimplePromptBuilderFactory
+from hermes.chat.interface.assistant.models.request_builder import compilation_cache
+from hermes.chat.interface.assistant.models.request_builder.context_window import ContextWindow
+from hermes.chat.interface.assistant.models.request_builder.openai import OpenAIRequestBuilder
+from hermes.chat.messages import TextMessage, TextualFileMessage
+
+
+class TestRequestCompilationCache:
+    @pytest.fixture
+    def request_builder(self):
+        builder = OpenAIRequestBuilder("gpt-4o", Mock(), SimplePromptBuilderFactory())
+        builder.handle_text_message = Mock(wraps=builder.handle_text_message)
+        return builder
+
+    def _conversation(self, turns: int) -> list:
+        messages = []
+        for turn in range(turns):
+            messages.append(TextMessage(author="user", text=f"question {turn}"))
+            messages.append(TextMessage(author="assistant", text=f"answer {turn}"))
+        return messages
+
+    def test_only_new_messages_are_processed(self, request_builder):
+        messages = self._conversation(3)
+        first_request = request_builder.build_request(messages)
+        assert request_builder.handle_text_message.call_count == 6
+
+        request_builder.handle_text_message.reset_mock()
+        messages.append(TextMessage(author="user", text="follow up"))
+        second_request = request_builder.build_request(messages)
+
+        assert request_builder.handle_text_message.call_count == 1
+        assert second_request["messages"][:6] == first_request["messages"]
+        assert len(second_request["messages"]) == 7
+
+    def test_incremental_request_matches_full_rebuild(self, request_builder):
+        messages = self._conversation(2)
+        request_builder.build_request(messages)
+        messages.append(TextMessage(author="user", text="follow up"))
+        incremental_request = request_builder.build_request(messages)
+
+        request_builder.reset_compilation_cache()
+        assert request_builder.build_request(messages) == incremental_request
+
+    def test_edited_history_is_not_served_from_cache(self, request_builder):
+        messages = self._conversation(3)
+        request_builder.build_request(messages)
+
+        messages[2] = TextMessage(author="user", text="edited question")
+        request = request_builder.build_request(messages)
+
+        assert "edited question" in request["messages"][2]["content"]
+
+    def test_modified_attached_file_invalidates_prefix(self, request_builder, tmp_path):
+        attached_file = tmp_path / "notes.txt"
+        attached_file.write_text("first version")
+        messages = [TextualFileMessage(author="user", text_filepath=str(attached_file), textual_content=None)]
+        request_builder.build_request(messages)
+
+        attached_file.write_text("second, longer version")
+        request = request_builder.build_request(messages)
+
+        assert "second, longer version" in request["messages"][0]["content"]
+
+    def test_each_message_is_fingerprinted_once_per_build(self, request_builder, tmp_path):
+        attached_file = tmp_path / "notes.txt"
+        attached_file.write_text("some notes")
+        messages = [*self._conversation(2), TextualFileMessage(author="user", text_filepath=str(attached_file), textual_content=None)]
+        request_builder.set_context_window(ContextWindow(100_000, reserved_output_tokens=0))
+
+        # Called once by each fingerprint, whichever step of the build computes it
+        with patch.object(compilation_cache, "_get_referenced_paths", wraps=compilation_cache._get_referenced_paths) as get_paths:  # noqa: SLF001
+            request_builder.build_request(messages)
+
+        assert get_paths.call_count == len(messages)
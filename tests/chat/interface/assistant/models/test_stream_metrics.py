@@ -0,0 +1,123 @@
+import json
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from hermes.chat.events.message_event import MessageEvent
+from hermes.chat.interface.assistant.chat.response_types import TextLLMResponse
+from hermes.chat.interface.assistant.models.chat_models.base import ChatModel
+from hermes.chat.interface.assistant.models.chat_models.stream_metrics import (
+    StreamMetricsRegistry,
+    measure_stream,
+    record_request_build_seconds,
+)
+from hermes.chat.interface.user.interface.event_renderer import EventRenderer
+from hermes.chat.messages import TextGeneratorMessage
+
+
+def _slow_chunks(delays: list[float]):
+    for index, delay in enumerate(delays):
+        time.sleep(delay)
+        yield TextLLMResponse(f"chunk{index} ")
+
+
+class StaticModel(ChatModel):
+    def __init__(self):
+        super().__init__({}, "static", Mock())
+
+    def initialize(self):
+        pass
+
+    async def _stream(self, request):
+        yield "hello "
+        yield "world"
+
+    def get_request_builder(self):
+        return Mock()
+
+    @staticmethod
+    def get_provider() -> str:
+        return "STATIC"
+
+    @staticmethod
+    def get_model_tags() -> list[str]:
+        return ["static"]
+
+
+def _streamed_message_events(registry: StreamMetricsRegistry):
+    yield MessageEvent(TextGeneratorMessage(author="assistant", text_generator=measure_stream(["a"], "TEST/model", registry)))
+
+
+class TestStreamMetrics:
+    def test_waiting_and_consumer_time_are_separated(self):
+        registry = StreamMetricsRegistry()
+
+        for _ in measure_stream(_slow_chunks([0.05, 0.01, 0.01]), "TEST/model", registry):
+            time.sleep(0.02)
+
+        metrics = registry.take_unreported()[0]
+        assert metrics.completed
+        assert metrics.chunk_count == 3
+        assert metrics.time_to_first_chunk_seconds is not None
+        assert metrics.time_to_first_chunk_seconds >= 0.05
+        assert metrics.waiting_seconds >= 0.07
+        assert metrics.consumer_seconds >= 0.06
+        assert metrics.waiting_seconds + metrics.consumer_seconds == pytest.approx(metrics.total_seconds)
+        assert sum(metrics.gap_histogram.values()) == 2
+        assert metrics.tokens_per_second is not None
+
+    def test_request_build_time_is_reported_by_the_next_stream_of_the_thread(self):
+        registry = StreamMetricsRegistry()
+        record_request_build_seconds(0.25)
+
+        list(measure_stream(["a"], "TEST/model", registry))
+        list(measure_stream(["a"], "TEST/model", registry))
+
+        first, second = registry.take_unreported()
+        assert first.request_build_seconds == 0.25
+        assert second.request_build_seconds is None
+
+    def test_closed_stream_is_recorded_as_interrupted(self):
+        registry = StreamMetricsRegistry()
+
+        stream = measure_stream(_slow_chunks([0, 0, 0]), "TEST/model", registry)
+        next(stream)
+        stream.close()
+
+        metrics = registry.take_unreported()[0]
+        assert not metrics.completed
+        assert "interrupted" in metrics.describe()
+
+    def test_metrics_are_exported_as_jsonl(self, tmp_path):
+        registry = StreamMetricsRegistry()
+        registry.set_export_path(tmp_path / "metrics.jsonl")
+
+        list(measure_stream(["a" * 40, "b" * 40], "TEST/model", registry))
+        list(measure_stream(["c"], "OTHER/model", registry))
+
+        lines = [json.loads(line) for line in (tmp_path / "metrics.jsonl").read_text().splitlines()]
+        assert [line["model"] for line in lines] == ["TEST/model", "OTHER/model"]
+        assert lines[0]["output_tokens"] == 20
+        assert len(registry.describe_summary()) == 2
+
+    def test_send_request_is_measured(self, monkeypatch):
+        registry = StreamMetricsRegistry()
+        monkeypatch.setattr("hermes.chat.interface.assistant.models.chat_models.base.get_shared_stream_metrics", lambda: registry)
+
+        assert list(StaticModel().send_request({})) == ["hello ", "world"]
+
+        assert registry.take_unreported()[0].model == "STATIC/static"
+
+    def test_event_renderer_shows_the_metrics_on_demand(self, monkeypatch):
+        registry = StreamMetricsRegistry()
+        monkeypatch.setattr("hermes.chat.interface.user.interface.event_renderer.get_shared_stream_metrics", lambda: registry)
+        notifications_printer = Mock()
+        renderer = EventRenderer(None, notifications_printer)
+
+        renderer.render_events(_streamed_message_events(registry))
+        notifications_printer.print_notification.assert_not_called()
+
+        renderer.show_stream_metrics = True
+        renderer.render_events(_streamed_message_events(registry))
+        assert "TEST/model" in notifications_printer.print_notification.call_args.args[0]
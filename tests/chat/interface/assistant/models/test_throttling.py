@@ -0,0 +1,154 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import anthropic
+import botocore.exceptions
+import httpx
+import openai
+import pytest
+
+from hermes.chat.interface.assistant.models.chat_models import rate_limiter
+from hermes.chat.interface.assistant.models.chat_models.base import ChatModel
+from hermes.chat.interface.assistant.models.chat_models.rate_limiter import ProviderRateLimiter, TokenBucket
+from hermes.chat.interface.assistant.models.chat_models.retry_policy import RetryPolicy, get_retry_after_seconds, is_retryable_error
+
+
+class HttpError(Exception):
+    def __init__(self, status_code: int, headers: dict | None = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+class BotoError(Exception):
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": 400, "HTTPHeaders": {}}}
+
+
+class FlakyModel(ChatModel):
+    def __init__(self, errors: list[Exception], config: dict | None = None):
+        super().__init__(config or {}, "flaky", Mock())
+        self.errors = errors
+        self.attempts = 0
+
+    def initialize(self):
+        pass
+
+    async def _stream(self, request):
+        self.attempts += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        yield "response"
+
+    def get_request_builder(self):
+        return Mock()
+
+    @staticmethod
+    def get_provider() -> str:
+        return "FLAKY"
+
+    @staticmethod
+    def get_model_tags() -> list[str]:
+        return ["flaky"]
+
+
+@pytest.fixture(autouse=True)
+def no_sleep():
+    with patch("hermes.chat.interface.assistant.models.chat_models.base.asyncio.sleep", new_callable=AsyncMock) as sleep:
+        yield sleep
+
+
+@pytest.fixture(autouse=True)
+def fresh_limiters(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_shared_limiters", {})
+
+
+class TestThrottling:
+    def test_token_bucket_asks_to_wait_once_empty(self):
+        bucket = TokenBucket(capacity=2, refill_per_second=1)
+
+        assert bucket.reserve(1) == 0
+        assert bucket.reserve(1) == 0
+        assert bucket.reserve(1) == pytest.approx(1, abs=0.05)
+        assert bucket.reserve(1) == pytest.approx(2, abs=0.05)
+
+    def test_limiter_waits_for_the_tightest_limit(self):
+        limiter = ProviderRateLimiter(requests_per_minute=600, tokens_per_minute=60)
+
+        assert asyncio.run(limiter.acquire(60)) == 0
+        assert asyncio.run(limiter.acquire(30)) == pytest.approx(30, abs=0.1)
+
+    def test_retryable_errors(self):
+        assert is_retryable_error(HttpError(429))
+        assert is_retryable_error(HttpError(529))
+        assert is_retryable_error(BotoError("ThrottlingException"))
+        assert not is_retryable_error(HttpError(400))
+        assert not is_retryable_error(BotoError("ValidationException"))
+        assert not is_retryable_error(ValueError("bad request"))
+
+    def test_dropped_connections_and_timeouts_are_retryable(self):
+        # The SDKs may be built against different httpx releases, only the attribute access matters here
+        request = Mock(spec=httpx.Request)
+
+        assert is_retryable_error(openai.APIConnectionError(request=request))
+        assert is_retryable_error(openai.APITimeoutError(request))
+        assert is_retryable_error(anthropic.APIConnectionError(request=request))
+        assert is_retryable_error(anthropic.APITimeoutError(request))
+        assert is_retryable_error(botocore.exceptions.ReadTimeoutError(endpoint_url="https://bedrock"))
+        assert is_retryable_error(botocore.exceptions.EndpointConnectionError(endpoint_url="https://bedrock"))
+        assert is_retryable_error(httpx.ConnectTimeout("timed out"))
+
+    def test_retry_after_headers(self):
+        assert get_retry_after_seconds(HttpError(429, {"Retry-After": "7"})) == 7
+        assert get_retry_after_seconds(HttpError(429, {"retry-after-ms": "1500"})) == 1.5
+        assert get_retry_after_seconds(HttpError(429)) is None
+
+    def test_backoff_is_jittered_and_capped(self):
+        policy = RetryPolicy(base_delay_seconds=1, max_delay_seconds=10)
+
+        delays = [policy.get_delay(10, None) for _ in range(50)]
+
+        assert all(0 <= delay <= 10 for delay in delays)
+        assert len(set(delays)) > 1
+        assert policy.get_delay(0, 42) == 42
+
+    def test_throttled_request_is_retried_with_retry_after(self, no_sleep):
+        model = FlakyModel([HttpError(429, {"Retry-After": "3"}), HttpError(503)])
+
+        assert list(model.send_request({})) == ["response"]
+        assert model.attempts == 3
+        assert no_sleep.call_args_list[0].args == (3.0,)
+        assert model.throttle_stats.retries == 2
+        assert model.throttle_stats.backoff_wait_seconds >= 3
+
+    def test_non_retryable_error_is_raised(self):
+        model = FlakyModel([HttpError(400)])
+
+        with pytest.raises(HttpError):
+            list(model.send_request({}))
+        assert model.attempts == 1
+
+    def test_gives_up_after_max_attempts(self):
+        model = FlakyModel([HttpError(429) for _ in range(10)])
+
+        with pytest.raises(RuntimeError, match="still throttling"):
+            list(model.send_request({}))
+        assert model.attempts == model.retry_policy.max_attempts
+
+    def test_transient_errors_are_not_reported_as_throttling(self):
+        model = FlakyModel([ConnectionResetError("connection dropped") for _ in range(10)])
+
+        with pytest.raises(RuntimeError, match="still fails with transient errors"):
+            list(model.send_request({}))
+        notice = model.notifications_printer.print_notification.call_args_list[0].args[0]
+        assert "failed with a transient error (ConnectionResetError)" in notice
+        assert "throttled (" not in notice
+
+    def test_models_of_a_provider_share_the_limiter(self):
+        first = FlakyModel([], config={"requests_per_minute": "60"})
+        second = FlakyModel([])
+
+        assert first.rate_limiter is second.rate_limiter
+        assert first.rate_limiter.is_limited
@@ -0,0 +1,72 @@
+from unittest.mock import Mock
+
+import pytest
+
+from hermes.chat.interface.assistant.models.request_builder import url_content_cache
+from hermes.chat.interface.assistant.models.request_builder.url_content_cache import UrlContentCache, normalize_url
+from hermes.utils.disk_cache import DiskCache
+
+
+def _response(status_code: int, content: bytes = b"", headers: dict | None = None) -> Mock:
+    response = Mock(status_code=status_code, content=content, headers=headers or {})
+    if status_code >= 400:
+        response.raise_for_status.side_effect = Exception(f"HTTP {status_code}")
+    return response
+
+
+class TestUrlContentCache:
+    @pytest.fixture
+    def session(self):
+        return Mock()
+
+    @pytest.fixture
+    def cache(self, tmp_path, session, monkeypatch):
+        monkeypatch.setattr(url_content_cache, "get_shared_http_transport", lambda: Mock(get_session=Mock(return_value=session)))
+        return UrlContentCache(DiskCache(tmp_path, max_disk_bytes=1024 * 1024, max_memory_bytes=1024 * 1024), headers={})
+
+    def test_normalized_urls_share_the_entry(self, cache, session):
+        session.get.return_value = _response(200, b"image")
+
+        cache.get_bytes("HTTPS://Example.com:443/a.png?b=2&a=1#top")
+        cache.get_bytes("https://example.com/a.png?a=1&b=2")
+
+        session.get.assert_called_once()
+
+    def test_stale_entry_is_revalidated_with_validators(self, cache, session, monkeypatch):
+        session.get.return_value = _response(200, b"image", {"ETag": '"v1"'})
+        cache.get_bytes("https://example.com/a.png")
+
+        monkeypatch.setattr(url_content_cache, "FRESHNESS_TTL_SECONDS", -1)
+        session.get.return_value = _response(304)
+        assert cache.get_bytes("https://example.com/a.png") == b"image"
+        assert session.get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+
+    def test_stale_entry_is_served_when_revalidation_fails(self, cache, session, monkeypatch):
+        session.get.return_value = _response(200, b"image")
+        cache.get_bytes("https://example.com/a.png")
+
+        monkeypatch.setattr(url_content_cache, "FRESHNESS_TTL_SECONDS", -1)
+        session.get.return_value = _response(500)
+        assert cache.get_bytes("https://example.com/a.png") == b"image"
+
+    def test_fetch_error_without_cached_entry_is_raised(self, cache, session):
+        session.get.return_value = _response(404)
+        with pytest.raises(Exception, match="HTTP 404"):
+            cache.get_bytes("https://example.com/missing.png")
+
+    def test_failed_fetch_is_not_retried_within_the_failure_ttl(self, cache, session, monkeypatch):
+        session.get.side_effect = TimeoutError("timed out")
+        for _ in range(3):
+            with pytest.raises(TimeoutError):
+                cache.get_markdown("https://unreachable.example.com")
+        assert session.get.call_count == 1
+
+        monkeypatch.setattr(url_content_cache, "FAILURE_TTL_SECONDS", -1)
+        with pytest.raises(TimeoutError):
+            cache.get_markdown("https://unreachable.example.com")
+        assert session.get.call_count == 2
+
+
+def test_normalize_url():
+    assert normalize_url("HTTP://Example.com:80") == "http://example.com/"
+    assert normalize_url("https://example.com:8443/path?z=1&a=2#section") == "https://example.com:8443/path?a=2&z=1"
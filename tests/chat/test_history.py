@@ -0,0 +1,86 @@
+from unittest.mock import Mock
+
+from hermes.chat.events.history_recovery_event import HistoryRecoveryEvent
+from hermes.chat.events.message_event import MessageEvent
+from hermes.chat.history import History
+from hermes.chat.interface.assistant.chat.assistant_orchestrator import ChatAssistantOrchestrator
+from hermes.chat.messages.text import TextMessage
+
+
+def _text(author: str, text: str, is_directly_entered: bool = False) -> TextMessage:
+    return TextMessage(author=author, text=text, is_directly_entered=is_directly_entered)
+
+
+def _texts(messages) -> list[str]:
+    return [message.text for message in messages]
+
+
+class TestHistorySync:
+    def test_only_new_messages_are_synced(self):
+        history = History()
+        history.add_message(_text("user", "first"))
+
+        first_sync = history.sync_history_for("assistant")
+        history.add_message(_text("assistant", "second"))
+        history.commit()
+        second_sync = history.sync_history_for("assistant")
+
+        assert (_texts(first_sync.messages), first_sync.is_incremental) == (["first"], False)
+        assert (_texts(second_sync.messages), second_sync.is_incremental) == (["second"], True)
+        assert history.sync_history_for("assistant").messages == []
+
+    def test_directly_entered_messages_of_the_author_are_left_out(self):
+        history = History()
+        history.add_message(_text("user", "typed", is_directly_entered=True))
+        history.add_message(_text("assistant", "answer"))
+
+        assert _texts(history.sync_history_for("user").messages) == ["answer"]
+        assert _texts(history.get_history_for("assistant")) == ["typed", "answer"]
+
+    def test_rolled_back_messages_cause_a_full_sync(self):
+        history = History()
+        history.add_message(_text("user", "kept"))
+        history.commit()
+        history.sync_history_for("assistant")
+        history.add_message(_text("user", "interrupted"))
+        history.sync_history_for("assistant")
+
+        history.reset_uncommitted()
+        history_sync = history.sync_history_for("assistant")
+
+        assert (_texts(history_sync.messages), history_sync.is_incremental) == (["kept"], False)
+
+    def test_clear_and_load_cause_a_full_sync(self, tmp_path):
+        history_path = tmp_path / "history.json"
+        history = History()
+        history.add_message(_text("user", "saved"))
+        history.commit()
+        history.save(str(history_path))
+        history.sync_history_for("assistant")
+
+        history.clear()
+        assert history.sync_history_for("assistant").is_incremental is False
+
+        history.load(str(history_path))
+        history_sync = history.sync_history_for("assistant")
+        assert (_texts(history_sync.messages), history_sync.is_incremental) == (["saved"], False)
+
+
+class TestChatAssistantHistoryRecovery:
+    def test_incremental_events_are_accumulated(self):
+        model = Mock()
+        control_panel = Mock(is_agent_mode=False)
+        control_panel.get_active_commands.return_value = []
+        orchestrator = ChatAssistantOrchestrator(model, control_panel)
+        history = History()
+
+        for text in ["first", "second"]:
+            history.add_message(_text("user", text))
+            history_sync = history.sync_history_for("assistant")
+            new_message = _text("user", f"{text} follow-up")
+            orchestrator.render(
+                event for event in [HistoryRecoveryEvent(history_sync.messages, history_sync.is_incremental), MessageEvent(new_message)]
+            )
+
+        rendered_messages = model.get_request_builder.return_value.build_request.call_args.args[0]
+        assert _texts(rendered_messages[1:]) == ["first", "second", "second follow-up"]
@@ -0,0 +1,167 @@
+from unittest.mock import Mock
+
+import pytest
+
+from hermes.chat.events.engine_commands import BranchEvent
+from hermes.chat.history import History, LazyHistoryItem
+from hermes.chat.history_branches import SEGMENTS_DIRECTORY, is_branches_directory
+from hermes.chat.history_journal import HistoryJournal, HistoryJournalSettings
+from hermes.chat.indexed_history import IndexedHistoryReader
+from hermes.chat.messages.text import TextMessage
+
+
+def add_messages(history: History, *texts: str):
+    for text in texts:
+        history.add_message(TextMessage(author="user", text=text))
+    history.commit()
+
+
+def get_texts(history: History) -> list[str]:
+    texts = []
+    for message in history.get_messages():
+        assert isinstance(message, TextMessage)
+        texts.append(message.text)
+    return texts
+
+
+def get_saved_segment_lengths(history: History, directory) -> list[int]:
+    history.save_branches(str(directory))
+    return sorted(len(IndexedHistoryReader(path)) for path in (directory / SEGMENTS_DIRECTORY).iterdir())
+
+
+class TestHistoryBranches:
+    def test_branch_shares_the_items_before_it(self, tmp_path):
+        history = History()
+        add_messages(history, "first", "second")
+
+        history.create_branch("feature")
+        add_messages(history, "on feature")
+
+        assert history.branches.get_branches() == {"main": 2, "feature": 3}
+        # The shared items are saved once, the feature branch only adds its own item
+        assert get_saved_segment_lengths(history, tmp_path) == [1, 2]
+        assert get_texts(history) == ["first", "second", "on feature"]
+
+    def test_switching_branches(self):
+        history = History()
+        add_messages(history, "first")
+        history.create_checkpoint("start")
+        add_messages(history, "main answer")
+        history.create_branch("retry", "start")
+        add_messages(history, "retried answer")
+        history.get_history_for("assistant")
+
+        assert get_texts(history) == ["first", "retried answer"]
+        history.switch_branch("main")
+        assert get_texts(history) == ["first", "main answer"]
+        assert history.sync_history_for("assistant").messages == history.get_messages()
+        assert history.branches.get_branches() == {"main": 2, "retry": 2}
+        assert history.branches.get_checkpoints() == {"start": 1}
+
+    def test_checkpoints_without_new_items_share_the_segment(self, tmp_path):
+        history = History()
+        add_messages(history, "first")
+
+        history.create_checkpoint("one")
+        history.create_checkpoint("two")
+        history.create_branch("other")
+
+        assert get_saved_segment_lengths(history, tmp_path) == [1]
+
+    def test_clearing_keeps_the_other_branches(self):
+        history = History()
+        add_messages(history, "first")
+        history.create_branch("kept")
+        history.switch_branch("main")
+
+        history.clear()
+        add_messages(history, "new start")
+
+        assert get_texts(history) == ["new start"]
+        history.switch_branch("kept")
+        assert get_texts(history) == ["first"]
+
+    def test_unknown_branch_or_checkpoint(self):
+        history = History()
+
+        with pytest.raises(ValueError):
+            history.switch_branch("missing")
+        with pytest.raises(ValueError):
+            history.create_branch("new", "missing")
+        with pytest.raises(ValueError):
+            history.create_branch("main")
+
+    def test_switch_is_autosaved(self, tmp_path):
+        journal = HistoryJournal.create_session(HistoryJournalSettings(directory=str(tmp_path)))
+        history = History(journal=journal)
+        add_messages(history, "first")
+        history.create_branch("other")
+        add_messages(history, "on other")
+
+        history.switch_branch("main")
+
+        resumed = History()
+        resumed.load(str(journal.session_directory))
+        assert get_texts(resumed) == ["first"]
+
+
+class TestSavedHistoryBranches:
+    def test_branches_are_saved_and_loaded_lazily(self, tmp_path):
+        history = History()
+        add_messages(history, "first")
+        history.create_checkpoint("start")
+        add_messages(history, "main answer")
+        history.create_branch("retry", "start")
+        add_messages(history, "retried answer")
+
+        history.save_branches(str(tmp_path))
+        loaded = History()
+        loaded.load(str(tmp_path))
+
+        assert is_branches_directory(tmp_path)
+        assert len(list((tmp_path / SEGMENTS_DIRECTORY).iterdir())) == 3
+        assert all(isinstance(item, LazyHistoryItem) for item in loaded.branches.get_items())
+        assert loaded.branches.current_branch == "retry"
+        assert get_texts(loaded) == ["first", "retried answer"]
+        loaded.switch_branch("main")
+        assert get_texts(loaded) == ["first", "main answer"]
+
+    def test_saved_segments_are_not_written_again(self, tmp_path):
+        history = History()
+        add_messages(history, "first")
+        history.save_branches(str(tmp_path))
+        [first_segment] = (tmp_path / SEGMENTS_DIRECTORY).iterdir()
+        first_written = first_segment.stat().st_mtime_ns
+
+        add_messages(history, "second")
+        history.save_branches(str(tmp_path))
+
+        assert len(list((tmp_path / SEGMENTS_DIRECTORY).iterdir())) == 2
+        assert first_segment.stat().st_mtime_ns == first_written
+        loaded = History()
+        loaded.load(str(tmp_path))
+        assert get_texts(loaded) == ["first", "second"]
+
+
+class TestBranchEvent:
+    def test_creates_then_switches(self):
+        orchestrator = Mock()
+        orchestrator.history = History()
+        orchestrator.participants = [Mock()]
+        add_messages(orchestrator.history, "first")
+
+        BranchEvent("other").execute(orchestrator)
+        add_messages(orchestrator.history, "on other")
+        BranchEvent("main").execute(orchestrator)
+
+        assert get_texts(orchestrator.history) == ["first"]
+        assert orchestrator.history.branches.current_branch == "main"
+        orchestrator.participants[0].initialize_from_history.assert_called_with(orchestrator.history)
+
+    def test_unknown_checkpoint_is_reported(self):
+        orchestrator = Mock()
+        orchestrator.history = History()
+
+        BranchEvent("other", "missing").execute(orchestrator)
+
+        assert "missing" in orchestrator.notifications_printer.print_notification.call_args.args[0]
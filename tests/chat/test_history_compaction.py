@@ -0,0 +1,172 @@
+import threading
+from unittest.mock import Mock
+
+from hermes.chat.history import History
+from hermes.chat.history_compaction import HistoryCompactionSettings, HistoryCompactor, HistorySummarizer
+from hermes.chat.indexed_history import IndexedHistoryReader
+from hermes.chat.interface.assistant.chat.response_types import TextLLMResponse, ThinkingLLMResponse
+from hermes.chat.interface.assistant.models.prompt_builder.simple_prompt_builder import SimplePromptBuilderFactory
+from hermes.chat.interface.assistant.models.request_builder.openai import OpenAIRequestBuilder
+from hermes.chat.messages import HistorySummaryMessage, LLMRunCommandOutput, TextMessage
+
+
+class FakeSummarizer:
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+        self.error: Exception | None = None
+
+    def summarize(self, messages):
+        self.calls.append(messages)
+        self.started.set()
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return f"summary {len(self.calls)}"
+
+
+def create_history(tmp_path) -> tuple[History, HistoryCompactor, FakeSummarizer]:
+    summarizer = FakeSummarizer()
+    # Each turn is ~42 tokens, the history is compacted over 4 turns and keeps the last 2
+    settings = HistoryCompactionSettings(model="FAKE/fake", threshold_tokens=200, kept_recent_tokens=90)
+    compactor = HistoryCompactor(settings, summarizer.summarize, tmp_path / "compacted", Mock())
+    return History(compactor=compactor), compactor, summarizer
+
+
+def add_turn(history: History, number: int):
+    history.add_message(TextMessage(author="user", text=f"question {number} " + "x" * 40, is_directly_entered=True))
+    history.add_message(TextMessage(author="assistant", text=f"answer {number} " + "y" * 40))
+    history.commit()
+
+
+def wait_for_summary(compactor: HistoryCompactor):
+    # The summary runs on the compactor's worker thread, which has no public handle to wait on
+    pending = compactor._pending  # noqa: SLF001
+    assert pending is not None
+    pending.exception(5)
+
+
+def get_summary(history: History) -> HistorySummaryMessage:
+    summary = history.get_messages()[0]
+    assert isinstance(summary, HistorySummaryMessage)
+    return summary
+
+
+def get_texts(history: History) -> list[str]:
+    texts = []
+    for message in history.get_messages():
+        assert isinstance(message, TextMessage | HistorySummaryMessage)
+        texts.append(message.text.split(" x")[0].split(" y")[0])
+    return texts
+
+
+class TestHistoryCompactor:
+    def test_oldest_turns_are_replaced_by_the_summary(self, tmp_path):
+        history, compactor, summarizer = create_history(tmp_path)
+        for number in range(5):
+            add_turn(history, number)
+        wait_for_summary(compactor)
+        add_turn(history, 5)
+
+        summary = get_summary(history)
+        assert (summary.text, summary.summarized_count) == ("summary 1", 6)
+        assert get_texts(history)[1:] == ["question 3", "answer 3", "question 4", "answer 4", "question 5", "answer 5"]
+        # The originals are archived
+        assert summary.archive_path is not None
+        assert len(IndexedHistoryReader(summary.archive_path)) == 6
+        assert history.sync_history_for("assistant").messages[0] is summary
+
+    def test_turns_are_not_blocked_by_the_summary(self, tmp_path):
+        history, compactor, summarizer = create_history(tmp_path)
+        summarizer.release.clear()
+
+        for number in range(8):
+            add_turn(history, number)
+
+        assert summarizer.started.wait(5)
+        assert len(summarizer.calls) == 1
+        assert len(history.get_messages()) == 16
+        summarizer.release.set()
+
+    def test_summaries_roll_over(self, tmp_path):
+        history, compactor, summarizer = create_history(tmp_path)
+        for number in range(5):
+            add_turn(history, number)
+        wait_for_summary(compactor)
+        for number in range(5, 8):
+            add_turn(history, number)
+        wait_for_summary(compactor)
+        add_turn(history, 8)
+
+        summary = get_summary(history)
+        assert isinstance(summarizer.calls[1][0], HistorySummaryMessage)
+        assert (summary.text, summary.summarized_count) == ("summary 2", 12)
+
+    def test_summary_of_a_replaced_history_is_discarded(self, tmp_path):
+        history, compactor, summarizer = create_history(tmp_path)
+        for number in range(5):
+            add_turn(history, number)
+        wait_for_summary(compactor)
+
+        history.clear()
+        add_turn(history, 10)
+
+        assert get_texts(history) == ["question 10", "answer 10"]
+
+    def test_current_turn_is_kept_even_when_over_the_kept_tokens(self, tmp_path):
+        history, compactor, summarizer = create_history(tmp_path)
+        for number in range(3):
+            add_turn(history, number)
+        history.add_message(TextMessage(author="user", text="question 3", is_directly_entered=True))
+        history.add_message(TextMessage(author="assistant", text="answer 3 " + "y" * 8000))
+        history.commit()
+        wait_for_summary(compactor)
+        history.commit()
+
+        assert isinstance(history.get_messages()[0], HistorySummaryMessage)
+        assert get_texts(history)[1:] == ["question 3", "answer 3"]
+
+    def test_failed_summary_is_retried_later(self, tmp_path):
+        history, compactor, summarizer = create_history(tmp_path)
+        summarizer.error = RuntimeError("rate limited")
+        for number in range(5):
+            add_turn(history, number)
+        wait_for_summary(compactor)
+        add_turn(history, 5)
+
+        assert len(history.get_messages()) == 12
+        summarizer.error = None
+        for number in range(6, 16):
+            add_turn(history, number)
+        wait_for_summary(compactor)
+        assert len(summarizer.calls) == 2
+
+
+class TestHistorySummary:
+    def test_summary_is_rendered_into_the_request(self):
+        request_builder = OpenAIRequestBuilder("gpt-4o", Mock(), SimplePromptBuilderFactory())
+        summary = HistorySummaryMessage(text="The user is refactoring the parser", summarized_count=12)
+
+        request = request_builder.build_request([summary, TextMessage(author="user", text="Continue")])
+
+        assert "Summary of the earlier conversation (12 messages" in str(request["messages"])
+        assert "The user is refactoring the parser" in str(request["messages"])
+
+    def test_summary_survives_serialization(self):
+        summary = HistorySummaryMessage(text="summary", summarized_count=3, archive_path="/tmp/compacted.hidx")
+
+        assert HistorySummaryMessage.from_json(summary.to_json()).to_json() == summary.to_json()
+
+    def test_summarizer_cuts_long_messages(self):
+        model = Mock()
+        model.send_request.return_value = iter([ThinkingLLMResponse("thinking"), TextLLMResponse("the summary")])
+        summarizer = HistorySummarizer(model, max_message_characters=10)
+
+        summary = summarizer.summarize([LLMRunCommandOutput(text="z" * 100)])
+
+        prompt = model.get_request_builder().build_request.call_args.args[0][0].text
+        assert summary == "the summary"
+        assert "user: zzzzzzzzzz\n[... 90 characters cut]" in prompt
+        model.initialize.assert_called_once()
@@ -0,0 +1,154 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from hermes.chat.history import History
+from hermes.chat.history_journal import (
+    JOURNAL_FILENAME,
+    HistoryJournal,
+    HistoryJournalSettings,
+    JournalCompression,
+    JournalFsyncPolicy,
+)
+from hermes.chat.indexed_history import IndexedHistoryReader, write_indexed_history
+from hermes.chat.messages.text import TextMessage
+
+
+def create_history(tmp_path, **settings) -> tuple[History, HistoryJournal]:
+    journal = HistoryJournal.create_session(HistoryJournalSettings(directory=str(tmp_path), **settings))
+    return History(journal=journal), journal
+
+
+def add_messages(history: History, *texts: str):
+    for text in texts:
+        history.add_message(TextMessage(author="user", text=text))
+    history.commit()
+
+
+def get_exited_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", ""])
+    process.wait()
+    return process.pid
+
+
+def load_texts(path) -> list[str]:
+    history = History()
+    history.load(str(path))
+    return [message.text for message in history.get_messages() if isinstance(message, TextMessage)]
+
+
+class TestHistoryJournal:
+    def test_commits_are_journaled(self, tmp_path):
+        history, journal = create_history(tmp_path)
+
+        add_messages(history, "first")
+        add_messages(history, "second", "third")
+        history.add_message(TextMessage(author="user", text="uncommitted"))
+
+        journal_lines = (journal.session_directory / JOURNAL_FILENAME).read_text().splitlines()
+        assert len(journal_lines) == 3
+        # Recovered without closing, as after a crash
+        assert load_texts(journal.session_directory) == ["first", "second", "third"]
+
+    def test_journal_is_compacted_into_the_snapshot(self, tmp_path):
+        history, journal = create_history(tmp_path, snapshot_every_entries=3)
+
+        add_messages(history, "first", "second")
+        add_messages(history, "third")
+        add_messages(history, "fourth")
+
+        [snapshot_path] = journal.session_directory.glob("snapshot-*")
+        assert len(IndexedHistoryReader(snapshot_path)) == 3
+        assert len((journal.session_directory / JOURNAL_FILENAME).read_text().splitlines()) == 1
+        assert load_texts(journal.session_directory) == ["first", "second", "third", "fourth"]
+
+    def test_torn_and_stale_entries_are_skipped(self, tmp_path):
+        history, journal = create_history(tmp_path, fsync=JournalFsyncPolicy.ALWAYS)
+        add_messages(history, "first")
+        journal_path = journal.session_directory / JOURNAL_FILENAME
+        stale_entry = json.dumps({"generation": 0, "item": {"message": TextMessage(author="user", text="stale").to_json()}})
+
+        with open(journal_path, "a", encoding="utf-8") as f:
+            f.write(stale_entry + "\n" + '{"generation": 1, "item": {"mess')
+
+        assert load_texts(journal.session_directory) == ["first"]
+
+    def test_clear_and_load_start_a_new_snapshot(self, tmp_path):
+        saved_path = tmp_path / "saved.json"
+        saved_history = History()
+        add_messages(saved_history, "saved")
+        saved_history.save(str(saved_path))
+        history, journal = create_history(tmp_path / "sessions")
+
+        add_messages(history, "first")
+        history.clear()
+        history.load(str(saved_path))
+        add_messages(history, "after load")
+
+        assert load_texts(journal.session_directory) == ["saved", "after load"]
+
+    def test_branch_switch_is_journaled_without_a_snapshot(self, tmp_path):
+        history, journal = create_history(tmp_path / "sessions", snapshot_every_entries=4)
+        add_messages(history, "first", "second")
+        history.create_checkpoint("start")
+        add_messages(history, "third", "fourth")
+        [snapshot_path] = journal.session_directory.glob("snapshot-*")
+
+        history.create_branch("retry", "start")
+        add_messages(history, "retried")
+
+        assert list(journal.session_directory.glob("snapshot-*")) == [snapshot_path]
+        assert len(IndexedHistoryReader(snapshot_path)) == 4
+        assert load_texts(journal.session_directory) == ["first", "second", "retried"]
+        # A new session resumed from it keeps the rewind
+        resumed, resumed_journal = create_history(tmp_path / "resumed")
+        resumed.load(str(journal.session_directory))
+        assert load_texts(resumed_journal.session_directory) == ["first", "second", "retried"]
+
+    def test_compressed_journal_is_recovered(self, tmp_path):
+        pytest.importorskip("zstandard")
+        history, journal = create_history(tmp_path, compression=JournalCompression.ZSTD)
+
+        add_messages(history, "first")
+        add_messages(history, "second")
+
+        assert journal.compression == JournalCompression.ZSTD
+        assert load_texts(journal.session_directory) == ["first", "second"]
+
+    def test_missing_zstandard_falls_back_to_plain_journal(self, tmp_path, monkeypatch):
+        monkeypatch.setitem(__import__("sys").modules, "zstandard", None)
+        history, journal = create_history(tmp_path, compression=JournalCompression.ZSTD)
+
+        add_messages(history, "first")
+
+        assert journal.compression == JournalCompression.NONE
+        assert load_texts(journal.session_directory) == ["first"]
+
+    def test_old_sessions_are_deleted(self, tmp_path):
+        settings = HistoryJournalSettings(directory=str(tmp_path), max_sessions=2)
+        exited_pid = get_exited_pid()
+        for name in [f"20240101-000000-{exited_pid}", f"20240102-000000-{exited_pid}"]:
+            (tmp_path / name).mkdir()
+            write_indexed_history(tmp_path / name / "snapshot-1.hidx", [])
+
+        journal = HistoryJournal.create_session(settings)
+
+        assert sorted(path.name for path in tmp_path.iterdir()) == [f"20240102-000000-{exited_pid}", journal.session_directory.name]
+
+    def test_sessions_of_running_processes_are_kept(self, tmp_path):
+        settings = HistoryJournalSettings(directory=str(tmp_path), max_sessions=1)
+        running_session = tmp_path / f"20240101-000000-{os.getpid()}"
+        running_session.mkdir()
+        write_indexed_history(running_session / "snapshot-1.hidx", [])
+
+        HistoryJournal.create_session(settings)
+
+        assert running_session.exists()
+
+    def test_settings_from_ini_strings(self):
+        settings = HistoryJournalSettings.from_config({"autosave": "false", "fsync": "always", "compression": "zstd"})
+
+        assert (settings.autosave, settings.fsync, settings.compression) == (False, JournalFsyncPolicy.ALWAYS, JournalCompression.ZSTD)
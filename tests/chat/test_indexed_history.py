@@ -0,0 +1,100 @@
+from unittest.mock import patch
+
+import pytest
+
+from hermes.chat import history as history_module
+from hermes.chat.history import History
+from hermes.chat.history_journal import HistoryJournal, HistoryJournalSettings
+from hermes.chat.indexed_history import IndexedHistoryReader, is_indexed_history
+from hermes.chat.messages import LLMRunCommandOutput, Message
+from hermes.chat.messages.text import TextMessage
+
+
+def create_saved_history(path) -> str:
+    history = History()
+    history.add_message(TextMessage(author="user", text="typed question", is_directly_entered=True))
+    history.add_message(TextMessage(author="assistant", text="answer"))
+    history.add_message(LLMRunCommandOutput(text="x" * 100_000, name="cat big.txt"))
+    history.commit()
+    history.save(str(path))
+    return str(path)
+
+
+def get_text(message: Message) -> str:
+    assert isinstance(message, (TextMessage, LLMRunCommandOutput))
+    return message.text
+
+
+@pytest.fixture
+def deserialize_message():
+    with patch.object(history_module, "deserialize_message", wraps=history_module.deserialize_message) as deserialize_message:
+        yield deserialize_message
+
+
+class TestIndexedHistory:
+    def test_loading_reads_only_the_index(self, tmp_path, deserialize_message):
+        path = create_saved_history(tmp_path / "history.hidx")
+        history = History()
+
+        history.load(path)
+
+        assert is_indexed_history(path)
+        assert deserialize_message.call_count == 0
+        assert [message.get_content_for_assistant() for message in history.get_messages()][:2] == ["typed question", "answer"]
+        assert get_text(history.get_messages()[2]) == "x" * 100_000
+
+    def test_visibility_comes_from_the_metadata(self, tmp_path, deserialize_message):
+        history = History()
+        history.load(create_saved_history(tmp_path / "history.hidx"))
+
+        user_sync = history.sync_history_for("user")
+
+        assert [message.author for message in user_sync.messages] == ["assistant", "user"]
+        # The message the user typed isn't deserialized for the user's own view
+        assert deserialize_message.call_count == 2
+
+    def test_saving_over_the_loaded_file_keeps_the_messages_readable(self, tmp_path):
+        path = create_saved_history(tmp_path / "history.hidx")
+        history = History()
+        history.load(path)
+        history.add_message(TextMessage(author="user", text="follow up"))
+        history.commit()
+
+        history.save(path)
+        reloaded = History()
+        reloaded.load(path)
+
+        assert [message.author for message in reloaded.get_messages()] == ["user", "assistant", "user", "user"]
+        assert get_text(reloaded.get_messages()[-1]) == "follow up"
+        assert get_text(history.get_messages()[1]) == "answer"
+
+    def test_json_files_still_load(self, tmp_path, deserialize_message):
+        path = create_saved_history(tmp_path / "history.json")
+        history = History()
+
+        history.load(path)
+
+        assert not is_indexed_history(path)
+        # JSON histories have no index, all the messages are deserialized on load
+        assert deserialize_message.call_count == 3
+        assert get_text(history.get_messages()[1]) == "answer"
+
+    def test_resumed_session_is_copied_without_deserializing(self, tmp_path, deserialize_message):
+        settings = HistoryJournalSettings(directory=str(tmp_path / "sessions"))
+        first_journal = HistoryJournal.create_session(settings)
+        first_session = History(journal=first_journal)
+        first_session.load(create_saved_history(tmp_path / "history.hidx"))
+        first_session.add_message(TextMessage(author="user", text="journaled"))
+        first_session.commit()
+
+        second_journal = HistoryJournal(tmp_path / "second", settings)
+        second_journal.session_directory.mkdir()
+        second_session = History(journal=second_journal)
+        second_session.load(str(first_journal.session_directory))
+
+        assert deserialize_message.call_count == 1
+        [snapshot_path] = second_journal.session_directory.glob("snapshot-*")
+        assert len(IndexedHistoryReader(snapshot_path)) == 3
+        resumed = History()
+        resumed.load(str(second_journal.session_directory))
+        assert get_text(resumed.get_messages()[-1]) == "journaled"
@@ -0,0 +1,34 @@
+import pytest
+
+from hermes.chat import history_journal
+from hermes.chat.interface.assistant.models.request_builder import (
+    attachment_cache,
+    gemini_upload_registry,
+    image_preprocessing,
+    ingestion_pipeline,
+    url_content_cache,
+)
+from hermes.utils import http_transport
+from hermes.utils.http_transport import HttpTransport, HttpTransportSettings
+
+
+@pytest.fixture(autouse=True, scope="session")
+def no_connection_warm_up():
+    """Models initialized in the tests would otherwise open a connection to their real API"""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(http_transport, "_shared_http_transport", HttpTransport(HttpTransportSettings(warm_up=False)))
+        yield
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """The process-wide caches are created again under tmp_path instead of the user's cache directory"""
+    cache_dir = tmp_path / "cache"
+    for module in (attachment_cache, gemini_upload_registry, history_journal, image_preprocessing, url_content_cache):
+        monkeypatch.setattr(module, "get_cache_dir_path", lambda: cache_dir)
+    monkeypatch.setattr(attachment_cache, "_shared_cache", None)
+    monkeypatch.setattr(url_content_cache, "_shared_cache", None)
+    monkeypatch.setattr(image_preprocessing, "_shared_preprocessor", None)
+    monkeypatch.setattr(ingestion_pipeline, "_shared_pipeline", None)
+    monkeypatch.setattr(gemini_upload_registry, "_shared_registry", None)
+    return cache_dir
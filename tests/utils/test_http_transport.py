@@ -0,0 +1,109 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any
+from unittest.mock import Mock
+
+import anthropic
+import httpx
+import openai
+import pytest
+
+from hermes.chat.interface.assistant.models.chat_models.claude import ClaudeModel
+from hermes.chat.interface.assistant.models.chat_models.openai import OpenAIModel
+from hermes.utils.http_transport import HttpTransport, HttpTransportSettings
+
+
+class _CountingHandler(BaseHTTPRequestHandler):
+    requests_received = threading.Event()
+    request_count = 0
+
+    def do_HEAD(self):  # noqa: N802
+        self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        _CountingHandler.request_count += 1
+        self.requests_received.set()
+
+    def log_message(self, *args: Any, **kwargs: Any):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = HTTPServer(("127.0.0.1", 0), _CountingHandler)
+    _CountingHandler.requests_received.clear()
+    _CountingHandler.request_count = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+class TestHttpTransport:
+    def test_settings_are_parsed_from_ini_and_json_configs(self):
+        assert HttpTransportSettings.from_config({"max_connections": "8", "http2": "false", "keepalive_expiry_seconds": "1.5"}) == (
+            HttpTransportSettings(max_connections=8, http2=False, keepalive_expiry_seconds=1.5)
+        )
+        assert HttpTransportSettings.from_config({"warm_up": False}).warm_up is False
+
+    def test_clients_are_shared(self):
+        transport = HttpTransport()
+
+        assert transport.get_client(httpx.AsyncClient) is transport.get_client(httpx.AsyncClient)
+        assert transport.get_client(httpx.Client) is not transport.get_client(httpx.AsyncClient)
+        assert transport.get_session() is transport.get_session()
+
+    def test_settings_are_applied_to_the_pools(self):
+        transport = HttpTransport(HttpTransportSettings(max_connections=3, max_keepalive_connections=2, connect_timeout_seconds=1))
+
+        client = transport.get_client(httpx.Client)
+
+        assert client.timeout.connect == 1
+        # httpx doesn't expose the limits of the pool
+        assert client._transport._pool._max_connections == 3  # noqa: SLF001
+
+    def test_settings_are_ignored_once_the_clients_exist(self):
+        transport = HttpTransport()
+        transport.get_client(httpx.Client)
+
+        transport.configure(HttpTransportSettings(max_connections=1))
+
+        assert transport.settings.max_connections == 64
+
+    def test_warm_up_opens_the_connection_once(self, local_server):
+        transport = HttpTransport()
+
+        transport.warm_up(local_server, httpx.AsyncClient)
+        transport.warm_up(local_server, httpx.AsyncClient)
+
+        assert _CountingHandler.requests_received.wait(5)
+        time.sleep(0.2)
+        assert _CountingHandler.request_count == 1
+
+    def test_warm_up_can_be_disabled(self, local_server):
+        transport = HttpTransport(HttpTransportSettings(warm_up=False))
+
+        transport.warm_up(local_server, httpx.AsyncClient)
+
+        assert not _CountingHandler.requests_received.wait(0.2)
+
+    def test_models_use_the_shared_client(self, monkeypatch):
+        transport = HttpTransport(HttpTransportSettings(warm_up=False))
+        monkeypatch.setattr("hermes.chat.interface.assistant.models.chat_models.openai.get_shared_http_transport", lambda: transport)
+        monkeypatch.setattr("hermes.chat.interface.assistant.models.chat_models.claude.get_shared_http_transport", lambda: transport)
+        models = [OpenAIModel({"api_key": "key"}, "gpt-4o", Mock()), ClaudeModel({"api_key": "key"}, "claude-3-5-haiku-20241022", Mock())]
+
+        for model in models:
+            model.initialize()
+
+        # The SDK clients don't expose the httpx client they were given
+        assert models[0].client._client is transport.get_client(openai.DefaultAsyncHttpxClient)  # noqa: SLF001
+        assert models[1].client._client is transport.get_client(anthropic.DefaultAsyncHttpxClient)  # noqa: SLF001
+
+    def test_sdk_clients_get_pools_of_their_httpx_package(self):
+        transport = HttpTransport()
+
+        client = transport.get_client(openai.DefaultAsyncHttpxClient)
+
+        assert isinstance(client, openai.DefaultAsyncHttpxClient)
+        assert client.follow_redirects